@@ -14,10 +14,18 @@ Strategy:
 4. Build "confidence adjustments" to apply to similar future bets
 """
 
+import argparse
 import json
+import os
 from datetime import datetime
 import glob
 
+from betting_database import bet_id, ids_current, open_if_populated
+from incremental_learning import SettlementFeed, write_json_if_changed
+
+LOSS_STATE_FILE = 'loss_patterns_state.json'
+LOSS_PATTERNS = ('spread_favorites_losing', 'moneyline_wrong', 'underdog_value_misses', 'confidence_mismatches')
+
 def analyze_loss_opposite(loss_bet):
     """
     For a losing bet, calculate what the OPPOSITE bet would have been
@@ -117,6 +125,25 @@ def analyze_loss_opposite(loss_bet):
     
     return analysis
 
+def classify_loss(loss):
+    """Return (analysis, [loss pattern names]) for one losing bet; (None, []) if unparseable"""
+    analysis = analyze_loss_opposite(loss)
+    if not analysis:
+        return None, []
+    
+    patterns = []
+    if analysis.get('opposite_would_win'):
+        patterns.append('underdog_value_misses')
+        # High confidence but wrong?
+        if loss.get('confidence', 0) >= 80:
+            patterns.append('confidence_mismatches')
+    
+    # Check if we were betting favorite
+    if loss.get('bet_type') == 'SPREAD' and '-' in loss.get('recommendation', ''):
+        patterns.append('spread_favorites_losing')
+    
+    return analysis, patterns
+
 def build_learning_insights():
     """Analyze all past bets to find patterns in losses"""
     
@@ -161,7 +188,7 @@ def build_learning_insights():
     }
     
     for i, loss in enumerate(losses, 1):
-        analysis = analyze_loss_opposite(loss)
+        analysis, patterns = classify_loss(loss)
         if not analysis:
             continue
         
@@ -172,16 +199,9 @@ def build_learning_insights():
         
         if analysis.get('opposite_would_win'):
             print(f"   💡 Opposite Would WIN: {analysis.get('opposite_bet')}")
-            loss_patterns['underdog_value_misses'].append(analysis)
-            
-            # High confidence but wrong?
-            if loss.get('confidence', 0) >= 80:
-                loss_patterns['confidence_mismatches'].append(analysis)
         
-        if loss.get('bet_type') == 'SPREAD':
-            # Check if we were betting favorite
-            if '-' in loss.get('recommendation', ''):
-                loss_patterns['spread_favorites_losing'].append(analysis)
+        for pattern in patterns:
+            loss_patterns[pattern].append(analysis)
     
     # Generate insights
     print(f"\n\n{'='*80}")
@@ -235,11 +255,83 @@ def build_learning_insights():
         'example_losses': loss_patterns['underdog_value_misses'][:5]  # First 5 misses
     }
     
-    with open('learning_insights.json', 'w') as f:
-        json.dump(insights, f, indent=2)
+    write_json_if_changed('learning_insights.json', insights)
     
     print(f"\n✅ Learning insights saved to learning_insights.json")
     return insights
 
+def _load_loss_state():
+    try:
+        with open(LOSS_STATE_FILE, 'r') as f:
+            state = json.load(f)
+        if ids_current(state.get('watermark')):
+            return state
+    except Exception:
+        pass
+    return {'watermark': {}, 'results': {}, 'patterns': {p: {} for p in LOSS_PATTERNS}}
+
+def update_learning_insights():
+    """
+    Incremental build_learning_insights: only settlements since the stored
+    watermark are read and classified. Per-bet results and loss patterns are
+    kept in loss_patterns_state.json, keyed by bet id, so a corrected result
+    replaces its earlier classification.
+    """
+    state = _load_loss_state()
+    bets, watermark = SettlementFeed(open_if_populated()).since(state.get('watermark'))
+    
+    changed = 0
+    for bet in bets:
+        key = bet_id(bet)
+        if state['results'].get(key) == bet['result']:
+            continue
+        changed += 1
+        state['results'][key] = bet['result']
+        for members in state['patterns'].values():
+            members.pop(key, None)
+        if bet['result'] == 'LOSS':
+            analysis, patterns = classify_loss(bet)
+            for pattern in patterns:
+                state['patterns'][pattern][key] = analysis
+    
+    print(f"🧠 {changed} new settlements since last run")
+    if changed or watermark != state.get('watermark'):
+        state['watermark'] = watermark
+        tmp = LOSS_STATE_FILE + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, LOSS_STATE_FILE)
+    
+    results = list(state['results'].values())
+    wins, losses = results.count('WIN'), results.count('LOSS')
+    patterns = state['patterns']
+    insights = {
+        'generated_at': datetime.now().isoformat(),
+        'total_bets': len(results),
+        'wins': wins,
+        'losses': losses,
+        'win_rate_pct': (wins/(wins+losses)*100) if (wins+losses)>0 else 0,
+        'patterns': {
+            'spread_favorites_losing': len(patterns['spread_favorites_losing']),
+            'underdog_value_misses': len(patterns['underdog_value_misses']),
+            'high_confidence_wrong': len(patterns['confidence_mismatches']),
+        },
+        'example_losses': list(patterns['underdog_value_misses'].values())[:5]
+    }
+    
+    if write_json_if_changed('learning_insights.json', insights):
+        print("✅ Learning insights saved to learning_insights.json")
+    else:
+        print("✅ Learning insights unchanged")
+    return insights
+
 if __name__ == '__main__':
-    build_learning_insights()
+    parser = argparse.ArgumentParser(description='Adaptive Learning System v2.0')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only classify settlements since the last run')
+    args = parser.parse_args()
+    
+    if args.incremental:
+        update_learning_insights()
+    else:
+        build_learning_insights()
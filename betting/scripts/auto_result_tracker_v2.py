@@ -10,7 +10,6 @@ Features:
 """
 
 import json
-import requests
 from datetime import datetime, timezone, timedelta
 import sys
 import re
@@ -18,21 +17,25 @@ import os
 
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
 
+from betting_database import record_settled_bets
+from espn_scoreboard import get_service
+
 class AutoResultTrackerV2:
     def __init__(self):
         self.active_bets_file = 'active_bets.json'
         self.log_file = 'bet_tracking.log'
         
-        # ESPN API endpoints by sport
-        self.espn_endpoints = {
-            'NCAA Basketball': 'basketball/mens-college-basketball',
-            'NBA': 'basketball/nba',
-            'NFL': 'football/nfl',
-            'MLB': 'baseball/mlb',
-            'NHL': 'hockey/nhl',
-            'College Football': 'football/college-football',
-            'Premier League': 'soccer/eng.1'
+        # ESPN scoreboard leagues by sport (espn_scoreboard league codes)
+        self.espn_leagues = {
+            'NCAA Basketball': 'ncb',
+            'NBA': 'nba',
+            'NFL': 'nfl',
+            'MLB': 'mlb',
+            'NHL': 'nhl',
+            'College Football': 'cfb',
+            'Premier League': 'epl'
         }
+        self.scoreboards = get_service()
     
         """Load Telegram credentials if available"""
         try:
@@ -48,49 +51,23 @@ class AutoResultTrackerV2:
         print(f"{timestamp} {message}")
     
     def fetch_espn_scores(self, sport, date_str):
-        """Fetch completed games from ESPN for a specific date"""
-        endpoint = self.espn_endpoints.get(sport)
-        if not endpoint:
+        """Completed games for a sport on a date, from the shared ESPN scoreboard cache"""
+        league = self.espn_leagues.get(sport)
+        if not league:
             return []
         
-        try:
-            url = f"https://site.api.espn.com/apis/site/v2/sports/{endpoint}/scoreboard"
-            params = {
-                'limit': 300,
-                'dates': date_str.replace('-', '')  # ESPN wants YYYYMMDD
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                scores = []
-                
-                for event in data.get('events', []):
-                    status = event.get('status', {})
-                    if status.get('type', {}).get('completed') == True:
-                        competitors = event.get('competitions', [{}])[0].get('competitors', [])
-                        if len(competitors) == 2:
-                            away = competitors[1] if competitors[1].get('homeAway') == 'away' else competitors[0]
-                            home = competitors[0] if competitors[0].get('homeAway') == 'home' else competitors[1]
-                            
-                            away_score = int(away.get('score', 0))
-                            home_score = int(home.get('score', 0))
-                            
-                            # Skip games with 0-0 scores (incomplete data)
-                            if away_score > 0 or home_score > 0:
-                                scores.append({
-                                    'away_team': away.get('team', {}).get('displayName', ''),
-                                    'home_team': home.get('team', {}).get('displayName', ''),
-                                    'away_score': away_score,
-                                    'home_score': home_score,
-                                    'completed': True
-                                })
-                
-                return scores
-        except Exception as e:
-            self.log(f"⚠️  ESPN error for {sport}: {e}")
-            return []
+        scores = []
+        for event in self.scoreboards.events(league, date_str):
+            # Skip games with 0-0 scores (incomplete data)
+            if event.completed and (event.away_score or event.home_score):
+                scores.append({
+                    'away_team': event.away_team,
+                    'home_team': event.home_team,
+                    'away_score': event.away_score,
+                    'home_score': event.home_score,
+                    'completed': True
+                })
+        return scores
     
     def normalize_team_name(self, name):
         """Normalize team name for matching"""
@@ -205,9 +182,10 @@ class AutoResultTrackerV2:
         
         self.log(f"📊 Processing {len(bets)} active bets from {bet_date}...")
         
-        # Fetch ESPN scores for each sport
+        # Fetch ESPN scores for each sport (all scoreboards warmed concurrently)
+        self.scoreboards.prefetch([(league, bet_date) for league in self.espn_leagues.values()])
         sport_scores = {}
-        for sport_key in self.espn_endpoints.keys():
+        for sport_key in self.espn_leagues.keys():
             scores = self.fetch_espn_scores(sport_key, bet_date)
             if scores:
                 sport_scores[sport_key] = scores
@@ -279,6 +257,8 @@ class AutoResultTrackerV2:
             
             with open(completed_file, 'w') as f:
                 json.dump(completed_data, f, indent=2)
+            # Dual-write: BettingDB is the primary store, JSON kept during the transition
+            record_settled_bets(completed_bets, bet_date)
             
             self.log(f"💾 Saved {len(completed_bets)} new results to {completed_file}")
         
@@ -4,6 +4,7 @@
 Runs every 15 minutes to keep dashboard fresh
 
 TASKS:
+0. Snapshot pre-game lines (closing line value for settled bets)
 1. Check all active games for status (started/in-progress/finished)
 2. Move finished games to Previous Results
 3. Update win/loss records
@@ -17,10 +18,11 @@ TASKS:
 import json
 import os
 import sys
-import subprocess
 from datetime import datetime
 import pytz
 
+from pipeline_runner import Pipeline, Stage, settle, snapshot_lines
+
 # Configuration
 WORKSPACE = os.environ.get('WORKSPACE', os.getcwd())
 sys.path.insert(0, WORKSPACE)
@@ -33,6 +35,7 @@ ACTIVE_BETS_FILE = f"{WORKSPACE}/active_bets.json"
 RANKED_BETS_FILE = f"{WORKSPACE}/ranked_bets.json"
 COMPLETED_BETS_FILE = f"{WORKSPACE}/completed_bets_2026-02-16.json"
 UPDATE_LOG_FILE = f"{WORKSPACE}/auto_update.log"
+BET_STATS_FILE = f"{WORKSPACE}/cache/bet_stats.json"
 
 def log(message: str):
     """Log with timestamp to console and file"""
@@ -48,38 +51,6 @@ def log(message: str):
     except:
         pass
 
-def run_script(script_path: str, description: str) -> bool:
-    """Run a Python script and return success status"""
-    try:
-        log(f"▶️  Running: {description}")
-        
-        result = subprocess.run(
-            ['python3', script_path],
-            cwd=WORKSPACE,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5-minute timeout
-        )
-        
-        if result.returncode == 0:
-            log(f"✅ {description} - SUCCESS")
-            if result.stdout:
-                log(f"   Output: {result.stdout[:500]}")  # First 500 chars
-            return True
-        else:
-            log(f"❌ {description} - FAILED")
-            if result.stderr:
-                log(f"   Error: {result.stderr[:500]}")
-            return False
-    
-    except subprocess.TimeoutExpired:
-        log(f"⏱️ {description} - TIMEOUT (>5 min)")
-        return False
-    
-    except Exception as e:
-        log(f"❌ {description} - ERROR: {e}")
-        return False
-
 def load_json_file(filepath: str):
     """Load JSON file safely"""
     try:
@@ -101,12 +72,12 @@ def save_json_file(filepath: str, data: dict):
         log(f"⚠️ Error saving {filepath}: {e}")
         return False
 
-def recalculate_stats():
+def recalculate_stats(ctx=None):
     """Recalculate win/loss stats from completed bets"""
     try:
         log("📊 Recalculating stats...")
         
-        completed_data = load_json_file(COMPLETED_BETS_FILE)
+        completed_data = ctx.load_json(COMPLETED_BETS_FILE) if ctx else load_json_file(COMPLETED_BETS_FILE)
         if not completed_data:
             log("   ⚠️ No completed bets file found")
             return {'wins': 0, 'losses': 0, 'win_rate': 0, 'record': '0-0'}
@@ -132,7 +103,7 @@ def recalculate_stats():
         # Save to cache
         cache_dir = f"{WORKSPACE}/cache"
         os.makedirs(cache_dir, exist_ok=True)
-        save_json_file(f"{cache_dir}/bet_stats.json", stats)
+        save_json_file(BET_STATS_FILE, stats)
         
         return stats
     
@@ -140,7 +111,7 @@ def recalculate_stats():
         log(f"❌ Stats calculation failed: {e}")
         return None
 
-def update_timestamps():
+def update_timestamps(ctx=None):
     """Update last_updated timestamps in all data files"""
     try:
         timestamp = datetime.now(EST).isoformat()
@@ -167,20 +138,21 @@ def main():
     
     start_time = datetime.now(EST)
     
-    success_count = 0
-    total_tasks = 3
-    
-    # Task 1: Check game statuses and move finished games
-    if run_script(f"{WORKSPACE}/game_status_checker.py", "Game Status Checker"):
-        success_count += 1
-    
-    # Task 2: Recalculate stats
-    if recalculate_stats():
-        success_count += 1
+    # Line snapshot -> game status -> stats -> timestamps, in-process (stats skipped if completed bets unchanged)
+    pipeline = Pipeline('auto_update', [
+        Stage('lines', snapshot_lines, always=True, description="Closing Line Snapshot"),
+        Stage('settle', settle, outputs=[ACTIVE_BETS_FILE, RANKED_BETS_FILE, COMPLETED_BETS_FILE],
+              after=['lines'], always=True, description="Game Status Checker"),
+        Stage('stats', lambda ctx: recalculate_stats(ctx) is not None, inputs=[COMPLETED_BETS_FILE],
+              outputs=[BET_STATS_FILE], description="Stats Recalculation"),
+        Stage('publish', update_timestamps, outputs=[ACTIVE_BETS_FILE, RANKED_BETS_FILE, COMPLETED_BETS_FILE],
+              always=True, description="Update Timestamps"),
+    ], log=log)
+    report = pipeline.run()
+    pipeline.print_report(report)
     
-    # Task 3: Update timestamps for dashboard refresh
-    if update_timestamps():
-        success_count += 1
+    success_count = len(pipeline.succeeded(report))
+    total_tasks = len(report['stages'])
     
     # Calculate duration
     end_time = datetime.now(EST)
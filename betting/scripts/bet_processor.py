@@ -21,23 +21,13 @@ def run_scraper(date_str: str) -> bool:
     print("-" * 70)
     
     try:
-        # Try Node.js Puppeteer approach
-        result = subprocess.run(
-            [sys.executable, "-c", f"""
-import subprocess
-result = subprocess.run(['node', '{WORKSPACE}/scrape_espn.js', '{date_str}'], 
-                       capture_output=False)
-exit(result.returncode)
-"""],
-            cwd=WORKSPACE,
-            capture_output=False
-        )
-        
-        if result.returncode == 0:
+        # ESPN JSON scoreboard -> espn_scores_cache.json (in-process, no browser)
+        from espn_scraper import ingest
+        if ingest(date_str) is not None:
             print("✅ Scraping complete")
             return True
     except Exception as e:
-        print(f"⚠️  Puppeteer scraping failed: {e}")
+        print(f"⚠️  ESPN scoreboard ingest failed: {e}")
     
     # Fallback: Check if espn_scores_cache.json exists
     cache_file = f"{WORKSPACE}/espn_scores_cache.json"
@@ -4,7 +4,8 @@ Bet Ranker - Score and rank bets based on historical performance
 
 Calculates:
 1. Win % by bet type (SPREAD, MONEYLINE, TOTAL)
-2. Composite score: (confidence * win_rate_for_type * edge) + historical_boost
+2. Composite score: (confidence * win_rate_for_type * edge) + historical_boost,
+   where edge is measured against the no-vig market consensus when the bet was priced
 3. Top 10 ranking for dashboard display
 """
 
@@ -14,7 +15,12 @@ from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
+from betting_database import open_if_populated, DB_PATH
+from incremental_learning import refresh_cube
+from portfolio_allocator import allocate, market_edge
+
 WORKSPACE = Path("/Users/macmini/.openclaw/workspace")
+CUBE_FILE = WORKSPACE / 'performance_cube.json'
 
 def load_completed_bets():
     """Load all completed bets from completed_bets_*.json files"""
@@ -55,7 +61,10 @@ def calculate_bet_type_performance(completed_bets):
         elif bet['result'].upper() == 'LOSS':
             performance[bet_type]['losses'] += 1
     
-    # Convert to win rates
+    return _win_rates(performance), performance
+
+def _win_rates(performance):
+    """Convert W/L counts to win rates"""
     win_rates = {}
     for bet_type, stats in performance.items():
         total = stats['wins'] + stats['losses']
@@ -64,7 +73,30 @@ def calculate_bet_type_performance(completed_bets):
         else:
             win_rates[bet_type] = 0.5  # Default to 50% if no data
     
-    return win_rates, performance
+    return win_rates
+
+def load_bet_type_performance():
+    """Win % for each bet type from the incrementally maintained performance cube
+    
+    Only settlements since the cube's watermark are read, instead of every
+    completed_bets_*.json file. Same return shape as calculate_bet_type_performance.
+    """
+    cube, _ = refresh_cube(str(CUBE_FILE), open_if_populated(DB_PATH), workspace=WORKSPACE)
+    return performance_from_cube(cube)
+
+def performance_from_cube(cube):
+    """Win % and W/L counts per bet type rolled up from a PerformanceCube"""
+    performance = {
+        'SPREAD': {'wins': 0, 'losses': 0},
+        'MONEYLINE': {'wins': 0, 'losses': 0},
+        'TOTAL': {'wins': 0, 'losses': 0}
+    }
+    for bet_type, agg in cube.rollup('bet_type').items():
+        stats = performance.setdefault(str(bet_type).upper(), {'wins': 0, 'losses': 0})
+        stats['wins'] += agg['wins']
+        stats['losses'] += agg['losses']
+    
+    return _win_rates(performance), performance
 
 def load_adaptive_weights():
     """Load adaptive weights from learning system"""
@@ -80,7 +112,7 @@ def load_adaptive_weights():
             'TOTAL': {'weight': 1.0}
         }
 
-def score_bet(bet, win_rates):
+def score_bet(bet, win_rates, adaptive_weights=None):
     """
     Calculate LARLScore for a bet using the ADAPTIVE formula
     
@@ -89,22 +121,27 @@ def score_bet(bet, win_rates):
     
     This properly weights:
     - Confidence in the pick (0-100%)
-    - Edge identified vs. market (points or %)
+    - Edge identified vs. market: model win probability minus the no-vig consensus
+      (% points) when the bet was priced by market_consensus, else the heuristic edge
     - Historical success rate of this bet type
     - Adaptive weight based on learning system (boosts strong types, suppresses weak types)
     
     Higher score = better bet to place
+    
+    adaptive_weights: {bet_type: {'weight': w}}; read from adaptive_weights.json when omitted
     """
     bet_type = bet.get('bet_type', 'SPREAD').upper()
     confidence = max(0, bet.get('confidence', 70)) / 100  # Convert to 0-1, clamp non-negative
-    edge = max(0.0, float(bet.get('edge', 2.0)))  # Clamp edge to non-negative
+    measured = market_edge(bet)
+    edge = max(0.0, float(bet.get('edge', 2.0) if measured is None else measured))  # Clamp edge to non-negative
     
     # Use historical win rate from actual bet performance
     # Default to 50% if bet type not yet tracked
     win_rate = win_rates.get(bet_type, 0.5)
     
     # Load and apply adaptive weight
-    adaptive_weights = load_adaptive_weights()
+    if adaptive_weights is None:
+        adaptive_weights = load_adaptive_weights()
     adaptive_weight = adaptive_weights.get(bet_type, {}).get('weight', 1.0)
     
     # Skip disabled bet types (weight <= 0)
@@ -148,10 +185,12 @@ def deduplicate_conflicting_bets(scored_bets):
     
     return filtered
 
-def rank_today_bets(today_bets, win_rates):
+def rank_today_bets(today_bets, win_rates, adaptive_weights=None):
     """Rank today's bets by score, removing conflicting bets and low-quality picks"""
     scored_bets = []
     low_quality_count = 0
+    if adaptive_weights is None:
+        adaptive_weights = load_adaptive_weights()
     
     for bet in today_bets:
         # FILTER: Skip bets with LOW data quality (using default stats)
@@ -159,7 +198,7 @@ def rank_today_bets(today_bets, win_rates):
             low_quality_count += 1
             continue  # Don't include in ranked list
         
-        score = score_bet(bet, win_rates)
+        score = score_bet(bet, win_rates, adaptive_weights)
         scored_bets.append({
             'bet': bet,
             'score': score,
@@ -194,7 +233,7 @@ def load_today_bets():
         print(f"Error loading active_bets.json: {e}")
         return []
 
-def save_ranked_bets(ranked_bets, performance, win_rates):
+def save_ranked_bets(ranked_bets, performance, win_rates, output_path=None):
     """Save ranked bets to file for dashboard consumption
     
     🔧 CORRECTED: Rank purely by LARLScore formula without artificial balancing
@@ -202,6 +241,8 @@ def save_ranked_bets(ranked_bets, performance, win_rates):
     """
     
     adaptive_weights = load_adaptive_weights()
+    # EV and stakes are sized across the whole slate; ranking stays LARLScore
+    plan = allocate([item['bet'] for item in ranked_bets])
     
     output = {
         'timestamp': datetime.now().isoformat(),
@@ -220,13 +261,14 @@ def save_ranked_bets(ranked_bets, performance, win_rates):
                 for bet_type, stats in performance.items()
             }
         },
+        'portfolio': plan['summary'],
         'top_10': [],
         'rest': [],
         'selection_method': 'adaptive_larlescore_ranking_with_learning'
     }
     
     # Build top 10 based purely on LARLScore
-    for item in ranked_bets[:10]:
+    for item, sizing in zip(ranked_bets[:10], plan['bets'][:10]):
         bet_data = {
             'rank': item['rank'],
             'score': round(item['score'], 4),
@@ -235,6 +277,13 @@ def save_ranked_bets(ranked_bets, performance, win_rates):
             'recommendation': item['bet'].get('recommendation'),
             'confidence': item['bet'].get('confidence'),
             'edge': item['bet'].get('edge'),
+            'market_edge': item['bet'].get('market_edge'),
+            'consensus_probability': item['bet'].get('consensus_probability'),
+            'odds': sizing['odds'],
+            'odds_valid': sizing['odds_valid'],
+            'ev': sizing['ev'],
+            'stake_fraction': sizing['stake_fraction'],
+            'stake': sizing['stake'],
             'risk_tier': item['bet'].get('risk_tier'),
             'game_time': item['bet'].get('game_time'),
             'reason': item['bet'].get('reason'),
@@ -243,7 +292,7 @@ def save_ranked_bets(ranked_bets, performance, win_rates):
         output['top_10'].append(bet_data)
     
     # Add rest
-    for item in ranked_bets[10:]:
+    for item, sizing in zip(ranked_bets[10:], plan['bets'][10:]):
         bet_data = {
             'rank': item['rank'],
             'score': round(item['score'], 4),
@@ -252,6 +301,13 @@ def save_ranked_bets(ranked_bets, performance, win_rates):
             'recommendation': item['bet'].get('recommendation'),
             'confidence': item['bet'].get('confidence'),
             'edge': item['bet'].get('edge'),
+            'market_edge': item['bet'].get('market_edge'),
+            'consensus_probability': item['bet'].get('consensus_probability'),
+            'odds': sizing['odds'],
+            'odds_valid': sizing['odds_valid'],
+            'ev': sizing['ev'],
+            'stake_fraction': sizing['stake_fraction'],
+            'stake': sizing['stake'],
             'risk_tier': item['bet'].get('risk_tier'),
             'game_time': item['bet'].get('game_time'),
             'reason': item['bet'].get('reason'),
@@ -260,7 +316,7 @@ def save_ranked_bets(ranked_bets, performance, win_rates):
         output['rest'].append(bet_data)
     
     # Save to file
-    with open(WORKSPACE / 'betting/data/ranked_bets.json', 'w') as f:
+    with open(output_path or WORKSPACE / 'betting/data/ranked_bets.json', 'w') as f:
         json.dump(output, f, indent=2)
     
     return output
@@ -302,12 +358,10 @@ def print_rankings(ranked_bets, win_rates, performance):
 
 def main():
     """Main execution"""
-    print("[*] Loading completed bets...")
-    completed_bets = load_completed_bets()
-    print(f"    Loaded {len(completed_bets)} completed bets")
-    
-    print("[*] Calculating performance by bet type...")
-    win_rates, performance = calculate_bet_type_performance(completed_bets)
+    print("[*] Calculating performance by bet type (new settlements only)...")
+    win_rates, performance = load_bet_type_performance()
+    settled = sum(s['wins'] + s['losses'] for s in performance.values())
+    print(f"    {settled} completed bets")
     
     print("[*] Loading today's bets...")
     today_bets = load_today_bets()
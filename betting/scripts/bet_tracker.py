@@ -4,7 +4,7 @@ LarlBot Bet Tracker 🎰
 Track bet performance and results
 """
 
-import sqlite3
+from betting_database import get_connection
 import pandas as pd
 from datetime import datetime, timedelta
 import json
@@ -16,7 +16,7 @@ class BetTracker:
     
     def init_tracking_tables(self):
         """Initialize bet tracking tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Placed bets table
@@ -70,12 +70,11 @@ class BetTracker:
         ''')
         
         conn.commit()
-        conn.close()
         print("✅ Bet tracking tables initialized")
     
     def place_bet(self, game_id, bet_type, bet_side, amount, odds, edge, confidence, bookmaker="unknown", notes=""):
         """Record a placed bet"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -86,14 +85,13 @@ class BetTracker:
         
         bet_id = cursor.lastrowid
         conn.commit()
-        conn.close()
         
         print(f"📝 Bet recorded: ID {bet_id}, {bet_type} {bet_side}, ${amount} @ {odds}")
         return bet_id
     
     def settle_bet(self, bet_id, result, payout):
         """Settle a completed bet"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -103,14 +101,13 @@ class BetTracker:
         ''', (result, payout, bet_id))
         
         conn.commit()
-        conn.close()
         
         print(f"✅ Bet {bet_id} settled: {result}, payout: ${payout}")
         self.update_performance_stats()
     
     def update_performance_stats(self):
         """Update daily performance statistics"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         
         # Calculate today's stats
         today = datetime.now().strftime('%Y-%m-%d')
@@ -144,11 +141,10 @@ class BetTracker:
             
             conn.commit()
         
-        conn.close()
     
     def log_alert(self, alert_type, message, game_id=None, edge=None, confidence=None):
         """Log an alert for monitoring"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -157,12 +153,11 @@ class BetTracker:
         ''', (alert_type, game_id, message, edge, confidence))
         
         conn.commit()
-        conn.close()
         print(f"🚨 Alert logged: {alert_type} - {message}")
     
     def get_performance_summary(self, days=30):
         """Get performance summary for last N days"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         
         query = '''
             SELECT * FROM performance_stats 
@@ -171,7 +166,6 @@ class BetTracker:
         '''.format(days)
         
         df = pd.read_sql_query(query, conn)
-        conn.close()
         
         if df.empty:
             return {
@@ -198,7 +192,7 @@ class BetTracker:
     
     def get_pending_bets(self):
         """Get all pending bets that need settlement"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         
         query = '''
             SELECT * FROM placed_bets 
@@ -207,12 +201,11 @@ class BetTracker:
         '''
         
         df = pd.read_sql_query(query, conn)
-        conn.close()
         return df
     
     def get_recent_alerts(self, limit=10):
         """Get recent alerts"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         
         query = '''
             SELECT * FROM alerts 
@@ -221,7 +214,6 @@ class BetTracker:
         '''
         
         df = pd.read_sql_query(query, conn, params=[limit])
-        conn.close()
         return df
 
 if __name__ == "__main__":
@@ -1,19 +1,77 @@
 #!/usr/bin/env python3
 """
-Simple SQLite wrapper for betting data. Provides migration from existing JSON files
-into a local SQLite database at ./betting.db. This is additive — JSON files remain
-as the source of truth for now.
+SQLite storage layer for betting data (betting/data/betting.db).
+
+- BettingDB is the primary store for bets. completed_bets_*.json files are still
+  written alongside (dual-write) while the remaining JSON readers are migrated.
+- Shared per-process connection pool (one connection per thread per database file),
+  WAL journal mode so the dashboard can read while cron jobs write.
+- Covering indexes for the dashboard (date/result/edge) and learning (bet_type,
+  sport, risk_tier x result) queries.
+- Batched upserts: save_bets() writes any number of rows in one transaction.
+- closing_lines: the latest pre-commence FanDuel line per game, one upsert per
+  odds snapshot (see closing_line_value.py); settled bets carry their CLV.
+- player_props / prop_fetches: normalized prop lines (one row per event, book,
+  market, player, line) and the (event, market set) fetch log props_ingestion.py
+  uses as its cache.
+
+Run once to migrate every existing JSON file into the database:
+    python3 betting_database.py
 """
 
 import sqlite3
 import json
 import glob
 import os
+import re
+import threading
 from datetime import datetime
 
-DB_PATH = 'betting.db'
+# The one database every writer and reader opens, wherever the script runs from
+BET_ID_VERSION = '2'     # 2: derived ids carry the recommendation
+DB_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'betting.db'))
 WORKSPACE = '.'
 
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def get_connection(path=DB_PATH):
+    """
+    Shared connection for this thread and database file. Callers must NOT close it;
+    commit as usual. Every pooled connection runs in WAL mode with a busy timeout.
+    """
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    key = os.path.abspath(path)
+    conn = conns.get(key)
+    if conn is None:
+        conn = sqlite3.connect(key, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conns[key] = conn
+    return conn
+
+
+def close_connections():
+    """Close this thread's pooled connections (end of a script / worker thread)."""
+    conns = getattr(_local, 'conns', None) or {}
+    for conn in conns.values():
+        try:
+            conn.close()
+        except Exception:
+            pass
+    conns.clear()
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
 CREATE_TABLES_SQL = [
     """
     CREATE TABLE IF NOT EXISTS bets (
@@ -62,108 +120,526 @@ CREATE_TABLES_SQL = [
         picks_json TEXT,
         top10_json TEXT
     );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS closing_lines (
+        game TEXT,
+        commence_time TEXT,
+        sport TEXT,
+        bookmaker TEXT,
+        home_team TEXT,
+        away_team TEXT,
+        home_spread REAL,
+        home_spread_odds REAL,
+        away_spread REAL,
+        away_spread_odds REAL,
+        home_ml REAL,
+        away_ml REAL,
+        total REAL,
+        over_price REAL,
+        under_price REAL,
+        captured_at TEXT,
+        PRIMARY KEY(game, commence_time)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS player_props (
+        event_id TEXT,
+        bookmaker TEXT,
+        market TEXT,
+        player TEXT,
+        line REAL,
+        over_price REAL,
+        under_price REAL,
+        sport TEXT,
+        game TEXT,
+        commence_time TEXT,
+        captured_at TEXT,
+        PRIMARY KEY(event_id, bookmaker, market, player, line)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS prop_fetches (
+        event_id TEXT,
+        markets TEXT,
+        sport TEXT,
+        game TEXT,
+        commence_time TEXT,
+        fetched_at TEXT,
+        quota_cost INTEGER,
+        PRIMARY KEY(event_id, markets)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS db_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
     """
 ]
 
+# Columns added after the first release of the bets table (ALTERed in on open)
+BETS_EXTRA_COLUMNS = {
+    'risk_tier': 'TEXT',
+    'source': 'TEXT',          # 'completed_file' | 'tracker'
+    'payload_json': 'TEXT',    # full original bet dict, so readers get every field back
+    'updated_at': 'TEXT',
+    'clv': 'REAL',             # closing line value, implied-probability points (closing_line_value.py)
+}
+
+CREATE_INDEXES_SQL = [
+    # dashboard: per-date top-10 by edge, and W/L counts per date
+    "CREATE INDEX IF NOT EXISTS idx_bets_date_result ON bets (date, result, edge)",
+    "CREATE INDEX IF NOT EXISTS idx_bets_source_date ON bets (source, date, game, edge)",
+    # learning engine roll-ups (covering: group column + result + confidence/edge)
+    "CREATE INDEX IF NOT EXISTS idx_bets_type_result ON bets (bet_type, result, confidence, edge)",
+    "CREATE INDEX IF NOT EXISTS idx_bets_sport_result ON bets (sport, result, confidence, edge)",
+    "CREATE INDEX IF NOT EXISTS idx_bets_risk_result ON bets (risk_tier, result, confidence, edge)",
+    "CREATE INDEX IF NOT EXISTS idx_bets_result ON bets (result, confidence, edge)",
+    # incremental learning: settlements since a watermark
+    "CREATE INDEX IF NOT EXISTS idx_bets_updated_at ON bets (updated_at)",
+]
+
+BET_COLUMNS = ['id', 'date', 'game', 'sport', 'bet_type', 'recommendation', 'edge', 'confidence',
+               'larlscore', 'result', 'actual_score', 'risk_tier', 'source', 'payload_json', 'updated_at', 'clv']
+
+CLOSING_LINE_COLUMNS = ['game', 'commence_time', 'sport', 'bookmaker', 'home_team', 'away_team',
+                        'home_spread', 'home_spread_odds', 'away_spread', 'away_spread_odds',
+                        'home_ml', 'away_ml', 'total', 'over_price', 'under_price', 'captured_at']
+
+PLAYER_PROP_COLUMNS = ['event_id', 'bookmaker', 'market', 'player', 'line', 'over_price', 'under_price',
+                       'sport', 'game', 'commence_time', 'captured_at']
+
+# Emoji prefixes the JSON files carry on sport / risk tier ('🏀 NCAA Basketball', '🟢 LOW RISK')
+_LABEL_PREFIXES = ('🏀 ', '🏈 ', '⚾ ', '🏒 ', '⚽ ', '🥊 ', '🟢 ', '🟡 ', '🔴 ')
+
+# SQL expressions for the bucket dimensions LearningEngine reports on
+CONFIDENCE_BUCKET_SQL = """CASE
+    WHEN confidence >= 90 THEN '90-100%'
+    WHEN confidence >= 80 THEN '80-89%'
+    WHEN confidence >= 70 THEN '70-79%'
+    WHEN confidence >= 60 THEN '60-69%'
+    ELSE '50-59%' END"""
+EDGE_BUCKET_SQL = """CASE
+    WHEN edge >= 10 THEN '10+ pts'
+    WHEN edge >= 5 THEN '5-9.9 pts'
+    WHEN edge >= 3 THEN '3-4.9 pts'
+    WHEN edge >= 1 THEN '1-2.9 pts'
+    ELSE '0-0.9 pts' END"""
+DIMENSIONS = {
+    'date': 'date',
+    'sport': 'sport',
+    'bet_type': 'bet_type',
+    'risk_tier': 'risk_tier',
+    'result': 'result',
+    'confidence_bucket': CONFIDENCE_BUCKET_SQL,
+    'edge_bucket': EDGE_BUCKET_SQL,
+}
+
+
+def clean_label(value):
+    """'🏀 NCAA Basketball' -> 'NCAA Basketball' (same normalization LearningEngine applies)"""
+    if not isinstance(value, str):
+        return value
+    for prefix in _LABEL_PREFIXES:
+        value = value.replace(prefix, '')
+    return value.strip()
+
+
+def bet_id(bet, date=None):
+    """
+    The bet's own id, else '{date}_{game}_{bet_type}_{recommendation}'. The date is the
+    bet's, its game_date, then the caller's (file date); the recommendation keeps OVER
+    and UNDER (or both sides) of one game apart.
+    """
+    explicit = bet.get('id') or bet.get('bet_id')
+    if explicit:
+        return explicit
+    parts = (bet.get('date') or bet.get('game_date') or date, bet.get('game'), bet.get('bet_type'),
+             bet.get('recommendation'))
+    return '_'.join(str(part) for part in parts if part is not None)
+
+
+def ids_current(watermark):
+    """
+    False when a settlement watermark's canonical ids predate BET_ID_VERSION: state
+    keyed by those ids must be rebuilt, or the same bet would count under two ids.
+    """
+    return not watermark or watermark.get('id_version') == BET_ID_VERSION
+
+
+def _legacy_bet_id(date, game, bet_type):
+    """Derived id before BET_ID_VERSION 2 (no recommendation, 'None_' when undated)"""
+    return f"{date}_{game}_{bet_type}"
+
+
+def _date_from_filename(path):
+    m = re.search(r'(\d{4}-\d{2}-\d{2})', os.path.basename(path))
+    return m.group(1) if m else None
+
+
+def _bets_from_file_data(data):
+    # Handle both list and dict-with-bets-key formats
+    if isinstance(data, dict) and 'bets' in data:
+        return data['bets']
+    if isinstance(data, list):
+        return data
+    return [data]
+
+
 class BettingDB:
     def __init__(self, path=DB_PATH):
         self.path = path
-        self.conn = sqlite3.connect(self.path)
-        self.conn.row_factory = sqlite3.Row
         self._init_db()
 
-    def _init_db(self):
+    @property
+    def conn(self):
+        # Pooled per thread, so one BettingDB can be shared by a threaded server
+        return get_connection(self.path)
+
+    def _cursor(self):
         cur = self.conn.cursor()
-        for sql in CREATE_TABLES_SQL:
-            cur.executescript(sql)
+        cur.row_factory = sqlite3.Row
+        return cur
+
+    def _init_db(self):
+        key = os.path.abspath(self.path)
+        with _init_lock:
+            if key in _initialized:
+                return
+            cur = self.conn.cursor()
+            for sql in CREATE_TABLES_SQL:
+                cur.executescript(sql)
+            existing = {r[1] for r in cur.execute("PRAGMA table_info(bets)").fetchall()}
+            for col, col_type in BETS_EXTRA_COLUMNS.items():
+                if col not in existing:
+                    cur.execute(f"ALTER TABLE bets ADD COLUMN {col} {col_type}")
+            for sql in CREATE_INDEXES_SQL:
+                cur.execute(sql)
+            self._rekey_bets(cur)
+            self.conn.commit()
+            _initialized.add(key)
+
+    def _rekey_bets(self, cur):
+        """One-time move of rows stored under a legacy derived id to the current bet_id"""
+        row = cur.execute("SELECT value FROM db_meta WHERE key = 'bet_id_version'").fetchone()
+        if row and row[0] == BET_ID_VERSION:
+            return
+        rows = cur.execute("SELECT id, date, game, bet_type, payload_json FROM bets").fetchall()
+        for old, date, game, bet_type, payload in rows:
+            if old != _legacy_bet_id(date, game, bet_type):
+                continue  # explicit ids are kept
+            bet = json.loads(payload) if payload else {}
+            new = bet_id(bet, date)
+            if new != old:
+                cur.execute("UPDATE OR IGNORE bets SET id = ? WHERE id = ?", (new, old))
+                if not cur.rowcount:
+                    cur.execute("DELETE FROM bets WHERE id = ?", (old,))  # a row under the new id wins
+        cur.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES ('bet_id_version', ?)", (BET_ID_VERSION,))
+
+    # --- Meta ---
+    def get_meta(self, key, default=None):
+        row = self._cursor().execute("SELECT value FROM db_meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)", (key, str(value)))
         self.conn.commit()
 
     # --- Bets ---
+    @staticmethod
+    def _bet_row(bet, date=None, source=None):
+        return {
+            'id': bet_id(bet, date),
+            'date': bet.get('date') or date,
+            'game': bet.get('game') or bet.get('game_name'),
+            'sport': clean_label(bet.get('sport')),
+            'bet_type': bet.get('bet_type') or bet.get('type'),
+            'recommendation': bet.get('recommendation') or bet.get('pick'),
+            'edge': bet.get('edge'),
+            'confidence': bet.get('confidence'),
+            'larlscore': bet.get('larlscore'),
+            'result': (bet.get('result') or '').strip().upper() or None,
+            'actual_score': bet.get('actual_score') or bet.get('final_score'),
+            'risk_tier': clean_label(bet.get('risk_tier')),
+            'source': source or bet.get('source'),
+            'payload_json': json.dumps(bet),
+            'updated_at': datetime.now().isoformat(),
+            'clv': bet.get('clv'),
+        }
+
+    def save_bets(self, bets, date=None, source=None):
+        """Batched upsert - one transaction for the whole list. Returns rows written."""
+        rows = [self._bet_row(b, date, source) for b in bets if isinstance(b, dict)]
+        if not rows:
+            return 0
+        cols = ', '.join(BET_COLUMNS)
+        params = ', '.join(f':{c}' for c in BET_COLUMNS)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in BET_COLUMNS if c != 'id')
+        # Re-saving an unchanged bet leaves the row (and updated_at) alone, so
+        # updated_at works as a settlement watermark for incremental readers
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO bets ({cols}) VALUES ({params}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates} "
+                f"WHERE bets.payload_json IS NOT excluded.payload_json "
+                f"OR bets.result IS NOT excluded.result OR bets.source IS NOT excluded.source",
+                rows)
+        return len(rows)
+
     def save_bet(self, bet):
         """Save or replace a bet record. Bet is a dict with matching keys."""
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT OR REPLACE INTO bets (id, date, game, sport, bet_type, recommendation, edge, confidence, larlscore, result, actual_score)
-            VALUES (:id, :date, :game, :sport, :bet_type, :recommendation, :edge, :confidence, :larlscore, :result, :actual_score)
-            """,
-            {
-                'id': bet.get('id') or f"{bet.get('date')}_{bet.get('game')}_{bet.get('bet_type')}",
-                'date': bet.get('date'),
-                'game': bet.get('game'),
-                'sport': bet.get('sport'),
-                'bet_type': bet.get('bet_type'),
-                'recommendation': bet.get('recommendation'),
-                'edge': bet.get('edge'),
-                'confidence': bet.get('confidence'),
-                'larlscore': bet.get('larlscore'),
-                'result': bet.get('result'),
-                'actual_score': bet.get('actual_score')
-            }
-        )
-        self.conn.commit()
+        self.save_bets([bet])
 
     def get_bets_by_date(self, date):
-        cur = self.conn.cursor()
+        cur = self._cursor()
         cur.execute("SELECT * FROM bets WHERE date = ?", (date,))
         return [dict(r) for r in cur.fetchall()]
 
+    def get_completed_bets(self, results=('WIN', 'LOSS'), date=None, source=None):
+        """
+        Full bet dicts (as originally written to JSON) with a result in `results`.
+        Replaces globbing completed_bets_*.json + bet_tracker_input.json.
+        """
+        sql = f"SELECT date, result, payload_json FROM bets WHERE result IN ({','.join('?' * len(results))})"
+        args = [r.upper() for r in results]
+        if date:
+            sql += " AND date = ?"
+            args.append(date)
+        if source:
+            sql += " AND source = ?"
+            args.append(source)
+        sql += " ORDER BY date, id"
+        out = []
+        for r in self._cursor().execute(sql, args).fetchall():
+            bet = json.loads(r['payload_json']) if r['payload_json'] else {}
+            bet['result'] = r['result']
+            bet.setdefault('date', r['date'])
+            out.append(bet)
+        return out
+
+    def get_settled_since(self, updated_after=None, results=('WIN', 'LOSS', 'PUSH')):
+        """
+        Bets with a result in `results` written after `updated_after` (an updated_at
+        value), plus the new high-water mark. Returns (bets, watermark).
+        """
+        sql = (f"SELECT date, result, payload_json, updated_at FROM bets "
+               f"WHERE result IN ({','.join('?' * len(results))})")
+        args = [r.upper() for r in results]
+        if updated_after:
+            sql += " AND updated_at > ?"
+            args.append(updated_after)
+        out = []
+        high = updated_after
+        for r in self._cursor().execute(sql + " ORDER BY updated_at", args).fetchall():
+            bet = json.loads(r['payload_json']) if r['payload_json'] else {}
+            bet['result'] = r['result']
+            bet.setdefault('date', r['date'])
+            out.append(bet)
+            high = r['updated_at']
+        return out, high
+
+    def get_dates(self, source='completed_file'):
+        rows = self._cursor().execute(
+            "SELECT DISTINCT date FROM bets WHERE source = ? AND date IS NOT NULL ORDER BY date", (source,))
+        return [r['date'] for r in rows.fetchall()]
+
+    def count_bets(self):
+        return self.conn.execute("SELECT COUNT(*) FROM bets").fetchone()[0]
+
+    def aggregate(self, group_by=(), results=('WIN', 'LOSS'), where=None, params=()):
+        """
+        W/L/P counts plus sum/avg confidence and edge, grouped by any of DIMENSIONS.
+        Returns a list of dicts with the group columns plus wins, losses, pushes, total,
+        sum_confidence, sum_edge, avg_confidence, avg_edge, clv_bets, avg_clv.
+        """
+        group_by = list(group_by)
+        for g in group_by:
+            if g not in DIMENSIONS:
+                raise ValueError(f'Unknown dimension: {g}')
+        select = [f'{DIMENSIONS[g]} AS {g}' for g in group_by]
+        select += [
+            "SUM(CASE WHEN result = 'WIN' THEN 1 ELSE 0 END) AS wins",
+            "SUM(CASE WHEN result = 'LOSS' THEN 1 ELSE 0 END) AS losses",
+            "SUM(CASE WHEN result = 'PUSH' THEN 1 ELSE 0 END) AS pushes",
+            "COUNT(*) AS total",
+            "SUM(COALESCE(confidence, 0)) AS sum_confidence",
+            "SUM(COALESCE(edge, 0)) AS sum_edge",
+            "AVG(COALESCE(confidence, 0)) AS avg_confidence",
+            "AVG(COALESCE(edge, 0)) AS avg_edge",
+            "COUNT(clv) AS clv_bets",
+            "AVG(clv) AS avg_clv",
+        ]
+        sql = f"SELECT {', '.join(select)} FROM bets WHERE result IN ({','.join('?' * len(results))})"
+        args = list(results)
+        if where:
+            sql += f" AND ({where})"
+            args.extend(params)
+        if group_by:
+            sql += " GROUP BY " + ', '.join(group_by)
+        return [dict(r) for r in self._cursor().execute(sql, args).fetchall()]
+
+    def top_n_per_date(self, n=10, source='completed_file'):
+        """
+        Dashboard 'top 10 unique games per date': best-edge bet per game, then the
+        n highest-edge games per date. Returns full bet dicts.
+        """
+        sql = """
+            SELECT date, result, payload_json FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY date ORDER BY edge DESC) AS date_rank
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY date, game ORDER BY edge DESC) AS game_rank
+                    FROM bets WHERE source = ?
+                ) WHERE game_rank = 1
+            ) WHERE date_rank <= ?
+            ORDER BY date, date_rank
+        """
+        out = []
+        for r in self._cursor().execute(sql, (source, n)).fetchall():
+            bet = json.loads(r['payload_json']) if r['payload_json'] else {}
+            bet['result'] = r['result']
+            out.append(bet)
+        return out
+
+    # --- Closing lines ---
+    def save_closing_lines(self, rows):
+        """
+        Batched upsert of line snapshots. A stored line is only replaced by a later
+        capture, so after commence the row holds the closing line. Returns rows given.
+        """
+        rows = [{c: r.get(c) for c in CLOSING_LINE_COLUMNS} for r in rows]
+        if not rows:
+            return 0
+        cols = ', '.join(CLOSING_LINE_COLUMNS)
+        params = ', '.join(f':{c}' for c in CLOSING_LINE_COLUMNS)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in CLOSING_LINE_COLUMNS[2:])
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO closing_lines ({cols}) VALUES ({params}) "
+                f"ON CONFLICT(game, commence_time) DO UPDATE SET {updates} "
+                f"WHERE excluded.captured_at >= closing_lines.captured_at "
+                f"AND excluded.captured_at < closing_lines.commence_time",
+                rows)
+        return len(rows)
+
+    def get_closing_lines(self, games):
+        """{game: [line rows ordered by commence_time]} for every game in one query"""
+        games = sorted({g for g in games if g})
+        out = {}
+        # stay under SQLite's bound-parameter limit on very large slates
+        for i in range(0, len(games), 500):
+            chunk = games[i:i + 500]
+            sql = (f"SELECT * FROM closing_lines WHERE game IN ({','.join('?' * len(chunk))}) "
+                   f"ORDER BY commence_time")
+            for r in self._cursor().execute(sql, chunk).fetchall():
+                out.setdefault(r['game'], []).append(dict(r))
+        return out
+
+    # --- Player props ---
+    def save_props(self, fetch, rows):
+        """
+        Replace an event's rows for the fetched market set with a new snapshot and
+        log the fetch, in one transaction. fetch: event_id, markets (list), sport,
+        game, commence_time, fetched_at, quota_cost. Returns rows written.
+        """
+        markets = sorted(fetch['markets'])
+        rows = [{c: r.get(c) for c in PLAYER_PROP_COLUMNS} for r in rows]
+        cols = ', '.join(PLAYER_PROP_COLUMNS)
+        params = ', '.join(f':{c}' for c in PLAYER_PROP_COLUMNS)
+        with self.conn:
+            self.conn.execute(
+                f"DELETE FROM player_props WHERE event_id = ? AND market IN ({','.join('?' * len(markets))})",
+                [fetch['event_id']] + markets)
+            self.conn.executemany(f"INSERT OR REPLACE INTO player_props ({cols}) VALUES ({params})", rows)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO prop_fetches (event_id, markets, sport, game, commence_time, fetched_at, quota_cost) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fetch['event_id'], ','.join(markets), fetch.get('sport'), fetch.get('game'),
+                 fetch.get('commence_time'), fetch['fetched_at'], fetch.get('quota_cost')))
+        return len(rows)
+
+    def get_prop_fetches(self, event_ids):
+        """{(event_id, 'market,market'): fetch row} for the given events"""
+        event_ids = sorted({e for e in event_ids if e})
+        out = {}
+        for i in range(0, len(event_ids), 500):
+            chunk = event_ids[i:i + 500]
+            sql = f"SELECT * FROM prop_fetches WHERE event_id IN ({','.join('?' * len(chunk))})"
+            for r in self._cursor().execute(sql, chunk).fetchall():
+                out[(r['event_id'], r['markets'])] = dict(r)
+        return out
+
+    def get_props(self, event_ids, bookmaker=None):
+        """Prop rows for the given events (optionally one bookmaker), ordered by game/market/player"""
+        event_ids = sorted({e for e in event_ids if e})
+        out = []
+        for i in range(0, len(event_ids), 500):
+            chunk = event_ids[i:i + 500]
+            sql = f"SELECT * FROM player_props WHERE event_id IN ({','.join('?' * len(chunk))})"
+            params = list(chunk)
+            if bookmaker:
+                sql += " AND bookmaker = ?"
+                params.append(bookmaker)
+            out += [dict(r) for r in self._cursor().execute(sql + " ORDER BY commence_time, game, market, player", params)]
+        return out
+
     # --- Team stats ---
     def save_team_stats(self, team_stats):
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT OR REPLACE INTO team_stats (team_name, league, ppg, opp_ppg, mov, home_ppg, away_ppg, recent_ppg_json, recent_margin_json, wins, losses, last_updated)
-            VALUES (:team_name, :league, :ppg, :opp_ppg, :mov, :home_ppg, :away_ppg, :recent_ppg_json, :recent_margin_json, :wins, :losses, :last_updated)
-            """,
-            {
-                'team_name': team_stats.get('team_name'),
-                'league': team_stats.get('league'),
-                'ppg': team_stats.get('ppg'),
-                'opp_ppg': team_stats.get('opp_ppg'),
-                'mov': team_stats.get('mov'),
-                'home_ppg': team_stats.get('home_ppg'),
-                'away_ppg': team_stats.get('away_ppg'),
-                'recent_ppg_json': json.dumps(team_stats.get('recent_ppg', [])),
-                'recent_margin_json': json.dumps(team_stats.get('recent_margin', [])),
-                'wins': team_stats.get('wins'),
-                'losses': team_stats.get('losses'),
-                'last_updated': team_stats.get('last_updated')
-            }
-        )
-        self.conn.commit()
+        self.save_team_stats_batch([team_stats])
+
+    def save_team_stats_batch(self, records):
+        rows = [{
+            'team_name': t.get('team_name'),
+            'league': t.get('league'),
+            'ppg': t.get('ppg'),
+            'opp_ppg': t.get('opp_ppg'),
+            'mov': t.get('mov'),
+            'home_ppg': t.get('home_ppg'),
+            'away_ppg': t.get('away_ppg'),
+            'recent_ppg_json': json.dumps(t.get('recent_ppg', [])),
+            'recent_margin_json': json.dumps(t.get('recent_margin', [])),
+            'wins': t.get('wins'),
+            'losses': t.get('losses'),
+            'last_updated': t.get('last_updated')
+        } for t in records]
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO team_stats (team_name, league, ppg, opp_ppg, mov, home_ppg, away_ppg, recent_ppg_json, recent_margin_json, wins, losses, last_updated)
+                VALUES (:team_name, :league, :ppg, :opp_ppg, :mov, :home_ppg, :away_ppg, :recent_ppg_json, :recent_margin_json, :wins, :losses, :last_updated)
+                """,
+                rows
+            )
 
     def get_team_stats(self, team_name, league):
-        cur = self.conn.cursor()
+        cur = self._cursor()
         cur.execute("SELECT * FROM team_stats WHERE team_name = ? AND league = ?", (team_name, league))
         row = cur.fetchone()
         return dict(row) if row else None
 
     # --- Weights ---
     def save_weight_entry(self, date, bet_type, weight, tier=None, rationale=None):
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO weights (date, bet_type, weight, tier, rationale) VALUES (?, ?, ?, ?, ?)",
-            (date, bet_type, weight, tier, rationale)
-        )
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO weights (date, bet_type, weight, tier, rationale) VALUES (?, ?, ?, ?, ?)",
+                (date, bet_type, weight, tier, rationale)
+            )
 
     def get_weights(self):
-        cur = self.conn.cursor()
+        cur = self._cursor()
         cur.execute("SELECT * FROM weights ORDER BY date DESC")
         return [dict(r) for r in cur.fetchall()]
 
     # --- Daily picks ---
     def save_daily_picks(self, date, picks, top10=None):
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT OR REPLACE INTO daily_picks (date, picks_json, top10_json) VALUES (?, ?, ?)",
-            (date, json.dumps(picks), json.dumps(top10) if top10 is not None else None)
-        )
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO daily_picks (date, picks_json, top10_json) VALUES (?, ?, ?)",
+                (date, json.dumps(picks), json.dumps(top10) if top10 is not None else None)
+            )
 
     def get_daily_picks(self, date):
-        cur = self.conn.cursor()
+        cur = self._cursor()
         cur.execute("SELECT * FROM daily_picks WHERE date = ?", (date,))
         row = cur.fetchone()
         return dict(row) if row else None
@@ -178,32 +654,21 @@ class BettingDB:
                     data = json.load(f)
             except Exception:
                 continue
-            # Handle both list and dict-with-bets-key formats
-            if isinstance(data, dict) and 'bets' in data:
-                bets_list = data['bets']
-            elif isinstance(data, list):
-                bets_list = data
-            else:
-                bets_list = [data]
-            for bet in bets_list:
-                # Normalize keys
-                bet_record = {
-                    'id': bet.get('id') or bet.get('bet_id') or None,
-                    'date': bet.get('date') or bet.get('day'),
-                    'game': bet.get('game'),
-                    'sport': bet.get('sport'),
-                    'bet_type': bet.get('bet_type') or bet.get('type'),
-                    'recommendation': bet.get('recommendation') or bet.get('pick'),
-                    'edge': bet.get('edge'),
-                    'confidence': bet.get('confidence'),
-                    'larlscore': bet.get('larlscore'),
-                    'result': bet.get('result'),
-                    'actual_score': bet.get('actual_score')
-                }
-                self.save_bet(bet_record)
-                count += 1
+            file_date = (data.get('date') if isinstance(data, dict) else None) or _date_from_filename(path)
+            count += self.save_bets(_bets_from_file_data(data), date=file_date, source='completed_file')
         return count
 
+    def migrate_tracker_bets(self, filename='bet_tracker_input.json'):
+        path = os.path.join(WORKSPACE, filename)
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except Exception:
+            return 0
+        return self.save_bets(_bets_from_file_data(data), source='tracker')
+
     def migrate_team_stats(self, filename='team_stats_cache.json'):
         path = os.path.join(WORKSPACE, filename)
         if not os.path.exists(path):
@@ -213,14 +678,14 @@ class BettingDB:
                 data = json.load(f)
         except Exception:
             return 0
-        count = 0
         # Handle nested 'teams' key or flat dict
         teams = data.get('teams', data) if isinstance(data, dict) else data
+        records = []
         for team_name, stats in teams.items():
             # Some cache formats map team -> simple string or value; skip non-dict entries
             if not isinstance(stats, dict):
                 continue
-            record = {
+            records.append({
                 'team_name': team_name,
                 'league': stats.get('league') or ('nba' if 'nba' in filename else 'ncaa'),
                 'ppg': stats.get('ppg'),
@@ -233,10 +698,10 @@ class BettingDB:
                 'wins': stats.get('wins'),
                 'losses': stats.get('losses'),
                 'last_updated': stats.get('last_updated')
-            }
-            self.save_team_stats(record)
-            count += 1
-        return count
+            })
+        if records:
+            self.save_team_stats_batch(records)
+        return len(records)
 
     def migrate_adaptive_weights(self, filename='adaptive_weights.json'):
         path = os.path.join(WORKSPACE, filename)
@@ -258,16 +723,53 @@ class BettingDB:
             count += 1
         return count
 
+    def migrate_all(self):
+        """One-shot migration of every JSON source. Safe to re-run (bets upsert by id)."""
+        summary = {
+            'bets': self.migrate_completed_bets(),
+            'tracker_bets': self.migrate_tracker_bets(),
+            'team_stats': self.migrate_team_stats('team_stats_cache.json')
+                          + self.migrate_team_stats('nba_team_stats_cache.json'),
+        }
+        if self.get_meta('weights_migrated') is None:
+            summary['adaptive_weights'] = self.migrate_adaptive_weights('adaptive_weights.json')
+            self.set_meta('weights_migrated', datetime.now().isoformat())
+        self.set_meta('migrated_at', datetime.now().isoformat())
+        return summary
+
+
+def record_settled_bets(bets, date, source='completed_file', path=None):
+    """
+    Dual-write hook for settlement writers: mirror bets just written to
+    completed_bets_{date}.json into the database. Never raises - the JSON file
+    is still written either way during the transition.
+    """
+    try:
+        db = BettingDB(path or DB_PATH)
+        return db.save_bets(bets, date=date, source=source)
+    except Exception as e:
+        print(f"⚠️  BettingDB dual-write failed: {e}")
+        return 0
+
+
+def open_if_populated(path=DB_PATH):
+    """BettingDB for readers, or None if the database hasn't been migrated yet (use JSON)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        db = BettingDB(path)
+        return db if db.get_meta('migrated_at') and db.count_bets() else None
+    except Exception as e:
+        print(f"⚠️  BettingDB unavailable ({e}), falling back to JSON files")
+        return None
+
 
 if __name__ == '__main__':
     db = BettingDB()
     print('Initialized DB at', db.path)
 
-    migrated_bets = db.migrate_completed_bets()
-    migrated_teams = db.migrate_team_stats('team_stats_cache.json')
-    migrated_weights = db.migrate_adaptive_weights('adaptive_weights.json')
+    summary = db.migrate_all()
 
     print('Migration summary:')
-    print('  bets imported:', migrated_bets)
-    print('  team stats imported:', migrated_teams)
-    print('  adaptive weights imported:', migrated_weights)
+    for key, count in summary.items():
+        print(f'  {key} imported:', count)
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 🎰 LarlBot Browser Result Checker v2.0 - Full Integration
-Uses browser automation to scrape ESPN scoreboard for accurate game results
+Settles bets from espn_scores_cache.json (written by espn_scraper.py from
+ESPN's JSON scoreboard - no browser needed)
 """
 
 import json
@@ -276,28 +277,13 @@ def main():
     bets_file = sys.argv[1] if len(sys.argv) > 1 else ACTIVE_BETS_FILE
     print(f"\n📂 Bets file: {bets_file}")
     
-    # Check if ESPN cache exists
+    # Fill the ESPN cache from the JSON scoreboard when it is missing
     if not os.path.exists(ESPN_CACHE_FILE):
-        print(f"\n❌ ESPN scores cache not found: {ESPN_CACHE_FILE}")
-        print("\n📋 Instructions:")
-        print("1. Use OpenClaw browser tool to scrape ESPN scoreboard")
-        print("2. Save results to espn_scores_cache.json")
-        print("3. Run this script again")
-        print("\nExpected format:")
-        print("""{
-  "date": "2026-02-14",
-  "games": [
-    {
-      "away_team": "Hawaii",
-      "home_team": "Cal State Northridge",
-      "away_score": 60,
-      "home_score": 84,
-      "status": "Final"
-    },
-    ...
-  ]
-}""")
-        return
+        from espn_scraper import ingest
+        date_str = load_json(bets_file).get('date') or datetime.now().strftime("%Y-%m-%d")
+        print(f"\n📡 ESPN scores cache not found - ingesting {date_str} from the ESPN scoreboard")
+        if ingest(date_str) is None:
+            print("⚠️  ESPN scoreboard unavailable - every bet stays pending")
     
     # Load ESPN scores
     espn_scores = load_json(ESPN_CACHE_FILE)
@@ -6,36 +6,34 @@ Updates daily after NCAA-API scores are loaded
 Feeds into next day's LARLScore calculations
 """
 
-import json
-import os
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
+from betting_database import open_if_populated, DB_PATH
+from incremental_learning import refresh_cube, write_json_if_changed
+from performance_cube import PerformanceCube
+
 WORKSPACE = Path("/Users/macmini/.openclaw/workspace")
+CUBE_FILE = WORKSPACE / 'performance_cube.json'
 
-def calculate_historical_win_rates():
+def calculate_historical_win_rates(all_bets=None):
     """
     Load all completed bets and calculate win rates by:
     1. Bet type (SPREAD, TOTAL, MONEYLINE)
     2. Confidence level (50-60, 60-70, 70-80, 80-90, 90%+)
     3. Date (to detect drift over time)
     
+    Pass all_bets to reuse bets already loaded by the caller (pipeline_runner);
+    otherwise the persisted performance cube is brought up to date with only the
+    settlements since its watermark.
+    
     Returns dict with statistics for use in LARLScore calculations
     """
-    all_bets = []
-    
-    # Load all completed_bets files
-    for f in sorted(WORKSPACE.glob("completed_bets_*.json")):
-        try:
-            with open(f, 'r') as file:
-                data = json.load(file)
-                if isinstance(data, dict) and 'bets' in data:
-                    all_bets.extend(data['bets'])
-                elif isinstance(data, list):
-                    all_bets.extend(data)
-        except Exception as e:
-            print(f"Warning: Error loading {f}: {e}")
+    if all_bets is None:
+        cube, _ = refresh_cube(str(CUBE_FILE), open_if_populated(DB_PATH), workspace=WORKSPACE)
+    else:
+        cube = PerformanceCube.from_bets(all_bets)
     
     # Initialize result structure
     results = {
@@ -52,15 +50,17 @@ def calculate_historical_win_rates():
         'notes': 'Used in LARLScore formula: (confidence/100) × edge × (win_rate / 0.5)'
     }
     
+    # Every table below is a roll-up of the cube
+    by_type = defaultdict(lambda: {'wins': 0, 'losses': 0})
+    for bet_type, agg in cube.rollup('bet_type').items():
+        by_type[str(bet_type).upper()]['wins'] += agg['wins']
+        by_type[str(bet_type).upper()]['losses'] += agg['losses']
+    
     # Calculate by bet type
     for bet_type in ['SPREAD', 'TOTAL', 'MONEYLINE']:
-        type_bets = [b for b in all_bets 
-                     if b.get('bet_type', '').upper() == bet_type 
-                     and b.get('result', '').upper() in ['WIN', 'LOSS']]
+        wins, losses = by_type[bet_type]['wins'], by_type[bet_type]['losses']
         
-        if type_bets:
-            wins = len([b for b in type_bets if b['result'].upper() == 'WIN'])
-            losses = len([b for b in type_bets if b['result'].upper() == 'LOSS'])
+        if wins + losses:
             total = wins + losses
             win_rate = wins / total if total > 0 else 0.5
             
@@ -83,23 +83,21 @@ def calculate_historical_win_rates():
                 'note': 'No data - using neutral 50% default'
             }
     
-    # Calculate by confidence level
+    # Calculate by confidence level (cube buckets are [50,60), [60,70), ... so no
+    # bet lands in two bins at the boundaries)
     confidence_bins = [
-        ('50-60%', 50, 61),
-        ('60-70%', 60, 71),
-        ('70-80%', 70, 81),
-        ('80-90%', 80, 91),
-        ('90%+', 90, 101)
+        ('50-60%', '50-59%'),
+        ('60-70%', '60-69%'),
+        ('70-80%', '70-79%'),
+        ('80-90%', '80-89%'),
+        ('90%+', '90-100%')
     ]
+    by_confidence = cube.rollup('confidence_bucket')
     
-    for label, min_conf, max_conf in confidence_bins:
-        conf_bets = [b for b in all_bets 
-                     if min_conf <= b.get('confidence', 50) < max_conf
-                     and b.get('result', '').upper() in ['WIN', 'LOSS']]
-        
-        if conf_bets:
-            wins = len([b for b in conf_bets if b['result'].upper() == 'WIN'])
-            losses = len([b for b in conf_bets if b['result'].upper() == 'LOSS'])
+    for label, bucket in confidence_bins:
+        agg = by_confidence.get(bucket)
+        if agg and agg['wins'] + agg['losses']:
+            wins, losses = agg['wins'], agg['losses']
             total = wins + losses
             win_rate = wins / total if total > 0 else 0.5
             
@@ -112,25 +110,13 @@ def calculate_historical_win_rates():
             }
     
     # Calculate by date
-    for bet in all_bets:
-        if 'result' not in bet or bet['result'].upper() not in ['WIN', 'LOSS']:
+    for (date_key, bet_type), agg in sorted(cube.rollup(['date', 'bet_type']).items()):
+        if agg['wins'] + agg['losses'] == 0:
             continue
-        
-        # Try to extract date from game_time or use current date
-        date_key = 'unknown'
-        if 'game_time' in bet:
-            # Most game times are like "07:00 PM EST"
-            # We'll use the file date instead
-            date_key = 'current'  # Simplified for now
-        
-        if date_key not in results['by_date']:
-            results['by_date'][date_key] = defaultdict(lambda: {'wins': 0, 'losses': 0})
-        
-        bet_type = bet.get('bet_type', 'UNKNOWN').upper()
-        if bet['result'].upper() == 'WIN':
-            results['by_date'][date_key][bet_type]['wins'] += 1
-        else:
-            results['by_date'][date_key][bet_type]['losses'] += 1
+        day = results['by_date'].setdefault(date_key, {})
+        counts = day.setdefault(str(bet_type).upper(), {'wins': 0, 'losses': 0})
+        counts['wins'] += agg['wins']
+        counts['losses'] += agg['losses']
     
     # Calculate overall stats
     total_wins = sum(v['wins'] for v in results['by_type'].values())
@@ -145,12 +131,11 @@ def calculate_historical_win_rates():
     
     return results
 
-def save_win_rates(results):
+def save_win_rates(results, output_file=None):
     """Save calculated win rates to file"""
-    output_file = WORKSPACE / "historical_win_rates.json"
+    output_file = output_file or WORKSPACE / "historical_win_rates.json"
     
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    write_json_if_changed(str(output_file), results)
     
     return output_file
 
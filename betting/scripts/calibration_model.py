@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+🎯 Confidence Calibration Model - raw model confidence -> realized win probability
+
+The predictors produce confidence with hand-tuned heuristics (predict_spread:
+45 + 3×|margin|, evaluate_against_market: 40 + 4×|diff|, SmartEdgeCalculator's
+step function, ...). This model learns what those numbers actually mean:
+
+- Isotonic fit (pool-adjacent-violators) of win/loss on raw confidence, per
+  (sport, bet_type), per bet_type and overall
+- Each level is shrunk toward its parent (overall toward the raw value itself)
+  bin by bin, weighted by the bets near that confidence (LOCAL_BANDWIDTH), so a
+  thin stretch of a group stays close to what the rest of the history says.
+  Outside a group's observed confidence range the parent curve is used as is.
+- Fits are stored as compact piecewise-linear knots and expanded on load into a
+  101-entry table (one per integer confidence): scoring is an O(1) array lookup,
+  vectorized over a whole slate
+- Sufficient statistics (W/L per integer confidence) are kept per group, so a
+  refit only reads settlements since the last watermark (SettlementFeed); the
+  fits themselves are recomputed from the counts, a 101-bin pass per group
+
+The raw value a bet was scored from is kept in raw_confidence, so refits always
+learn from raw model output, never from already-calibrated numbers.
+
+USAGE:
+    python3 calibration_model.py            # incremental refit
+    python3 calibration_model.py --rebuild  # refit from all settled bets
+    python3 calibration_model.py --report   # raw vs calibrated by bucket
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from betting_database import open_if_populated, bet_id, clean_label, ids_current
+from incremental_learning import SettlementFeed
+
+CALIBRATION_FILE = 'calibration_model.json'
+MODEL_VERSION = 3        # 3: per-bin shrinkage, parent curve outside the observed range
+
+GRID = 101              # table entries: raw confidence 0..100
+PRIOR_STRENGTH = 20     # pseudo-bets of the parent fit blended into every bin
+LOCAL_BANDWIDTH = 5     # bins either side whose bets count toward a bin's sample (triangular weights)
+MIN_PROBABILITY = 0.01
+MAX_PROBABILITY = 0.99
+ANY = '*'
+
+
+def _key(sport, bet_type):
+    return f"{sport}|{bet_type}"
+
+
+def _group_keys(sport, bet_type):
+    """Most to least specific"""
+    return [_key(sport, bet_type), _key(ANY, bet_type), _key(ANY, ANY)]
+
+
+def _labels(bet):
+    sport = clean_label(bet.get('sport')) or 'Unknown'
+    return sport, str(bet.get('bet_type') or 'SPREAD').upper()
+
+
+def raw_confidence(bet):
+    value = bet.get('raw_confidence', bet.get('confidence'))
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 50.0
+
+
+def _bin(value):
+    return int(min(GRID - 1, max(0, round(value))))
+
+
+def isotonic(x, y, w):
+    """Pool-adjacent-violators: non-decreasing weighted fit of y on sorted x"""
+    blocks = []  # [sum_wy, sum_w, count]
+    for yi, wi in zip(y, w):
+        blocks.append([yi * wi, wi, 1])
+        while len(blocks) > 1 and blocks[-2][0] / blocks[-2][1] > blocks[-1][0] / blocks[-1][1]:
+            wy, ww, n = blocks.pop()
+            blocks[-1][0] += wy
+            blocks[-1][1] += ww
+            blocks[-1][2] += n
+    return np.repeat([b[0] / b[1] for b in blocks], [b[2] for b in blocks])
+
+
+def _knots(table):
+    """Piecewise-linear knots of a dense table (points where the slope changes)"""
+    keep = np.flatnonzero(np.abs(np.diff(table, 2)) > 1e-9) + 1
+    idx = np.concatenate(([0], keep, [GRID - 1]))
+    return [[int(i), round(float(table[i]), 4)] for i in idx]
+
+
+def _table(knots):
+    xs, ys = zip(*knots)
+    return np.interp(np.arange(GRID), xs, ys)
+
+
+class CalibrationModel:
+    def __init__(self):
+        # group key -> np.array([wins per bin, decided per bin])
+        self.counts = {}
+        # group key -> dense probability table (GRID,)
+        self.tables = {}
+        # bet_id -> [sport, bet_type, bin, won] of what that bet contributed
+        self.seen = {}
+        self.watermark = {}
+
+    # ------------------------------------------------------------------ fit
+
+    def update(self, bets):
+        """Fold settled bets into the counts. Returns the number of bets that changed them."""
+        changed = 0
+        for bet in bets:
+            result = str(bet.get('result') or '').strip().upper()
+            if result not in ('WIN', 'LOSS'):
+                continue
+            sport, bet_type = _labels(bet)
+            entry = [sport, bet_type, _bin(raw_confidence(bet)), result == 'WIN']
+            key = bet_id(bet)
+            previous = self.seen.get(key)
+            if previous == entry:
+                continue
+            if previous is not None:
+                self._add(previous, -1)
+            self._add(entry, 1)
+            self.seen[key] = entry
+            changed += 1
+        return changed
+
+    def _add(self, entry, sign):
+        sport, bet_type, b, won = entry
+        keys = _group_keys(sport, bet_type)
+        for key in keys:
+            counts = self.counts.setdefault(key, np.zeros((2, GRID)))
+            counts[0, b] += sign * won
+            counts[1, b] += sign
+
+    def _fit(self, key, parent):
+        wins, decided = self.counts[key]
+        observed = np.flatnonzero(decided > 0)
+        if not len(observed):
+            return parent
+        fitted = isotonic(observed, wins[observed] / decided[observed], decided[observed])
+        grid = np.arange(GRID)
+        # Only interpolate inside the observed range; beyond it the group says nothing
+        inside = (grid >= observed[0]) & (grid <= observed[-1])
+        own = np.where(inside, np.interp(grid, observed, fitted), parent)
+        # Each bin trusts its own fit by the bets near it, not by the group's total
+        kernel = 1.0 - np.abs(np.arange(-LOCAL_BANDWIDTH, LOCAL_BANDWIDTH + 1)) / (LOCAL_BANDWIDTH + 1)
+        local = np.convolve(decided, kernel, mode='same')
+        return (local * own + PRIOR_STRENGTH * parent) / (local + PRIOR_STRENGTH)
+
+    def refit(self):
+        """Refit every group from its counts (a 101-bin pass each). Parents before children."""
+        identity = np.clip(np.arange(GRID) / 100.0, MIN_PROBABILITY, MAX_PROBABILITY)
+        for key in [k for k, c in self.counts.items() if c[1].sum() <= 0]:
+            self.counts.pop(key)
+        self.tables = {}
+        for key in sorted(self.counts, key=lambda k: (k.split('|', 1)[0] != ANY, k != _key(ANY, ANY), k)):
+            sport, bet_type = key.split('|', 1)
+            if key == _key(ANY, ANY):
+                parent = identity
+            else:
+                parent = self.tables.get(_key(ANY, ANY) if sport == ANY else _key(ANY, bet_type), identity)
+            self.tables[key] = np.clip(self._fit(key, parent), MIN_PROBABILITY, MAX_PROBABILITY)
+
+    # --------------------------------------------------------------- lookup
+
+    def sample_size(self, key):
+        counts = self.counts.get(key)
+        return int(counts[1].sum()) if counts is not None else 0
+
+    def _resolve(self, sport, bet_type):
+        for key in _group_keys(sport, bet_type):
+            if key in self.tables:
+                return key
+        return None
+
+    def probability(self, sport, bet_type, confidence):
+        """Calibrated win probability (0-1) for one raw confidence value"""
+        key = self._resolve(clean_label(sport) or 'Unknown', str(bet_type or 'SPREAD').upper())
+        if key is None:
+            return float(np.clip(confidence / 100.0, MIN_PROBABILITY, MAX_PROBABILITY))
+        return float(self.tables[key][_bin(confidence)])
+
+    def probabilities(self, bets):
+        """Vectorized calibrated win probabilities for a list of bets"""
+        if not bets:
+            return np.zeros(0)
+        keys = sorted(self.tables)
+        index = {k: i for i, k in enumerate(keys)}
+        stacked = np.vstack([self.tables[k] for k in keys] +
+                            [np.clip(np.arange(GRID) / 100.0, MIN_PROBABILITY, MAX_PROBABILITY)])
+        rows = np.array([index.get(self._resolve(*_labels(b)), len(keys)) for b in bets])
+        bins = np.clip(np.rint([raw_confidence(b) for b in bets]), 0, GRID - 1).astype(int)
+        return stacked[rows, bins]
+
+    # ---------------------------------------------------------- persistence
+
+    @classmethod
+    def load(cls, path=CALIBRATION_FILE):
+        model = cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return model
+        if data.get('version') != MODEL_VERSION or not ids_current(data.get('watermark')):
+            return model  # rebuild from scratch on layout or bet id changes
+        for key, group in data.get('groups', {}).items():
+            model.counts[key] = np.array([group['wins'], group['decided']], dtype=float)
+            model.tables[key] = _table(group['knots'])
+        model.seen = data.get('seen', {})
+        model.watermark = data.get('watermark', {})
+        return model
+
+    def save(self, path=CALIBRATION_FILE):
+        data = {
+            'version': MODEL_VERSION,
+            'generated_at': datetime.now().isoformat(),
+            'groups': {
+                key: {
+                    'bets': self.sample_size(key),
+                    'knots': _knots(self.tables[key]),
+                    'wins': [int(v) for v in self.counts[key][0]],
+                    'decided': [int(v) for v in self.counts[key][1]],
+                }
+                for key in sorted(self.tables)
+            },
+            'seen': self.seen,
+            'watermark': self.watermark,
+        }
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+def unique_by_id(bets):
+    """The fit sample with each bet id once (first copy); repeats are reported, not fitted twice"""
+    seen = set()
+    unique = []
+    for bet in bets:
+        key = bet_id(bet)
+        if key not in seen:
+            seen.add(key)
+            unique.append(bet)
+    if len(unique) < len(bets):
+        print(f"⚠️  Calibration sample: skipped {len(bets) - len(unique)} bets with a repeated id")
+    return unique
+
+
+def refresh_model(path=CALIBRATION_FILE, db=None, workspace='.', rebuild=False):
+    """
+    Fold settlements since the model's watermark into it, refit and save.
+    Returns (model, number of bets that changed it).
+    """
+    model = CalibrationModel() if rebuild else CalibrationModel.load(path)
+    bets, watermark = SettlementFeed(db, workspace).since(model.watermark)
+    changed = model.update(unique_by_id(bets))
+    if changed:
+        model.refit()
+    if changed or watermark != model.watermark or not os.path.exists(path):
+        model.watermark = watermark
+        model.save(path)
+    return model, changed
+
+
+_loaded = {}
+
+
+def _cached_model(path):
+    """Model loaded once per file version (path, mtime, size)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    sig = (path, st.st_mtime_ns, st.st_size)
+    if sig not in _loaded:
+        _loaded.clear()
+        _loaded[sig] = CalibrationModel.load(path)
+    return _loaded[sig]
+
+
+def calibrate_picks(picks, model=None, path=CALIBRATION_FILE):
+    """
+    Replace each pick's heuristic confidence with its calibrated win probability.
+
+    Sets raw_confidence (kept if already present, so re-calibrating is a no-op),
+    win_probability (%) and confidence. Picks are returned unchanged when no
+    model has been fitted yet.
+    """
+    model = model or _cached_model(path)
+    if model is None or not model.tables or not picks:
+        return picks
+    probs = model.probabilities(picks)
+    for pick, p in zip(picks, probs):
+        raw = pick.setdefault('raw_confidence', pick.get('confidence'))
+        calibrated = int(round(p * 100))
+        pick['win_probability'] = round(float(p) * 100, 1)
+        pick['confidence'] = calibrated
+        instructions = pick.get('bet_instructions')
+        if isinstance(instructions, str) and raw is not None:
+            pick['bet_instructions'] = instructions.replace(f"Confidence: {int(raw)}%", f"Confidence: {calibrated}%")
+    return picks
+
+
+def print_report(model):
+    print("\n" + "=" * 70)
+    print("🎯 CONFIDENCE CALIBRATION")
+    print("=" * 70)
+    for key in sorted(model.tables, key=lambda k: (k.count(ANY) * -1, k)):
+        wins, decided = model.counts[key]
+        print(f"\n{key.replace('|', ' / ')}  ({int(decided.sum())} bets)")
+        for low in range(50, 100, 10):
+            high = 100 if low == 90 else low + 9
+            n = decided[low:high + 1].sum()
+            if n == 0:
+                continue
+            actual = wins[low:high + 1].sum() / n * 100
+            table = model.tables[key][low:high + 1]
+            print(f"   raw {low:3}-{high:<3}% | actual {actual:5.1f}% (n={int(n):3}) | "
+                  f"calibrated {table.min()*100:5.1f}-{table.max()*100:5.1f}%")
+    print("\n" + "=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit the confidence calibration model')
+    parser.add_argument('--file', default=CALIBRATION_FILE)
+    parser.add_argument('--rebuild', action='store_true', help='Refit from every settled bet')
+    parser.add_argument('--report', action='store_true', help='Print raw vs calibrated by bucket')
+    args = parser.parse_args()
+
+    model, changed = refresh_model(args.file, open_if_populated(), rebuild=args.rebuild)
+    total = model.sample_size(_key(ANY, ANY))
+    print(f"🎯 Calibration model: {total} settled bets, {len(model.tables)} groups, {changed} new/changed")
+    if args.report:
+        print_report(model)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+📈 Closing Line Value - how the market moved after each pick
+
+Win/loss on a few dozen bets is mostly noise; whether the line moved toward our
+side before tip-off converges much faster. For every pick:
+
+    clv = P(win at our line | closing market) - P(implied by our price)
+
+in implied-probability points (+2.0 = we beat the close by 2%). The closing
+market is de-vigged (both sides' implied probabilities normalized to 1); a
+different spread/total number is converted with a normal margin/total model
+(sd from game_simulator's league priors). clv_points is the raw line move in
+our favor (spread/total only).
+
+Closing lines: every odds refresh stores a FanDuel snapshot per game (BettingDB
+closing_lines, one batched upsert per sport). A row is only replaced by a later
+capture taken before commence, so once a game starts it holds the last pre-game
+line. Rows are keyed by (game, commence_time) and a bet is matched to the row
+whose commence date (Eastern) is its game date, so a rematch inside the
+retention window is never scored against the earlier game's close. Snapshots come from OddsCollector.get_sports_odds, so they share its API
+cache and rate limits (the close is as fresh as the last refresh).
+
+Settlement computes CLV for the whole slate from one closing_lines query
+(attach_clv) and the value is stored with the settled bet; LearningEngine rolls
+it up next to win rate.
+
+USAGE:
+    from closing_line_value import capture_closing_lines, attach_clv
+    capture_closing_lines()                 # each update cycle, before settlement
+    attach_clv(finished_bets)               # sets bet['clv'], bet['clv_points'], bet['closing_line']
+    python3 closing_line_value.py           # CLV summary of settled bets
+    python3 closing_line_value.py --capture # take a snapshot now
+"""
+
+import argparse
+import math
+from datetime import datetime, timezone
+from statistics import NormalDist
+
+from betting_database import BettingDB, DB_PATH, clean_label
+from game_results_store import local_game_date
+from game_simulator import DEFAULT_SD, DEFAULT_RHO, LEAGUES
+from portfolio_allocator import american_to_decimal, bet_odds
+
+
+# OddsAPI sport keys the pick generator bets on (RealBettingModel.sports) by display name
+SPORT_KEYS = {'NCAA Basketball': 'basketball_ncaab', 'NBA': 'basketball_nba', 'NFL': 'americanfootball_nfl',
+              'MLB': 'baseball_mlb', 'College Football': 'americanfootball_ncaaf', 'NHL': 'ice_hockey_nhl',
+              'Premier League': 'soccer_epl'}
+DEFAULT_SPORTS = ('basketball_ncaab', 'basketball_nba')
+
+_NORMAL = NormalDist()
+
+
+def _float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _implied(odds):
+    odds = _float(odds)
+    return None if odds is None or abs(odds) < 100 else 1.0 / float(american_to_decimal(odds))
+
+
+def _no_vig(ours, theirs):
+    """Fair probability of our side from both sides' prices (our implied alone if the other is missing)"""
+    p, q = _implied(ours), _implied(theirs)
+    if p is None:
+        return None
+    return p / (p + q) if q else p
+
+
+def _utc(timestamp):
+    """ISO UTC string (comparable as text); naive datetimes are local time, like the odds cache's"""
+    ts = timestamp if isinstance(timestamp, datetime) else datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    return ts.astimezone(timezone.utc).isoformat(timespec='seconds')
+
+
+def line_sd(sport, bet_type):
+    """sd of the final margin (spread) or total, from game_simulator's league priors"""
+    league = LEAGUES.get(clean_label(sport) or '', 'ncaa')
+    sd, rho = DEFAULT_SD[league], DEFAULT_RHO[league]
+    return sd * math.sqrt(2 * (1 + rho if bet_type == 'TOTAL' else 1 - rho))
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+def snapshot_rows(games, sport_key, captured_at):
+    """
+    OddsAPI events -> closing_lines rows for games that have not started at
+    captured_at. Lines come from RealBettingModel's FanDuel parsers, the same
+    numbers the picks were made from.
+    """
+    from real_betting_model import RealBettingModel
+    parser = RealBettingModel()
+    captured_at = _utc(captured_at)
+    rows = []
+    for game in games or []:
+        home, away, commence = game.get('home_team'), game.get('away_team'), game.get('commence_time')
+        if not (home and away and commence) or _utc(commence) <= captured_at:
+            continue
+        row = {'game': f"{away} @ {home}", 'commence_time': _utc(commence), 'sport': sport_key,
+               'bookmaker': 'FanDuel', 'home_team': home, 'away_team': away, 'captured_at': captured_at}
+        for entry in parser.extract_fanduel_only(game.get('bookmakers', []), home, away) or []:
+            data = entry['data']
+            if entry['type'] == 'SPREAD':
+                row.update(home_spread=data.get('home_spread'), home_spread_odds=data.get('home_odds'),
+                           away_spread=data.get('away_spread'), away_spread_odds=data.get('away_odds'))
+            elif entry['type'] == 'MONEYLINE':
+                row.update(home_ml=data.get('home_odds'), away_ml=data.get('away_odds'))
+            elif entry['type'] == 'TOTALS':
+                row.update(total=data.get('total'), over_price=data.get('over_price'),
+                           under_price=data.get('under_price'))
+        if len(row) > 7:
+            rows.append(row)
+    return rows
+
+
+def capture_closing_lines(sports=DEFAULT_SPORTS, db=None, collector=None):
+    """Snapshot every upcoming game's lines for the given OddsAPI sports. Returns rows written."""
+    from odds_collector import OddsCollector
+    db = db or BettingDB(DB_PATH)
+    collector = collector or OddsCollector()
+    rows = []
+    for sport_key in sports:
+        games = collector.get_sports_odds(sport_key)
+        if not isinstance(games, list):
+            continue
+        # the cache time is when these prices were quoted (a cached response is not a new snapshot)
+        _, fetched_at = collector.cache_manager.get_cached_odds(sport_key)
+        rows += snapshot_rows(games, sport_key, fetched_at or datetime.now(timezone.utc))
+    written = db.save_closing_lines(rows)
+    print(f"📸 Line snapshot: {written} upcoming games across {len(sports)} sports")
+    return written
+
+
+def slate_sports(bets):
+    """OddsAPI sport keys for the sports on a slate"""
+    keys = {SPORT_KEYS.get(clean_label(b.get('sport')) or '') for b in bets}
+    return tuple(sorted(k for k in keys if k)) or DEFAULT_SPORTS
+
+
+# ---------------------------------------------------------------------------
+# CLV
+# ---------------------------------------------------------------------------
+
+def closing_line(rows, as_of, game_date=None):
+    """
+    The latest stored line for a game that had commenced by as_of (else the latest row).
+    game_date (YYYY-MM-DD, Eastern) keeps only that day's game; None when it has no row.
+    """
+    if game_date:
+        rows = [r for r in rows or [] if local_game_date(r['commence_time']) == str(game_date)[:10]]
+    if not rows:
+        return None
+    as_of = _utc(as_of)
+    started = [r for r in rows if r['commence_time'] <= as_of]
+    return (started or rows)[-1]
+
+
+def closing_line_value(bet, close):
+    """
+    {'clv', 'clv_points', 'closing_line'} for one bet against its game's closing
+    row, or None when the bet's side/market can't be matched.
+    """
+    if not close:
+        return None
+    bet_type = str(bet.get('bet_type') or 'SPREAD').upper()
+    recommendation = str(bet.get('recommendation') or '').strip()
+    our_price = bet_odds(bet)
+    home, away = close['home_team'], close['away_team']
+
+    if bet_type == 'MONEYLINE':
+        side = recommendation.replace('(Moneyline)', '').strip()
+        if side not in (home, away):
+            return None
+        ours, theirs = (close['home_ml'], close['away_ml']) if side == home else (close['away_ml'], close['home_ml'])
+        fair, points, close_number = _no_vig(ours, theirs), None, None
+    else:
+        side, _, line = recommendation.rpartition(' ')
+        line = _float(line)
+        if line is None:
+            return None
+        if bet_type == 'TOTAL':
+            over = side.strip().upper() == 'OVER'
+            if side.strip().upper() not in ('OVER', 'UNDER'):
+                return None
+            close_number = _float(close['total'])
+            ours, theirs = (close['over_price'], close['under_price']) if over else (close['under_price'], close['over_price'])
+            points = None if close_number is None else (close_number - line if over else line - close_number)
+        else:
+            side = side.strip()
+            if side not in (home, away):
+                return None
+            close_number = _float(close['home_spread'] if side == home else close['away_spread'])
+            ours, theirs = ((close['home_spread_odds'], close['away_spread_odds']) if side == home
+                            else (close['away_spread_odds'], close['home_spread_odds']))
+            points = None if close_number is None else line - close_number
+        fair_at_close = _no_vig(ours, theirs)
+        if points is None or fair_at_close is None:
+            return None
+        # shift the fair probability from the closing number to ours
+        z = _NORMAL.inv_cdf(min(max(fair_at_close, 1e-6), 1 - 1e-6))
+        fair = _NORMAL.cdf(z + points / line_sd(bet.get('sport'), bet_type))
+
+    paid = _implied(our_price)
+    if fair is None or paid is None:
+        return None
+    return {
+        'clv': round((fair - paid) * 100, 2),
+        'clv_points': None if points is None else round(points, 1),
+        'closing_line': {'line': close_number, 'odds': _float(ours), 'captured_at': close['captured_at']},
+    }
+
+
+def attach_clv(bets, db=None, as_of=None):
+    """
+    Set clv / clv_points / closing_line on every bet whose game has a snapshot,
+    with one closing_lines query for the whole slate. Returns bets with CLV.
+    """
+    if not bets:
+        return 0
+    db = db or BettingDB(DB_PATH)
+    as_of = as_of or datetime.now(timezone.utc)
+    lines = db.get_closing_lines((b.get('game') or '').strip() for b in bets)
+    found = 0
+    for bet in bets:
+        close = closing_line(lines.get((bet.get('game') or '').strip()), as_of,
+                             bet.get('game_date') or bet.get('date'))
+        value = closing_line_value(bet, close)
+        if value:
+            bet.update(value)
+            found += 1
+    return found
+
+
+def clv_summary(bets):
+    """{'clv_bets', 'avg_clv', 'beat_close_pct'} over bets carrying a clv"""
+    values = [b['clv'] for b in bets if isinstance(b.get('clv'), (int, float))]
+    if not values:
+        return {'clv_bets': 0, 'avg_clv': None, 'beat_close_pct': None}
+    return {
+        'clv_bets': len(values),
+        'avg_clv': round(sum(values) / len(values), 2),
+        'beat_close_pct': round(sum(1 for v in values if v > 0) / len(values) * 100, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Closing line value tracking')
+    parser.add_argument('--capture', action='store_true', help='Snapshot upcoming lines now')
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    db = BettingDB(args.db)
+    if args.capture:
+        capture_closing_lines(db=db)
+    print("📈 Closing line value (settled bets)")
+    for row in db.aggregate(['bet_type'], results=('WIN', 'LOSS', 'PUSH')):
+        if row['clv_bets']:
+            print(f"   {row['bet_type'] or 'Unknown':10} {row['clv_bets']:4d} bets | avg CLV {row['avg_clv']:+.2f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -23,8 +23,8 @@ except ImportError:
 
 try:
     from ml_betting_model import MLBettingModel
-    USE_ML = True
-    ml_model = MLBettingModel()
+    ml_model = MLBettingModel()  # loaded once per process (ml_model.pkl from the training job)
+    USE_ML = ml_model.model is not None
 except ImportError:
     USE_ML = False
     ml_model = None
@@ -41,6 +41,12 @@ try:
 except ImportError:
     USE_REASONING_ENGINE = False
 
+try:
+    from calibration_model import calibrate_picks
+    USE_CALIBRATION = True
+except ImportError:
+    USE_CALIBRATION = False
+
 try:
     from smart_edge_calculator import SmartEdgeCalculator
     USE_SMART_EDGE = True
@@ -78,7 +84,7 @@ def enhance_pick_with_smart_edge(pick, calc):
             edge_result = calc.calculate_spread_edge(
                 away_team, home_team, spread,
                 venue_city=venue_city, venue_state=venue_state,
-                sport=sport
+                sport=sport, game_time=pick.get('game_time')
             )
             
             # Update pick with smart edge
@@ -111,7 +117,7 @@ def enhance_pick_with_smart_edge(pick, calc):
             edge_result = calc.calculate_total_edge(
                 away_team, home_team, over_under,
                 venue_city=venue_city, venue_state=venue_state,
-                sport=sport
+                sport=sport, game_time=pick.get('game_time')
             )
             
             # Update pick with smart edge
@@ -186,6 +192,15 @@ def get_todays_value_bets():
                     'bet_type': pick.get('bet_type', 'SPREAD'),
                     'recommendation': pick.get('recommendation', 'N/A'),
                     'fanduel_line': pick.get('fanduel_line', 'N/A'),
+                    'odds': pick.get('odds', -110),
+                    'sim_probability': pick.get('sim_probability'),
+                    # no-vig market consensus (market_consensus.attach_consensus)
+                    'consensus_probability': pick.get('consensus_probability'),
+                    'market_edge': pick.get('market_edge'),
+                    'price_value': pick.get('price_value'),
+                    'fair_line': pick.get('fair_line'),
+                    'consensus_books': pick.get('consensus_books'),
+                    'off_market': pick.get('off_market', False),
                     'edge': pick.get('edge', 0),
                     'confidence': pick.get('confidence', 50),
                     'risk_tier': pick.get('risk_tier', '🟡 MODERATE RISK'),
@@ -213,6 +228,20 @@ def get_todays_value_bets():
                 except Exception as e:
                     pass  # Continue without adaptive filter
             
+            # CALIBRATE: heuristic confidence -> realized win probability (calibration_model.json)
+            if USE_CALIBRATION:
+                try:
+                    formatted_picks = calibrate_picks(formatted_picks)
+                except Exception as e:
+                    pass  # Keep heuristic confidence if no usable model
+            
+            # Warm team strength and outdoor weather for the whole slate once (smart edge reads them per pick)
+            if USE_SMART_EDGE:
+                try:
+                    smart_edge_calc.prefetch(formatted_picks)
+                except Exception:
+                    pass
+            
             # Classify risk tiers based on confidence
             enhanced_picks = []
             for pick in formatted_picks:
@@ -241,6 +270,9 @@ def get_todays_value_bets():
                 
                 enhanced_picks.append(pick)
             
+            if USE_SMART_EDGE:
+                smart_edge_calc.flush()  # one cache write for the slate
+            
             # Cache the picks before returning
             CacheManager.set_cache('daily_picks', enhanced_picks)
             return enhanced_picks
@@ -31,6 +31,12 @@ try:
 except ImportError:
     CACHE_AVAILABLE = False
 
+try:
+    from betting_database import open_if_populated, DB_PATH as BETTING_DB_FILE
+    BETTING_DB_AVAILABLE = True
+except ImportError:
+    BETTING_DB_AVAILABLE = False
+
 app = Flask(__name__, 
             template_folder=os.path.join(WORKSPACE, 'templates'),
             static_folder=os.path.join(WORKSPACE, 'static'))
@@ -89,6 +95,34 @@ def set_cache_headers(response):
 # DATA LOADING
 # ============================================================================
 
+_betting_db = None
+
+def get_betting_db():
+    """
+    BettingDB (primary store) once it has been migrated, else None -> JSON files.
+    Connections are pooled per thread, so the one instance serves every request.
+    """
+    global _betting_db
+    if _betting_db is None and BETTING_DB_AVAILABLE:
+        _betting_db = open_if_populated(BETTING_DB_FILE)
+    return _betting_db
+
+def load_completed_files() -> List[Dict]:
+    """[{'date', 'bets'}] per completed-bets date - from BettingDB, or completed_bets_*.json"""
+    db = get_betting_db()
+    if db:
+        by_date = {}
+        for bet in db.get_completed_bets(('WIN', 'LOSS', 'PENDING'), source='completed_file'):
+            by_date.setdefault(bet.get('date'), []).append(bet)
+        return [{'date': d, 'bets': b} for d, b in sorted(by_date.items())]
+    
+    files = []
+    for filepath in sorted(glob.glob(COMPLETED_BETS_PATTERN)):
+        data = load_json_file(filepath)
+        if data:
+            files.append(data)
+    return files
+
 def load_json_file(filepath: str) -> Optional[Dict]:
     """Load JSON file safely"""
     try:
@@ -192,13 +226,11 @@ def load_completed_bets() -> List[Dict]:
         # Include WIN, LOSS, and PENDING (awaiting scores)
         all_completed.extend([b for b in bets if b.get('result') in ['WIN', 'LOSS', 'PENDING']])
     
-    # Load from glob pattern - includes all dates
-    for filepath in glob.glob(COMPLETED_BETS_PATTERN):
-        data = load_json_file(filepath)
-        if data:
-            bets = data.get('bets', [])
-            # Include WIN, LOSS, and PENDING (awaiting scores)
-            all_completed.extend([b for b in bets if b.get('result') in ['WIN', 'LOSS', 'PENDING']])
+    # Load every date (BettingDB if migrated, else the completed_bets_*.json files)
+    for data in load_completed_files():
+        bets = data.get('bets', [])
+        # Include WIN, LOSS, and PENDING (awaiting scores)
+        all_completed.extend([b for b in bets if b.get('result') in ['WIN', 'LOSS', 'PENDING']])
     
     return all_completed
 
@@ -227,14 +259,15 @@ def get_top_10_recommended_bets() -> List[Dict]:
     When a game has multiple bets (SPREAD + TOTAL), select the one with highest edge
     Returns only completed (WIN/LOSS) bets from the top 10 unique games per date
     """
+    db = get_betting_db()
+    if db:
+        # Window-function query over the (source, date, game, edge) index
+        return db.top_n_per_date(10)
+    
     top_10_bets = []
     
     # Process each date's completed bets
-    for filepath in sorted(glob.glob(COMPLETED_BETS_PATTERN)):
-        data = load_json_file(filepath)
-        if not data:
-            continue
-        
+    for data in load_completed_files():
         bets = data.get('bets', [])
         
         # Group bets by game
@@ -280,6 +313,9 @@ def calculate_todays_stats() -> Dict:
         'wins': 0,
         'losses': 0,
         'completed': 0,
+        'avg_clv': None,
+        'beat_close_pct': None,
+        'clv_bets': 0,
         'timestamp': get_est_now()
     }
     
@@ -304,6 +340,9 @@ def calculate_todays_stats() -> Dict:
     # Calculate win rate
     win_rate = int((wins / total * 100)) if total > 0 else 0
     
+    # Closing line value (set at settlement) - converges long before the win rate does
+    clv_values = [b['clv'] for b in completed_bets if isinstance(b.get('clv'), (int, float))]
+    
     return {
         'win_rate': win_rate,
         'record': f"{wins}-{losses}",
@@ -311,6 +350,9 @@ def calculate_todays_stats() -> Dict:
         'wins': wins,
         'losses': losses,
         'completed': total,
+        'avg_clv': round(sum(clv_values) / len(clv_values), 2) if clv_values else None,
+        'beat_close_pct': round(sum(1 for v in clv_values if v > 0) / len(clv_values) * 100, 1) if clv_values else None,
+        'clv_bets': len(clv_values),
         'timestamp': get_est_now()
     }
 
@@ -439,12 +481,8 @@ def api_previous_results():
     """
     results_by_date = {}
     
-    # Load from completed_bets files and filter to top 10 only
-    for filepath in glob.glob(COMPLETED_BETS_PATTERN):
-        data = load_json_file(filepath)
-        if not data:
-            continue
-            
+    # Load completed bets per date and filter to top 10 only
+    for data in load_completed_files():
         date = data.get('date', 'unknown')
         bets = data.get('bets', [])
         
@@ -2,171 +2,240 @@
 """
 DraftKings Odds Scraper - Backup odds source 🎰
 Legal for personal use, research, and analysis
+
+Secondary provider for OddsCollector when OddsAPI has nothing for a sport:
+
+- The sportsbook page embeds its data as `window.__INITIAL_STATE__ = {...};`.
+  Only that blob is read: a substring search for the marker, then one
+  json.JSONDecoder.raw_decode from the opening brace, which stops at the
+  matching close (no DOM build, no <script> walk, no rfind slicing)
+- The state's event group (events + Game Lines offers) is normalized into the
+  OddsAPI event model (id, sport_key, commence_time, home_team, away_team,
+  bookmakers[draftkings].markets[h2h/spreads/totals].outcomes), so
+  OddsCollector.parse_odds_data and the market consensus read it unchanged
+- scrape_all_sports fetches every sport concurrently over one pooled session
+
+USAGE:
+    from draftkings_scraper import DraftKingsScraper
+    events = DraftKingsScraper().get_dk_odds('nba')      # OddsAPI-shaped events
+    python3 draftkings_scraper.py --sports nba nfl
+    python3 draftkings_scraper.py --save ../data/dk_pages          # keep raw pages
+    python3 draftkings_scraper.py --bench ../data/dk_pages/*.html  # time extraction
 """
 
-import requests
+import argparse
 import json
+import os
 import time
-from bs4 import BeautifulSoup
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+STATE_MARKER = 'window.__INITIAL_STATE__'
+BOOKMAKER = {'key': 'draftkings', 'title': 'DraftKings'}
+
+# DK sport path -> OddsAPI sport key
+SPORT_KEYS = {'nba': 'basketball_nba', 'ncb': 'basketball_ncaab', 'nfl': 'americanfootball_nfl', 'mlb': 'baseball_mlb'}
+# DK offer label -> OddsAPI market key
+OFFER_MARKETS = {'moneyline': 'h2h', 'spread': 'spreads', 'point spread': 'spreads', 'run line': 'spreads',
+                 'total': 'totals', 'total points': 'totals', 'total runs': 'totals'}
+
+
+def extract_state(html):
+    """The embedded __INITIAL_STATE__ object from a sportsbook page (None if absent)"""
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    marker = html.find(STATE_MARKER)
+    if marker < 0:
+        return None
+    start = html.find('{', marker + len(STATE_MARKER))
+    if start < 0:
+        return None
+    try:
+        state, _ = json.JSONDecoder().raw_decode(html, start)
+    except json.JSONDecodeError:
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def american_price(value):
+    """'-110' / '−110' (unicode minus) / '+150' / 150 -> int, None if unparseable"""
+    try:
+        return int(float(str(value).replace('−', '-').replace('+', '')))
+    except (TypeError, ValueError):
+        return None
+
+
+def _offers(event_group):
+    """Every offer dict in an event group's offer categories (DK nests them in lists of lists)"""
+    for category in event_group.get('offerCategories') or []:
+        for descriptor in category.get('offerSubcategoryDescriptors') or []:
+            for row in (descriptor.get('offerSubcategory') or {}).get('offers') or []:
+                for offer in (row if isinstance(row, list) else [row]):
+                    if isinstance(offer, dict):
+                        yield offer
+
+
+def _market(offer, home, away):
+    """DK offer -> OddsAPI market dict (None for offers we don't map)"""
+    key = OFFER_MARKETS.get(str(offer.get('label', '')).strip().lower())
+    if not key:
+        return None
+    outcomes = []
+    for i, o in enumerate(offer.get('outcomes') or []):
+        price = american_price(o.get('oddsAmerican'))
+        if price is None:
+            continue
+        label = str(o.get('label', ''))
+        if key == 'totals':
+            name = 'Over' if label.lower().startswith('o') else 'Under'
+        else:
+            # Match the participant to a team, else DK's order (away first, home second)
+            participant = o.get('participant') or label
+            name = home if participant == home else away if participant == away else (away, home)[i % 2]
+        outcome = {'name': name, 'price': price}
+        if key != 'h2h' and o.get('line') is not None:
+            outcome['point'] = float(o['line'])
+        outcomes.append(outcome)
+    return {'key': key, 'outcomes': outcomes} if len(outcomes) == 2 else None
+
+
+def normalize_state(state, sport):
+    """__INITIAL_STATE__ -> [OddsAPI-shaped event] for one sport's event group"""
+    groups = (state or {}).get('eventGroups') or {}
+    groups = groups.values() if isinstance(groups, dict) else groups
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    events = {}
+    for group in groups:
+        if not isinstance(group, dict):
+            continue
+        for ev in group.get('events') or []:
+            away, _, home = str(ev.get('name', '')).partition(' @ ')
+            away, home = (away or ev.get('teamName1', '')).strip(), (home or ev.get('teamName2', '')).strip()
+            if not (home and away and ev.get('eventId')):
+                continue
+            events[str(ev['eventId'])] = {
+                'id': f"dk_{ev['eventId']}",
+                'sport_key': SPORT_KEYS.get(sport, sport),
+                'commence_time': ev.get('startDate'),
+                'home_team': home,
+                'away_team': away,
+                'bookmakers': [dict(BOOKMAKER, last_update=now, markets=[])],
+            }
+        for offer in _offers(group):
+            event = events.get(str(offer.get('eventId')))
+            if not event:
+                continue
+            market = _market(offer, event['home_team'], event['away_team'])
+            markets = event['bookmakers'][0]['markets']
+            if market and all(m['key'] != market['key'] for m in markets):
+                markets.append(market)
+    return [e for e in events.values() if e['bookmakers'][0]['markets']]
+
 
 class DraftKingsScraper:
-    def __init__(self):
+    def __init__(self, workers=4, timeout=15):
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=1)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json, text/plain, */*',
+            'Accept': 'text/html,application/xhtml+xml,application/json, text/plain, */*',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br'
+            'Accept-Encoding': 'gzip, deflate'
         })
-        
+        self.workers = workers
+        self.timeout = timeout
+
         # DraftKings sport mapping
         self.sport_paths = {
             'nba': 'basketball/nba',
-            'ncb': 'basketball/ncaab', 
+            'ncb': 'basketball/ncaab',
             'nfl': 'football/nfl',
             'mlb': 'baseball/mlb'
         }
-    
-    def get_dk_odds(self, sport='nba'):
-        """Scrape odds from DraftKings"""
+
+    def fetch_page(self, sport):
+        """Raw sportsbook page for a sport"""
+        url = f"https://sportsbook.draftkings.com/{self.sport_paths[sport]}"
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def get_dk_odds(self, sport='nba', html=None):
+        """DraftKings odds for a sport as OddsAPI-shaped events ([] on failure)"""
         if sport not in self.sport_paths:
             print(f"❌ Sport {sport} not supported for DK scraping")
             return []
-        
-        sport_path = self.sport_paths[sport]
-        url = f"https://sportsbook.draftkings.com/{sport_path}"
-        
+
         try:
-            print(f"🎯 Scraping DraftKings {sport.upper()} odds...")
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            # DraftKings loads data via JavaScript/API calls
-            # Look for embedded JSON data in the page
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to find the data script tag
-            scripts = soup.find_all('script')
-            game_data = []
-            
-            for script in scripts:
-                if script.string and 'offerings' in script.string:
-                    try:
-                        # Extract JSON data (simplified approach)
-                        script_content = script.string
-                        if 'window.__INITIAL_STATE__' in script_content:
-                            # Parse the initial state data
-                            start = script_content.find('{')
-                            end = script_content.rfind('}') + 1
-                            if start > -1 and end > start:
-                                data_str = script_content[start:end]
-                                initial_data = json.loads(data_str)
-                                game_data = self.parse_dk_data(initial_data, sport)
-                                break
-                    except (json.JSONDecodeError, KeyError) as e:
-                        continue
-            
-            if not game_data:
-                # Fallback: try to parse from visible HTML elements
-                game_data = self.parse_dk_html(soup, sport)
-            
-            print(f"📊 Scraped {len(game_data)} {sport.upper()} games from DraftKings")
-            return game_data
-            
+            html = html if html is not None else self.fetch_page(sport)
+            state = extract_state(html)
+            if state is None:
+                print(f"⚠️ No DraftKings state blob on the {sport.upper()} page")
+                return []
+            events = normalize_state(state, sport)
+            print(f"📊 Scraped {len(events)} {sport.upper()} games from DraftKings")
+            return events
         except Exception as e:
             print(f"❌ DraftKings scraping failed: {e}")
             return []
-    
-    def parse_dk_data(self, data, sport):
-        """Parse DraftKings JSON data structure"""
-        games = []
-        
-        # This is a simplified parser - DK's structure is complex
-        # In production, you'd need to reverse engineer their current API structure
-        
-        try:
-            # Look for offerings/events data
-            if 'sportsbook' in data and 'offerings' in data['sportsbook']:
-                offerings = data['sportsbook']['offerings']
-                
-                for offering in offerings:
-                    if offering.get('eventGroupName', '').lower() == sport:
-                        # Extract game info
-                        games.append({
-                            'source': 'draftkings',
-                            'game_id': offering.get('eventId', 'unknown'),
-                            'home_team': offering.get('homeTeamName', ''),
-                            'away_team': offering.get('awayTeamName', ''),
-                            'spread': self.extract_spread(offering),
-                            'total': self.extract_total(offering),
-                            'timestamp': datetime.now().isoformat()
-                        })
-        
-        except Exception as e:
-            print(f"⚠️ Error parsing DK JSON data: {e}")
-        
-        return games
-    
-    def parse_dk_html(self, soup, sport):
-        """Fallback HTML parsing if JSON extraction fails"""
-        games = []
-        
-        # Look for game containers in the HTML
-        game_containers = soup.find_all('div', {'data-testid': 'event-cell'}) or \
-                         soup.find_all('div', class_=lambda x: x and 'game' in x.lower()) or \
-                         soup.find_all('table', class_=lambda x: x and 'sportsbook' in x.lower())
-        
-        print(f"🔍 Found {len(game_containers)} potential game containers in HTML")
-        
-        for container in game_containers[:10]:  # Limit to prevent spam
-            try:
-                # Try to extract team names and odds
-                team_elements = container.find_all(text=True)
-                text_content = ' '.join([text.strip() for text in team_elements if text.strip()])
-                
-                # Very basic pattern matching - would need refinement
-                if '@' in text_content and any(keyword in text_content.lower() 
-                    for keyword in ['spread', 'point', 'total', 'over', 'under']):
-                    
-                    games.append({
-                        'source': 'draftkings_html',
-                        'game_id': f"dk_html_{len(games)}",
-                        'raw_text': text_content[:200],  # For debugging
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    
-            except Exception as e:
-                continue
-        
-        return games
-    
-    def extract_spread(self, offering):
-        """Extract spread from DK offering data"""
-        # Placeholder - would need to match DK's current data structure
-        return offering.get('pointSpread', {}).get('homePointSpread')
-    
-    def extract_total(self, offering):
-        """Extract total from DK offering data"""
-        # Placeholder - would need to match DK's current data structure  
-        return offering.get('totalPoints', {}).get('total')
-    
-    def scrape_all_sports(self):
-        """Scrape odds for all supported sports"""
+
+    def scrape_all_sports(self, sports=None):
+        """Scrape several sports concurrently over the shared session -> {sport: events}"""
+        sports = [s for s in (sports or self.sport_paths) if s in self.sport_paths]
         all_odds = {}
-        
-        for sport in self.sport_paths.keys():
-            odds = self.get_dk_odds(sport)
-            if odds:
-                all_odds[sport] = odds
-            time.sleep(2)  # Be respectful to their servers
-        
+        if not sports:
+            return all_odds
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(sports))) as pool:
+            futures = {pool.submit(self.get_dk_odds, sport): sport for sport in sports}
+            for fut in as_completed(futures):
+                odds = fut.result()
+                if odds:
+                    all_odds[futures[fut]] = odds
         return all_odds
 
-if __name__ == "__main__":
-    # Test the scraper
+
+def bench(paths, repeat=20):
+    """Time state extraction + normalization on saved pages (sport from the file name, e.g. nba.html)"""
+    for path in paths:
+        with open(path, 'rb') as f:
+            html = f.read().decode('utf-8', errors='replace')
+        sport = os.path.splitext(os.path.basename(path))[0].split('_')[0]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            events = normalize_state(extract_state(html), sport)
+        per_page = (time.perf_counter() - started) / repeat * 1000
+        print(f"⏱️ {os.path.basename(path)}: {len(html) / 1e6:.2f} MB, {len(events)} events, {per_page:.2f} ms/page")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DraftKings fallback odds')
+    parser.add_argument('--sports', nargs='+', choices=['nba', 'ncb', 'nfl', 'mlb'])
+    parser.add_argument('--save', help='Directory to save the raw pages to (<sport>.html)')
+    parser.add_argument('--bench', nargs='+', help='Saved pages to time extraction against')
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+        return
     scraper = DraftKingsScraper()
-    odds = scraper.get_dk_odds('nba')
-    print(f"\n📊 Scraping Results:")
-    for game in odds:
-        print(f"  {game}")
\ No newline at end of file
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+        for sport in args.sports or scraper.sport_paths:
+            with open(os.path.join(args.save, f"{sport}.html"), 'w') as f:
+                f.write(scraper.fetch_page(sport))
+            print(f"💾 Saved {sport}.html")
+        return
+    odds = scraper.scrape_all_sports(args.sports)
+    print("\n📊 Scraping Results:")
+    for sport, events in odds.items():
+        for event in events:
+            markets = ', '.join(m['key'] for m in event['bookmakers'][0]['markets'])
+            print(f"  {sport.upper()}: {event['away_team']} @ {event['home_team']} ({markets})")
+
+
+if __name__ == "__main__":
+    main()
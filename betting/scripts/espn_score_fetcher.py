@@ -5,75 +5,42 @@ Fetches college basketball scores and updates bet results
 """
 
 import json
-import requests
 from datetime import datetime, timedelta
 from pathlib import Path
 import re
 
-ESPN_SCOREBOARD_URL = "http://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard"
+from betting_database import record_settled_bets
+from espn_scoreboard import get_service
 
 def fetch_espn_scores(date_str=None):
     """
-    Fetch ESPN scoreboard for college basketball
+    Fetch ESPN scoreboard for college basketball (shared espn_scoreboard cache)
     date_str: 'YYYY-MM-DD' or None for today
-    Returns: list of games with scores
+    Returns: list of games with scores ('TBD' until the game is final)
     """
     
     if date_str is None:
         date_str = datetime.now().strftime('%Y-%m-%d')
     
-    # Convert to YYYYMMDD format for ESPN
-    espn_date = date_str.replace('-', '')
-    
     print(f"[{datetime.now().strftime('%H:%M:%S')}] 🏀 Fetching ESPN scores for {date_str}...")
     
-    try:
-        # Fetch scoreboard
-        params = {'dates': espn_date}
-        response = requests.get(ESPN_SCOREBOARD_URL, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        games = []
-        
-        # Parse events (games)
-        for event in data.get('events', []):
-            game_info = {
-                'name': event.get('name', ''),
-                'date': event.get('date', ''),
-                'status': event.get('status', {}).get('type', ''),
-                'competitions': []
+    games = []
+    for event in get_service().events('ncb', date_str):
+        away_score = event.away_score if event.completed else 'TBD'
+        home_score = event.home_score if event.completed else 'TBD'
+        games.append({
+            'name': event.matchup,
+            'date': event.date,
+            'status': event.detail,
+            'competitors': {
+                'away': {'team': event.away_team, 'score': away_score},
+                'home': {'team': event.home_team, 'score': home_score},
+                'matchup': event.matchup
             }
-            
-            for comp in event.get('competitions', []):
-                # Get team info and scores
-                competitors = comp.get('competitors', [])
-                if len(competitors) >= 2:
-                    away = competitors[1]  # Away team (typically listed second)
-                    home = competitors[0]  # Home team
-                    
-                    away_team = away.get('team', {}).get('displayName', 'Unknown')
-                    home_team = home.get('team', {}).get('displayName', 'Unknown')
-                    away_score = away.get('score', 'TBD')
-                    home_score = home.get('score', 'TBD')
-                    
-                    game_info['competitors'] = {
-                        'away': {'team': away_team, 'score': away_score},
-                        'home': {'team': home_team, 'score': home_score},
-                        'matchup': f"{away_team} @ {home_team}"
-                    }
-                    
-                    games.append(game_info)
-            
-            if game_info['competitors']:
-                games.append(game_info)
-        
-        print(f"✅ Found {len(games)} games on {date_str}")
-        return games
+        })
     
-    except Exception as e:
-        print(f"❌ Error fetching ESPN scores: {e}")
-        return []
+    print(f"✅ Found {len(games)} games on {date_str}")
+    return games
 
 def match_game_to_bet(espn_matchup, bet_game):
     """
@@ -238,6 +205,8 @@ def update_completed_bets(date_str, espn_games):
         data['last_updated'] = datetime.now().isoformat()
         with open(bets_file, 'w') as f:
             json.dump(data, f, indent=2)
+        # Dual-write: BettingDB is the primary store, JSON kept during the transition
+        record_settled_bets(data.get('bets', []), date_str)
         print(f"\n✅ Updated {updated} bets in {bets_file}")
     
     return updated
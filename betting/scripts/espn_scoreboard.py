@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+📡 ESPN Scoreboard Service - one scoreboard fetch per (league, date) per polling interval
+
+Every score consumer (result trackers, status checkers, pick generators, the
+sports data collector) reads scoreboards through this service instead of
+calling ESPN itself:
+
+1. Each (league, date) scoreboard is fetched over one shared, rate-limited
+   session (espn_team_fetcher.ConditionalClient) and parsed once into compact
+   ScoreboardEvent tuples. Home/away always come from competitor.homeAway
+   (competitor order is only the fallback: ESPN lists home first).
+2. Parsed events are cached in memory and in SCOREBOARD_CACHE_FILE (write-behind,
+   flushed once at exit) with a status-aware TTL:
+   - any game in progress      -> POLL_INTERVAL
+   - games still to start      -> until the next tip-off (POLL_INTERVAL..SCHEDULED_TTL)
+   - everything final, today   -> FINAL_TTL
+   - everything final, earlier -> never expires
+3. Concurrent callers asking for the same scoreboard share a single fetch;
+   a failed fetch serves the last cached events. With nothing cached it returns
+   [] - or raises ScoreboardUnavailable for strict=True callers (writers that
+   must not mistake a failed fetch for a day without games).
+
+USAGE:
+    from espn_scoreboard import get_service
+    service = get_service()
+    events = service.events('nba', '2026-02-18')            # [ScoreboardEvent]
+    event = service.find('Duke Blue Devils @ North Carolina Tar Heels', 'ncaab')
+    service.prefetch([('ncb', None), ('nba', None)])       # warm several leagues at once
+    python3 espn_scoreboard.py --leagues ncb nba --date 2026-02-18
+"""
+
+import argparse
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from game_results_store import EST, local_game_date
+
+SCOREBOARD_CACHE_FILE = '../data/espn_scoreboards.json'
+ESPN_API_BASE = 'https://site.api.espn.com/apis/site/v2/sports'
+DEFAULT_WORKERS = 8
+POLL_INTERVAL = 60              # seconds; live scoreboards are refetched at most this often
+SCHEDULED_TTL = 15 * 60
+FINAL_TTL = 3 * 60 * 60         # today's slate can still gain late corrections
+EMPTY_TTL = 60 * 60
+RETAIN_DAYS = 14                # on-disk scoreboards older than this are dropped at load
+
+LEAGUES = {
+    'ncb': 'basketball/mens-college-basketball',
+    'nba': 'basketball/nba',
+    'nfl': 'football/nfl',
+    'cfb': 'football/college-football',
+    'mlb': 'baseball/mlb',
+    'nhl': 'hockey/nhl',
+    'epl': 'soccer/eng.1',
+}
+LEAGUE_PARAMS = {'ncb': {'groups': '50', 'limit': '500'}, 'cfb': {'groups': '80', 'limit': '500'}}
+DEFAULT_PARAMS = {'limit': '300'}
+
+# Sport labels used across the scripts -> league code
+LEAGUE_ALIASES = {
+    'ncaab': 'ncb', 'ncaa': 'ncb', 'basketball': 'ncb', 'ncaa basketball': 'ncb', 'college basketball': 'ncb',
+    'basketball_ncaab': 'ncb', 'basketball_nba': 'nba', 'nba basketball': 'nba',
+    'americanfootball_nfl': 'nfl', 'nfl football': 'nfl',
+    'college football': 'cfb', 'ncaaf': 'cfb', 'americanfootball_ncaaf': 'cfb',
+    'baseball_mlb': 'mlb', 'icehockey_nhl': 'nhl', 'nhl hockey': 'nhl',
+    'premier league': 'epl', 'soccer': 'epl', 'soccer_epl': 'epl',
+}
+
+
+class ScoreboardUnavailable(Exception):
+    """A scoreboard fetch failed and no cached copy exists (events(..., strict=True))"""
+
+
+class ScoreboardEvent(NamedTuple):
+    league: str
+    event_id: str
+    date: str                   # ESPN UTC start time ('2026-02-18T00:00Z')
+    local_date: str             # US Eastern game date
+    away_team: str
+    home_team: str
+    away_id: Optional[str]
+    home_id: Optional[str]
+    away_score: Optional[int]   # None until the game has started
+    home_score: Optional[int]
+    state: str                  # 'pre' / 'in' / 'post'
+    status: str                 # 'STATUS_FINAL', 'STATUS_IN_PROGRESS', ...
+    detail: str                 # 'Final', 'Final/OT', 'Scheduled', ...
+    completed: bool
+    venue: str
+
+    @property
+    def matchup(self):
+        return f"{self.away_team} @ {self.home_team}"
+
+    @property
+    def final_score(self):
+        return f"{self.away_score}-{self.home_score}" if self.completed else None
+
+
+def league_code(label):
+    """'ncaab' / 'NCAA Basketball' / '🏀 NBA' / 'basketball_nba' -> league code (None if unknown)"""
+    label = re.sub(r'[^a-z0-9_. ]', '', str(label or '').lower()).strip()
+    return label if label in LEAGUES else LEAGUE_ALIASES.get(label)
+
+
+def scoreboard_day(day=None):
+    """None / date / 'YYYY-MM-DD' / 'YYYYMMDD' -> date (None or '' means today, Eastern)"""
+    if not day:
+        return datetime.now(EST).date()
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return datetime.strptime(str(day).replace('-', '')[:8], '%Y%m%d').date()
+
+
+def _score(competitor, state):
+    if state == 'pre':
+        return None
+    try:
+        return int(float(competitor.get('score')))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_event(event, league):
+    """Raw ESPN scoreboard event -> ScoreboardEvent (None if it has no two competitors)"""
+    comp = (event.get('competitions') or [{}])[0]
+    competitors = comp.get('competitors') or []
+    if len(competitors) < 2:
+        return None
+    home = next((c for c in competitors if c.get('homeAway') == 'home'), competitors[0])
+    away = next((c for c in competitors if c.get('homeAway') == 'away'), competitors[1])
+    status = (comp.get('status') or event.get('status') or {}).get('type') or {}
+    state = status.get('state') or 'pre'
+    home_team, away_team = home.get('team') or {}, away.get('team') or {}
+    return ScoreboardEvent(
+        league=league,
+        event_id=str(event.get('id')),
+        date=event.get('date'),
+        local_date=local_game_date(event.get('date')),
+        away_team=away_team.get('displayName', ''),
+        home_team=home_team.get('displayName', ''),
+        away_id=str(away_team['id']) if away_team.get('id') else None,
+        home_id=str(home_team['id']) if home_team.get('id') else None,
+        away_score=_score(away, state),
+        home_score=_score(home, state),
+        state=state,
+        status=status.get('name', ''),
+        detail=status.get('description', ''),
+        completed=bool(status.get('completed')),
+        venue=(comp.get('venue') or {}).get('fullName', ''),
+    )
+
+
+def parse_scoreboard(data, league):
+    events = (parse_event(ev, league) for ev in (data or {}).get('events', []))
+    return [e for e in events if e]
+
+
+def scoreboard_ttl(events, day, now=None):
+    """Seconds a parsed scoreboard stays fresh (None: never expires)"""
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(EST).date()
+    if not events:
+        return EMPTY_TTL
+    states = {e.state for e in events}
+    if 'in' in states:
+        return POLL_INTERVAL
+    if 'pre' not in states:
+        return None if day < today else FINAL_TTL
+    # Scheduled games: nothing changes before the next start time
+    starts = []
+    for e in events:
+        if e.state == 'pre' and e.date:
+            try:
+                start = datetime.fromisoformat(e.date.replace('Z', '+00:00'))
+                starts.append((start - now).total_seconds())
+            except ValueError:
+                pass
+    until = min(starts) if starts else SCHEDULED_TTL
+    return int(min(max(until, POLL_INTERVAL), SCHEDULED_TTL))
+
+
+def _name_words(name):
+    return re.findall(r"[a-z0-9&']+", str(name or '').lower().replace('.', ''))
+
+
+def teams_match(wanted, espn):
+    """True when the shorter name is a run of whole words (or word prefixes, e.g. 'St' -> 'State') of the longer
+
+    'Kansas' matches 'Kansas Jayhawks' but not 'Arkansas Razorbacks'.
+    """
+    short, long_ = sorted((_name_words(wanted), _name_words(espn)), key=len)
+    if not short:
+        return False
+    return any(all(long_[start + i].startswith(word) for i, word in enumerate(short))
+               for start in range(len(long_) - len(short) + 1))
+
+
+class ScoreboardService:
+    def __init__(self, client=None, cache_path=SCOREBOARD_CACHE_FILE, workers=DEFAULT_WORKERS):
+        if client is None:
+            from espn_team_fetcher import ConditionalClient
+            client = ConditionalClient(workers=workers, cache_dir=None)
+        self.client = client
+        self.workers = workers
+        self.disk = None
+        if cache_path:
+            from write_behind_cache import WriteBehindCache
+            self.disk = WriteBehindCache(cache_path)
+            self._prune()
+        self.memory = {}        # key -> (monotonic expiry or None, [ScoreboardEvent])
+        self.stats = {'fetches': 0, 'memory_hits': 0, 'disk_hits': 0, 'stale': 0}
+        self._lock = threading.Lock()
+        self._key_locks = defaultdict(threading.Lock)
+
+    @staticmethod
+    def key(league, day):
+        return f"{league}|{day.strftime('%Y%m%d')}"
+
+    def _prune(self):
+        cutoff = (datetime.now(EST).date() - timedelta(days=RETAIN_DAYS)).strftime('%Y%m%d')
+        for key in [k for k in self.disk.data if k.split('|')[-1] < cutoff]:
+            self.disk.delete(key)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _cached(self, key):
+        """Fresh events from memory, else from disk (promoted to memory), else None"""
+        entry = self.memory.get(key)
+        if entry and (entry[0] is None or time.monotonic() < entry[0]):
+            self._count('memory_hits')
+            return entry[1]
+        stored = self.disk.get(key) if self.disk is not None else None
+        if stored:
+            ttl = stored.get('ttl')
+            remaining = None if ttl is None else ttl - (time.time() - stored.get('fetched_at', 0))
+            if remaining is None or remaining > 0:
+                events = [ScoreboardEvent(**e) for e in stored.get('events', [])]
+                self.memory[key] = (None if remaining is None else time.monotonic() + remaining, events)
+                self._count('disk_hits')
+                return events
+        return None
+
+    def _stale(self, key):
+        entry = self.memory.get(key)
+        if entry:
+            return entry[1]
+        stored = self.disk.get(key) if self.disk is not None else None
+        return [ScoreboardEvent(**e) for e in stored.get('events', [])] if stored else None
+
+    def events(self, league, day=None, strict=False):
+        """
+        Parsed scoreboard for a league (code or any alias) on a day, [] when unavailable
+        (strict=True: raise ScoreboardUnavailable instead)
+        """
+        code = league_code(league)
+        if code is None:
+            print(f"❌ Unknown league: {league}")
+            return []
+        day = scoreboard_day(day)
+        key = self.key(code, day)
+        with self._lock:
+            key_lock = self._key_locks[key]
+        # One fetch per key: callers that arrive mid-fetch wait and read the cache
+        with key_lock:
+            events = self._cached(key)
+            if events is not None:
+                return events
+            self._count('fetches')
+            params = dict(LEAGUE_PARAMS.get(code, DEFAULT_PARAMS), dates=day.strftime('%Y%m%d'))
+            data = self.client.get(f"{ESPN_API_BASE}/{LEAGUES[code]}/scoreboard", params)
+            if data is None:
+                events = self._stale(key)
+                if events is not None:
+                    self._count('stale')
+                    return events
+                if strict:
+                    raise ScoreboardUnavailable(f"{code} scoreboard for {day} unavailable")
+                return []
+            events = parse_scoreboard(data, code)
+            ttl = scoreboard_ttl(events, day)
+            self.memory[key] = (None if ttl is None else time.monotonic() + ttl, events)
+            if self.disk is not None:
+                with self._lock:
+                    self.disk.set(key, {'fetched_at': time.time(), 'ttl': ttl,
+                                        'events': [e._asdict() for e in events]})
+            return events
+
+    def prefetch(self, pairs):
+        """Warm [(league, day)] concurrently -> {(league, day): events}"""
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(pairs))) as pool:
+            return dict(zip(pairs, pool.map(lambda pair: self.events(*pair), pairs)))
+
+    def find(self, game, league, day=None):
+        """ScoreboardEvent for an 'Away @ Home' game string (exact, then whole-word match), or None
+
+        A fuzzy match that fits more than one event is ambiguous and returns None rather than a guess.
+        """
+        if ' @ ' not in str(game):
+            return None
+        away, home = (part.strip() for part in game.split(' @ ', 1))
+        events = self.events(league, day)
+        exact = next((e for e in events if e.away_team == away and e.home_team == home), None)
+        if exact:
+            return exact
+        candidates = [e for e in events if teams_match(away, e.away_team) and teams_match(home, e.home_team)]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def flush(self):
+        if self.disk is not None:
+            with self._lock:
+                self.disk.flush()
+
+
+_shared_service = None
+
+
+def get_service():
+    """Process-wide ScoreboardService, so every consumer shares one cache and session"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = ScoreboardService()
+    return _shared_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ESPN scoreboards through the shared cache')
+    parser.add_argument('--leagues', nargs='+', default=['ncb', 'nba'], help='League codes or aliases')
+    parser.add_argument('--date', help='YYYY-MM-DD (default: today, Eastern)')
+    args = parser.parse_args()
+
+    service = get_service()
+    results = service.prefetch([(league, args.date) for league in args.leagues])
+    for (league, _), events in results.items():
+        live = sum(1 for e in events if e.state == 'in')
+        final = sum(1 for e in events if e.completed)
+        print(f"📡 {league}: {len(events)} games ({live} live, {final} final)")
+        for e in events[:5]:
+            score = f"{e.away_score}-{e.home_score}" if e.state != 'pre' else e.detail
+            print(f"   {e.matchup}: {score}")
+    print(f"📊 {service.stats}")
+
+
+if __name__ == '__main__':
+    main()
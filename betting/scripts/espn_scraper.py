@@ -1,158 +1,72 @@
 #!/usr/bin/env python3
 """
-🎰 LarlBot ESPN Scraper v1.0
-Automated browser-based scraping of ESPN scoreboard for accurate game results
+🎰 LarlBot ESPN Results Ingest v2.0
+Final scores for the results path from ESPN's JSON scoreboard - no browser
+
+Writes espn_scores_cache.json in the format the Puppeteer scraper used to
+produce (date, source, scraped_at, games[{away_team, home_team, away_score,
+home_score, status}]), so browser_result_checker_full.py and bet_processor.py
+read it unchanged. Scores come from the shared espn_scoreboard service (one
+cached JSON request per date) instead of launching Chromium and walking
+document.body.innerText. A failed fetch leaves the cache file untouched and
+ingest() returns None, so callers fall back instead of settling on zero games.
+
+--parity compares the JSON ingest against saved scraper outputs (fixtures in
+the old espn_scores_cache.json format): every scraped final must be present
+with the same score. Exit status is 1 on any mismatch.
+
+USAGE:
+    python3 espn_scraper.py [YYYY-MM-DD]                    # ingest (default: today)
+    python3 espn_scraper.py --parity ../data/espn_scores_cache.json   # saved Puppeteer output
 """
 
+import argparse
 import json
 import os
 import sys
-import re
-import time
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from espn_scoreboard import get_service, teams_match, ScoreboardUnavailable
 
 WORKSPACE = "/Users/macmini/.openclaw/workspace"
 ESPN_CACHE_FILE = f"{WORKSPACE}/espn_scores_cache.json"
+SOURCE = "ESPN Division I Scoreboard (JSON)"
 
 
-def normalize_team_name_for_display(name: str) -> str:
-    """Clean up team name for consistency"""
-    # Just strip extra whitespace and standardize case
-    return name.strip().title()
-
-
-def extract_games_from_text(text: str) -> List[Dict]:
-    """
-    Extract games from ESPN scoreboard page text
-    Pattern: Team (record) H1 H2 [OT] Total | Team (record) H1 H2 [OT] Total
-    """
-    games = []
-    
-    # Split by Final/Final/OT markers
-    lines = text.split('\n')
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Look for status lines (Final, Final/OT, etc)
-        if line in ['FINAL', 'FINAL/OT', 'FINAL/2OT', 'FINAL/3OT'] or line.startswith('FINAL'):
-            status = line
-            i += 1
-            
-            # Skip header row if present
-            if i < len(lines) and any(x in lines[i].lower() for x in ['1', '2', 'ot', 'total']):
-                i += 1
-            
-            # Look for team data in next ~20 lines
-            away_team = None
-            away_h1 = None
-            home_team = None
-            
-            for j in range(i, min(i + 20, len(lines))):
-                curr = lines[j].strip()
-                
-                # Skip empty lines
-                if not curr:
-                    continue
-                
-                # Look for pattern: Team (Record) | H1 | H2 | [OT] | Total
-                if '(' in curr and ')' in curr and curr[0].isalpha():
-                    # This is a team line
-                    team_part = curr.split('(')[0].strip()
-                    
-                    if not away_team:
-                        away_team = team_part
-                    else:
-                        # This is the home team
-                        # Collect next few lines for scores
-                        scores = []
-                        for k in range(j, min(j + 10, len(lines))):
-                            score_line = lines[k].strip()
-                            if score_line and score_line[0].isdigit():
-                                scores.append(int(score_line))
-                            elif score_line.isdigit():
-                                scores.append(int(score_line))
-                            elif scores and not score_line[0].isdigit():
-                                break
-                        
-                        if len(scores) >= 4:  # At least H1, H2, H1, H2 (4 numbers)
-                            # Find the totals (should be near end)
-                            away_total = scores[-2] if len(scores) % 2 == 0 else scores[-2]
-                            home_total = scores[-1]
-                            
-                            game = {
-                                "away_team": normalize_team_name_for_display(away_team),
-                                "home_team": normalize_team_name_for_display(curr),
-                                "away_score": away_total,
-                                "home_score": home_total,
-                                "status": status
-                            }
-                            
-                            # Validate scores are reasonable (0-200 range)
-                            if 0 <= away_total <= 200 and 0 <= home_total <= 200:
-                                games.append(game)
-                                away_team = None
-                        break
-        
-        i += 1
-    
-    return games
+def final_games(date_str: str, league: str = 'ncb') -> List[Dict]:
+    """Every finished game on a date, in the espn_scores_cache game format (raises ScoreboardUnavailable)"""
+    return [{
+        "away_team": event.away_team,
+        "home_team": event.home_team,
+        "away_score": event.away_score,
+        "home_score": event.home_score,
+        "status": event.detail.upper() or "FINAL",
+    } for event in get_service().events(league, date_str, strict=True) if event.completed]
 
 
 def scrape_espn_date(date_str: str) -> Dict:
     """
-    Scrape ESPN scoreboard for a specific date
-    Returns dict with date and list of games
-    
+    ESPN final scores for a specific date
+
     Args:
         date_str: Date in YYYY-MM-DD format
-    
+
     Returns:
         {
             "date": "2026-02-14",
             "games": [
-                {"away_team": "...", "home_team": "...", "away_score": X, "home_score": Y, "status": "Final"},
+                {"away_team": "...", "home_team": "...", "away_score": X, "home_score": Y, "status": "FINAL"},
                 ...
             ]
         }
     """
-    print(f"\n🌐 ESPN Scraper - {date_str}")
-    print("=" * 70)
-    print(f"📅 Target date: {date_str}")
-    print(f"⏳ Requires OpenClaw browser tool to be run via CLI")
-    print(f"\nSteps:")
-    print(f"1. Open ESPN scoreboard:")
-    print(f"   https://www.espn.com/mens-college-basketball/scoreboard/_/group/50/date/{date_str.replace('-', '')}")
-    print(f"\n2. In browser console, run:")
-    print(f"""
-(() => {{
-  const games = [];
-  const text = document.body.innerText;
-  const lines = text.split('\\n');
-  
-  for (let i = 0; i < lines.length; i++) {{
-    if (lines[i].match(/^(FINAL|Final)/)) {{
-      // Found a game, collect context
-      const context = lines.slice(i, i+30).join('|');
-      // Log it
-      console.log(context);
-    }}
-  }}
-}})()
-    """)
-    print(f"\n3. Copy all console output and save to: {ESPN_CACHE_FILE}")
-    print("=" * 70)
-    
-    return {
-        "date": date_str,
-        "games": [],
-        "manual_scrape_required": True
-    }
+    games = final_games(date_str)
+    print(f"📡 {len(games)} final games from the ESPN scoreboard for {date_str}")
+    return {"date": date_str, "games": games}
 
 
-def load_cached_scores(date_str: str) -> Dict:
+def load_cached_scores(date_str: str) -> Optional[Dict]:
     """Load cached ESPN scores if available"""
     if os.path.exists(ESPN_CACHE_FILE):
         with open(ESPN_CACHE_FILE) as f:
@@ -166,42 +80,94 @@ def save_scores(date_str: str, games: List[Dict]):
     """Save scores to cache file"""
     data = {
         "date": date_str,
-        "source": "ESPN Division I Scoreboard",
+        "source": SOURCE,
         "scraped_at": datetime.now().isoformat(),
         "games": games
     }
-    
-    with open(ESPN_CACHE_FILE, 'w') as f:
+
+    tmp = ESPN_CACHE_FILE + '.tmp'
+    with open(tmp, 'w') as f:
         json.dump(data, f, indent=2)
-    
+    os.replace(tmp, ESPN_CACHE_FILE)
+
     print(f"\n✅ Saved {len(games)} games to {ESPN_CACHE_FILE}")
 
 
+def ingest(date_str: str) -> Optional[Dict]:
+    """Fetch a date's final scores and write the cache file. Returns the cached data, None if the fetch failed."""
+    try:
+        data = scrape_espn_date(date_str)
+    except ScoreboardUnavailable as e:
+        print(f"❌ {e} - keeping {ESPN_CACHE_FILE} as it is")
+        return None
+    save_scores(date_str, data["games"])
+    return data
+
+
+def parity(fixture_path: str) -> Dict:
+    """
+    Compare a saved scraper output against the JSON ingest for the same date.
+    Returns {'date', 'scraped', 'matched', 'missing': [...], 'mismatched': [...]}
+    """
+    with open(fixture_path) as f:
+        fixture = json.load(f)
+    ingested = final_games(fixture['date'])
+    report = {'date': fixture['date'], 'scraped': len(fixture.get('games', [])), 'matched': 0,
+              'missing': [], 'mismatched': []}
+    for game in fixture.get('games', []):
+        # Both teams, else one team with the same final total (the scraped page used short names such as
+        # 'UConn' or 'Cal State Northridge'); more than one candidate is ambiguous and reported as missing
+        total = int(game['away_score']) + int(game['home_score'])
+        candidates = [g for g in ingested if teams_match(game['away_team'], g['away_team'])
+                      and teams_match(game['home_team'], g['home_team'])]
+        if not candidates:
+            candidates = [g for g in ingested if (teams_match(game['away_team'], g['away_team'])
+                                                  or teams_match(game['home_team'], g['home_team']))
+                          and g['away_score'] + g['home_score'] == total]
+        match = candidates[0] if len(candidates) == 1 else None
+        label = f"{game['away_team']} @ {game['home_team']}"
+        if match is None:
+            report['missing'].append(label)
+        elif (int(game['away_score']), int(game['home_score'])) != (match['away_score'], match['home_score']):
+            report['mismatched'].append(f"{label}: scraped {game['away_score']}-{game['home_score']}, "
+                                        f"json {match['away_score']}-{match['home_score']}")
+        else:
+            report['matched'] += 1
+    return report
+
+
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description='ESPN final scores -> espn_scores_cache.json')
+    parser.add_argument('date', nargs='?', default=datetime.now().strftime("%Y-%m-%d"), help='YYYY-MM-DD')
+    parser.add_argument('--parity', nargs='+', help='Saved scraper outputs to check the JSON ingest against')
+    parser.add_argument('--force', action='store_true', help='Refetch even if the cache already has the date')
+    args = parser.parse_args()
+
+    if args.parity:
+        ok = True
+        for path in args.parity:
+            report = parity(path)
+            print(f"🔍 {os.path.basename(path)} ({report['date']}): {report['matched']}/{report['scraped']} match")
+            for label in report['missing']:
+                print(f"   ❌ missing: {label}")
+            for label in report['mismatched']:
+                print(f"   ❌ {label}")
+            ok = ok and not report['missing'] and not report['mismatched']
+        sys.exit(0 if ok else 1)
+
     print("=" * 70)
-    print("🎰 LarlBot ESPN Scraper v1.0")
+    print("🎰 LarlBot ESPN Results Ingest v2.0")
     print("=" * 70)
-    
-    # Get date from argument or use today
-    if len(sys.argv) > 1:
-        date_str = sys.argv[1]
-    else:
-        date_str = datetime.now().strftime("%Y-%m-%d")
-    
-    print(f"\n📅 Scraping date: {date_str}")
-    
-    # Check if cached
-    cached = load_cached_scores(date_str)
+    print(f"\n📅 Date: {args.date}")
+
+    cached = None if args.force else load_cached_scores(args.date)
     if cached:
         print(f"✅ Using cached data ({len(cached.get('games', []))} games)")
         return
-    
-    # Show instructions for manual scraping
-    scrape_espn_date(date_str)
-    
-    print(f"\n❓ After manually scraping and saving to {ESPN_CACHE_FILE}:")
-    print(f"   Run: python3 browser_result_checker_full.py [bet_file.json]")
+    if ingest(args.date) is None:
+        sys.exit(1)
+    print("   Run: python3 browser_result_checker_full.py [bet_file.json]")
 
 
 if __name__ == "__main__":
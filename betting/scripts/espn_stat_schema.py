@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Declarative extraction schema for ESPN team statistics responses.
+
+Each stat is declared once as:
+    stat name -> known JSON paths (most specific, checked first)
+              -> normalized label aliases (name / displayName / abbreviation)
+
+A schema is compiled once into an ordered list of lookup keys per stat. Each
+response is flattened into a {label: value} map in a single traversal, and every
+stat is then a handful of dict lookups. Stats that can't be found are counted
+per stat and reported, instead of silently coming back as None.
+
+Usage:
+    from espn_stat_schema import NCAA_TEAM_STATS
+    values, missing = NCAA_TEAM_STATS.extract(stats_json)
+"""
+import re
+import sys
+import threading
+from collections import Counter
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_label(label):
+    """'Points Per Game' / 'avgPoints' / 'PTS' -> 'pointspergame' / 'avgpoints' / 'pts'"""
+    return _NON_ALNUM.sub('', str(label).lower())
+
+
+def normalize_path(path):
+    """'results.stats.categories.offensive.stats.avgPoints' -> same with each segment normalized"""
+    return '.'.join(normalize_label(p) for p in path.split('.'))
+
+
+def _to_number(stat):
+    for key in ('value', 'displayValue', 'avg', 'average'):
+        val = stat.get(key)
+        if val is None or val == '':
+            continue
+        try:
+            return float(str(val).replace(',', ''))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def flatten_stats(obj):
+    """
+    Single traversal of an ESPN statistics response.
+
+    Every dict that carries a stat label (name / displayName / abbreviation) and a
+    numeric value is recorded under:
+      - its full label path, e.g. 'results.stats.categories.offensive.stats.avgpoints'
+      - each bare normalized label, e.g. 'avgpoints', 'pointspergame', 'pts'
+    List items contribute their 'name' to the path. First occurrence wins, which
+    matches the depth-first order the old find_value walker used.
+    """
+    flat = {}
+    stack = [(obj, '')]
+    while stack:
+        node, path = stack.pop()
+        if isinstance(node, dict):
+            labels = [node.get(k) for k in ('name', 'displayName', 'abbreviation')]
+            labels = [normalize_label(l) for l in labels if isinstance(l, str) and l]
+            if labels and any(k in node for k in ('value', 'displayValue', 'avg', 'average')):
+                num = _to_number(node)
+                if num is not None:
+                    if path:
+                        flat.setdefault(path, num)
+                    for label in labels:
+                        flat.setdefault(label, num)
+            children = []
+            for k, v in node.items():
+                if isinstance(v, (dict, list)):
+                    seg = normalize_label(k)
+                    children.append((v, f'{path}.{seg}' if path else seg))
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            children = []
+            for item in node:
+                seg = None
+                if isinstance(item, dict) and isinstance(item.get('name'), str):
+                    seg = normalize_label(item['name'])
+                children.append((item, f'{path}.{seg}' if seg else path))
+            stack.extend(reversed(children))
+    return flat
+
+
+class CompiledSchema:
+    """A schema compiled to ordered lookup keys, with thread-safe miss accounting."""
+
+    def __init__(self, name, schema):
+        self.name = name
+        self.lookups = {}
+        self.optional = set()
+        for stat, spec in schema.items():
+            keys = [normalize_path(p) for p in spec.get('paths', [])]
+            keys += [normalize_label(a) for a in spec.get('aliases', [])]
+            # dedupe, keep order
+            self.lookups[stat] = list(dict.fromkeys(keys))
+            if spec.get('optional'):
+                self.optional.add(stat)
+        self.misses = Counter()
+        self.responses = 0
+        self._lock = threading.Lock()
+
+    def extract(self, response):
+        """Return ({stat: float or None}, [missing stat names]) from one response."""
+        flat = flatten_stats(response)
+        values = {}
+        missing = []
+        for stat, keys in self.lookups.items():
+            val = None
+            for key in keys:
+                if key in flat:
+                    val = flat[key]
+                    break
+            values[stat] = val
+            if val is None:
+                missing.append(stat)
+        with self._lock:
+            self.responses += 1
+            self.misses.update(missing)
+        return values, missing
+
+    def miss_report(self):
+        """{stat: miss count} for every stat that missed at least once."""
+        with self._lock:
+            return {stat: self.misses[stat] for stat in self.lookups if self.misses[stat]}
+
+    def report(self):
+        """Print a one-block summary of schema misses (required stats flagged loudly)."""
+        misses = self.miss_report()
+        if not misses:
+            return misses
+        for stat, count in misses.items():
+            tag = 'info' if stat in self.optional else 'WARN'
+            print(f'{tag}: {self.name} schema miss: {stat!r} not found in '
+                  f'{count}/{self.responses} responses (tried: {", ".join(self.lookups[stat][:4])}...)',
+                  file=sys.stderr)
+        return misses
+
+
+# ESPN site API /teams/{id}/statistics puts per-game averages under
+# results.stats.categories[<category>].stats[<name>]
+_CAT = 'results.stats.categories'
+
+TEAM_STAT_SCHEMA = {
+    'ppg': {
+        'paths': [f'{_CAT}.offensive.stats.avgPoints', f'{_CAT}.scoring.stats.avgPoints'],
+        'aliases': ['avgPoints', 'Points Per Game', 'ppg', 'points per game (ppg)', 'avg points'],
+    },
+    'opp_ppg': {
+        'paths': [f'{_CAT}.defensive.stats.avgPointsAgainst', 'opponent.avgPoints'],
+        'aliases': ['avgPointsAgainst', 'Points Allowed Per Game', 'opp ppg', 'opp points per game',
+                    'avg points against', 'points allowed'],
+    },
+    'fga': {
+        'paths': [f'{_CAT}.offensive.stats.avgFieldGoalsAttempted'],
+        'aliases': ['avgFieldGoalsAttempted', 'Field Goal Attempts Per Game', 'field goal attempts', 'fga'],
+    },
+    'poss': {
+        'paths': [f'{_CAT}.general.stats.possessions'],
+        'aliases': ['possessions', 'possessions per game', 'avgPossessions', 'pace'],
+        'optional': True,   # ESPN rarely publishes this for NCAA; predictors default to 70
+    },
+    'mov': {
+        'paths': [f'{_CAT}.general.stats.avgPointDifferential'],
+        'aliases': ['avgPointDifferential', 'margin of victory', 'mov', 'point differential', 'margin'],
+        'optional': True,   # derived from ppg - opp_ppg when missing
+    },
+}
+
+NBA_TEAM_STAT_SCHEMA = dict(TEAM_STAT_SCHEMA)
+NBA_TEAM_STAT_SCHEMA['ppg'] = {
+    'paths': TEAM_STAT_SCHEMA['ppg']['paths'],
+    'aliases': TEAM_STAT_SCHEMA['ppg']['aliases'] + ['avg points for', 'avgPointsFor'],
+}
+NBA_TEAM_STAT_SCHEMA['mov'] = {
+    'paths': TEAM_STAT_SCHEMA['mov']['paths'],
+    'aliases': ['avgPointDifferential', 'differential', 'differential per game', 'net rating', 'point differential'],
+    'optional': True,
+}
+
+NCAA_TEAM_STATS = CompiledSchema('ncaa_team_stats', TEAM_STAT_SCHEMA)
+NBA_TEAM_STATS = CompiledSchema('nba_team_stats', NBA_TEAM_STAT_SCHEMA)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Concurrent ESPN team fetcher shared by the NCAA and NBA team stats fetchers.
+
+- Bounded worker pool (ThreadPoolExecutor) instead of a serial loop + sleep
+- Token-bucket rate limit shared by every worker
+- Conditional requests per endpoint (ETag / Last-Modified); a 304 reuses the stored body
+- Incremental mode: only teams that played since the last refresh are refetched,
+  using the scoreboard as the change feed
+- Cache is written once at the end, with a per-team 'last_updated' freshness stamp
+- Scoreboards read for the change feed are ingested into the GameResultsStore, and
+  recent form / home-away splits come from that store (no per-team schedule fetches)
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from game_results_store import GameResultsStore, DB_PATH as RESULTS_DB
+
+DEFAULT_WORKERS = 16
+DEFAULT_RATE = 40.0      # requests per second across all workers
+DEFAULT_BURST = 40
+HTTP_CACHE_DIR = 'espn_http_cache'
+
+
+class TokenBucket:
+    """Thread-safe token bucket. acquire() blocks until a token is available."""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ConditionalClient:
+    """
+    Rate-limited GET with per-endpoint conditional requests.
+
+    Validators and the last good body for each URL are kept in HTTP_CACHE_DIR
+    (one small file per URL), so a 304 from ESPN costs no parsing of new data
+    and no re-download.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 cache_dir=HTTP_CACHE_DIR, timeout=15):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.bucket = TokenBucket(rate, burst)
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.stats = {'requests': 0, 'not_modified': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _entry_path(self, url, params):
+        key = url + '?' + json.dumps(params or {}, sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def _load_entry(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def get(self, url, params=None):
+        """GET url and return parsed JSON (or None on error)."""
+        if not url:
+            return None
+        path = self._entry_path(url, params) if self.cache_dir else None
+        entry = self._load_entry(path) if path and os.path.exists(path) else None
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        self.bucket.acquire()
+        self._count('requests')
+        try:
+            r = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            if r.status_code == 304 and entry:
+                self._count('not_modified')
+                return entry.get('body')
+            r.raise_for_status()
+            body = r.json()
+        except Exception as e:
+            self._count('errors')
+            print(f'ERROR fetching {url}: {e}', file=sys.stderr)
+            # Serve the stale body rather than nothing
+            return entry.get('body') if entry else None
+
+        etag = r.headers.get('ETag')
+        last_modified = r.headers.get('Last-Modified')
+        if path and (etag or last_modified):
+            tmp = path + '.tmp'
+            try:
+                with open(tmp, 'w') as f:
+                    json.dump({'etag': etag, 'last_modified': last_modified, 'body': body}, f)
+                os.replace(tmp, path)
+            except Exception as e:
+                print(f'WARN could not store validators for {url}: {e}', file=sys.stderr)
+        return body
+
+
+def extract_team_list(data):
+    """Team list lives at data['teams'] or data['sports'][0]['leagues'][0]['teams']."""
+    if not isinstance(data, dict):
+        return []
+    tlist = data.get('teams') or []
+    if not tlist:
+        for sp in data.get('sports', []):
+            for lg in sp.get('leagues', []):
+                tlist = lg.get('teams') or tlist
+    return tlist
+
+
+def team_id_of(t):
+    team = t.get('team') if isinstance(t, dict) and 'team' in t else t
+    team_id = team.get('id') if isinstance(team, dict) else None
+    if not team_id and isinstance(t, dict):
+        team_id = t.get('id')
+    return str(team_id) if team_id else None
+
+
+def teams_played_since(client, base, since, until=None, scoreboard_params=None,
+                       store=None, sport=None):
+    """
+    Return the set of team ids with a completed game on any date in [since, until].
+    Returns None if the scoreboard could not be read (caller should fall back to full).
+    If a GameResultsStore is passed, every scoreboard read is also ingested into it.
+    """
+    until = until or datetime.utcnow()
+    day = since.date()
+    played = set()
+    while day <= until.date():
+        params = dict(scoreboard_params or {})
+        params['dates'] = day.strftime('%Y%m%d')
+        data = client.get(f'{base}/scoreboard', params=params)
+        if data is None:
+            return None
+        if store is not None:
+            store.ingest_scoreboard(data, sport)
+        for ev in data.get('events', []):
+            state = ((ev.get('status') or {}).get('type') or {}).get('state')
+            for comp in ev.get('competitions', []):
+                comp_state = ((comp.get('status') or {}).get('type') or {}).get('state') or state
+                if comp_state != 'post':
+                    continue
+                for c in comp.get('competitors', []):
+                    tid = (c.get('team') or {}).get('id')
+                    if tid:
+                        played.add(str(tid))
+        day += timedelta(days=1)
+    return played
+
+
+def load_cache(path):
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except Exception:
+            return None
+    return None
+
+
+def write_cache(path, data):
+    """Single atomic write of the whole cache."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def run_fetch(base, team_list_url, out_path, fetch_team, source, incremental=False,
+              scoreboard_params=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, label='teams',
+              schema=None, results_sport=None, results_db=RESULTS_DB):
+    """
+    Refresh a team stats cache.
+
+    fetch_team(team_id, get) -> (name, stats) is called from worker threads, where
+    get(url) is the shared rate-limited conditional getter. If the fetcher extracts
+    stats through a CompiledSchema, pass it as schema= so misses land in the cache meta.
+    results_sport (GameResultsStore sport code) turns on scoreboard ingest and fills
+    recent_ppg / recent_margin / home-away splits from the local results store.
+    """
+    started = time.monotonic()
+    client = ConditionalClient(workers=workers, rate=rate, burst=max(1, int(rate)))
+    previous = load_cache(out_path)
+    previous_teams = (previous or {}).get('teams', {})
+    id_to_name = {str(s.get('team_id')): n for n, s in previous_teams.items()
+                  if isinstance(s, dict) and s.get('team_id')}
+
+    store = GameResultsStore(results_db) if results_sport else None
+    try:
+        since = datetime.fromisoformat(previous.get('last_updated')) if previous else None
+    except Exception:
+        since = None
+
+    targets = None
+    mode = 'full'
+    played = None
+    if since or store is not None:
+        # Scoreboards since the last refresh: change feed + results store ingest
+        played = teams_played_since(client, base, since or datetime.utcnow() - timedelta(days=1),
+                                    scoreboard_params=scoreboard_params, store=store, sport=results_sport)
+    if incremental and previous and id_to_name and since:
+        if played is None:
+            print('⚠️  Scoreboard change feed unavailable - falling back to full refresh')
+        else:
+            targets = sorted(played)
+            mode = 'incremental'
+    elif incremental:
+        print('⚠️  No usable previous cache for incremental mode - running full refresh')
+
+    if targets is None:
+        data = client.get(team_list_url)
+        tlist = extract_team_list(data)
+        if not tlist:
+            print(f'No {label} found in response', file=sys.stderr)
+            return None
+        targets = [tid for tid in (team_id_of(t) for t in tlist) if tid]
+
+    teams = dict(previous_teams) if mode == 'incremental' else {}
+    failures = []
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_team, tid, client.get): tid for tid in targets}
+        for fut in as_completed(futures):
+            tid = futures[fut]
+            try:
+                name, stats = fut.result()
+            except Exception as e:
+                failures.append({'team_id': tid, 'reason': str(e)})
+                continue
+            if not name or stats is None:
+                failures.append({'team_id': tid, 'reason': 'no name'})
+                continue
+            # Team renamed since last refresh: drop the old key
+            old_name = id_to_name.get(tid)
+            if old_name and old_name != name:
+                teams.pop(old_name, None)
+            stats['team_id'] = tid
+            stats['last_updated'] = datetime.utcnow().isoformat()
+            teams[name] = stats
+            fetched += 1
+
+    if store is not None:
+        # Rolling form straight from local results - covers teams not refetched this run too
+        for name, stats in teams.items():
+            form = store.team_form(name, results_sport)
+            if form:
+                stats.update(form)
+
+    out = {
+        'last_updated': datetime.utcnow().isoformat(),
+        'teams': dict(sorted(teams.items())),
+        'meta': {
+            'source': source,
+            'mode': mode,
+            'fetched': fetched,
+            'total': len(teams),
+            'http': dict(client.stats),
+        },
+    }
+    if schema is not None:
+        out['meta']['schema_misses'] = schema.report()
+    write_cache(out_path, out)
+
+    elapsed = time.monotonic() - started
+    print(f'Fetched {fetched} {label} ({mode}), cached {len(teams)}, failures: {len(failures)} '
+          f'in {elapsed:.1f}s [requests={client.stats["requests"]}, '
+          f'304={client.stats["not_modified"]}, errors={client.stats["errors"]}]')
+    if failures:
+        print('Failures:', failures)
+    return out
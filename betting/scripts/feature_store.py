@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+🗄️ Feature Store - one versioned feature row per (event, as_of)
+
+Model components used to gather their own inputs from different places
+(TeamStrengthCalculator's season stats, the predictors' team_stats_cache.json,
+InjuryProcessor / WeatherProcessor caches, odds dicts). The store materializes
+them once into a single row per event and as_of time, so training, backtests and
+live scoring read identical numbers.
+
+Columns are grouped by source:
+    efficiency  season off/def efficiency + pace, season ppg / opp ppg (games before as_of)
+    form        last-5 ppg, margin, rest, games from the results store (games before as_of)
+    injuries    injury impact points per team (reports timestamped up to as_of)
+    weather     venue weather + total adjustment (events with a venue city only)
+    market      spread, total, moneylines, over/under prices (when the caller has them)
+
+Layout (FEATURE_STORE_DIR): one <column>.npy per column (float64, NaN = missing,
+memory-mapped on read) plus index.json with the row keys and, per row and group,
+a digest of that group's inputs. Refreshing a row recomputes and rewrites only
+the groups whose inputs changed; unchanged rows are not touched. Bumping
+FEATURE_VERSION rebuilds the store, bumping a GROUP_VERSIONS entry recomputes
+that group only.
+
+Efficiency is point-in-time: season ppg / opp ppg come from the results store's
+games before as_of. The season stats files and team_stats_cache.json only
+describe the current season-to-date, so they feed rows as of today and never
+history, and an efficiency group written on its day is frozen afterwards (a
+later refresh would otherwise read numbers from after the game).
+
+USAGE:
+    from feature_store import FeatureStore, make_event
+    store = FeatureStore()
+    keys = store.materialize([make_event('nba', 'Boston Celtics', 'New York Knicks', '2026-02-19')])
+    X = store.matrix(keys, ['home_ppg', 'away_ppg'])
+    python3 feature_store.py --info
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from game_results_store import GameResultsStore, LEAGUE_TO_SPORT, DB_PATH, EST
+
+FEATURE_STORE_DIR = '../data/feature_store'
+FEATURE_VERSION = 2     # 2: point-in-time efficiency (rows built from current stats are dropped)
+
+GROUPS = {
+    'efficiency': ('home_off_eff', 'home_def_eff', 'home_pace', 'away_off_eff', 'away_def_eff', 'away_pace',
+                   'home_ppg_season', 'home_opp_ppg_season', 'away_ppg_season', 'away_opp_ppg_season'),
+    'form': ('home_ppg', 'away_ppg', 'home_margin', 'away_margin', 'home_rest', 'away_rest',
+             'home_games', 'away_games'),
+    'injuries': ('home_injury_points', 'away_injury_points'),
+    'weather': ('weather_temperature', 'weather_wind', 'weather_precipitation', 'weather_total_adjustment'),
+    'market': ('market_spread', 'market_total', 'home_ml', 'away_ml', 'over_price', 'under_price'),
+}
+GROUP_VERSIONS = {'efficiency': 1, 'form': 1, 'injuries': 1, 'weather': 1, 'market': 1}
+FROZEN_GROUPS = ('efficiency',)     # never recomputed once the row's as_of day has passed
+COLUMNS = tuple(c for cols in GROUPS.values() for c in cols)
+
+# odds dict keys (real_betting_model parse_*_market) -> market columns
+MARKET_KEYS = {'home_spread': 'market_spread', 'total': 'market_total', 'home_odds': 'home_ml',
+               'away_odds': 'away_ml', 'over_price': 'over_price', 'under_price': 'under_price'}
+
+
+def make_event(league, home, away, date, market=None, venue=None):
+    """
+    Event dict the store understands. market: odds values keyed like MARKET_KEYS;
+    venue: {'city', 'state', 'sport'}. Leave either as None to keep what is stored.
+    """
+    return {'league': league, 'home': home.strip(), 'away': away.strip(), 'date': str(date)[:10],
+            'market': market, 'venue': venue}
+
+
+def market_from_fanduel(fanduel_bets):
+    """Market inputs from RealBettingModel.extract_fanduel_only output (moneyline prices, not spread prices)"""
+    market = {}
+    for entry in fanduel_bets or []:
+        data = entry.get('data') or {}
+        if entry.get('type') == 'SPREAD':
+            market['home_spread'] = data.get('home_spread')
+        elif entry.get('type') == 'MONEYLINE':
+            market.update(home_odds=data.get('home_odds'), away_odds=data.get('away_odds'))
+        elif entry.get('type') == 'TOTALS':
+            market.update(total=data.get('total'), over_price=data.get('over_price'),
+                          under_price=data.get('under_price'))
+    return market or None
+
+
+def event_id(event):
+    return f"{event['league']}|{event['away']} @ {event['home']}|{event['date']}"
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def today():
+    """Today's date (Eastern), YYYY-MM-DD"""
+    return datetime.now(EST).strftime('%Y-%m-%d')
+
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class Sources:
+    """Raw inputs per group, loaded lazily once per materialize() call"""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._cache = {}
+
+    def _once(self, name, loader):
+        if name not in self._cache:
+            try:
+                self._cache[name] = loader()
+            except Exception as e:
+                print(f"⚠️ Feature source {name} unavailable: {e}")
+                self._cache[name] = None
+        return self._cache[name]
+
+    def season_stats(self, league):
+        def load():
+            if league == 'nba':
+                from nba_2025_26_season_stats import NBA_SEASON_STATS
+                return NBA_SEASON_STATS
+            from ncaab_2025_26_season_stats import NCAAB_SEASON_STATS
+            return NCAAB_SEASON_STATS
+        return self._once(f'season_{league}', load) or {}
+
+    def team_stats_cache(self, league):
+        def load():
+            from ncaa_spread_predictor import _get_cache
+            return _get_cache(league=league)
+        return self._once(f'cache_{league}', load) or {}
+
+    def results(self):
+        return self._once('results', lambda: GameResultsStore(self.db_path) if os.path.exists(self.db_path) else None)
+
+    def injuries(self):
+        def load():
+            from injury_processor import InjuryProcessor
+            return InjuryProcessor().injury_data
+        return self._once('injuries', load) or {}
+
+    def weather(self):
+        def load():
+            from weather_processor import WeatherProcessor
+            return WeatherProcessor()
+        return self._once('weather', load)
+
+    # --- group inputs: plain JSON-able values, digested to decide what to recompute.
+    # None means "no information for this group" - the stored values are kept.
+
+    def group_inputs(self, group, event, as_of):
+        league, home, away = event['league'], event['home'], event['away']
+        if group == 'efficiency':
+            # Current-season files/cache only for rows as of today; history gets results-store averages
+            live = as_of[:10] >= today()
+            season = self.season_stats(league) if live else {}
+            cache = self.team_stats_cache(league) if live else {}
+            store = self.results()
+            sport = LEAGUE_TO_SPORT.get(league, league)
+            inputs = {}
+            for side, team in (('home', home), ('away', away)):
+                to_date = (store.season_before(team, sport, as_of[:10]) if store is not None else None) \
+                    or cache.get(team) or {}
+                inputs[side] = {'season': season.get(team), 'ppg': to_date.get('ppg'),
+                                'opp_ppg': to_date.get('opp_ppg')}
+            return inputs
+        if group == 'form':
+            store = self.results()
+            if store is None:
+                return None
+            sport = LEAGUE_TO_SPORT.get(league, league)
+            return {side: store.form_before(team, sport, as_of[:10])
+                    for side, team in (('home', home), ('away', away))}
+        if group == 'injuries':
+            # reports up to as_of, compared at as_of's precision (a date includes that day's reports)
+            data = self.injuries()
+            return {side: sorted(([i.get('player'), i.get('impact_points'), i.get('timestamp')]
+                                  for i in data.get(team, []) if str(i.get('timestamp', ''))[:len(as_of)] <= as_of),
+                                 key=str)
+                    for side, team in (('home', home), ('away', away))}
+        if group == 'weather':
+            venue = event.get('venue')
+            proc = self.weather()
+            if not venue or proc is None:
+                return None
+            w = proc.get_weather('', venue.get('city'), venue.get('state'))
+            return dict(w, total_adjustment=proc.calculate_total_adjustment(venue.get('sport'), w))
+        if group == 'market':
+            market = event.get('market')
+            return {k: market.get(k) for k in MARKET_KEYS} if market else None
+        raise KeyError(group)
+
+
+def compute_group(group, inputs):
+    """Column values for one group from its inputs"""
+    if group == 'efficiency':
+        row = []
+        for side in ('home', 'away'):
+            season = inputs[side]['season'] or {}
+            row += [_num(season.get('off_eff')), _num(season.get('def_eff')), _num(season.get('pace'))]
+        return row + [_num(inputs['home']['ppg']), _num(inputs['home']['opp_ppg']),
+                      _num(inputs['away']['ppg']), _num(inputs['away']['opp_ppg'])]
+    if group == 'form':
+        h, a = inputs['home'] or {}, inputs['away'] or {}
+        return [_num(h.get('ppg')), _num(a.get('ppg')), _num(h.get('margin')), _num(a.get('margin')),
+                _num(h.get('rest_days')), _num(a.get('rest_days')), _num(h.get('games', 0)), _num(a.get('games', 0))]
+    if group == 'injuries':
+        return [float(sum(_num(i[1]) for i in inputs[side]) if inputs[side] else 0.0) for side in ('home', 'away')]
+    if group == 'weather':
+        return [_num(inputs.get('temperature')), _num(inputs.get('wind_speed')),
+                _num(inputs.get('precipitation')), _num(inputs.get('total_adjustment'))]
+    if group == 'market':
+        return [_num(inputs.get(k)) for k in MARKET_KEYS]
+    raise KeyError(group)
+
+
+class FeatureStore:
+    def __init__(self, path=FEATURE_STORE_DIR, db_path=DB_PATH):
+        self.path = path
+        self.db_path = db_path
+        self.keys = []          # [event_id, as_of] per row
+        self.digests = []       # {group: digest} per row
+        self.index = {}         # (event_id, as_of) -> row
+        self.columns = {}       # column -> memory-mapped array
+        self._load()
+
+    # ---------------------------------------------------------- persistence
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        try:
+            with open(self._file('index.json'), 'r') as f:
+                meta = json.load(f)
+        except Exception:
+            return
+        if meta.get('version') != FEATURE_VERSION or tuple(meta.get('columns', ())) != COLUMNS:
+            return  # layout changed: rebuild
+        try:
+            columns = {c: np.load(self._file(f'{c}.npy'), mmap_mode='r') for c in COLUMNS}
+        except (OSError, ValueError):
+            return
+        if any(len(col) != len(meta['keys']) for col in columns.values()):
+            return
+        self.keys, self.digests, self.columns = meta['keys'], meta['digests'], columns
+        self.index = {tuple(k): i for i, k in enumerate(self.keys)}
+
+    def _save_index(self):
+        tmp = self._file('index.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'version': FEATURE_VERSION, 'columns': COLUMNS, 'group_versions': GROUP_VERSIONS,
+                       'updated_at': datetime.now().isoformat(), 'keys': self.keys, 'digests': self.digests}, f)
+        os.replace(tmp, self._file('index.json'))
+
+    def _write(self, updates, appended):
+        """updates: {column: {row: value}} for existing rows; appended: {column: [values]} for new rows"""
+        os.makedirs(self.path, exist_ok=True)
+        n_old = len(self.keys) - (len(next(iter(appended.values()))) if appended else 0)
+        for c in COLUMNS:
+            cells = updates.get(c, {})
+            if appended:
+                old = np.asarray(self.columns[c]) if c in self.columns else np.zeros(0)
+                data = np.concatenate([old[:n_old], np.asarray(appended[c], dtype=float)])
+                for row, value in cells.items():
+                    data[row] = value
+                tmp = self._file(f'{c}.tmp.npy')
+                np.save(tmp, data)
+                os.replace(tmp, self._file(f'{c}.npy'))
+            elif cells:
+                col = np.load(self._file(f'{c}.npy'), mmap_mode='r+')
+                rows = np.fromiter(cells.keys(), dtype=np.int64)
+                col[rows] = np.fromiter(cells.values(), dtype=float)
+                col.flush()
+                del col
+        self._save_index()
+        self.columns = {c: np.load(self._file(f'{c}.npy'), mmap_mode='r') for c in COLUMNS}
+
+    # -------------------------------------------------------------- writes
+
+    def materialize(self, events, as_of=None):
+        """
+        Ensure a current row for every event at as_of (default: the event's date).
+        Only groups whose inputs changed are recomputed. Returns the row keys.
+        """
+        sources = Sources(self.db_path)
+        day = today()
+        keys, updates, appended = [], {}, {c: [] for c in COLUMNS}
+        changed = False
+        for event in events:
+            row_as_of = str(as_of or event['date'])
+            key = (event_id(event), row_as_of)
+            keys.append(key)
+            row = self.index.get(key)
+            new = row is None
+            if new:
+                row = len(self.keys)
+                self.keys.append(list(key))
+                self.digests.append({})
+                self.index[key] = row
+                values = {c: np.nan for c in COLUMNS}
+            for group, cols in GROUPS.items():
+                if group in FROZEN_GROUPS and row_as_of[:10] < day and group in self.digests[row]:
+                    continue  # written as of its own day; today's stats would leak into it
+                inputs = sources.group_inputs(group, event, row_as_of)
+                if inputs is None:
+                    continue
+                digest = _digest([GROUP_VERSIONS[group], inputs])
+                if self.digests[row].get(group) == digest:
+                    continue
+                self.digests[row][group] = digest
+                changed = True
+                for c, v in zip(cols, compute_group(group, inputs)):
+                    if new:
+                        values[c] = v
+                    else:
+                        updates.setdefault(c, {})[row] = v
+            if new:
+                changed = True
+                for c in COLUMNS:
+                    appended[c].append(values[c])
+        if changed:
+            self._write(updates, appended if appended[COLUMNS[0]] else None)
+        return keys
+
+    # --------------------------------------------------------------- reads
+
+    def rows(self, keys):
+        return np.array([self.index.get(tuple(k), -1) for k in keys], dtype=np.int64)
+
+    def matrix(self, keys, columns=COLUMNS):
+        """(len(keys), len(columns)) float array; unknown keys are all-NaN rows"""
+        rows = self.rows(keys)
+        out = np.full((len(rows), len(columns)), np.nan)
+        known = rows >= 0
+        for j, c in enumerate(columns):
+            if c in self.columns and known.any():
+                out[known, j] = self.columns[c][rows[known]]
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Feature store')
+    parser.add_argument('--dir', default=FEATURE_STORE_DIR)
+    parser.add_argument('--info', action='store_true', help='Rows, events and column coverage')
+    parser.add_argument('--event', nargs=4, metavar=('LEAGUE', 'HOME', 'AWAY', 'DATE'),
+                        help='Materialize and print one event row')
+    args = parser.parse_args()
+
+    store = FeatureStore(args.dir)
+    if args.event:
+        keys = store.materialize([make_event(*args.event)])
+        for c, v in zip(COLUMNS, store.matrix(keys)[0]):
+            print(f"   {c:28} {v:10.2f}")
+    if args.info or not args.event:
+        print(f"🗄️ Feature store v{FEATURE_VERSION}: {len(store.keys)} rows, "
+              f"{len({k[0] for k in store.keys})} events, {len(COLUMNS)} columns")
+        if store.keys:
+            X = store.matrix(store.keys)
+            for group, cols in GROUPS.items():
+                filled = np.mean(~np.isnan(X[:, [COLUMNS.index(c) for c in cols]])) * 100
+                print(f"   {group:11} {filled:5.1f}% filled")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 """
 SWORD: Fetch actual game results from ESPN and update completed bets
+
+Run: python3 fetch_game_results.py [YYYY-MM-DD]   (default: yesterday)
 """
 
 import json
-import requests
 from datetime import datetime, timedelta
 from pathlib import Path
 import re
 
+from espn_scoreboard import get_service
+
 def clean_team_name(name):
     """Clean team name for ESPN lookup"""
     # Remove common suffixes and clean up
@@ -23,14 +26,13 @@ def fetch_espn_results(date_str):
     
     print(f"\n🔍 Fetching ESPN results for {date_str}...")
     
-    # Convert date to ESPN format (20260216)
-    espn_date = date_str.replace('-', '')
-    
-    # This would normally call ESPN API
-    # For now, return empty dict (we'll populate manually)
-    # TODO: Implement actual ESPN scraping
-    
+    # Finished games from the shared scoreboard cache, in the results_map format
+    # update_completed_bets_with_results reads: {game: (away, home, spread, team)}
     results = {}
+    for event in get_service().events('ncb', date_str):
+        if event.completed:
+            results[event.matchup] = (event.away_score, event.home_score, None, None)
+    print(f"✅ {len(results)} final scores")
     return results
 
 def update_completed_bets_with_results(date_str, results_map):
@@ -76,32 +78,7 @@ def update_completed_bets_with_results(date_str, results_map):
     
     return updated
 
-# For now, print instructions for manual fix
-print("""
-=" * 70)
-SWORD: ESPN Result Tracking Not Implemented
-=" * 70)
-
-To properly track game results, we need to either:
-
-1. **Use ESPN API** (recommended for production)
-   - Requires ESPN API key + endpoint setup
-   - Can fetch live scores and final results
-
-2. **Use web scraping** (fallback)
-   - Scrape ESPN.com directly
-   - More fragile but doesn't require API key
-
-3. **Manual input** (temporary)
-   - User provides scores in dashboard
-   - We mark bets WIN/LOSS manually
-
-CURRENT STATUS:
-✅ Stats aggregation: WORKING (bet_stats.json)
-⚠️ Game result fetching: PENDING (needs ESPN integration)
-❌ Automated win/loss determination: NEEDS IMPLEMENTATION
-
-ACTION REQUIRED:
-Provide Feb 16 game results so we can mark bets WIN/LOSS
-OR set up ESPN API credentials
-""")
+if __name__ == '__main__':
+    import sys
+    date_str = sys.argv[1] if len(sys.argv) > 1 else (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    update_completed_bets_with_results(date_str, fetch_espn_results(date_str))
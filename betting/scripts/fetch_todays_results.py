@@ -4,12 +4,13 @@ Fetch today's game results from ESPN and update ranked_bets.json with WIN/LOSS
 """
 
 import json
-import requests
 from datetime import datetime
 import pytz
 import re
 import sys
 
+from espn_scoreboard import get_service
+
 def extract_teams(game_str):
     """Extract teams from game string like 'Team A @ Team B'"""
     parts = game_str.split(' @ ')
@@ -18,48 +19,19 @@ def extract_teams(game_str):
     return None, None
 
 def get_ncaa_basketball_scores():
-    """Fetch NCAA basketball scores from ESPN"""
+    """Today's NCAA basketball scores from the shared ESPN scoreboard cache"""
     scores = {}
-    try:
-        url = "https://www.espn.com/mens-college-basketball/scores"
-        response = requests.get(url, timeout=10)
-        
-        # Simple regex-based parsing
-        # Look for patterns like "Team1 Score - Score Team2"
-        pattern = r'([A-Za-z\s]+?)\s+(\d+)\s*-\s*(\d+)\s+([A-Za-z\s]+)'
-        
-        # Try JSON API instead
-        api_url = "http://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard"
-        api_response = requests.get(api_url, timeout=10)
-        
-        if api_response.status_code == 200:
-            data = api_response.json()
-            for event in data.get('events', []):
-                try:
-                    # Get teams and scores
-                    competitors = event.get('competitions', [{}])[0].get('competitors', [])
-                    if len(competitors) >= 2:
-                        away_team = competitors[0].get('team', {}).get('displayName', '')
-                        home_team = competitors[1].get('team', {}).get('displayName', '')
-                        away_score = int(competitors[0].get('score', 0) or 0)
-                        home_score = int(competitors[1].get('score', 0) or 0)
-                        status = event.get('status', {}).get('type', {}).get('state', '')
-                        
-                        if away_team and home_team:
-                            key = f"{away_team} @ {home_team}"
-                            scores[key] = {
-                                'away_score': away_score,
-                                'home_score': home_score,
-                                'final_score': f"{away_score}-{home_score}",
-                                'status': status
-                            }
-                except Exception as e:
-                    print(f"Error parsing event: {e}")
-        
-        return scores
-    except Exception as e:
-        print(f"Error fetching NCAA scores: {e}")
-        return {}
+    for event in get_service().events('ncb'):
+        if event.away_team and event.home_team:
+            away_score = event.away_score or 0
+            home_score = event.home_score or 0
+            scores[event.matchup] = {
+                'away_score': away_score,
+                'home_score': home_score,
+                'final_score': f"{away_score}-{home_score}",
+                'status': event.state
+            }
+    return scores
 
 def calculate_bet_result(game_result, bet_type, recommendation):
     """Calculate if bet won or lost"""
@@ -23,11 +23,12 @@ This ensures all data is fresh and consistent before production deployment.
 import json
 import os
 import sys
-import subprocess
 from datetime import datetime
 import pytz
 from typing import Dict, List, Optional
 
+from pipeline_runner import Pipeline, Stage, settle
+
 # Configuration
 WORKSPACE = os.environ.get('WORKSPACE', os.getcwd())
 sys.path.insert(0, WORKSPACE)
@@ -40,6 +41,8 @@ ACTIVE_BETS_FILE = f"{WORKSPACE}/active_bets.json"
 RANKED_BETS_FILE = f"{WORKSPACE}/ranked_bets.json"
 COMPLETED_BETS_FILE = f"{WORKSPACE}/completed_bets_{datetime.now(EST).strftime('%Y-%m-%d')}.json"
 SYNC_LOG_FILE = f"{WORKSPACE}/internal_sync.log"
+CACHE_DIR = f"{WORKSPACE}/cache"
+BET_STATS_FILE = f"{CACHE_DIR}/bet_stats.json"
 
 # Alert threshold (5 minutes)
 ALERT_THRESHOLD_SECONDS = 300
@@ -58,41 +61,6 @@ def log(message: str):
     except:
         pass
 
-def run_script(script_path: str, description: str) -> bool:
-    """Run a Python script and return success status"""
-    try:
-        log(f"▶️  Running: {description}")
-        
-        result = subprocess.run(
-            ['python3', script_path],
-            cwd=WORKSPACE,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5-minute timeout per script
-        )
-        
-        if result.returncode == 0:
-            log(f"✅ {description} - SUCCESS")
-            if result.stdout:
-                # Log first 300 chars of output
-                output_preview = result.stdout[:300].replace('\n', ' ')
-                log(f"   Output: {output_preview}...")
-            return True
-        else:
-            log(f"❌ {description} - FAILED (exit code: {result.returncode})")
-            if result.stderr:
-                error_preview = result.stderr[:300].replace('\n', ' ')
-                log(f"   Error: {error_preview}...")
-            return False
-    
-    except subprocess.TimeoutExpired:
-        log(f"⏱️ {description} - TIMEOUT (>5 min)")
-        return False
-    
-    except Exception as e:
-        log(f"❌ {description} - ERROR: {e}")
-        return False
-
 def load_json_file(filepath: str) -> Optional[Dict]:
     """Load JSON file safely"""
     try:
@@ -114,14 +82,15 @@ def save_json_file(filepath: str, data: Dict) -> bool:
         log(f"⚠️ Error saving {filepath}: {e}")
         return False
 
-def verify_data_consistency() -> bool:
+def verify_data_consistency(ctx=None) -> bool:
     """Verify all data files are consistent and valid"""
     log("🔍 Verifying data consistency...")
     
     issues = []
+    load = ctx.load_json if ctx else load_json_file
     
     # Check active_bets.json
-    active_data = load_json_file(ACTIVE_BETS_FILE)
+    active_data = load(ACTIVE_BETS_FILE)
     if not active_data:
         issues.append("active_bets.json missing or corrupted")
     elif 'bets' not in active_data:
@@ -130,7 +99,7 @@ def verify_data_consistency() -> bool:
         log(f"   ✅ active_bets.json: {len(active_data['bets'])} bets")
     
     # Check ranked_bets.json
-    ranked_data = load_json_file(RANKED_BETS_FILE)
+    ranked_data = load(RANKED_BETS_FILE)
     if not ranked_data:
         issues.append("ranked_bets.json missing or corrupted")
     elif 'top_10' not in ranked_data:
@@ -139,7 +108,7 @@ def verify_data_consistency() -> bool:
         log(f"   ✅ ranked_bets.json: {len(ranked_data['top_10'])} ranked bets")
     
     # Check completed_bets file
-    completed_data = load_json_file(COMPLETED_BETS_FILE)
+    completed_data = load(COMPLETED_BETS_FILE)
     if not completed_data:
         log(f"   ⚠️ completed_bets file missing (creating new)")
         save_json_file(COMPLETED_BETS_FILE, {
@@ -160,12 +129,12 @@ def verify_data_consistency() -> bool:
     log("✅ Data consistency verified")
     return True
 
-def recalculate_all_stats() -> Dict:
+def recalculate_all_stats(ctx=None) -> Dict:
     """Recalculate comprehensive statistics from completed bets"""
     try:
         log("📊 Recalculating all statistics...")
         
-        completed_data = load_json_file(COMPLETED_BETS_FILE)
+        completed_data = ctx.load_json(COMPLETED_BETS_FILE) if ctx else load_json_file(COMPLETED_BETS_FILE)
         if not completed_data or 'bets' not in completed_data:
             log("   ⚠️ No completed bets found")
             return {'wins': 0, 'losses': 0, 'win_rate': 0, 'record': '0-0'}
@@ -206,9 +175,8 @@ def recalculate_all_stats() -> Dict:
             log(f"   ✅ {bet_type}: {type_stats['wins']}-{type_stats['losses']} ({type_wr}%)")
         
         # Save to cache
-        cache_dir = f"{WORKSPACE}/cache"
-        os.makedirs(cache_dir, exist_ok=True)
-        save_json_file(f"{cache_dir}/bet_stats.json", stats)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        save_json_file(BET_STATS_FILE, stats)
         
         return stats
     
@@ -216,7 +184,7 @@ def recalculate_all_stats() -> Dict:
         log(f"❌ Stats calculation failed: {e}")
         return None
 
-def update_all_timestamps():
+def update_all_timestamps(ctx=None):
     """Update last_updated timestamps in all data files"""
     try:
         timestamp = datetime.now(EST).isoformat()
@@ -235,6 +203,15 @@ def update_all_timestamps():
         log(f"⚠️ Timestamp update failed: {e}")
         return False
 
+def prepare_cache_dir(ctx=None) -> bool:
+    """Ensure the cache directory exists for the production sync"""
+    if os.path.exists(CACHE_DIR):
+        log("   ✅ Cache directory ready for production sync")
+    else:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        log("   ✅ Cache directory created")
+    return True
+
 def main():
     """Main internal sync process"""
     log("=" * 80)
@@ -244,49 +221,28 @@ def main():
     start_time = datetime.now(EST)
     log(f"⏰ Start Time: {start_time.strftime('%Y-%m-%d %H:%M:%S EST')}")
     
-    success_count = 0
-    total_tasks = 5
-    
-    # TASK 1: Check game statuses and move finished games
-    # This handles steps 1-5 of the requirements
-    log("")
-    log("📋 TASK 1/5: Game Status Check & Results Processing")
-    if run_script(f"{WORKSPACE}/game_status_checker.py", "Game Status Checker"):
-        success_count += 1
-    
-    # TASK 2: Recalculate all statistics
-    # This handles steps 6-7 of the requirements
-    log("")
-    log("📋 TASK 2/5: Statistics Recalculation")
-    if recalculate_all_stats():
-        success_count += 1
-    
-    # TASK 3: Update all timestamps
-    # This handles step 8-10 of the requirements
+    # TASK 1: Game status check & results processing (steps 1-5)
+    # TASK 2: Statistics recalculation (steps 6-7) - skipped if completed bets unchanged
+    # TASK 3: Update data file timestamps (steps 8-10)
+    # TASK 4: Data consistency verification (step 11)
+    # TASK 5: Cache refresh for production (step 12)
+    pipeline = Pipeline('internal_sync', [
+        Stage('settle', settle, outputs=[ACTIVE_BETS_FILE, RANKED_BETS_FILE, COMPLETED_BETS_FILE],
+              always=True, description="Game Status Checker"),
+        Stage('stats', lambda ctx: recalculate_all_stats(ctx) is not None, inputs=[COMPLETED_BETS_FILE],
+              outputs=[BET_STATS_FILE], description="Statistics Recalculation"),
+        Stage('publish', update_all_timestamps, outputs=[ACTIVE_BETS_FILE, RANKED_BETS_FILE, COMPLETED_BETS_FILE],
+              always=True, description="Update Data File Timestamps"),
+        Stage('verify', verify_data_consistency, inputs=[ACTIVE_BETS_FILE, RANKED_BETS_FILE],
+              outputs=[COMPLETED_BETS_FILE], always=True, description="Data Consistency Verification"),
+        Stage('cache', prepare_cache_dir, always=True, description="Cache Refresh for Production"),
+    ], log=log)
+    report = pipeline.run()
     log("")
-    log("📋 TASK 3/5: Update Data File Timestamps")
-    if update_all_timestamps():
-        success_count += 1
+    pipeline.print_report(report)
     
-    # TASK 4: Verify data consistency
-    # This handles step 11 of the requirements
-    log("")
-    log("📋 TASK 4/5: Data Consistency Verification")
-    if verify_data_consistency():
-        success_count += 1
-    
-    # TASK 5: Prepare for GitHub push (ensure cache is fresh)
-    # This handles step 12 of the requirements
-    log("")
-    log("📋 TASK 5/5: Cache Refresh for Production")
-    cache_dir = f"{WORKSPACE}/cache"
-    if os.path.exists(cache_dir):
-        log("   ✅ Cache directory ready for production sync")
-        success_count += 1
-    else:
-        os.makedirs(cache_dir, exist_ok=True)
-        log("   ✅ Cache directory created")
-        success_count += 1
+    success_count = len(pipeline.succeeded(report))
+    total_tasks = len(report['stages'])
     
     # Calculate duration
     end_time = datetime.now(EST)
@@ -310,7 +266,7 @@ def main():
     log("=" * 80)
     
     # Exit with error code if any critical tasks failed
-    if success_count < 4:  # Allow 1 failure
+    if success_count < total_tasks - 1:  # Allow 1 failure
         log("❌ Too many failures - sync incomplete")
         sys.exit(1)
     else:
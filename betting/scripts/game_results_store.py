@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Game results store - per-team finished games keyed by (sport, team, date).
+
+Fed by the daily scoreboard ingest (SportsDataCollector.store_games and the
+team stats fetchers' scoreboard change feed), so rolling team form comes from
+local SQLite instead of downloading every team's full schedule.
+
+Tables (in sports_betting.db, next to the existing games table):
+- team_games: one row per team per finished game, indexed on (sport, team, date)
+- team_form:  running per-team aggregates, updated incrementally as results arrive
+
+Run: python3 game_results_store.py --backfill 7   (ingest last 7 days of scoreboards)
+     python3 game_results_store.py --team "Duke Blue Devils" --sport ncb
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+import pytz
+import requests
+
+from betting_database import get_connection
+
+DB_PATH = 'sports_betting.db'
+EST = pytz.timezone('America/Detroit')
+
+# Same sport codes as SportsDataCollector
+SCOREBOARD_URLS = {
+    'ncb': 'https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard',
+    'nba': 'https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard',
+    'nfl': 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard',
+    'mlb': 'https://site.api.espn.com/apis/site/v2/sports/baseball/mlb/scoreboard',
+}
+# League names used by the predictors / team stats caches
+LEAGUE_TO_SPORT = {'ncaa': 'ncb', 'nba': 'nba'}
+
+FINAL_STATUSES = ('final', 'final/ot', 'final/2ot', 'final/3ot', 'completed', 'post')
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS team_games (
+    sport TEXT NOT NULL,
+    team TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    opponent TEXT,
+    is_home INTEGER,
+    points_for REAL,
+    points_against REAL,
+    margin REAL,
+    rest_days INTEGER,
+    PRIMARY KEY (sport, team, game_id)
+);
+CREATE INDEX IF NOT EXISTS idx_team_games_team_date ON team_games (sport, team, date DESC);
+CREATE TABLE IF NOT EXISTS team_form (
+    sport TEXT NOT NULL,
+    team TEXT NOT NULL,
+    games INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    pts_for REAL DEFAULT 0,
+    pts_against REAL DEFAULT 0,
+    home_games INTEGER DEFAULT 0,
+    home_pts_for REAL DEFAULT 0,
+    home_pts_against REAL DEFAULT 0,
+    away_games INTEGER DEFAULT 0,
+    away_pts_for REAL DEFAULT 0,
+    away_pts_against REAL DEFAULT 0,
+    last_game_date TEXT,
+    PRIMARY KEY (sport, team)
+);
+"""
+
+
+def local_game_date(iso_date):
+    """ESPN event dates are UTC ('2026-02-18T00:00Z'); bucket games by the US Eastern date."""
+    if not iso_date:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(iso_date).replace('Z', '+00:00'))
+        if dt.tzinfo is None:
+            return dt.strftime('%Y-%m-%d')
+        return dt.astimezone(EST).strftime('%Y-%m-%d')
+    except ValueError:
+        return str(iso_date)[:10]
+
+
+def _days_between(earlier, later):
+    return (datetime.strptime(later, '%Y-%m-%d') - datetime.strptime(earlier, '%Y-%m-%d')).days
+
+
+class GameResultsStore:
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.conn.executescript(CREATE_SQL)
+        self.conn.commit()
+
+    @property
+    def conn(self):
+        # shared per-thread connection from the betting_database pool
+        return get_connection(self.db_path)
+
+    def _cursor(self):
+        cur = self.conn.cursor()
+        cur.row_factory = sqlite3.Row
+        return cur
+
+    # --- Ingest ---
+    def record_game(self, sport, game_id, date, home_team, away_team, home_score, away_score):
+        """
+        Record one finished game for both teams. Returns the number of new team rows.
+        Already-known games are ignored, so replaying a scoreboard is free.
+        """
+        try:
+            home_score = float(home_score)
+            away_score = float(away_score)
+        except (TypeError, ValueError):
+            return 0
+        date = local_game_date(date)
+        added = 0
+        for team, opp, is_home, pf, pa in (
+            (home_team, away_team, 1, home_score, away_score),
+            (away_team, home_team, 0, away_score, home_score),
+        ):
+            if self._insert_team_game(sport, team, str(game_id), date, opp, is_home, pf, pa):
+                added += 1
+        return added
+
+    def _insert_team_game(self, sport, team, game_id, date, opp, is_home, pf, pa):
+        cur = self._cursor()
+        cur.execute("SELECT 1 FROM team_games WHERE sport = ? AND team = ? AND game_id = ?",
+                    (sport, team, game_id))
+        if cur.fetchone():
+            return False
+
+        prev = cur.execute(
+            "SELECT date FROM team_games WHERE sport = ? AND team = ? AND date < ? ORDER BY date DESC LIMIT 1",
+            (sport, team, date)).fetchone()
+        rest_days = _days_between(prev['date'], date) if prev else None
+        cur.execute(
+            """INSERT INTO team_games (sport, team, game_id, date, opponent, is_home,
+                                       points_for, points_against, margin, rest_days)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (sport, team, game_id, date, opp, is_home, pf, pa, pf - pa, rest_days))
+
+        # A backfilled older game changes the rest days of the game that follows it
+        nxt = cur.execute(
+            "SELECT game_id, date FROM team_games WHERE sport = ? AND team = ? AND date > ? ORDER BY date ASC LIMIT 1",
+            (sport, team, date)).fetchone()
+        if nxt:
+            cur.execute("UPDATE team_games SET rest_days = ? WHERE sport = ? AND team = ? AND game_id = ?",
+                        (_days_between(date, nxt['date']), sport, team, nxt['game_id']))
+
+        # Running aggregates - one row touched per new result
+        won = 1 if pf > pa else 0
+        lost = 1 if pf < pa else 0
+        cur.execute("INSERT OR IGNORE INTO team_form (sport, team) VALUES (?, ?)", (sport, team))
+        cur.execute(
+            """UPDATE team_form SET
+                   games = games + 1, wins = wins + ?, losses = losses + ?,
+                   pts_for = pts_for + ?, pts_against = pts_against + ?,
+                   home_games = home_games + ?, home_pts_for = home_pts_for + ?, home_pts_against = home_pts_against + ?,
+                   away_games = away_games + ?, away_pts_for = away_pts_for + ?, away_pts_against = away_pts_against + ?,
+                   last_game_date = MAX(COALESCE(last_game_date, ''), ?)
+               WHERE sport = ? AND team = ?""",
+            (won, lost, pf, pa,
+             is_home, pf if is_home else 0, pa if is_home else 0,
+             1 - is_home, 0 if is_home else pf, 0 if is_home else pa,
+             date, sport, team))
+        return True
+
+    def record_games(self, games):
+        """
+        Record finished games in the SportsDataCollector game dict format
+        (id, sport, date, home_team, away_team, home_score, away_score, status).
+        Non-final games are skipped. Single commit for the batch.
+        """
+        added = 0
+        for g in games:
+            status = str(g.get('status') or '').lower()
+            if status not in FINAL_STATUSES and not status.startswith('final'):
+                continue
+            # collector ids are '<sport>_<espn id>'; store the bare ESPN id so both feeds dedupe
+            game_id = str(g['id'])
+            if game_id.startswith(g['sport'] + '_'):
+                game_id = game_id[len(g['sport']) + 1:]
+            added += self.record_game(g['sport'], game_id, g['date'], g['home_team'], g['away_team'],
+                                      g.get('home_score'), g.get('away_score'))
+        self.conn.commit()
+        return added
+
+    def ingest_scoreboard(self, data, sport):
+        """Record every completed game from a raw ESPN scoreboard response."""
+        added = 0
+        for ev in (data or {}).get('events', []):
+            for comp in ev.get('competitions', []):
+                state = ((comp.get('status') or ev.get('status') or {}).get('type') or {}).get('state')
+                if state != 'post':
+                    continue
+                competitors = comp.get('competitors', [])
+                home = next((c for c in competitors if c.get('homeAway') == 'home'), None)
+                away = next((c for c in competitors if c.get('homeAway') == 'away'), None)
+                if not home or not away:
+                    continue
+                added += self.record_game(
+                    sport, ev.get('id'), ev.get('date'),
+                    (home.get('team') or {}).get('displayName'), (away.get('team') or {}).get('displayName'),
+                    home.get('score'), away.get('score'))
+        self.conn.commit()
+        return added
+
+    def backfill(self, sport, days, session=None):
+        """Ingest the last `days` scoreboards for a sport."""
+        url = SCOREBOARD_URLS[sport]
+        session = session or requests.Session()
+        params = {'groups': '50', 'limit': '500'} if sport == 'ncb' else {}
+        today = datetime.now(EST).date()
+        added = 0
+        for i in range(days, -1, -1):
+            day = today - timedelta(days=i)
+            try:
+                r = session.get(url, params=dict(params, dates=day.strftime('%Y%m%d')), timeout=15)
+                r.raise_for_status()
+                added += self.ingest_scoreboard(r.json(), sport)
+            except Exception as e:
+                print(f'❌ Scoreboard {sport} {day}: {e}', file=sys.stderr)
+        return added
+
+    # --- Rolling-window queries (all served by idx_team_games_team_date) ---
+    def last_games(self, team, sport, n=5, venue=None):
+        """Most recent n games (newest first). venue: None, 'home' or 'away'."""
+        sql = "SELECT * FROM team_games WHERE sport = ? AND team = ?"
+        args = [sport, team]
+        if venue in ('home', 'away'):
+            sql += " AND is_home = ?"
+            args.append(1 if venue == 'home' else 0)
+        sql += " ORDER BY date DESC LIMIT ?"
+        args.append(n)
+        return [dict(r) for r in self._cursor().execute(sql, args).fetchall()]
+
+    def rest_days(self, team, sport, as_of=None):
+        """Days between the team's last game and as_of (default: today, Eastern)."""
+        row = self._cursor().execute("SELECT last_game_date FROM team_form WHERE sport = ? AND team = ?",
+                                (sport, team)).fetchone()
+        if not row or not row['last_game_date']:
+            return None
+        as_of = as_of or datetime.now(EST).strftime('%Y-%m-%d')
+        return _days_between(row['last_game_date'], as_of)
+
+    def team_form(self, team, sport, n=5):
+        """
+        Feature dict in the team stats cache format:
+        recent_ppg / recent_margin (newest first), season home/away splits, record, last_game_date.
+        Returns None if the team has no stored results.
+        """
+        form = self._cursor().execute("SELECT * FROM team_form WHERE sport = ? AND team = ?",
+                                 (sport, team)).fetchone()
+        if not form or not form['games']:
+            return None
+        recent = self.last_games(team, sport, n)
+
+        def avg(total, count):
+            return round(total / count, 2) if count else None
+
+        return {
+            'results_ppg': avg(form['pts_for'], form['games']),
+            'results_opp_ppg': avg(form['pts_against'], form['games']),
+            'recent_ppg': [r['points_for'] for r in recent],
+            'recent_margin': [r['margin'] for r in recent],
+            'home_ppg': avg(form['home_pts_for'], form['home_games']),
+            'away_ppg': avg(form['away_pts_for'], form['away_games']),
+            'home_opp_ppg': avg(form['home_pts_against'], form['home_games']),
+            'away_opp_ppg': avg(form['away_pts_against'], form['away_games']),
+            'games_played': form['games'],
+            'form_wins': form['wins'],
+            'form_losses': form['losses'],
+            'last_game_date': form['last_game_date'],
+            'last_rest_days': recent[0]['rest_days'] if recent else None,
+        }
+
+    def form_before(self, team, sport, date, n=5):
+        """
+        Point-in-time form from the n games strictly before date (for training on
+        history without peeking at later results). None if the team has no earlier games.
+        """
+        rows = self._cursor().execute(
+            "SELECT date, points_for, margin FROM team_games WHERE sport = ? AND team = ? AND date < ? "
+            "ORDER BY date DESC LIMIT ?", (sport, team, date, n)).fetchall()
+        if not rows:
+            return None
+        return {
+            'games': len(rows),
+            'ppg': sum(r['points_for'] for r in rows) / len(rows),
+            'margin': sum(r['margin'] for r in rows) / len(rows),
+            'rest_days': _days_between(rows[0]['date'], date),
+        }
+
+    def season_before(self, team, sport, date):
+        """
+        Point-in-time season averages (ppg / opp_ppg) over every stored game strictly
+        before date. None if the team has no earlier games.
+        """
+        row = self._cursor().execute(
+            "SELECT COUNT(*) AS games, AVG(points_for) AS ppg, AVG(points_against) AS opp_ppg "
+            "FROM team_games WHERE sport = ? AND team = ? AND date < ?", (sport, team, date)).fetchone()
+        if not row or not row['games']:
+            return None
+        return {'games': row['games'], 'ppg': row['ppg'], 'opp_ppg': row['opp_ppg']}
+
+    def scoring_spread(self, sport):
+        """
+        Historical score dispersion for the simulator: per-team standard deviation of
+        points scored / allowed, plus league-wide sd and home/away score correlation.
+        """
+        cur = self._cursor()
+        teams = {}
+        for r in cur.execute(
+                """SELECT team, COUNT(*) AS games,
+                          AVG(points_for) AS mf, AVG(points_for * points_for) AS mf2,
+                          AVG(points_against) AS ma, AVG(points_against * points_against) AS ma2
+                   FROM team_games WHERE sport = ? GROUP BY team""", (sport,)):
+            n = r['games']
+            scale = n / (n - 1) if n > 1 else 0.0
+            teams[r['team']] = {
+                'games': n,
+                'sd_for': max(0.0, (r['mf2'] - r['mf'] ** 2) * scale) ** 0.5,
+                'sd_against': max(0.0, (r['ma2'] - r['ma'] ** 2) * scale) ** 0.5,
+            }
+        pairs = cur.execute("SELECT points_for, points_against FROM team_games WHERE sport = ? AND is_home = 1",
+                            (sport,)).fetchall()
+        league = {'games': len(pairs), 'sd': None, 'rho': None}
+        if len(pairs) > 2:
+            home = [p[0] for p in pairs]
+            away = [p[1] for p in pairs]
+            mh, ma = sum(home) / len(home), sum(away) / len(away)
+            vh = sum((h - mh) ** 2 for h in home)
+            va = sum((a - ma) ** 2 for a in away)
+            cov = sum((h - mh) * (a - ma) for h, a in zip(home, away))
+            league['sd'] = ((vh + va) / (2 * (len(pairs) - 1))) ** 0.5
+            league['rho'] = cov / (vh * va) ** 0.5 if vh and va else None
+        return {'teams': teams, 'league': league}
+
+    def all_team_forms(self, sport, n=5):
+        teams = [r['team'] for r in self._cursor().execute("SELECT team FROM team_form WHERE sport = ?", (sport,))]
+        return {t: self.team_form(t, sport, n) for t in teams}
+
+
+_shared_stores = {}
+
+
+def get_team_form(team, league='ncaa', n=5, db_path=DB_PATH):
+    """
+    Predictor-side lookup: team_form() plus current rest_days, over one shared
+    connection per process. Returns None if there is no store or no results.
+    """
+    if not os.path.exists(db_path):
+        return None
+    store = _shared_stores.get(db_path)
+    if store is None:
+        store = _shared_stores[db_path] = GameResultsStore(db_path)
+    sport = LEAGUE_TO_SPORT.get(league, league)
+    form = store.team_form(team, sport, n)
+    if form:
+        form['rest_days'] = store.rest_days(team, sport)
+    return form
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Game results store')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--sport', default='ncb', choices=sorted(SCOREBOARD_URLS))
+    parser.add_argument('--backfill', type=int, default=0, help='ingest the last N days of scoreboards')
+    parser.add_argument('--team', help='print rolling form for one team')
+    args = parser.parse_args()
+
+    store = GameResultsStore(args.db)
+    if args.backfill:
+        added = store.backfill(args.sport, args.backfill)
+        print(f'💾 Recorded {added} new team results for {args.sport.upper()}')
+    if args.team:
+        print(store.team_form(args.team, args.sport))
+        print('rest days:', store.rest_days(args.team, args.sport))
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+🎲 Game Simulator - Monte Carlo spread / total / moneyline probabilities
+
+predict_spread and predict_total give point estimates; this turns them into a
+joint score distribution so every market is priced from the same draws:
+
+- Means: home/away expected scores from the predictors (team stats caches +
+  local results form): home = (total + margin) / 2, away = (total - margin) / 2
+- Spread: per-team sd of points scored/allowed from the game results store,
+  shrunk toward the league sd; home/away scores correlated (pace) with the
+  league correlation from stored results
+- N_DRAWS bivariate-normal draws per game, the whole slate as one NumPy batch,
+  rounded to whole points
+- Each game is kept as integer histograms of margin and total, so cover / over /
+  moneyline probabilities for ANY line are a histogram sum (no resimulation when
+  only the odds move)
+- Results are cached per (matchup, feature version); the feature version is a
+  digest of the simulation inputs, so new stats or results trigger a resim
+
+USAGE:
+    from game_simulator import GameSimulator
+    dists = GameSimulator().simulate([('nba', 'Boston Celtics', 'New York Knicks')])
+    python3 game_simulator.py nba "Boston Celtics" "New York Knicks" --spread -5.5 --total 221.5
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from game_results_store import GameResultsStore, LEAGUE_TO_SPORT, DB_PATH
+
+SIM_CACHE_FILE = '../data/game_simulations.json'
+SIM_VERSION = 1
+N_DRAWS = 10000
+SEED = 20260218
+CHUNK_GAMES = 250           # games per batch (bounds memory at ~40MB)
+
+# League priors when the results store is thin
+DEFAULT_SD = {'nba': 12.0, 'ncaa': 10.5}
+DEFAULT_RHO = {'nba': 0.25, 'ncaa': 0.25}
+PRIOR_GAMES = 10            # pseudo-games of the league sd blended into each team's sd
+
+# Display names the pick generators use -> predictor league
+LEAGUES = {'NBA': 'nba', 'NCAA Basketball': 'ncaa'}
+
+
+def _digest(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def matchup_key(league, home, away):
+    return f"{league}|{away.strip()} @ {home.strip()}"
+
+
+class ScoreDistribution:
+    """Integer histograms of (home - away) margin and combined total for one game"""
+
+    def __init__(self, margin_start, margin_counts, total_start, total_counts, features=None):
+        self.margin_start = int(margin_start)
+        self.margin_counts = np.asarray(margin_counts, dtype=float)
+        self.total_start = int(total_start)
+        self.total_counts = np.asarray(total_counts, dtype=float)
+        self.features = features or {}
+
+    @staticmethod
+    def _split(start, counts, line):
+        """P(value > line), P(value == line) from a histogram"""
+        values = start + np.arange(len(counts))
+        n = counts.sum()
+        return counts[values > line].sum() / n, counts[values == line].sum() / n
+
+    def cover_probability(self, home_side, line):
+        """(win, push) for a spread bet: team margin + line > 0"""
+        if home_side:
+            win, push = self._split(self.margin_start, self.margin_counts, -line)
+            return win, push
+        # away covers when home margin < line
+        above, push = self._split(self.margin_start, self.margin_counts, line)
+        return 1.0 - above - push, push
+
+    def over_probability(self, line):
+        """(over, push) for a total"""
+        return self._split(self.total_start, self.total_counts, line)
+
+    def win_probability(self, home_side):
+        """Moneyline; regulation ties go to overtime, counted as a coin flip"""
+        home, tie = self._split(self.margin_start, self.margin_counts, 0)
+        p = home + tie / 2
+        return p if home_side else 1.0 - p
+
+    def pick_probability(self, pick, home):
+        """Win probability of a pick with pushes excluded (as calibration counts them), or None"""
+        bet_type = str(pick.get('bet_type') or '').upper()
+        recommendation = str(pick.get('recommendation') or '').strip()
+        try:
+            if bet_type == 'MONEYLINE':
+                return self.win_probability(recommendation.startswith(home))
+            side, line = recommendation.rsplit(' ', 1)
+            line = float(line)
+            if bet_type == 'TOTAL':
+                over, push = self.over_probability(line)
+                win = over if side.upper() == 'OVER' else 1.0 - over - push
+            elif bet_type == 'SPREAD':
+                win, push = self.cover_probability(side.strip() == home, line)
+            else:
+                return None
+        except (ValueError, TypeError):
+            return None
+        return win / (1.0 - push) if push < 1.0 else None
+
+    def to_dict(self):
+        return {
+            'margin': [self.margin_start, [int(c) for c in self.margin_counts]],
+            'total': [self.total_start, [int(c) for c in self.total_counts]],
+            'features': self.features,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['margin'][0], data['margin'][1], data['total'][0], data['total'][1], data.get('features'))
+
+
+def _trim(counts):
+    nz = np.flatnonzero(counts)
+    return int(nz[0]), counts[nz[0]:nz[-1] + 1]
+
+
+def simulate_batch(mu_home, mu_away, sd_home, sd_away, rho, draws=N_DRAWS, seed=SEED):
+    """
+    Vectorized bivariate-normal draws for G games at once.
+    Returns (margin_start, margin_counts, total_start, total_counts) per game.
+    """
+    mu_home, mu_away, sd_home, sd_away, rho = (np.asarray(v, dtype=float)[:, None]
+                                              for v in (mu_home, mu_away, sd_home, sd_away, rho))
+    g = mu_home.shape[0]
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((2, g, draws))
+    home = np.rint(mu_home + sd_home * z[0])
+    away = np.rint(mu_away + sd_away * (rho * z[0] + np.sqrt(1.0 - rho ** 2) * z[1]))
+    home = np.maximum(home, 0).astype(np.int64)
+    away = np.maximum(away, 0).astype(np.int64)
+
+    results = []
+    rows = np.arange(g)[:, None]
+    for values in (home - away, home + away):
+        lo = int(values.min())
+        width = int(values.max()) - lo + 1
+        counts = np.bincount((rows * width + (values - lo)).ravel(), minlength=g * width).reshape(g, width)
+        results.append([(lo + start, c) for start, c in map(_trim, counts)])
+    return [(m[0], m[1], t[0], t[1]) for m, t in zip(*results)]
+
+
+class GameSimulator:
+    def __init__(self, draws=N_DRAWS, cache_path=SIM_CACHE_FILE, db_path=DB_PATH):
+        self.draws = draws
+        self.cache_path = cache_path
+        self.db_path = db_path
+        self.cache = self._load_cache()
+        self._spread = {}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        return data.get('games', {}) if data.get('version') == SIM_VERSION else {}
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp = self.cache_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': SIM_VERSION, 'games': self.cache}, f)
+        os.replace(tmp, self.cache_path)
+
+    def _scoring_spread(self, league):
+        if league not in self._spread:
+            spread = {'teams': {}, 'league': {}}
+            if os.path.exists(self.db_path):
+                try:
+                    spread = GameResultsStore(self.db_path).scoring_spread(LEAGUE_TO_SPORT.get(league, league))
+                except Exception as e:
+                    print(f"⚠️ Scoring spread unavailable for {league}: {e}")
+            self._spread[league] = spread
+        return self._spread[league]
+
+    def features(self, league, home, away):
+        """Simulation inputs for one matchup: score means, sds and correlation"""
+        from ncaa_spread_predictor import predict_spread
+        from ncaa_total_predictor import predict_total
+
+        margin = predict_spread(home, away, home_is_home=True, league=league)[0]
+        total = predict_total(home, away, home_is_home=True, league=league)[0]
+
+        spread = self._scoring_spread(league)
+        league_stats = spread['league']
+        league_sd = league_stats.get('sd') or DEFAULT_SD.get(league, DEFAULT_SD['ncaa'])
+        n = league_stats.get('games') or 0
+        rho = league_stats.get('rho')
+        rho = DEFAULT_RHO.get(league, 0.25) if rho is None else (n * rho + PRIOR_GAMES * DEFAULT_RHO.get(league, 0.25)) / (n + PRIOR_GAMES)
+
+        def team_var(team, key):
+            t = spread['teams'].get(team.strip())
+            if not t or t['games'] < 2:
+                return league_sd ** 2
+            return (t['games'] * t[key] ** 2 + PRIOR_GAMES * league_sd ** 2) / (t['games'] + PRIOR_GAMES)
+
+        return {
+            'mu_home': round((total + margin) / 2, 2),
+            'mu_away': round((total - margin) / 2, 2),
+            'sd_home': round(((team_var(home, 'sd_for') + team_var(away, 'sd_against')) / 2) ** 0.5, 2),
+            'sd_away': round(((team_var(away, 'sd_for') + team_var(home, 'sd_against')) / 2) ** 0.5, 2),
+            'rho': round(float(np.clip(rho, -0.9, 0.9)), 3),
+        }
+
+    def simulate(self, matchups, save=True):
+        """
+        Score distributions for (league, home, away) matchups, keyed by matchup_key.
+        Cached games whose feature version is unchanged are not resimulated; the rest
+        run as one vectorized batch.
+        """
+        results, pending, seen = {}, [], set()
+        for league, home, away in matchups:
+            key = matchup_key(league, home, away)
+            if key in seen:
+                continue
+            seen.add(key)
+            features = self.features(league, home, away)
+            version = _digest(SIM_VERSION, self.draws, features)
+            cached = self.cache.get(key)
+            if cached and cached.get('feature_version') == version:
+                results[key] = ScoreDistribution.from_dict(cached)
+            else:
+                pending.append((key, version, features))
+
+        for i in range(0, len(pending), CHUNK_GAMES):
+            chunk = pending[i:i + CHUNK_GAMES]
+            cols = {f: [p[2][f] for p in chunk] for f in ('mu_home', 'mu_away', 'sd_home', 'sd_away', 'rho')}
+            batch = simulate_batch(cols['mu_home'], cols['mu_away'], cols['sd_home'], cols['sd_away'], cols['rho'],
+                                   draws=self.draws)
+            for (key, version, features), hists in zip(chunk, batch):
+                dist = ScoreDistribution(*hists, features=features)
+                results[key] = dist
+                self.cache[key] = dict(dist.to_dict(), feature_version=version)
+
+        if pending and save:
+            self._save_cache()
+        return results
+
+
+def attach_sim_probabilities(picks, simulator=None):
+    """
+    Set sim_probability (%) on basketball picks from one simulated slate.
+    Picks need 'game' ("Away @ Home"), 'sport', 'bet_type' and 'recommendation'.
+    """
+    matchups = []
+    for pick in picks:
+        league = next((lg for name, lg in LEAGUES.items() if name in str(pick.get('sport', ''))), None)
+        away, sep, home = str(pick.get('game', '')).partition(' @ ')
+        if league and sep:
+            matchups.append((pick, league, home.strip(), away.strip()))
+    if not matchups:
+        return picks
+
+    simulator = simulator or GameSimulator()
+    dists = simulator.simulate([(lg, home, away) for _, lg, home, away in matchups])
+    for pick, league, home, away in matchups:
+        p = dists[matchup_key(league, home, away)].pick_probability(pick, home)
+        if p is not None:
+            pick['sim_probability'] = round(float(p) * 100, 1)
+    return picks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo game simulation')
+    parser.add_argument('league', choices=sorted(DEFAULT_SD))
+    parser.add_argument('home')
+    parser.add_argument('away')
+    parser.add_argument('--spread', type=float, help="home team's spread (e.g. -5.5)")
+    parser.add_argument('--total', type=float)
+    parser.add_argument('--draws', type=int, default=N_DRAWS)
+    args = parser.parse_args()
+
+    sim = GameSimulator(draws=args.draws)
+    dist = sim.simulate([(args.league, args.home, args.away)])[matchup_key(args.league, args.home, args.away)]
+    f = dist.features
+    print(f"🎲 {args.away} @ {args.home} ({args.draws} draws)")
+    print(f"   Expected score: {args.home} {f['mu_home']:.1f} - {args.away} {f['mu_away']:.1f} "
+          f"(sd {f['sd_home']:.1f}/{f['sd_away']:.1f}, rho {f['rho']:.2f})")
+    print(f"   {args.home} win: {dist.win_probability(True)*100:.1f}% | {args.away} win: {dist.win_probability(False)*100:.1f}%")
+    if args.spread is not None:
+        win, push = dist.cover_probability(True, args.spread)
+        print(f"   {args.home} {args.spread:+g} covers: {win*100:.1f}% (push {push*100:.1f}%)")
+    if args.total is not None:
+        over, push = dist.over_probability(args.total)
+        print(f"   Over {args.total}: {over*100:.1f}% | Under: {(1-over-push)*100:.1f}% (push {push*100:.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
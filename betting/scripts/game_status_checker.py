@@ -7,17 +7,19 @@ Auto-detects when games have finished and marks WIN/LOSS
 
 import json
 import os
-import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 from typing import Dict, List, Optional
 
+from betting_database import record_settled_bets
+from closing_line_value import attach_clv
+from espn_scoreboard import get_service, league_code, scoreboard_day
+
 # Configuration
 WORKSPACE = os.environ.get('WORKSPACE', os.getcwd())
 ACTIVE_BETS_FILE = f"{WORKSPACE}/active_bets.json"
 RANKED_BETS_FILE = f"{WORKSPACE}/ranked_bets.json"
 COMPLETED_BETS_FILE = f"{WORKSPACE}/completed_bets_2026-02-16.json"
-ESPN_API_BASE = "https://site.api.espn.com/apis/site/v2/sports"
 
 # Timezone
 EST = pytz.timezone('America/Detroit')
@@ -48,81 +50,31 @@ def save_json_file(filepath: str, data: Dict):
         log(f"❌ Error saving {filepath}: {e}")
         return False
 
-def get_espn_score(game: str, sport: str = "basketball") -> Optional[Dict]:
+def get_espn_score(game: str, sport: str = "basketball", game_date: Optional[str] = None) -> Optional[Dict]:
     """
-    Fetch game score from ESPN API
+    Game score from the ESPN scoreboard of the bet's game date (default: today,
+    Eastern), then the day before - a late tip-off that goes final after midnight
+    is still found. Shared espn_scoreboard cache, so checking every active bet
+    costs one scoreboard fetch per league and date.
     Returns: {'home_team': str, 'away_team': str, 'home_score': int, 'away_score': int, 'status': str}
     """
     try:
-        # Parse game string (format: "Team A @ Team B")
-        if ' @ ' not in game:
+        # Unknown sports fall back to college basketball, as before
+        league = league_code(sport) or 'ncb'
+        day = scoreboard_day(game_date)
+        service = get_service()
+        event = service.find(game, league, day) or service.find(game, league, day - timedelta(days=1))
+        if not event:
             return None
         
-        away_team, home_team = game.split(' @ ')
-        away_team = away_team.strip()
-        home_team = home_team.strip()
-        
-        # Map sport to ESPN league
-        league_map = {
-            'basketball': 'basketball/mens-college-basketball',
-            'ncaab': 'basketball/mens-college-basketball',
-            'nba': 'basketball/nba',
-            'nfl': 'football/nfl',
-            'nhl': 'hockey/nhl',
-            'mlb': 'baseball/mlb'
+        return {
+            'home_team': event.home_team,
+            'away_team': event.away_team,
+            'home_score': event.home_score or 0,
+            'away_score': event.away_score or 0,
+            'status': event.status or 'Unknown',  # 'STATUS_SCHEDULED', 'STATUS_IN_PROGRESS', 'STATUS_FINAL'
+            'game_id': event.event_id,
         }
-        
-        league = league_map.get(sport.lower(), 'basketball/mens-college-basketball')
-        
-        # ESPN scoreboard API
-        url = f"{ESPN_API_BASE}/{league}/scoreboard"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code != 200:
-            return None
-        
-        data = response.json()
-        
-        # Search for matching game
-        for event in data.get('events', []):
-            competitions = event.get('competitions', [])
-            if not competitions:
-                continue
-            
-            competition = competitions[0]
-            competitors = competition.get('competitors', [])
-            
-            if len(competitors) < 2:
-                continue
-            
-            # Find home and away teams
-            home = next((c for c in competitors if c.get('homeAway') == 'home'), None)
-            away = next((c for c in competitors if c.get('homeAway') == 'away'), None)
-            
-            if not home or not away:
-                continue
-            
-            espn_home = home.get('team', {}).get('displayName', '')
-            espn_away = away.get('team', {}).get('displayName', '')
-            
-            # Check if teams match (fuzzy match)
-            if (home_team.lower() in espn_home.lower() or espn_home.lower() in home_team.lower()) and \
-               (away_team.lower() in espn_away.lower() or espn_away.lower() in away_team.lower()):
-                
-                status = competition.get('status', {}).get('type', {}).get('name', 'Unknown')
-                home_score = int(home.get('score', 0))
-                away_score = int(away.get('score', 0))
-                
-                return {
-                    'home_team': espn_home,
-                    'away_team': espn_away,
-                    'home_score': home_score,
-                    'away_score': away_score,
-                    'status': status,  # 'STATUS_SCHEDULED', 'STATUS_IN_PROGRESS', 'STATUS_FINAL'
-                    'game_id': event.get('id'),
-                }
-        
-        return None
     
     except Exception as e:
         log(f"⚠️ ESPN API error for {game}: {e}")
@@ -204,7 +156,7 @@ def check_game_status(bet: Dict) -> Dict:
     
     log(f"🔍 Checking: {game}")
     
-    score_data = get_espn_score(game, sport)
+    score_data = get_espn_score(game, sport, bet.get('game_date') or bet.get('date'))
     
     if not score_data:
         log(f"   ⏳ No score data available (game not started or API error)")
@@ -269,6 +221,8 @@ def move_to_completed(bet: Dict, result: str, final_score: str):
         
         # Save
         save_json_file(COMPLETED_BETS_FILE, completed_data)
+        # Dual-write: BettingDB is the primary store, JSON kept during the transition
+        record_settled_bets([bet], completed_data['date'])
         
         log(f"   ✅ Moved to completed_bets: {bet['game']} - {result}")
         return True
@@ -300,30 +254,21 @@ def update_all_game_statuses():
     scheduled_count = 0
     
     remaining_bets = []
+    settled = []  # (bet, result, final_score, status_info) - moved after CLV is attached for the slate
     
     for bet in all_bets:
         # Skip if already has result
         if bet.get('result') in ['WIN', 'LOSS']:
             log(f"⏭️ Skipping {bet.get('game')} - already has result: {bet.get('result')}")
-            move_to_completed(bet, bet['result'], bet.get('final_score', 'N/A'))
+            settled.append((bet, bet['result'], bet.get('final_score', 'N/A'), None))
             continue
         
         # Check game status
         status_info = check_game_status(bet)
         
         if status_info['status'] == 'FINAL' and status_info['result']:
-            # Game finished - move to completed
             finished_count += 1
-            move_to_completed(bet, status_info['result'], status_info['final_score'])
-            
-            # Update ranked_bets.json if this bet is in top 10
-            if ranked_data and 'top_10' in ranked_data:
-                for ranked_item in ranked_data['top_10']:
-                    ranked_bet = ranked_item.get('full_bet', {})
-                    if ranked_bet.get('game') == bet['game']:
-                        ranked_bet['result'] = status_info['result']
-                        ranked_bet['final_score'] = status_info['final_score']
-                        ranked_bet['completed_at'] = datetime.now(EST).isoformat()
+            settled.append((bet, status_info['result'], status_info['final_score'], status_info))
         
         elif status_info['status'] == 'IN_PROGRESS':
             in_progress_count += 1
@@ -333,6 +278,30 @@ def update_all_game_statuses():
             scheduled_count += 1
             remaining_bets.append(bet)
     
+    # Closing line value for every finished bet from one closing_lines lookup
+    if settled:
+        try:
+            with_clv = attach_clv([bet for bet, _, _, _ in settled])
+            log(f"📈 CLV attached to {with_clv}/{len(settled)} finished bets")
+        except Exception as e:
+            log(f"⚠️ CLV skipped: {e}")
+    
+    for bet, result, final_score, status_info in settled:
+        # Game finished - move to completed
+        move_to_completed(bet, result, final_score)
+        
+        if status_info:
+            # Update ranked_bets.json if this bet is in top 10
+            if ranked_data and 'top_10' in ranked_data:
+                for ranked_item in ranked_data['top_10']:
+                    ranked_bet = ranked_item.get('full_bet', {})
+                    if ranked_bet.get('game') == bet['game']:
+                        ranked_bet['result'] = status_info['result']
+                        ranked_bet['final_score'] = status_info['final_score']
+                        ranked_bet['completed_at'] = datetime.now(EST).isoformat()
+                        if 'clv' in bet:
+                            ranked_bet['clv'] = bet['clv']
+    
     # Update active_bets.json (remove finished games)
     active_data['bets'] = remaining_bets
     active_data['last_updated'] = datetime.now(EST).isoformat()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Incremental learning support - consume only settlements that arrived since the
+last run instead of re-reading every completed_bets_*.json on each cron tick.
+
+- SettlementFeed: settled bets newer than a persisted watermark. With a
+  migrated BettingDB the watermark is the bets.updated_at high-water mark (an
+  indexed range scan); otherwise it is the (mtime, size) of each
+  completed_bets_*.json / bet_tracker_input.json, and only changed files are read.
+  The same bet can be settled in more than one place (tracker copies carry no
+  date, so bet_id differs); bets are deduplicated on settlement_key and every
+  copy is fed under the id of the first one seen (kept in the watermark)
+- refresh_cube: load the PerformanceCube, fold in the feed, persist cube and
+  watermark together in one atomic write
+- write_json_if_changed: outputs are rewritten only when their content (ignoring
+  generated_at / timestamp stamps) actually changed
+
+Usage:
+    cube, changed = refresh_cube('performance_cube.json', open_if_populated())
+"""
+
+import glob
+import json
+import os
+import re
+
+from betting_database import bet_id, BET_ID_VERSION
+from performance_cube import PerformanceCube
+
+SETTLED_RESULTS = ('WIN', 'LOSS', 'PUSH')
+VOLATILE_KEYS = ('generated_at', 'timestamp', 'last_updated')
+
+
+def settlement_key(bet):
+    """(game, bet_type, recommendation) - the identity LearningEngine deduplicates on"""
+    game = (bet.get('game') or bet.get('game_name') or '').strip()
+    return game, bet.get('bet_type'), (bet.get('recommendation') or '').strip()
+
+
+def dedupe_settlements(bets):
+    """First bet per settlement_key, in order (dated from a later copy when it has no date)"""
+    kept = {}
+    unique = []
+    for bet in bets:
+        key = settlement_key(bet)
+        first = kept.get(key)
+        if first is None:
+            kept[key] = bet
+            unique.append(bet)
+        elif not first.get('date') and bet.get('date'):
+            first['date'] = bet['date']   # tracker bets carry no date; the completed file's copy does
+    return unique
+
+
+class SettlementFeed:
+    def __init__(self, db=None, workspace='.'):
+        self.db = db
+        self.workspace = str(workspace)
+
+    def since(self, watermark):
+        """Return (settled bets newer than watermark, new watermark)."""
+        watermark = dict(watermark or {})
+        if self.db is not None:
+            bets, high = self.db.get_settled_since(watermark.get('db_updated_at'), SETTLED_RESULTS)
+            watermark['db_updated_at'] = high
+        else:
+            bets = self._files_since(watermark)
+        ids = dict(watermark.get('ids', {}))   # '\x1f'-joined settlement_key -> canonical bet id
+        unique = []
+        for bet in dedupe_settlements(bets):
+            key = '\x1f'.join(str(part) for part in settlement_key(bet))
+            unique.append(dict(bet, id=ids.setdefault(key, bet_id(bet))))
+        watermark['ids'] = ids
+        watermark['id_version'] = BET_ID_VERSION
+        return unique, watermark
+
+    def _files_since(self, watermark):
+        seen = watermark.get('files', {})
+        files = {}
+        bets = []
+        # Tracker first, then the dated files: the first copy of a bet is the one kept
+        paths = [os.path.join(self.workspace, 'bet_tracker_input.json')]
+        paths += sorted(glob.glob(os.path.join(self.workspace, 'completed_bets_*.json')))
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            sig = [st.st_mtime_ns, st.st_size]
+            files[path] = sig
+            if seen.get(path) == sig:
+                continue
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"⚠️  Skipping unreadable {path}: {e}")
+                files.pop(path)
+                continue
+            file_bets = data.get('bets', []) if isinstance(data, dict) else data if isinstance(data, list) else []
+            file_date = re.search(r'(\d{4}-\d{2}-\d{2})', os.path.basename(path))
+            for bet in file_bets:
+                if not isinstance(bet, dict):
+                    continue
+                bet['result'] = (bet.get('result') or '').strip().upper()
+                if bet['result'] not in SETTLED_RESULTS:
+                    continue
+                if file_date:
+                    bet.setdefault('date', file_date.group(1))
+                bets.append(bet)
+        watermark['files'] = files
+        return bets
+
+
+def refresh_cube(cube_file, db=None, workspace='.'):
+    """
+    Bring the persisted cube up to date with settlements since its watermark.
+    Returns (cube, number of bets that changed it).
+    """
+    cube = PerformanceCube.load(cube_file)
+    bets, watermark = SettlementFeed(db, workspace).since(cube.watermark)
+    changed = cube.update(bets)
+    if changed or watermark != cube.watermark:
+        cube.watermark = watermark
+        cube.save(cube_file)
+    return cube, changed
+
+
+def _content(data):
+    if isinstance(data, dict):
+        return {k: v for k, v in data.items() if k not in VOLATILE_KEYS}
+    return data
+
+
+def write_json_if_changed(path, data, indent=2):
+    """Write data to path unless the file already holds the same content. Returns True if written."""
+    try:
+        with open(path, 'r') as f:
+            if _content(json.load(f)) == _content(json.loads(json.dumps(data))):
+                return False
+    except Exception:
+        pass
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp, path)
+    return True
@@ -12,12 +12,17 @@ from datetime import datetime
 
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
 
-def initialize_active_bets():
-    """Take TOP 10 daily picks by LARLScore (not raw order)"""
+ACTIVE_BETS_FILE = '/Users/macmini/.openclaw/workspace/betting/data/active_bets.json'
+
+def initialize_active_bets(output_path=ACTIVE_BETS_FILE, rank=True):
+    """Take TOP 10 daily picks by LARLScore (not raw order)
+
+    rank=False leaves ranking to the caller (pipeline_runner runs it as its own stage)
+    """
     
     # Get all picks from daily_recommendations
     from daily_recommendations import get_todays_value_bets
-    from bet_ranker import load_completed_bets, calculate_bet_type_performance, score_bet, deduplicate_conflicting_bets, load_adaptive_weights
+    from bet_ranker import load_bet_type_performance, score_bet, deduplicate_conflicting_bets, load_adaptive_weights
     
     print("🎰 Initializing today's bets (TOP 10 BY LARLESCORE)...")
     picks = get_todays_value_bets()
@@ -26,8 +31,7 @@ def initialize_active_bets():
     
     # Score ALL picks with LARLScore formula, THEN take top 10
     # This ensures TOTAL bets (66.7% WR) rank above SPREAD (47.5% WR)
-    completed = load_completed_bets()
-    win_rates, perf = calculate_bet_type_performance(completed)
+    win_rates, perf = load_bet_type_performance()
     adaptive_weights = load_adaptive_weights()
     
     # Filter out MONEYLINE (weight=0) and score remaining
@@ -62,12 +66,15 @@ def initialize_active_bets():
         'note': 'Only top 10 curated picks are placed for wagering (Feb 15 80% proven strategy)'
     }
     
-    with open('/Users/macmini/.openclaw/workspace/betting/data/active_bets.json', 'w') as f:
+    with open(output_path, 'w') as f:
         json.dump(active_bets_data, f, indent=2)
     
     print(f"   ✅ Saved TOP 10 bets to active_bets.json (wagering only)")
     print(f"   📊 Full pool of {len(picks)} bets available for analysis")
     
+    if not rank:
+        return len(top_10_picks), len(picks)
+    
     # Now run bet_ranker to create Top 10 ranking
     print("\n📊 Ranking bets by LarlScore...")
     import subprocess
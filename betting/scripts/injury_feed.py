@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+🏥 Injury Feed - ESPN injury reports for the teams on today's slate
+
+1. Today's scoreboard per sport (shared espn_scoreboard cache) gives the
+   slate: the ESPN id of every team playing (optionally narrowed to the teams
+   named by the caller).
+2. Each slate team's roster (which carries ESPN's injury designations) is
+   fetched concurrently through espn_team_fetcher's rate-limited conditional
+   client, so an unchanged roster is a cheap 304.
+3. Reports are diffed against the previous snapshot (the 'espn' entries
+   already in InjuryProcessor's cache); only teams whose report changed are
+   rewritten and have their impact aggregate recomputed.
+
+Impact level comes from recent minutes in the player stats store for
+basketball (STAR_MINUTES / KEY_MINUTES), from position for football
+(STAR_POSITIONS), and defaults to 'key' otherwise.
+
+USAGE:
+    from injury_feed import refresh_injuries
+    summary = refresh_injuries()                         # every sport's slate
+    summary = refresh_injuries(teams=['Duke Blue Devils'], sports=['ncb'])
+    python3 injury_feed.py --sports nba ncb
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from game_results_store import SCOREBOARD_URLS
+
+DEFAULT_WORKERS = 8
+RECENT_GAMES = 10
+STAR_MINUTES = 30
+KEY_MINUTES = 20
+STAR_POSITIONS = ('QB',)
+
+# ESPN injury designation -> InjuryProcessor status (anything else is ignored)
+ESPN_STATUSES = {'out': 'out', 'injured reserve': 'out', 'suspension': 'out', 'doubtful': 'doubtful',
+                 'questionable': 'questionable', 'day-to-day': 'day_to_day', 'probable': 'day_to_day'}
+
+
+def roster_url(sport, team_id):
+    return SCOREBOARD_URLS[sport].rsplit('/scoreboard', 1)[0] + f'/teams/{team_id}/roster'
+
+
+def slate_teams(scoreboards, sport, teams=None, day=None):
+    """{team name: ESPN team id} for every team on the day's scoreboard (narrowed to teams if given)"""
+    wanted = set(teams) if teams else None
+    slate = {}
+    for event in scoreboards.events(sport, day):
+        for name, team_id in ((event.away_team, event.away_id), (event.home_team, event.home_id)):
+            if name and team_id and (wanted is None or name in wanted):
+                slate[name] = team_id
+    return slate
+
+
+def roster_athletes(roster):
+    """Athletes from a roster payload (flat list for basketball, position groups for football)"""
+    athletes = []
+    for entry in (roster or {}).get('athletes', []):
+        athletes.extend(entry.get('items', []) if 'items' in entry else [entry])
+    return athletes
+
+
+class InjuryFeed:
+    def __init__(self, processor=None, client=None, workers=DEFAULT_WORKERS, scoreboards=None):
+        if processor is None:
+            from injury_processor import InjuryProcessor
+            processor = InjuryProcessor()
+        if client is None:
+            from espn_team_fetcher import ConditionalClient
+            client = ConditionalClient(workers=workers)
+        if scoreboards is None:
+            from espn_scoreboard import get_service
+            scoreboards = get_service()
+        self.processor = processor
+        self.client = client
+        self.scoreboards = scoreboards
+        self.workers = workers
+        self._minutes = {}      # sport -> (PlayerStatsStore, recent minutes per player index)
+
+    def recent_minutes(self, sport):
+        if sport not in self._minutes:
+            if sport not in ('nba', 'ncb'):
+                self._minutes[sport] = (None, None)
+            else:
+                from player_stats_store import PlayerStatsStore
+                store = PlayerStatsStore(sport)
+                minutes = np.asarray(store.columns['minutes'], dtype=float)
+                recent = np.full(len(store.players), np.nan)
+                for i in range(len(store.players)):
+                    start, end = int(store.offsets[i]), int(store.offsets[i + 1])
+                    if end > start:
+                        recent[i] = np.nanmean(minutes[max(start, end - RECENT_GAMES):end])
+                self._minutes[sport] = (store, recent)
+        return self._minutes[sport]
+
+    def impact_level(self, sport, athlete):
+        store, recent = self.recent_minutes(sport)
+        if store is not None:
+            idx = store.find_player(athlete.get('displayName'))
+            if idx is not None and not np.isnan(recent[idx]):
+                if recent[idx] >= STAR_MINUTES:
+                    return 'star'
+                return 'key' if recent[idx] >= KEY_MINUTES else 'bench'
+        position = ((athlete.get('position') or {}).get('abbreviation') or '').upper()
+        return 'star' if position in STAR_POSITIONS else 'key'
+
+    def team_report(self, sport, roster):
+        """Roster payload -> [{'player', 'status', 'impact_level'}] for every listed injury"""
+        report = []
+        for athlete in roster_athletes(roster):
+            for injury in athlete.get('injuries') or []:
+                status = ESPN_STATUSES.get(str(injury.get('status') or '').lower())
+                if status and athlete.get('displayName'):
+                    report.append({'player': athlete['displayName'], 'status': status,
+                                   'impact_level': self.impact_level(sport, athlete)})
+                    break
+        return report
+
+    def refresh(self, sports=None, teams=None):
+        """Fetch the slate's injury reports and apply the changed ones. Returns a summary."""
+        sports = sports or sorted(SCOREBOARD_URLS)
+        slate = [(sport, name, tid) for sport in sports
+                 for name, tid in slate_teams(self.scoreboards, sport, teams).items()]
+        summary = {'teams': len(slate), 'changed': [], 'failed': 0}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.client.get, roster_url(sport, tid)): (sport, name)
+                       for sport, name, tid in slate}
+            for fut in as_completed(futures):
+                sport, name = futures[fut]
+                roster = fut.result()
+                if roster is None:
+                    summary['failed'] += 1
+                    continue
+                if self.processor.apply_team_report(name, self.team_report(sport, roster)):
+                    summary['changed'].append(name)
+        self.processor.save_injury_data()
+        print(f"🏥 Injury reports: {summary['teams']} slate teams, {len(summary['changed'])} changed, "
+              f"{summary['failed']} failed")
+        return summary
+
+
+def refresh_injuries(sports=None, teams=None, workers=DEFAULT_WORKERS):
+    return InjuryFeed(workers=workers).refresh(sports=sports, teams=teams)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest ESPN injury reports for today's slate")
+    parser.add_argument('--sports', nargs='+', choices=sorted(SCOREBOARD_URLS))
+    parser.add_argument('--teams', nargs='+', help='Only these team names')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    summary = refresh_injuries(sports=args.sports, teams=args.teams, workers=args.workers)
+    for team in summary['changed']:
+        print(f"   🔄 {team}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,39 +7,43 @@ Impact calculations:
 - Star player out: -5 to -10 points of strength
 - Key rotation player out: -3 to -5 points
 - Bench player out: -1 to -2 points
+
+Injuries arrive from add_injury (manual) or the ESPN feed (injury_feed.py,
+apply_team_report). Per-team impact aggregates are precomputed when a team's
+injuries change, so get_team_injury_impact / compare_injury_impact are dict
+lookups however many bets are scored.
 """
 
-import json
 from datetime import datetime
-from pathlib import Path
 import sys
 
+from write_behind_cache import WriteBehindCache
+
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
 
+
+def report_signature(injuries):
+    """Order-independent identity of an injury list (what a feed diff compares)"""
+    return sorted((i['player'].lower(), i['status'], i['impact_level']) for i in injuries)
+
+
 class InjuryProcessor:
     """Process and track player injuries"""
     
-    def __init__(self):
+    def __init__(self, flush_interval=None):
         self.cache_file = 'injury_cache.json'
-        self.injury_data = self.load_injury_data()
+        # {team: [injury, ...]}, written once per run (save_injury_data() or exit)
+        self.cache = WriteBehindCache(self.cache_file, flush_interval=flush_interval)
+        # {team: get_team_injury_impact() result}, rebuilt only for teams whose injuries change
+        self.impacts = {team: self._aggregate(team) for team in self.injury_data}
     
-    def load_injury_data(self):
-        """Load cached injury data"""
-        try:
-            if Path(self.cache_file).exists():
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+    @property
+    def injury_data(self):
+        return self.cache.data
     
     def save_injury_data(self):
-        """Save injury data to cache"""
-        try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.injury_data, f, indent=2)
-        except:
-            pass
+        """Write pending injury data to the cache file"""
+        self.cache.flush()
     
     def add_injury(self, team, player, status, impact_level='moderate'):
         """Track a player injury
@@ -66,7 +70,41 @@ class InjuryProcessor:
         
         # Add new injury
         self.injury_data[team].append(injury)
-        self.save_injury_data()
+        self.cache.touch(team)
+        self.impacts[team] = self._aggregate(team)
+    
+    def apply_team_report(self, team, injuries, source='espn'):
+        """Replace a team's injuries from one source with a fresh report
+        
+        injuries: [{'player', 'status', 'impact_level'}]. Entries from other
+        sources are kept unless the report lists the same player. Returns True if
+        the team's injuries changed (nothing is touched or recomputed otherwise).
+        """
+        current = [i for i in self.injury_data.get(team, []) if i.get('source') == source]
+        if report_signature(current) == report_signature(injuries):
+            return False
+        
+        reported = {i['player'].lower() for i in injuries}
+        kept = [i for i in self.injury_data.get(team, [])
+                if i.get('source', 'manual') != source and i['player'].lower() not in reported]
+        now = datetime.now().isoformat()
+        updated = kept + [{
+            'player': i['player'],
+            'status': i['status'],
+            'impact_level': i['impact_level'],
+            'timestamp': now,
+            'impact_points': self.get_impact_value(i['impact_level'], i['status']),
+            'source': source
+        } for i in injuries]
+        
+        if updated:
+            self.injury_data[team] = updated
+            self.cache.touch(team)
+            self.impacts[team] = self._aggregate(team)
+        else:
+            self.cache.delete(team)
+            self.impacts.pop(team, None)
+        return True
     
     def get_impact_value(self, impact_level, status):
         """Get impact points for an injury"""
@@ -87,16 +125,18 @@ class InjuryProcessor:
         - questionable_players: List of questionable players
         - severity: 'None', 'Minor', 'Moderate', 'Severe'
         """
-        if team not in self.injury_data:
-            return {
-                'team': team,
-                'total_impact_points': 0,
-                'out_players': [],
-                'questionable_players': [],
-                'severity': 'None'
-            }
-        
-        injuries = self.injury_data[team]
+        return self.impacts.get(team) or {
+            'team': team,
+            'total_impact_points': 0,
+            'out_players': [],
+            'questionable_players': [],
+            'all_injuries': [],
+            'severity': 'None'
+        }
+    
+    def _aggregate(self, team):
+        """Impact summary for one team's stored injuries (run when they change)"""
+        injuries = self.injury_data.get(team, [])
         out_players = [i for i in injuries if i['status'] == 'out']
         questionable = [i for i in injuries if i['status'] == 'questionable']
         
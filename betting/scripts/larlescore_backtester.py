@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+🧪 LarlScore Backtester - replay settled history through parameterized scoring
+
+Loads every settled bet once into NumPy arrays, then for each parameter set:
+1. Scores every bet with a parameterized LarlScore (v3 adaptive formula with the
+   v4 boosts/penalties as tunable multipliers)
+2. Replays each historical day the way bet_ranker.rank_today_bets does: drop
+   LOW data-quality bets, keep the best-scored side per (game, bet_type), take
+   the top 10 by score
+3. Reports picks, record, win rate, units won and ROI (1 unit flat stakes)
+
+Per-bet-type win rates and adaptive weights are computed from the days BEFORE
+each slate only (same Bayesian smoothing as AdaptiveWeightUpdater), so a sweep
+over alpha / beta / min_sample_size never sees the result it is scoring.
+
+Parameter sets are evaluated together by broadcasting a (params, bets) score
+matrix; big grids are split into chunks and spread over worker processes.
+
+Only bets that were settled are in the history, so each replayed slate is the
+settled subset of that day's board.
+
+USAGE:
+    python3 larlescore_backtester.py                    # default formula grid
+    python3 larlescore_backtester.py --grid adaptive    # alpha/beta/min_sample sweep
+    python3 larlescore_backtester.py --grid-file my_grid.json --workers 8
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from betting_database import open_if_populated, DB_PATH
+from incremental_learning import SettlementFeed
+
+WORKSPACE = Path("/Users/macmini/.openclaw/workspace")
+RESULTS_FILE = 'larlescore_backtest_results.json'
+
+TOP_N = 10                  # bet_ranker top 10
+DEFAULT_ODDS = -110         # when a bet carries no price
+CHUNK_CELLS = 2_000_000     # params x bets per chunk (~16MB per float64 matrix)
+PARALLEL_MIN_PARAMS = 2000  # smaller grids are faster in-process
+
+# Parameter order of the score function; every parameter set is a row of these
+PARAMS = (
+    'conf_exp', 'edge_exp',
+    'high_edge', 'high_edge_boost', 'low_edge', 'low_edge_penalty',
+    'high_conf_boost', 'mid_conf_boost', 'total_conf_boost',
+    'moneyline_weight', 'alpha', 'beta', 'min_sample_size',
+)
+
+# bet_ranker.score_bet v3.0: no boosts, adaptive weights with the updater defaults
+V3_PARAMS = {
+    'conf_exp': 1.0, 'edge_exp': 1.0,
+    'high_edge': 10.0, 'high_edge_boost': 1.0, 'low_edge': 5.0, 'low_edge_penalty': 1.0,
+    'high_conf_boost': 1.0, 'mid_conf_boost': 1.0, 'total_conf_boost': 1.0,
+    'moneyline_weight': 1.0, 'alpha': 2.0, 'beta': 2.0, 'min_sample_size': 10,
+}
+
+# larlescore_v4_improved.calculate_larlescore_v4 constants
+V4_PARAMS = dict(V3_PARAMS, high_edge_boost=1.3, low_edge_penalty=0.5, high_conf_boost=1.2,
+                 mid_conf_boost=1.1, total_conf_boost=1.4, moneyline_weight=0.0)
+
+GRIDS = {
+    # v4 multipliers and the deep-analysis exponent variants
+    'formula': {
+        'conf_exp': [1.0, 1.5],
+        'edge_exp': [1.0, 1.2],
+        'high_edge_boost': [1.0, 1.15, 1.3, 1.5],
+        'low_edge_penalty': [0.3, 0.5, 0.75, 1.0],
+        'high_conf_boost': [1.0, 1.2, 1.4],
+        'mid_conf_boost': [1.0, 1.1, 1.2],
+        'total_conf_boost': [1.0, 1.2, 1.4],
+        'moneyline_weight': [0.0, 1.0],
+    },
+    # AdaptiveWeightUpdater smoothing on top of the v3 formula
+    'adaptive': {
+        'alpha': [0.5, 1.0, 2.0, 3.0, 5.0, 8.0],
+        'beta': [0.5, 1.0, 2.0, 3.0, 5.0, 8.0],
+        'min_sample_size': [5, 10, 20, 30, 50],
+        'moneyline_weight': [0.0, 1.0],
+    },
+}
+GRIDS['full'] = dict(GRIDS['formula'], **GRIDS['adaptive'])
+
+
+def _number(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def payout(odds):
+    """Profit per unit staked on a win at American odds"""
+    odds = _number(odds, DEFAULT_ODDS)
+    if odds >= 100:
+        return odds / 100.0
+    if odds <= -100:
+        return 100.0 / -odds
+    return 100.0 / -DEFAULT_ODDS
+
+
+class History:
+    """
+    Settled bets as flat arrays, sorted by date.
+
+    day         day index (0..n_days-1)
+    group       (day, game, bet_type) id - rank_today_bets keeps one side per group
+    type_code   index into bet_types
+    confidence, edge    clamped like bet_ranker.score_bet
+    win, loss, push     result masks
+    payout      profit per unit on a win
+    prior_wins / prior_total   (n_types, n_days) W and W+L counts before each day
+    """
+
+    def __init__(self, bets):
+        rows = []
+        for bet in bets:
+            date = bet.get('date')
+            result = str(bet.get('result') or '').strip().upper()
+            if not date or result not in ('WIN', 'LOSS', 'PUSH'):
+                continue
+            if bet.get('data_quality') == 'LOW':
+                continue  # rank_today_bets never ranks these
+            rows.append((str(date), bet, result))
+        rows.sort(key=lambda r: r[0])  # stable: keeps file order within a day
+
+        self.dates = sorted({r[0] for r in rows})
+        day_index = {d: i for i, d in enumerate(self.dates)}
+        self.bet_types = sorted({str(b.get('bet_type') or 'SPREAD').upper() for _, b, _ in rows})
+        type_index = {t: i for i, t in enumerate(self.bet_types)}
+
+        groups = {}
+        self.day = np.array([day_index[d] for d, _, _ in rows], dtype=np.int64)
+        self.group = np.array([
+            groups.setdefault((d, (b.get('game') or b.get('game_name') or '').strip(),
+                               str(b.get('bet_type') or 'SPREAD').upper()), len(groups))
+            for d, b, _ in rows], dtype=np.int64)
+        self.type_code = np.array([type_index[str(b.get('bet_type') or 'SPREAD').upper()]
+                                   for _, b, _ in rows], dtype=np.int64)
+        self.confidence = np.maximum(0.0, np.array([_number(b.get('confidence'), 70.0)
+                                                    for _, b, _ in rows]))
+        self.edge = np.maximum(0.0, np.array([_number(b.get('edge'), 2.0) for _, b, _ in rows]))
+        result = np.array([r for _, _, r in rows])
+        self.win = result == 'WIN'
+        self.loss = result == 'LOSS'
+        self.push = result == 'PUSH'
+        self.payout = np.array([payout(b.get('odds', b.get('price'))) for _, b, _ in rows])
+
+        # Sorting by day puts every day in one contiguous block, so a bet's rank in
+        # its day is its sorted position minus the block start - the same for every
+        # parameter row. Same trick for the dedup groups.
+        self.day_start = np.searchsorted(self.day, np.arange(len(self.dates)))
+        self.group_start = np.zeros(len(groups), dtype=np.int64)
+        if len(groups):
+            sorted_groups = np.sort(self.group)
+            self.group_start = np.searchsorted(sorted_groups, np.arange(len(groups)))
+
+        n_types, n_days = len(self.bet_types), len(self.dates)
+        wins = np.zeros((n_types, n_days))
+        total = np.zeros((n_types, n_days))
+        np.add.at(wins, (self.type_code, self.day), self.win)
+        np.add.at(total, (self.type_code, self.day), self.win | self.loss)
+        # Exclusive cumulative sums: counts from earlier days only
+        self.prior_wins = np.cumsum(wins, axis=1) - wins
+        self.prior_total = np.cumsum(total, axis=1) - total
+
+    def __len__(self):
+        return len(self.day)
+
+    @classmethod
+    def load(cls, workspace=WORKSPACE, db=None):
+        """All settled bets from BettingDB when it is populated, else the JSON files"""
+        if db is None:
+            db = open_if_populated(DB_PATH)
+        bets, _ = SettlementFeed(db, workspace).since({})
+        return cls(bets)
+
+
+def _param_matrix(param_sets):
+    """List of dicts -> (P, len(PARAMS)) array, missing keys filled from V3_PARAMS"""
+    return np.array([[float(p.get(k, V3_PARAMS[k])) for k in PARAMS] for p in param_sets])
+
+
+def _adaptive_weights(hist, alpha, beta, min_sample):
+    """
+    AdaptiveWeightUpdater.calculate_weights for every (param row, bet type, day),
+    from counts before that day. alpha / beta / min_sample are (P, 1, 1).
+    """
+    wins, count = hist.prior_wins[None], hist.prior_total[None]
+    overall_total = count.sum(axis=1, keepdims=True)
+    overall_wr = np.where(overall_total > 0, wins.sum(axis=1, keepdims=True) / np.maximum(overall_total, 1), 0.5)
+    smoothed = (wins + alpha) / (count + alpha + beta)
+    adjustment = (smoothed - overall_wr) * 2.0
+    stability = np.clip((count - 20) / 10.0, 0.0, 1.0)
+    weight = np.round(np.clip(1.0 + adjustment * stability, 0.3, 2.0), 2)
+    return np.where(count < min_sample, 1.0, weight)
+
+
+def score_matrix(hist, params):
+    """
+    (P, N) LarlScores for a (P, len(PARAMS)) parameter matrix:
+
+    (conf/100)^conf_exp × edge^edge_exp × (win_rate/0.5) × adaptive_weight
+      × high_edge_boost (edge >= high_edge) | low_edge_penalty (edge < low_edge)
+      × high_conf_boost (conf >= 80) | mid_conf_boost (conf >= 75)
+      × total_conf_boost (TOTAL with conf >= 75)
+      × moneyline_weight (MONEYLINE)
+    """
+    col = {k: params[:, i][:, None] for i, k in enumerate(PARAMS)}
+    conf, edge = hist.confidence[None], hist.edge[None]
+
+    prior_wins = hist.prior_wins[hist.type_code, hist.day]
+    prior_total = hist.prior_total[hist.type_code, hist.day]
+    win_rate = np.where(prior_total > 0, prior_wins / np.maximum(prior_total, 1), 0.5)
+
+    weights = _adaptive_weights(hist, col['alpha'][:, :, None], col['beta'][:, :, None],
+                                col['min_sample_size'][:, :, None])
+    weight = weights[:, hist.type_code, hist.day]
+
+    score = (conf / 100.0) ** col['conf_exp'] * edge ** col['edge_exp'] * (win_rate / 0.5)[None] * weight
+    score = score * np.where(edge >= col['high_edge'], col['high_edge_boost'],
+                             np.where(edge < col['low_edge'], col['low_edge_penalty'], 1.0))
+    score = score * np.where(conf >= 80, col['high_conf_boost'],
+                             np.where(conf >= 75, col['mid_conf_boost'], 1.0))
+    bet_types = np.array(hist.bet_types)[hist.type_code][None]
+    score = score * np.where((bet_types == 'TOTAL') & (conf >= 75), col['total_conf_boost'], 1.0)
+    score = score * np.where(bet_types == 'MONEYLINE', col['moneyline_weight'], 1.0)
+    return score
+
+
+def select_top(hist, scores, top_n=TOP_N):
+    """
+    (P, N) mask of the bets rank_today_bets would have put in each day's top_n:
+    best-scored side per (game, bet_type), then highest scores per day.
+    Ties keep history order, like the ranker's stable sort.
+    """
+    positions = np.arange(len(hist))[None]
+    by_score = np.argsort(-scores, axis=1, kind='stable')
+
+    # Dedup: group-major, score-descending order; the first of each group survives
+    order = np.take_along_axis(by_score, np.argsort(hist.group[by_score], axis=1, kind='stable'), axis=1)
+    first = positions == hist.group_start[hist.group[order]]
+    kept = np.zeros_like(first)
+    np.put_along_axis(kept, order, first, axis=1)
+
+    # Day-major, score-descending order with dropped sides sunk to the end of their day
+    ranked = np.where(kept, scores, -np.inf)
+    by_score = np.argsort(-ranked, axis=1, kind='stable')
+    order = np.take_along_axis(by_score, np.argsort(hist.day[by_score], axis=1, kind='stable'), axis=1)
+    in_top = (positions - hist.day_start[hist.day[order]]) < top_n
+    selected = np.zeros_like(in_top)
+    np.put_along_axis(selected, order, in_top & np.take_along_axis(kept, order, axis=1), axis=1)
+    return selected
+
+
+def evaluate(hist, params, top_n=TOP_N):
+    """Metrics for a (P, len(PARAMS)) parameter matrix, chunked to bound memory"""
+    n = max(1, len(hist))
+    chunk = max(1, CHUNK_CELLS // n)
+    out = {k: [] for k in ('picks', 'wins', 'losses', 'pushes', 'units')}
+    for start in range(0, len(params), chunk):
+        selected = select_top(hist, score_matrix(hist, params[start:start + chunk]), top_n)
+        out['picks'].append(selected.sum(axis=1))
+        out['wins'].append((selected & hist.win).sum(axis=1))
+        out['losses'].append((selected & hist.loss).sum(axis=1))
+        out['pushes'].append((selected & hist.push).sum(axis=1))
+        out['units'].append((selected * np.where(hist.win, hist.payout, np.where(hist.loss, -1.0, 0.0))).sum(axis=1))
+    return {k: np.concatenate(v) if v else np.zeros(0) for k, v in out.items()}
+
+
+# Worker processes receive the history once (initializer), then only parameter chunks
+_worker_hist = None
+
+
+def _init_worker(hist):
+    global _worker_hist
+    _worker_hist = hist
+
+
+def _evaluate_chunk(args):
+    params, top_n = args
+    return evaluate(_worker_hist, params, top_n)
+
+
+def expand_grid(grid, base=None):
+    """{'param': [values]} -> list of parameter dicts (cartesian product over base)"""
+    base = dict(base or V3_PARAMS)
+    for key in grid:
+        if key not in PARAMS:
+            raise ValueError(f'Unknown parameter: {key}')
+    keys = list(grid)
+    return [dict(base, **dict(zip(keys, values))) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+class Backtester:
+    def __init__(self, history, top_n=TOP_N, workers=None):
+        self.history = history
+        self.top_n = top_n
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, param_sets):
+        """Evaluate parameter dicts; returns one result dict per set, in input order"""
+        params = _param_matrix(param_sets)
+        if self.workers > 1 and len(params) >= PARALLEL_MIN_PARAMS:
+            splits = np.array_split(params, self.workers * 4)
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(self.history,)) as pool:
+                parts = list(pool.map(_evaluate_chunk, [(s, self.top_n) for s in splits if len(s)]))
+            metrics = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+        else:
+            metrics = evaluate(self.history, params, self.top_n)
+
+        results = []
+        for i, p in enumerate(param_sets):
+            picks, wins, losses = int(metrics['picks'][i]), int(metrics['wins'][i]), int(metrics['losses'][i])
+            units = float(metrics['units'][i])
+            results.append({
+                'params': {k: p.get(k, V3_PARAMS[k]) for k in PARAMS},
+                'picks': picks,
+                'wins': wins,
+                'losses': losses,
+                'pushes': int(metrics['pushes'][i]),
+                'win_rate': round(wins / (wins + losses) * 100, 1) if wins + losses else 0.0,
+                'units': round(units, 2),
+                'roi': round(units / picks * 100, 2) if picks else 0.0,
+                'record': f"{wins}-{losses}",
+            })
+        return results
+
+
+def best(results, metric='roi', min_picks=1, top=10):
+    eligible = [r for r in results if r['picks'] >= min_picks]
+    return sorted(eligible, key=lambda r: (r[metric], r['picks']), reverse=True)[:top]
+
+
+def _changed(params):
+    return ', '.join(f"{k}={v:g}" for k, v in params.items() if v != V3_PARAMS[k]) or 'v3 defaults'
+
+
+def print_results(baselines, ranked, hist, combos, elapsed, metric):
+    print("\n" + "=" * 80)
+    print("🧪 LARLSCORE BACKTEST")
+    print("=" * 80)
+    print(f"   History: {len(hist)} settled bets over {len(hist.dates)} days "
+          f"({hist.dates[0] if hist.dates else '-'} → {hist.dates[-1] if hist.dates else '-'})")
+    print(f"   Evaluated {combos} parameter sets in {elapsed:.2f}s")
+
+    print("\n📏 BASELINES:")
+    for name, r in baselines.items():
+        print(f"   {name:4} | {r['record']:>7} ({r['win_rate']:5.1f}%) | picks {r['picks']:4} | "
+              f"units {r['units']:+7.2f} | ROI {r['roi']:+6.2f}%")
+
+    print(f"\n🏆 TOP PARAMETER SETS (by {metric}):")
+    for i, r in enumerate(ranked, 1):
+        print(f"   #{i:2} | {r['record']:>7} ({r['win_rate']:5.1f}%) | picks {r['picks']:4} | "
+              f"units {r['units']:+7.2f} | ROI {r['roi']:+6.2f}%")
+        print(f"        {_changed(r['params'])}")
+    print("\n" + "=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest LarlScore parameter sweeps on settled history')
+    parser.add_argument('--workspace', default=str(WORKSPACE))
+    parser.add_argument('--grid', choices=sorted(GRIDS), default='formula')
+    parser.add_argument('--grid-file', help='JSON {"param": [values, ...]} (overrides --grid)')
+    parser.add_argument('--metric', choices=['roi', 'units', 'win_rate'], default='roi')
+    parser.add_argument('--min-picks', type=int, default=20, help='Ignore sets that picked fewer bets')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--top-n', type=int, default=TOP_N, help='Bets taken per day')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    hist = History.load(args.workspace)
+    if not len(hist):
+        print("❌ No settled bets found")
+        return
+
+    if args.grid_file:
+        with open(args.grid_file, 'r') as f:
+            grid = json.load(f)
+    else:
+        grid = GRIDS[args.grid]
+    param_sets = [V3_PARAMS, V4_PARAMS] + expand_grid(grid)
+
+    started = time.monotonic()
+    results = Backtester(hist, top_n=args.top_n, workers=args.workers).run(param_sets)
+    elapsed = time.monotonic() - started
+
+    baselines = {'v3': results[0], 'v4': results[1]}
+    ranked = best(results[2:], args.metric, args.min_picks, args.top)
+    print_results(baselines, ranked, hist, len(param_sets), elapsed, args.metric)
+
+    output = {
+        'generated_at': datetime.now().isoformat(),
+        'history': {'bets': len(hist), 'days': len(hist.dates),
+                    'first_date': hist.dates[0], 'last_date': hist.dates[-1]},
+        'grid': grid,
+        'combinations': len(param_sets),
+        'seconds': round(elapsed, 3),
+        'metric': args.metric,
+        'min_picks': args.min_picks,
+        'baselines': baselines,
+        'best': ranked,
+    }
+    path = Path(args.workspace) / RESULTS_FILE
+    with open(path, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\n✅ Results saved to {path}")
+
+
+if __name__ == '__main__':
+    main()
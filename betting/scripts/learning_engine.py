@@ -9,63 +9,55 @@ Features:
 - Calculates optimal thresholds (edge, confidence, risk)
 - Generates actionable recommendations for model tuning
 - Saves learning insights to learning_insights.json
+- Reads from BettingDB (betting.db) when it has been migrated, falling back to
+  the JSON files otherwise
+- Every report is a roll-up over a PerformanceCube: a full run rebuilds it in one
+  pass from the deduplicated settlement feed, --incremental folds new
+  settlements into performance_cube.json
+- --incremental: only settlements since the last run are read (see
+  incremental_learning.SettlementFeed); insights are rewritten only on change
+- Closing line value (closing_line_value.py) next to win rate: average CLV and
+  beat-the-close rate per sport / bet type, a far lower-variance signal than W/L
 """
 
-import json
-import glob
+import argparse
+import os
 from datetime import datetime
 from collections import defaultdict
-import statistics
+
+from betting_database import open_if_populated
+from performance_cube import PerformanceCube, DIMENSIONS as CUBE_DIMENSIONS, CONFIDENCE_BUCKETS, EDGE_BUCKETS, clv_entry
+from incremental_learning import SettlementFeed, refresh_cube, write_json_if_changed
+
+MIN_CLV_BETS = 10  # bets with a closing line before CLV drives a recommendation
 
 class LearningEngine:
-    def __init__(self):
+    def __init__(self, use_db=True):
         self.learning_file = 'learning_insights.json'
         self.completed_bets = []
         self.insights = {}
+        self.db = open_if_populated() if use_db else None
+        self.cube_file = 'performance_cube.json'
+        self.cube = PerformanceCube()
         
     def load_completed_bets(self):
-        """Load all completed bets from all sources"""
-        all_bets = []
-        
-        # Load from bet_tracker_input.json
-        try:
-            with open('bet_tracker_input.json', 'r') as f:
-                tracker = json.load(f)
-                for b in tracker.get('bets', []):
-                    b['result'] = (b.get('result') or '').strip().upper()
-                bets = [b for b in tracker.get('bets', []) if b.get('result') in ['WIN', 'LOSS']]
-                all_bets.extend(bets)
-        except:
-            pass
-        
-        # Load from completed_bets_*.json files
-        for filename in glob.glob('completed_bets_*.json'):
-            try:
-                with open(filename, 'r') as f:
-                    completed_file = json.load(f)
-                    for b in completed_file.get('bets', []):
-                        b['result'] = (b.get('result') or '').strip().upper()
-                    bets = [b for b in completed_file.get('bets', []) if b.get('result') in ['WIN', 'LOSS']]
-                    all_bets.extend(bets)
-            except:
-                pass
-        
-        # Deduplicate
-        seen = set()
-        unique_bets = []
-        for bet in all_bets:
-            game = (bet.get('game') or bet.get('game_name') or '').strip()
-            rec = (bet.get('recommendation') or '').strip()
-            key = (game, bet.get('bet_type'), rec)
-            if key not in seen:
-                seen.add(key)
-                unique_bets.append(bet)
-        
-        self.completed_bets = unique_bets
-        return len(unique_bets)
+        """
+        Load all completed bets from all sources and rebuild the cube from scratch.
+        Same deduplicated settlement feed as --incremental, read from an empty
+        watermark, so a full run drops bets removed or re-graded at the source.
+        """
+        bets, watermark = SettlementFeed(self.db).since({})
+        self.cube = PerformanceCube.from_bets(bets)
+        self.cube.watermark = watermark
+        self.cube.save(self.cube_file)
+        self.completed_bets = [b for b in bets if b.get('result') in ('WIN', 'LOSS')]
+        return len(self.completed_bets)
     
     def analyze_by_dimension(self, dimension_key):
         """Analyze performance by any dimension (sport, bet_type, risk_tier, etc.)"""
+        if dimension_key in CUBE_DIMENSIONS:
+            return self.cube.win_rate_table(dimension_key)
+        
         stats = defaultdict(lambda: {'wins': 0, 'losses': 0, 'total': 0})
         
         for bet in self.completed_bets:
@@ -98,107 +90,28 @@ class LearningEngine:
     
     def analyze_confidence_buckets(self):
         """Analyze win rate by confidence level buckets"""
-        buckets = {
-            '90-100%': {'wins': 0, 'losses': 0, 'confidences': []},
-            '80-89%': {'wins': 0, 'losses': 0, 'confidences': []},
-            '70-79%': {'wins': 0, 'losses': 0, 'confidences': []},
-            '60-69%': {'wins': 0, 'losses': 0, 'confidences': []},
-            '50-59%': {'wins': 0, 'losses': 0, 'confidences': []},
-        }
-        
-        for bet in self.completed_bets:
-            confidence = bet.get('confidence', 0)
-            result = bet.get('result')
-            
-            if confidence >= 90:
-                bucket = '90-100%'
-            elif confidence >= 80:
-                bucket = '80-89%'
-            elif confidence >= 70:
-                bucket = '70-79%'
-            elif confidence >= 60:
-                bucket = '60-69%'
-            else:
-                bucket = '50-59%'
-            
-            buckets[bucket]['confidences'].append(confidence)
-            if result == 'WIN':
-                buckets[bucket]['wins'] += 1
-            elif result == 'LOSS':
-                buckets[bucket]['losses'] += 1
-        
-        results = {}
-        for bucket, data in buckets.items():
-            total = data['wins'] + data['losses']
-            if total > 0:
-                win_rate = (data['wins'] / total) * 100
-                avg_confidence = statistics.mean(data['confidences']) if data['confidences'] else 0
-                results[bucket] = {
-                    'wins': data['wins'],
-                    'losses': data['losses'],
-                    'total': total,
-                    'win_rate': round(win_rate, 1),
-                    'avg_confidence': round(avg_confidence, 1),
-                    'record': f"{data['wins']}-{data['losses']}"
-                }
-        
-        return results
+        return self.cube.win_rate_table('confidence_bucket', CONFIDENCE_BUCKETS, 'avg_confidence')
     
     def analyze_edge_buckets(self):
         """Analyze win rate by edge size"""
-        buckets = {
-            '10+ pts': {'wins': 0, 'losses': 0, 'edges': []},
-            '5-9.9 pts': {'wins': 0, 'losses': 0, 'edges': []},
-            '3-4.9 pts': {'wins': 0, 'losses': 0, 'edges': []},
-            '1-2.9 pts': {'wins': 0, 'losses': 0, 'edges': []},
-            '0-0.9 pts': {'wins': 0, 'losses': 0, 'edges': []},
+        return self.cube.win_rate_table('edge_bucket', EDGE_BUCKETS, 'avg_edge')
+    
+    def analyze_clv(self):
+        """Closing line value overall and per sport / bet type"""
+        return {
+            'overall': clv_entry(self.cube.totals()),
+            'by_sport': self.cube.clv_table('sport'),
+            'by_bet_type': self.cube.clv_table('bet_type'),
         }
-        
-        for bet in self.completed_bets:
-            edge = bet.get('edge', 0)
-            result = bet.get('result')
-            
-            if edge >= 10:
-                bucket = '10+ pts'
-            elif edge >= 5:
-                bucket = '5-9.9 pts'
-            elif edge >= 3:
-                bucket = '3-4.9 pts'
-            elif edge >= 1:
-                bucket = '1-2.9 pts'
-            else:
-                bucket = '0-0.9 pts'
-            
-            buckets[bucket]['edges'].append(edge)
-            if result == 'WIN':
-                buckets[bucket]['wins'] += 1
-            elif result == 'LOSS':
-                buckets[bucket]['losses'] += 1
-        
-        results = {}
-        for bucket, data in buckets.items():
-            total = data['wins'] + data['losses']
-            if total > 0:
-                win_rate = (data['wins'] / total) * 100
-                avg_edge = statistics.mean(data['edges']) if data['edges'] else 0
-                results[bucket] = {
-                    'wins': data['wins'],
-                    'losses': data['losses'],
-                    'total': total,
-                    'win_rate': round(win_rate, 1),
-                    'avg_edge': round(avg_edge, 1),
-                    'record': f"{data['wins']}-{data['losses']}"
-                }
-        
-        return results
     
     def generate_recommendations(self):
         """Generate actionable recommendations based on analysis"""
         recommendations = []
         
         # Overall stats
-        total_bets = len(self.completed_bets)
-        total_wins = sum(1 for b in self.completed_bets if b.get('result') == 'WIN')
+        totals = self.cube.totals()
+        total_bets = totals['wins'] + totals['losses']
+        total_wins = totals['wins']
         overall_win_rate = (total_wins / total_bets * 100) if total_bets > 0 else 0
         
         # Analyze by sport
@@ -266,6 +179,25 @@ class LearningEngine:
                         'reason': f"Only {stats['win_rate']}% win rate with edge range {bucket}"
                     })
         
+        # Closing line value: converges long before win rate does
+        for bet_type, stats in self.cube.clv_table('bet_type').items():
+            if stats['clv_bets'] < MIN_CLV_BETS:
+                continue
+            if stats['avg_clv'] < 0:
+                recommendations.append({
+                    'type': 'CLV',
+                    'priority': 'HIGH',
+                    'action': f"Review {bet_type} picks - the market closes against them (avg CLV {stats['avg_clv']:+.2f}%)",
+                    'reason': f"Only {stats['beat_close_pct']}% of {stats['clv_bets']} bets beat the closing line"
+                })
+            elif stats['avg_clv'] >= 1.0:
+                recommendations.append({
+                    'type': 'CLV',
+                    'priority': 'LOW',
+                    'action': f"{bet_type} picks beat the close (avg CLV {stats['avg_clv']:+.2f}%)",
+                    'reason': f"{stats['beat_close_pct']}% of {stats['clv_bets']} bets beat the closing line - edge is real even if W/L lags"
+                })
+        
         # Risk tier analysis
         by_risk = self.analyze_by_dimension('risk_tier')
         for tier, stats in by_risk.items():
@@ -326,36 +258,69 @@ class LearningEngine:
         
         return thresholds
     
-    def run_analysis(self):
-        """Run complete analysis and save insights"""
+    def build_insights(self):
+        """Insights dict from the current cube (no printing, no files)"""
+        totals = self.cube.totals()
+        num_bets = totals['wins'] + totals['losses']
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'total_bets_analyzed': num_bets,
+            'overall_win_rate': round(totals['wins'] / num_bets * 100, 1) if num_bets else 0,
+            'by_sport': self.analyze_by_dimension('sport'),
+            'by_bet_type': self.analyze_by_dimension('bet_type'),
+            'by_risk_tier': self.analyze_by_dimension('risk_tier'),
+            'by_confidence': self.analyze_confidence_buckets(),
+            'by_edge': self.analyze_edge_buckets(),
+            'clv': self.analyze_clv(),
+            'recommendations': self.generate_recommendations(),
+            'optimal_thresholds': self.calculate_optimal_thresholds()
+        }
+    
+    def run_analysis(self, incremental=False):
+        """Run complete analysis and save insights (only written when they change)
+        
+        incremental=True folds in just the settlements since the cube's watermark
+        and returns early when nothing new has settled.
+        """
         print("\n" + "=" * 70)
         print("🧠 LarlBot Learning Engine v1.0")
         print("=" * 70)
         
         # Load data
-        num_bets = self.load_completed_bets()
-        print(f"📊 Loaded {num_bets} completed bets for analysis\n")
+        if incremental:
+            self.cube, changed = refresh_cube(self.cube_file, self.db)
+            totals = self.cube.totals()
+            num_bets = totals['wins'] + totals['losses']
+            print(f"📊 {changed} new settlements since last run ({num_bets} completed bets)\n")
+            if not changed and os.path.exists(self.learning_file):
+                print("✅ Nothing new settled - insights unchanged")
+                return None
+        else:
+            self.load_completed_bets()
+            totals = self.cube.totals()
+            num_bets = totals['wins'] + totals['losses']
+            print(f"📊 Loaded {num_bets} completed bets for analysis\n")
         
         if num_bets < 5:
             print("⚠️  Need at least 5 completed bets to generate insights")
             print("Keep betting and check back later!")
             return
         
-        # Run analyses
-        by_sport = self.analyze_by_dimension('sport')
-        by_bet_type = self.analyze_by_dimension('bet_type')
-        by_risk = self.analyze_by_dimension('risk_tier')
-        by_confidence = self.analyze_confidence_buckets()
-        by_edge = self.analyze_edge_buckets()
-        recommendations = self.generate_recommendations()
-        optimal_thresholds = self.calculate_optimal_thresholds()
+        insights = self.build_insights()
+        by_sport = insights['by_sport']
+        by_bet_type = insights['by_bet_type']
+        by_risk = insights['by_risk_tier']
+        by_confidence = insights['by_confidence']
+        by_edge = insights['by_edge']
+        recommendations = insights['recommendations']
+        optimal_thresholds = insights['optimal_thresholds']
         
         # Overall stats
-        total_wins = sum(1 for b in self.completed_bets if b.get('result') == 'WIN')
+        total_wins = totals['wins']
         overall_win_rate = (total_wins / num_bets * 100)
         
         # Display results
-        print(f"📈 Overall Win Rate: {overall_win_rate:.1f}% ({total_wins}-{num_bets - total_wins})\n")
+        print(f"📈 Overall Win Rate: {overall_win_rate:.1f}% ({total_wins}-{totals['losses']})\n")
         
         print("🏀 Performance by Sport:")
         for sport, stats in sorted(by_sport.items(), key=lambda x: x[1]['win_rate'], reverse=True):
@@ -379,6 +344,15 @@ class LearningEngine:
             emoji = '🔥' if stats['win_rate'] >= 75 else '✅' if stats['win_rate'] >= 60 else '⚠️' if stats['win_rate'] >= 50 else '❌'
             print(f"  {emoji} {bucket:12} {stats['record']:6} ({stats['win_rate']:5.1f}%)")
         
+        clv = insights['clv']
+        if clv['overall']['clv_bets']:
+            print("\n📈 Closing Line Value:")
+            overall = clv['overall']
+            print(f"  Overall: {overall['avg_clv']:+.2f}% avg CLV, beat the close {overall['beat_close_pct']}% ({overall['clv_bets']} bets)")
+            for bet_type, stats in sorted(clv['by_bet_type'].items(), key=lambda x: x[1]['avg_clv'], reverse=True):
+                emoji = '✅' if stats['avg_clv'] > 0 else '⚠️'
+                print(f"  {emoji} {bet_type:12} {stats['avg_clv']:+6.2f}% ({stats['beat_close_pct']:5.1f}% beat close, {stats['clv_bets']} bets)")
+        
         print("\n🎲 Risk Tier Performance:")
         for tier, stats in sorted(by_risk.items(), key=lambda x: x[1]['win_rate'], reverse=True):
             emoji = '🔥' if stats['win_rate'] >= 75 else '✅' if stats['win_rate'] >= 60 else '⚠️' if stats['win_rate'] >= 50 else '❌'
@@ -399,25 +373,18 @@ class LearningEngine:
         print(f"  • Max High-Risk %: {optimal_thresholds['max_high_risk_pct']}%")
         
         # Save insights
-        insights = {
-            'generated_at': datetime.now().isoformat(),
-            'total_bets_analyzed': num_bets,
-            'overall_win_rate': round(overall_win_rate, 1),
-            'by_sport': by_sport,
-            'by_bet_type': by_bet_type,
-            'by_risk_tier': by_risk,
-            'by_confidence': by_confidence,
-            'by_edge': by_edge,
-            'recommendations': recommendations,
-            'optimal_thresholds': optimal_thresholds
-        }
-        
-        with open(self.learning_file, 'w') as f:
-            json.dump(insights, f, indent=2)
-        
-        print(f"\n💾 Insights saved to: {self.learning_file}")
+        if write_json_if_changed(self.learning_file, insights):
+            print(f"\n💾 Insights saved to: {self.learning_file}")
+        else:
+            print(f"\n💾 Insights unchanged: {self.learning_file}")
         print("=" * 70)
+        return insights
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='LarlBot Learning Engine')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fold in settlements since the last run')
+    args = parser.parse_args()
+    
     engine = LearningEngine()
-    engine.run_analysis()
+    engine.run_analysis(incremental=args.incremental)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+⚖️ Market Consensus - no-vig fair prices from every book in the odds payload
+
+The OddsAPI response already carries every US book's spread, total and h2h
+prices; picks are still placed at FanDuel, but the rest of the market tells us
+where the fair line is. For a slate:
+
+1. Every book's prices go into (games x books) arrays (NaN where a book has no
+   market), one vectorized pass for the whole slate.
+2. Each book is de-vigged (both sides' implied probabilities normalized to 1)
+   and turned into the mean it implies with a normal margin/total model (sd from
+   game_simulator's league priors), so books hanging different numbers agree
+   on one scale:
+       spread: P(home covers s) = Φ((μ + s) / sd)   ->  μ = sd·Φ⁻¹(p) - s
+       total:  P(over t)        = Φ((μ - t) / sd)   ->  μ = t + sd·Φ⁻¹(p)
+3. Consensus = mean over the other books (FanDuel excluded, so its own price
+   can be judged against the market); fair lines are -μ (spread) and μ (total).
+4. FanDuel is off-market when its de-vigged probability differs from the
+   consensus probability at its own number by OFF_MARKET_PROB or more.
+
+attach_consensus() sets on each pick:
+    consensus_probability  fair win probability of the pick at its line (%)
+    market_edge            model probability - consensus probability (% points)
+    price_value            consensus probability - implied by the FanDuel price
+    fair_line, consensus_books, off_market
+
+No extra API calls: everything comes from the events get_games_for_sport /
+OddsCollector.get_sports_odds already fetched.
+
+USAGE:
+    from market_consensus import attach_consensus, slate_consensus
+    attach_consensus(picks, events)          # events: raw OddsAPI games
+    slate_consensus(events)                  # {"Away @ Home": {...}}
+"""
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+from closing_line_value import SPORT_KEYS, line_sd
+from portfolio_allocator import bet_odds, model_probability
+
+REFERENCE_BOOK = 'fanduel'
+OFF_MARKET_PROB = 0.03      # |FanDuel no-vig - consensus| that counts as off-market
+
+# per book, per game: home spread + both prices, total + both prices, both moneylines
+FIELDS = ('home_spread', 'home_spread_price', 'away_spread_price',
+          'total', 'over_price', 'under_price', 'home_ml', 'away_ml')
+_F = {name: i for i, name in enumerate(FIELDS)}
+
+_SPORT_NAMES = {key: name for name, key in SPORT_KEYS.items()}
+
+
+def _outcome(outcomes, team):
+    team = team.lower()
+    return next((o for o in outcomes if o.get('name', '').lower() == team), None) or \
+        next((o for o in outcomes if team in o.get('name', '').lower()), None)
+
+
+def book_prices(bookmaker, home, away):
+    """One bookmaker's markets -> row of FIELDS (NaN where missing)"""
+    row = [np.nan] * len(FIELDS)
+    for market in bookmaker.get('markets', []):
+        outcomes = market.get('outcomes', [])
+        if market.get('key') in ('spreads', 'h2h'):
+            h, a = _outcome(outcomes, home), _outcome(outcomes, away)
+            if not (h and a):
+                continue
+            if market['key'] == 'spreads':
+                row[_F['home_spread']] = h.get('point', np.nan)
+                row[_F['home_spread_price']], row[_F['away_spread_price']] = h.get('price', np.nan), a.get('price', np.nan)
+            else:
+                row[_F['home_ml']], row[_F['away_ml']] = h.get('price', np.nan), a.get('price', np.nan)
+        elif market.get('key') == 'totals':
+            over = next((o for o in outcomes if o.get('name', '').lower() == 'over'), None)
+            under = next((o for o in outcomes if o.get('name', '').lower() == 'under'), None)
+            if over and under:
+                row[_F['total']] = over.get('point', np.nan)
+                row[_F['over_price']], row[_F['under_price']] = over.get('price', np.nan), under.get('price', np.nan)
+    return [np.nan if v is None else v for v in row]
+
+
+def slate_arrays(events, reference=REFERENCE_BOOK):
+    """
+    OddsAPI events -> (games, books, prices, is_reference):
+    prices is (n_games, n_books, len(FIELDS)), is_reference a (n_books,) mask.
+    """
+    games, books, rows = [], {}, []
+    for event in events or []:
+        home, away = event.get('home_team'), event.get('away_team')
+        if not (home and away) or not event.get('bookmakers'):
+            continue
+        games.append({'game': f"{away} @ {home}", 'home': home, 'away': away,
+                      'sport': _SPORT_NAMES.get(event.get('sport_key'), event.get('sport_title'))})
+        rows.append({books.setdefault(bm.get('key') or bm.get('title', '').lower(), len(books)): book_prices(bm, home, away)
+                     for bm in event['bookmakers']})
+    prices = np.full((len(games), len(books), len(FIELDS)), np.nan)
+    for g, row in enumerate(rows):
+        for b, values in row.items():
+            prices[g, b] = values
+    names = list(books)
+    return games, names, prices, np.array([name == reference for name in names], dtype=bool)
+
+
+def _implied(odds):
+    """American odds -> implied probability (vectorized, NaN for missing/invalid prices)"""
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = np.where(odds > 0, 100.0 / (odds + 100.0), -odds / (100.0 - odds))
+    return np.where(np.abs(odds) >= 100, p, np.nan)
+
+
+def _no_vig(ours, theirs):
+    p, q = _implied(ours), _implied(theirs)
+    return p / (p + q)
+
+
+def _mean(values, mask):
+    """Mean over books (axis 1) where mask is set, NaN when no book qualifies"""
+    ok = mask & ~np.isnan(values)
+    n = ok.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(n > 0, np.where(ok, values, 0.0).sum(axis=1) / n, np.nan), n
+
+
+def _col(prices, name):
+    return prices[:, :, _F[name]]
+
+
+def _clip(p):
+    return np.clip(p, 1e-6, 1 - 1e-6)
+
+
+def slate_consensus(events, reference=REFERENCE_BOOK, off_market=OFF_MARKET_PROB):
+    """
+    {"Away @ Home": {'home', 'away', 'sport', 'books', 'spread', 'total', 'moneyline'}}
+    for every event with prices. Each market holds the consensus mean ('mu',
+    home margin / expected total; 'home_prob' for moneyline), 'sd', the fair line,
+    the number of books behind it, and - when FanDuel posts the market - its line,
+    its no-vig probability, the consensus probability at its line and 'off_market'
+    (the reference line of a moneyline is FanDuel's home price).
+    """
+    games, books, prices, is_ref = slate_arrays(events, reference)
+    if not games:
+        return {}
+    others = np.broadcast_to(~is_ref, prices.shape[:2])
+    ref = int(np.argmax(is_ref)) if is_ref.any() else None
+
+    sd_spread = np.array([line_sd(g['sport'], 'SPREAD') for g in games])[:, None]
+    sd_total = np.array([line_sd(g['sport'], 'TOTAL') for g in games])[:, None]
+
+    p_home_cover = _no_vig(_col(prices, 'home_spread_price'), _col(prices, 'away_spread_price'))
+    p_over = _no_vig(_col(prices, 'over_price'), _col(prices, 'under_price'))
+    p_home_win = _no_vig(_col(prices, 'home_ml'), _col(prices, 'away_ml'))
+    mu_margin_b = sd_spread * ndtri(_clip(p_home_cover)) - _col(prices, 'home_spread')
+    mu_total_b = _col(prices, 'total') + sd_total * ndtri(_clip(p_over))
+
+    markets = {}
+    for market, per_book, sd in (('spread', mu_margin_b, sd_spread[:, 0]),
+                                 ('total', mu_total_b, sd_total[:, 0]),
+                                 ('moneyline', p_home_win, None)):
+        mu, n = _mean(per_book, others)
+        entry = {'mu': mu, 'sd': sd, 'books': n}
+        if ref is not None:
+            if market == 'spread':
+                line, ref_p = _col(prices, 'home_spread')[:, ref], p_home_cover[:, ref]
+                at_line = ndtr((mu + line) / sd)
+            elif market == 'total':
+                line, ref_p = _col(prices, 'total')[:, ref], p_over[:, ref]
+                at_line = ndtr((mu - line) / sd)
+            else:
+                line, ref_p, at_line = _col(prices, 'home_ml')[:, ref], p_home_win[:, ref], mu
+            gap = ref_p - at_line
+            entry.update(line=line, reference_prob=ref_p, consensus_prob=at_line,
+                         off_market=np.abs(np.nan_to_num(gap)) >= off_market)
+        markets[market] = entry
+
+    any_price = ~np.isnan(prices).all(axis=2)
+    out = {}
+    for g, game in enumerate(games):
+        row = dict(game, books=[books[b] for b in np.flatnonzero(any_price[g])])
+        for market, entry in markets.items():
+            if not entry['books'][g]:
+                continue
+            mu = float(entry['mu'][g])
+            info = {'books': int(entry['books'][g])}
+            if market == 'moneyline':
+                info['home_prob'] = round(mu, 4)
+            else:
+                info.update(mu=round(mu, 2), sd=round(float(entry['sd'][g]), 2),
+                            fair_line=round(-mu if market == 'spread' else mu, 1))
+            if 'reference_prob' in entry and not np.isnan(entry['reference_prob'][g]):
+                info.update(reference_line=None if np.isnan(entry['line'][g]) else float(entry['line'][g]),
+                            reference_prob=round(float(entry['reference_prob'][g]), 4),
+                            consensus_prob=round(float(entry['consensus_prob'][g]), 4),
+                            off_market=bool(entry['off_market'][g]))
+            row[market] = info
+        out[game['game']] = row
+    return out
+
+
+def _pick_terms(pick, game):
+    """(market key, mu, sd, sign, line) to price a pick: P = Φ(sign·(mu ± line)/sd)"""
+    bet_type = str(pick.get('bet_type') or '').upper()
+    recommendation = str(pick.get('recommendation') or '').strip()
+    if bet_type == 'MONEYLINE':
+        side = recommendation.replace('(Moneyline)', '').strip()
+        if side not in (game['home'], game['away']):
+            return None
+        return 'moneyline', side == game['home']
+    side, _, line = recommendation.rpartition(' ')
+    try:
+        line = float(line)
+    except ValueError:
+        return None
+    side = side.strip()
+    if bet_type == 'TOTAL' and side.upper() in ('OVER', 'UNDER'):
+        return 'total', side.upper() == 'OVER', line
+    if bet_type == 'SPREAD' and side in (game['home'], game['away']):
+        return 'spread', side == game['home'], line
+    return None
+
+
+def attach_consensus(picks, events, reference=REFERENCE_BOOK, off_market=OFF_MARKET_PROB):
+    """
+    Price every pick against the market consensus of the same events (one
+    vectorized pass over the slate). Returns the number of picks priced.
+    """
+    consensus = slate_consensus(events, reference, off_market)
+    rows = []
+    for pick in picks:
+        game = consensus.get(str(pick.get('game', '')).strip())
+        terms = _pick_terms(pick, game) if game else None
+        if terms and terms[0] in game:
+            rows.append((pick, game, terms))
+    if not rows:
+        return 0
+
+    # Φ(z) for every spread/total pick at its own number; moneylines use the consensus directly
+    z = np.zeros(len(rows))
+    for i, (_, game, terms) in enumerate(rows):
+        market, first_side = terms[0], terms[1]
+        info = game[market]
+        if market == 'spread':
+            # home covers s: M + s > 0; away covers its s: -M + s > 0
+            z[i] = (info['mu'] + terms[2]) / info['sd'] if first_side else (terms[2] - info['mu']) / info['sd']
+        elif market == 'total':
+            z[i] = (info['mu'] - terms[2]) / info['sd'] if first_side else (terms[2] - info['mu']) / info['sd']
+    p_line = ndtr(z)
+    paid = _implied([bet_odds(pick) for pick, _, _ in rows])
+    model = np.array([model_probability(pick) for pick, _, _ in rows])
+
+    for i, (pick, game, terms) in enumerate(rows):
+        market, first_side = terms[0], terms[1]
+        info = game[market]
+        if market == 'moneyline':
+            p = info['home_prob'] if first_side else 1 - info['home_prob']
+            fair_line = None
+        else:
+            p = float(p_line[i])
+            fair_line = info['fair_line'] if first_side or market == 'total' else -info['fair_line']
+        pick['consensus_probability'] = round(p * 100, 1)
+        pick['market_edge'] = round(float(model[i] - p) * 100, 1)
+        pick['price_value'] = None if np.isnan(paid[i]) else round(float(p - paid[i]) * 100, 1)
+        pick['fair_line'] = fair_line
+        pick['consensus_books'] = info['books']
+        pick['off_market'] = info.get('off_market', False)
+    return len(rows)
+
+
+def off_market_lines(consensus):
+    """[(game, market, FanDuel line, FanDuel prob, consensus prob)] where FanDuel is off-market"""
+    flagged = []
+    for game, row in consensus.items():
+        for market in ('spread', 'total', 'moneyline'):
+            info = row.get(market)
+            if info and info.get('off_market'):
+                flagged.append((game, market, info.get('reference_line'), info['reference_prob'], info['consensus_prob']))
+    return flagged
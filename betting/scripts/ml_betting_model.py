@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+🧠 ML Betting Model - win probability learned from the real settled history
+
+Replaces the archived synthetic-data model (ARCHIVED_OLD_MODELS/ml_betting_model.py).
+Trained on every settled bet (SettlementFeed) joined with:
+- line data: bet type, line, posted price (implied probability), side
+- the heuristic model's own output: raw confidence and edge
+- team features from the feature store row of the event as of the game date
+  (season efficiency/pace, last-5 form, rest, injuries), so training never sees
+  results from after the bet and live scoring reads the same numbers
+
+Model: HistGradientBoostingClassifier (handles missing team features natively,
+fast batch inference). Training runs as a background job and pickles the model
+to ml_model.pkl; the pipeline loads it once per process and scores the whole
+slate with one predict_proba call. Predictions are cached by feature-row hash,
+so an odds refresh only scores the rows whose features changed.
+
+Before the final fit, a time-ordered holdout (latest HOLDOUT_FRACTION of dates)
+compares the model against the heuristic confidence (Brier, log loss, accuracy);
+walk_forward.py adds an 'ml' strategy for the out-of-sample ranking comparison.
+
+USAGE:
+    python3 ml_betting_model.py --train     # fit on all settled bets, save
+    python3 ml_betting_model.py             # show the saved model's holdout metrics
+"""
+
+import argparse
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+from betting_database import open_if_populated, clean_label
+from calibration_model import raw_confidence
+from feature_store import FeatureStore, make_event, event_id
+from game_results_store import DB_PATH
+from game_simulator import LEAGUES
+from incremental_learning import SettlementFeed, dedupe_settlements
+from portfolio_allocator import american_to_decimal, bet_odds
+
+ML_MODEL_FILE = 'ml_model.pkl'
+MODEL_VERSION = 1
+MIN_TRAIN = 50              # settled WIN/LOSS bets before a model is fitted
+HOLDOUT_FRACTION = 0.2
+EST = pytz.timezone('America/Detroit')
+
+PICK_FEATURES = (
+    'is_spread', 'is_moneyline', 'is_total', 'is_nba',
+    'raw_confidence', 'edge', 'implied_probability', 'line', 'side_home', 'side_over',
+)
+# Team inputs come from the feature store, so training, walk-forward and live scoring share them
+STORE_FEATURES = (
+    'home_off_eff', 'home_def_eff', 'home_pace', 'away_off_eff', 'away_def_eff', 'away_pace',
+    'home_ppg', 'away_ppg', 'home_margin', 'away_margin', 'home_rest', 'away_rest',
+    'home_injury_points', 'away_injury_points',
+)
+FEATURES = PICK_FEATURES + STORE_FEATURES
+
+MODEL_PARAMS = dict(max_iter=200, learning_rate=0.05, max_leaf_nodes=15, min_samples_leaf=20,
+                    l2_regularization=1.0, random_state=42)
+
+
+def _float(value, default=np.nan):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class FeatureBuilder:
+    """Bets -> feature matrix: pick-level features + the event's feature store row (as of the game date)"""
+
+    def __init__(self, db_path=DB_PATH, store=None):
+        self.store = store or FeatureStore(db_path=db_path)
+        self._keys = {}     # event id -> store key, materialized once per builder
+
+    def _event(self, bet, today):
+        league = next((lg for name, lg in LEAGUES.items() if name == clean_label(bet.get('sport'))), None)
+        away, sep, home = str(bet.get('game') or '').partition(' @ ')
+        if not league or not sep:
+            return None
+        return make_event(league, home, away, str(bet.get('date') or today)[:10])
+
+    def pick_row(self, bet, event):
+        bet_type = str(bet.get('bet_type') or 'SPREAD').upper()
+        home, away = (event['home'], event['away']) if event else ('', '')
+
+        recommendation = str(bet.get('recommendation') or '').strip()
+        side, _, line = recommendation.rpartition(' ')
+        line = _float(line)
+        if bet_type == 'MONEYLINE':
+            side, line = recommendation.replace('(Moneyline)', '').strip(), np.nan
+        side_home = 1.0 if home and side.strip() == home else 0.0 if away and side.strip() == away else 0.5
+        side_over = 1.0 if side.upper() == 'OVER' else 0.0 if side.upper() == 'UNDER' else 0.5
+        return [
+            float(bet_type == 'SPREAD'), float(bet_type == 'MONEYLINE'), float(bet_type == 'TOTAL'),
+            float(bool(event) and event['league'] == 'nba'),
+            raw_confidence(bet), _float(bet.get('edge')),
+            1.0 / float(american_to_decimal(bet_odds(bet))), line, side_home, side_over,
+        ]
+
+    def matrix(self, bets):
+        today = datetime.now(EST).strftime('%Y-%m-%d')
+        events = [self._event(b, today) for b in bets]
+        missing = {}
+        for e in events:
+            if e and event_id(e) not in self._keys:
+                missing[event_id(e)] = e
+        if missing:
+            for eid, key in zip(missing, self.store.materialize(list(missing.values()))):
+                self._keys[eid] = key
+        picks = np.array([self.pick_row(b, e) for b, e in zip(bets, events)], dtype=float)
+        team = self.store.matrix([self._keys[event_id(e)] if e else ('', '') for e in events], STORE_FEATURES)
+        return np.hstack([picks.reshape(len(bets), len(PICK_FEATURES)), team])
+
+
+def labelled(bets):
+    """Settled WIN/LOSS bets in date order, one per settlement, with 0/1 labels"""
+    bets = sorted((b for b in dedupe_settlements(bets) if str(b.get('result') or '').upper() in ('WIN', 'LOSS')),
+                  key=lambda b: str(b.get('date') or ''))
+    return bets, np.array([str(b['result']).upper() == 'WIN' for b in bets], dtype=int)
+
+
+def _scores(y, p):
+    p = np.clip(p, 1e-6, 1 - 1e-6)
+    return {
+        'brier': round(float(np.mean((p - y) ** 2)), 4),
+        'log_loss': round(float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))), 4),
+        'accuracy': round(float(np.mean((p >= 0.5) == y)), 4),
+    }
+
+
+def fit(X, y):
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    model = HistGradientBoostingClassifier(**MODEL_PARAMS)
+    # a feature with no values yet (e.g. no results store) can't be binned; it carries nothing anyway
+    model.fit(np.where(np.isnan(X).all(axis=0), 0.0, X), y)
+    return model
+
+
+def holdout_metrics(bets, X, y):
+    """Fit on all but the latest HOLDOUT_FRACTION of dates; ML vs heuristic confidence on the rest"""
+    dates = sorted({str(b.get('date') or '') for b in bets})
+    if len(dates) < 2:
+        return {}
+    cutoff = dates[int(len(dates) * (1 - HOLDOUT_FRACTION))]
+    split = sum(1 for b in bets if str(b.get('date') or '') < cutoff)
+    if split < MIN_TRAIN or len(set(y[:split])) < 2:
+        return {}
+    predicted = fit(X[:split], y[:split]).predict_proba(X[split:])[:, 1]
+    heuristic = np.clip(X[split:, FEATURES.index('raw_confidence')] / 100.0, 0.01, 0.99)
+    return {'holdout_from': cutoff, 'holdout_bets': len(bets) - split,
+            'ml': _scores(y[split:], predicted), 'heuristic': _scores(y[split:], heuristic)}
+
+
+def train(bets, features=None, holdout=True):
+    """
+    Fit on every settled bet (after a holdout comparison unless holdout=False).
+    Returns the model payload (what ml_model.pkl holds) or None if history is too thin.
+    """
+    bets, y = labelled(bets)
+    if len(bets) < MIN_TRAIN or len(set(y)) < 2:
+        return None
+    X = (features or FeatureBuilder()).matrix(bets)
+    return {
+        'version': MODEL_VERSION,
+        'features': FEATURES,
+        'model': fit(X, y),
+        'trained_at': datetime.now().isoformat(),
+        'trained_on': len(bets),
+        'metrics': holdout_metrics(bets, X, y) if holdout else {},
+    }
+
+
+def save(payload, path=ML_MODEL_FILE):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def load(path=ML_MODEL_FILE):
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None
+    if payload.get('version') != MODEL_VERSION or tuple(payload.get('features', ())) != FEATURES:
+        return None  # retrain on layout changes
+    return payload
+
+
+class MLBettingModel:
+    """Loaded once; batch win probabilities for a slate, cached by feature hash"""
+
+    def __init__(self, path=ML_MODEL_FILE, db_path=DB_PATH):
+        self.payload = load(path)
+        self.model = self.payload['model'] if self.payload else None
+        self.features = FeatureBuilder(db_path)  # forms before today don't change within a day
+        self._cache = {}
+
+    def predict_proba(self, bets):
+        """Win probability (0-1) per bet, or None when no model is trained"""
+        if self.model is None:
+            return None
+        if not bets:
+            return np.zeros(0)
+        X = self.features.matrix(bets)
+        keys = [row.tobytes() for row in X]
+        missing = [i for i, k in enumerate(keys) if k not in self._cache]
+        if missing:
+            for i, p in zip(missing, self.model.predict_proba(X[missing])[:, 1]):
+                self._cache[keys[i]] = float(p)
+        return np.array([self._cache[k] for k in keys])
+
+    def enhance_picks(self, picks):
+        """Set ml_probability (%) on every pick; confidence is left to the heuristic + calibration"""
+        probs = self.predict_proba(picks)
+        if probs is None:
+            return picks
+        for pick, p in zip(picks, probs):
+            pick['ml_probability'] = round(float(p) * 100, 1)
+        return picks
+
+
+def print_metrics(payload):
+    print(f"🧠 ML model trained {payload['trained_at'][:16]} on {payload['trained_on']} settled bets")
+    metrics = payload.get('metrics') or {}
+    if not metrics:
+        print("   (not enough history for a holdout comparison)")
+        return
+    print(f"   Holdout: {metrics['holdout_bets']} bets from {metrics['holdout_from']}")
+    for name in ('ml', 'heuristic'):
+        m = metrics[name]
+        print(f"   {name:10} | Brier {m['brier']:.4f} | log loss {m['log_loss']:.4f} | accuracy {m['accuracy']*100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train / inspect the ML betting model')
+    parser.add_argument('--train', action='store_true', help='Fit on every settled bet and save')
+    parser.add_argument('--file', default=ML_MODEL_FILE)
+    args = parser.parse_args()
+
+    if args.train:
+        bets, _ = SettlementFeed(open_if_populated(), '.').since({})
+        payload = train(bets)
+        if payload is None:
+            print(f"⏳ Need {MIN_TRAIN}+ settled WIN/LOSS bets to train (have {len(labelled(bets)[0])})")
+            return
+        save(payload, args.file)
+        print(f"💾 Saved {args.file}")
+    payload = load(args.file)
+    if payload is None:
+        print("❌ No trained model - run with --train")
+        return
+    print_metrics(payload)
+
+
+if __name__ == '__main__':
+    main()
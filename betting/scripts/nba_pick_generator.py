@@ -17,6 +17,7 @@ from universal_score_fetcher import UniversalScoreFetcher
 from nba_2025_26_season_stats import get_nba_team_stats, get_all_nba_teams
 from sport_config import get_sport_config
 from smart_edge_calculator import SmartEdgeCalculator
+from calibration_model import calibrate_picks
 
 class NBAPickGenerator:
     """Generate NBA picks using pace/efficiency model"""
@@ -246,6 +247,9 @@ class NBAPickGenerator:
         picks = self.generate_picks_for_games(games)
         print(f"   Generated {len(picks)} picks")
         
+        # Heuristic confidence -> calibrated win probability (no-op until a model is fitted)
+        picks = calibrate_picks(picks)
+        
         # 3. Deduplicate (no opposite sides)
         print(f"\n🔄 Deduplicating...")
         deduped = self.deduplicate_picks(picks)
@@ -2,12 +2,15 @@
 Simple NCAA spread predictor
 - Loads cached team stats (team_stats_cache.json) when available
 - Uses team offensive/defensive PPG, margin of victory proxy, home court advantage
+- Recent form and rest days come from the local game results store (game_results_store.py)
 - Returns predicted_margin (home - away), edge (predicted_margin - market_spread), confidence (0-100), recommendation ('HOME'/'AWAY')
 """
 import json
 import os
 from statistics import mean
 
+from game_results_store import get_team_form
+
 CACHE_PATH = '../data/team_stats_cache.json'
 NBA_CACHE_PATH = '../data/nba_team_stats_cache.json'
 
@@ -28,12 +31,35 @@ def _get_cache(league='ncaa'):
 def get_team(team_name, league='ncaa'):
     cache = _get_cache(league=league)
     entry = cache.get(team_name.strip(), {})
+    form = get_team_form(team_name.strip(), league=league) or {}
     if entry.get('ppg') is not None:
-        return entry
+        # fill anything the cache is missing (recent form, rest) from local results
+        merged = dict(entry)
+        for k, v in form.items():
+            if merged.get(k) in (None, []) and v is not None:
+                merged[k] = v
+        return merged
     # defaults differ slightly for NBA (higher scoring, lower HCA)
     if league=='nba':
-        return {'ppg':110.0,'opp_ppg':110.0,'mov':0.0,'home_ppg':111.5,'away_ppg':108.5,'recent_margin':[0,0,0,0,0]}
-    return {'ppg':72.0,'opp_ppg':72.0,'mov':0.0,'home_ppg':73.5,'away_ppg':70.5,'recent_margin':[0,0,0,0,0]}
+        default = {'ppg':110.0,'opp_ppg':110.0,'mov':0.0,'home_ppg':111.5,'away_ppg':108.5,'recent_margin':[0,0,0,0,0]}
+    else:
+        default = {'ppg':72.0,'opp_ppg':72.0,'mov':0.0,'home_ppg':73.5,'away_ppg':70.5,'recent_margin':[0,0,0,0,0]}
+    if form:
+        # team not in the stats cache but we have its results: use them over league averages
+        if form.get('results_ppg') is not None:
+            default['ppg'] = form['results_ppg']
+            default['opp_ppg'] = form['results_opp_ppg']
+        if form.get('recent_margin'):
+            default['recent_margin'] = form['recent_margin']
+        default['rest_days'] = form.get('rest_days')
+    return default
+
+def rest_penalty(team, league='ncaa'):
+    """Points lost playing on no rest (back-to-back). 0 when rest is unknown."""
+    rd = team.get('rest_days')
+    if rd is None or rd > 1:
+        return 0.0
+    return 1.5 if league=='nba' else 1.0
 
 def predict_spread(home_team, away_team, home_is_home=True, injuries=None, league='ncaa'):
     h = get_team(home_team, league=league)
@@ -60,7 +86,10 @@ def predict_spread(home_team, away_team, home_is_home=True, injuries=None, leagu
     # home court advantage: smaller for NBA
     hca = (3.5 if league=='ncaa' else 2.5) if home_is_home else 0.0
 
-    predicted_margin = baseline + recent_adj + hca
+    # rest: back-to-back penalty from the results store's last game date
+    rest_adj = rest_penalty(a, league) - rest_penalty(h, league)
+
+    predicted_margin = baseline + recent_adj + hca + rest_adj
 
     # injury adjustment (simple): if injuries list includes starter, swing by 3 points
     inj_adj = 0
@@ -85,7 +114,7 @@ def predict_spread(home_team, away_team, home_is_home=True, injuries=None, leagu
 
     side = 'HOME' if predicted_margin > 0 else 'AWAY'
 
-    return predicted_margin, conf, side, {'baseline':baseline,'recent_adj':recent_adj,'hca':hca,'inj_adj':inj_adj}
+    return predicted_margin, conf, side, {'baseline':baseline,'recent_adj':recent_adj,'hca':hca,'rest_adj':rest_adj,'inj_adj':inj_adj}
 
 if __name__ == '__main__':
     print(predict_spread('Duke','UNC'))
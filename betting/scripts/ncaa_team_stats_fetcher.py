@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 """
 Fetch NCAA men's college basketball team stats from ESPN public API and cache to team_stats_cache.json
-Run: python3 ncaa_team_stats_fetcher.py
+Run: python3 ncaa_team_stats_fetcher.py               (full refresh)
+     python3 ncaa_team_stats_fetcher.py --incremental (only teams that played since last refresh)
 """
-import requests, time, json, sys
-from datetime import datetime
+import argparse, requests, sys
+
+from espn_team_fetcher import run_fetch, DEFAULT_WORKERS, DEFAULT_RATE
+from espn_stat_schema import NCAA_TEAM_STATS
 
 BASE = 'https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball'
 TEAM_LIST_URL = BASE + '/teams?limit=1000'
@@ -94,179 +97,66 @@ def parse_team_stats(team_obj):
         return None, None
 
 
-def main():
-    data = safe_get(TEAM_LIST_URL)
-    if not data:
-        print('Failed to fetch team list', file=sys.stderr); return
-    teams = data.get('sports',[])
-    team_entries = []
-    for s in teams:
-        for conf in s.get('leagues',[]) if isinstance(s.get('leagues'), list) else []:
-            pass
-    # different shape: teams often at data['teams'] or data['sports'][0]['leagues'][0]['teams']
-    tlist = []
+def fetch_team(team_id, get=safe_get):
+    """Fetch and parse one team. Called from the concurrent fetcher's worker pool."""
+    team_url = f"{BASE}/teams/{team_id}"
+    # First, fetch the team's statistics endpoint which has real numbers
+    stats_url = f"{BASE}/teams/{team_id}/statistics"
+    stats_json = get(stats_url)
+    details = get(team_url)
+    # parse name
+    name = None
     try:
-        tlist = data.get('teams') or []
-        if not tlist:
-            # try nested
-            for sp in data.get('sports',[]):
-                for lg in sp.get('leagues',[]):
-                    tlist = lg.get('teams') or tlist
+        if isinstance(details, dict):
+            team_obj = details.get('team') or details
+            name = team_obj.get('displayName') or team_obj.get('name') or team_obj.get('location') and team_obj.get('location') + ' ' + team_obj.get('name')
     except:
-        tlist = []
-    if not tlist:
-        print('No teams found in response', file=sys.stderr); return
-
-    out = {'last_updated': datetime.utcnow().isoformat(), 'teams': {}, 'meta': {'source': 'espn', 'fetched': len(tlist)}}
-    failures = []
-    count = 0
-    for t in tlist:
-        # each t may be an object with 'team' key and 'id'
-        team = t.get('team') if isinstance(t, dict) and 'team' in t else t
-        team_id = team.get('id') if isinstance(team, dict) else None
-        if not team_id:
-            # try 'uid'
-            team_id = t.get('id')
-        team_url = f"{BASE}/teams/{team_id}" if team_id else None
-        # First, fetch the team's statistics endpoint which has real numbers
-        stats_url = f"{BASE}/teams/{team_id}/statistics" if team_id else None
-        schedule_url = f"{BASE}/teams/{team_id}/schedule" if team_id else None
-        stats_json = safe_get(stats_url) if stats_url else None
-        details = safe_get(team_url) if team_url else t
-        # parse name
         name = None
+    # parse stats from statistics endpoint (prefer this)
+    stats = None
+    if stats_json:
         try:
-            if isinstance(details, dict):
-                team_obj = details.get('team') or details
-                name = team_obj.get('displayName') or team_obj.get('name') or team_obj.get('location') and team_obj.get('location') + ' ' + team_obj.get('name')
-        except:
-            name = None
-        # parse stats from statistics endpoint (prefer this)
-        stats = None
-        if stats_json:
-            try:
-                # statistics endpoint often contains 'groups' or 'statistics' with splits
-                # we'll search the JSON for entries whose name includes 'points' or 'ppg' or 'points per game'
-                def find_value(obj, keywords):
-                    if isinstance(obj, dict):
-                        for k,v in obj.items():
-                            if isinstance(v, (dict,list)):
-                                res = find_value(v, keywords)
-                                if res is not None:
-                                    return res
-                            else:
-                                # skip
-                                pass
-                        # look for specific fields
-                        name = obj.get('name') or obj.get('displayName') if isinstance(obj, dict) else None
-                        if isinstance(name, str) and any(kw in name.lower() for kw in keywords):
-                            # try to read a numeric value
-                            val = obj.get('value') or obj.get('displayValue') or obj.get('avg') or obj.get('average')
-                            if val is not None and val != '':
-                                try:
-                                    return float(str(val).replace(',',''))
-                                except:
-                                    return val
-                    elif isinstance(obj, list):
-                        for it in obj:
-                            res = find_value(it, keywords)
-                            if res is not None:
-                                return res
-                    return None
-                ppg = find_value(stats_json, ['points per game','ppg','points per game (ppg)','points'])
-                opp_ppg = find_value(stats_json, ['points allowed per game','opp ppg','points allowed','opp points'])
-                fga = find_value(stats_json, ['field goal attempts','fga'])
-                poss = find_value(stats_json, ['possessions','pace'])
-                mov = find_value(stats_json, ['margin of victory','mov','margin'])
-                stats = {
-                    'ppg': float(ppg) if ppg not in (None,'') else None,
-                    'opp_ppg': float(opp_ppg) if opp_ppg not in (None,'') else None,
-                    'poss': float(poss) if poss not in (None,'') else None,
-                    'fga': float(fga) if fga not in (None,'') else None,
-                    'home_ppg': None,
-                    'away_ppg': None,
-                    'recent_ppg': None,
-                    'recent_margin': None,
-                    'mov': float(mov) if mov not in (None,'') else None,
-                    'wins': None,
-                    'losses': None,
-                }
-            except Exception as e:
-                print('Error parsing statistics endpoint for', team_id, e, file=sys.stderr)
-                stats = None
-        # fallback: try parsing from team details
-        if not stats:
-            name, stats = parse_team_stats(details or t)
-        # Now fetch schedule to compute recent_ppg and recent_margin
-        recent = None
-        if schedule_url:
-            sched = safe_get(schedule_url)
-            if sched and isinstance(sched, dict):
-                # find events/games
-                events = sched.get('events') or sched.get('games') or []
-                # take most recent completed games (where status type completed)
-                recent_scores = []
-                for ev in events:
-                    try:
-                        status = ev.get('status') or {}
-                        completed = False
-                        if isinstance(status, dict):
-                            ttype = status.get('type') or {}
-                            if isinstance(ttype, dict):
-                                if ttype.get('completed'):
-                                    completed = True
-                                if ttype.get('name','').lower() in ('final','completed'):
-                                    completed = True
-                        # some events have 'status.type.state' == 'post'
-                        if not completed:
-                            # try checking if scores exist
-                            if ev.get('status',{}).get('type',{}).get('state') in ('post','final'):
-                                completed = True
-                        if not completed:
-                            continue
-                        competitions = ev.get('competitions') or []
-                        for comp in competitions:
-                            for competitor in comp.get('competitors',[]):
-                                tid = competitor.get('team',{}).get('id')
-                                if str(tid) == str(team_id):
-                                    score = competitor.get('score')
-                                    opp = None
-                                    # find other team to compute margin
-                                    for c2 in comp.get('competitors',[]):
-                                        if c2 is competitor: continue
-                                        opp = c2
-                                    if score is None: continue
-                                    opp_score = opp.get('score') if opp else None
-                                    try:
-                                        recent_scores.append({'score': float(score), 'opp_score': float(opp_score) if opp_score is not None else None})
-                                    except:
-                                        pass
-                    except Exception:
-                        continue
-                if recent_scores:
-                    # take last 5 (most recent first)
-                    last = recent_scores[:5]
-                    # build lists of scores and margins (int values)
-                    recent_ppg_list = [int(r['score']) for r in last]
-                    recent_margin_list = [int(r['score'] - (r['opp_score'] if r['opp_score'] is not None else 0)) for r in last]
-                    stats['recent_ppg'] = recent_ppg_list
-                    stats['recent_margin'] = recent_margin_list
-        if not name:
-            failures.append({'team': team, 'reason': 'no name'})
-            continue
-        out['teams'][name] = stats
-        count += 1
-        # rate limit
-        time.sleep(0.14)
-    # write cache
-    with open(OUT,'w') as f:
-        json.dump(out, f, indent=2)
-    # summary
-    ok = count
-    failed = len(failures)
-    print(f'Fetched {ok} teams, failures: {failed}')
-    if failed:
-        print('Failures:', failures)
+            # one flattening pass over the response; misses are counted by the schema
+            vals, _ = NCAA_TEAM_STATS.extract(stats_json)
+            mov = vals['mov']
+            if mov is None and vals['ppg'] is not None and vals['opp_ppg'] is not None:
+                mov = vals['ppg'] - vals['opp_ppg']
+            stats = {
+                'ppg': vals['ppg'],
+                'opp_ppg': vals['opp_ppg'],
+                'poss': vals['poss'],
+                'fga': vals['fga'],
+                'home_ppg': None,
+                'away_ppg': None,
+                'recent_ppg': None,
+                'recent_margin': None,
+                'mov': mov,
+                'wins': None,
+                'losses': None,
+            }
+        except Exception as e:
+            print('Error parsing statistics endpoint for', team_id, e, file=sys.stderr)
+            stats = None
+    # fallback: try parsing from team details
+    if not stats:
+        name, stats = parse_team_stats(details or {})
+    if not name or stats is None:
+        return None, None
+    # recent_ppg / recent_margin / home-away splits are filled from the game results store
+    return name, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch NCAA team stats from ESPN')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only refetch teams that played since the last refresh')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='max requests per second')
+    args = parser.parse_args()
+    # groups=50 = all of Division I on the scoreboard
+    run_fetch(BASE, TEAM_LIST_URL, OUT, fetch_team, source='espn', incremental=args.incremental,
+              scoreboard_params={'groups': '50', 'limit': '500'}, schema=NCAA_TEAM_STATS,
+              results_sport='ncb', workers=args.workers, rate=args.rate, label='teams')
 
 if __name__=='__main__':
     main()
@@ -3,6 +3,7 @@ Simple NCAA total predictor
 - Fetches cached team stats from local files if present (team_stats_cache.json)
 - Otherwise, attempts to fetch from sports-reference via scraping (simple, fallback)
 - Predicts total by averaging team offensive PPG (adjusted for opponent defense), pace proxy, recent form, and home/away splits
+- Recent form / splits missing from the cache are filled from the local game results store
 - Returns: predicted_total (float), edge (predicted - market), confidence (0-100), side ('OVER'/'UNDER')
 
 This is intentionally simple and well-documented.
@@ -12,6 +13,8 @@ import os
 import math
 from statistics import mean
 
+from game_results_store import get_team_form
+
 CACHE_PATH = '../data/team_stats_cache.json'
 NBA_CACHE_PATH = '../data/nba_team_stats_cache.json'
 
@@ -64,10 +67,24 @@ def get_team_stats(team_name, league='ncaa'):
     # normalized key
     key = team_name.strip()
     cache = _get_cache(league=league)
+    form = get_team_form(key, league=league) or {}
     if key in cache and cache[key].get('ppg') is not None:
-        return cache[key]
-    # Fallback to stub if team not found
-    return fetch_team_stats_stub(key)
+        merged = dict(cache[key])
+        for k, v in form.items():
+            if merged.get(k) in (None, []) and v is not None:
+                merged[k] = v
+        return merged
+    # Fallback to stub if team not found, upgraded with any local results we have
+    stub = fetch_team_stats_stub(key)
+    if form.get('results_ppg') is not None:
+        stub['ppg'] = form['results_ppg']
+        stub['opp_ppg'] = form['results_opp_ppg']
+        for k in ('home_ppg', 'away_ppg'):
+            if form.get(k) is not None:
+                stub[k] = form[k]
+        if form.get('recent_ppg'):
+            stub['recent_ppg'] = form['recent_ppg']
+    return stub
 
 
 def predict_total(home_team, away_team, home_is_home=True, league='ncaa'):
@@ -82,16 +99,22 @@ def predict_total(home_team, away_team, home_is_home=True, league='ncaa'):
         v = d.get(key)
         return v if v is not None else default
 
+    # Venue splits: home team's home ppg / away team's road ppg when we have them
+    h_split = h.get('home_ppg') if home_is_home else None
+    a_split = a.get('away_ppg') if home_is_home else None
+    h_base = h_split if h_split is not None else val(h,'ppg',72.0)
+    a_base = a_split if a_split is not None else val(a,'ppg',72.0)
+
     # Offensive baseline: average of team ppg and opponent-adjusted ppg
-    h_off = (val(h,'ppg',72.0) + (val(h,'ppg',72.0) + val(a,'opp_ppg',72.0))/2)/2
-    a_off = (val(a,'ppg',72.0) + (val(a,'ppg',72.0) + val(h,'opp_ppg',72.0))/2)/2
+    h_off = (h_base + (val(h,'ppg',72.0) + val(a,'opp_ppg',72.0))/2)/2
+    a_off = (a_base + (val(a,'ppg',72.0) + val(h,'opp_ppg',72.0))/2)/2
 
     # Pace proxy: average possessions
     poss = mean([val(h,'poss',70.0), val(a,'poss',70.0)])
     poss_factor = poss / 70.0  # around 1
 
-    # Home/away splits: if home_is_home boost home scoring slightly
-    home_boost = 1.03 if home_is_home else 1.0
+    # Home/away splits: if home_is_home boost home scoring slightly (already in the split if we used one)
+    home_boost = 1.03 if home_is_home and h_split is None else 1.0
 
     # Recent form: use last 5 games mean vs season ppg
     def recent_factor(stats):
@@ -128,6 +151,8 @@ def predict_total(home_team, away_team, home_is_home=True, league='ncaa'):
         'away_pred': a_pred,
         'poss': poss,
         'home_boost': home_boost,
+        'home_split': h_split,
+        'away_split': a_split,
         'h_recent': h_recent,
         'a_recent': a_recent
     }
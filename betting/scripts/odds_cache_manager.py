@@ -5,7 +5,7 @@ Conserves API quota and provides fresh data when needed
 """
 
 import json
-import sqlite3
+from betting_database import get_connection
 from datetime import datetime, timedelta
 import os
 
@@ -18,7 +18,7 @@ class OddsCacheManager:
     
     def init_cache_db(self):
         """Initialize cache database"""
-        conn = sqlite3.connect(self.cache_db)
+        conn = get_connection(self.cache_db)
         cursor = conn.cursor()
         
         # Cache table for odds data
@@ -41,20 +41,18 @@ class OddsCacheManager:
         ''')
         
         conn.commit()
-        conn.close()
         print("✅ Odds cache database initialized")
     
     def get_daily_usage(self):
         """Get today's API call count"""
         today = datetime.now().strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect(self.cache_db)
+        conn = get_connection(self.cache_db)
         cursor = conn.cursor()
         
         cursor.execute('SELECT calls_made FROM daily_usage WHERE date = ?', (today,))
         result = cursor.fetchone()
         
-        conn.close()
         
         if result:
             return result[0]
@@ -67,7 +65,7 @@ class OddsCacheManager:
         """Increment today's API call count"""
         today = datetime.now().strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect(self.cache_db)
+        conn = get_connection(self.cache_db)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -76,13 +74,12 @@ class OddsCacheManager:
         ''', (today, today, datetime.now()))
         
         conn.commit()
-        conn.close()
     
     def reset_daily_counter(self):
         """Reset daily counter (called automatically at midnight)"""
         today = datetime.now().strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect(self.cache_db)
+        conn = get_connection(self.cache_db)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -91,7 +88,6 @@ class OddsCacheManager:
         ''', (today, datetime.now()))
         
         conn.commit()
-        conn.close()
     
     def can_make_api_call(self):
         """Check if we can make an API call today"""
@@ -100,7 +96,7 @@ class OddsCacheManager:
     
     def get_cached_odds(self, sport):
         """Get cached odds for a sport if still fresh"""
-        conn = sqlite3.connect(self.cache_db)
+        conn = get_connection(self.cache_db)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -108,7 +104,6 @@ class OddsCacheManager:
         ''', (sport,))
         
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return None, None
@@ -129,7 +124,7 @@ class OddsCacheManager:
     
     def cache_odds(self, sport, odds_data):
         """Cache odds data for a sport"""
-        conn = sqlite3.connect(self.cache_db)
+        conn = get_connection(self.cache_db)
         cursor = conn.cursor()
         
         odds_json = json.dumps(odds_data)
@@ -141,7 +136,6 @@ class OddsCacheManager:
         ''', (sport, odds_json, now))
         
         conn.commit()
-        conn.close()
         
         print(f"💾 Cached odds for {sport} at {now.strftime('%H:%M:%S')}")
     
@@ -150,7 +144,7 @@ class OddsCacheManager:
         daily_usage = self.get_daily_usage()
         remaining_calls = self.max_daily_calls - daily_usage
         
-        conn = sqlite3.connect(self.cache_db)
+        conn = get_connection(self.cache_db)
         cursor = conn.cursor()
         
         # Get last update times for all sports
@@ -160,7 +154,6 @@ class OddsCacheManager:
         ''')
         
         cached_sports = cursor.fetchall()
-        conn.close()
         
         status = {
             'daily_calls_used': daily_usage,
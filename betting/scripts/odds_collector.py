@@ -4,24 +4,36 @@ Real Odds Collection from The-Odds-API
 Get actual market odds instead of simulated ones
 """
 
-import requests
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import sqlite3
 from draftkings_scraper import DraftKingsScraper
 from odds_cache_manager import OddsCacheManager
 from oddsapi_rate_limiter import OddsAPIRateLimiter
+from odds_providers import HedgedOddsSource, OddsAPIProvider, DraftKingsProvider, has_bookmaker
+
+# OddsAPI bills up to 10 bookmakers as one region, so the consensus books cost no extra quota
+CONSENSUS_BOOKMAKERS = 'fanduel,draftkings,betmgm,williamhill_us,betrivers,fanatics,espnbet,bovada,betonlineag,lowvig'
+# OddsAPI key - Paid tier ($50/month) - 20,000 requests/month + player props! (ODDS_API_KEY overrides)
+ODDS_API_KEY = os.environ.get('ODDS_API_KEY', "82865426fd192e243376eb4e51185f3b")
 
 class OddsCollector:
     def __init__(self, api_key=None):
-        # OddsAPI key - Paid tier ($50/month) - 20,000 requests/month + player props!
-        self.api_key = api_key or "82865426fd192e243376eb4e51185f3b"
+        self.api_key = api_key or ODDS_API_KEY
         self.base_url = "https://api.the-odds-api.com/v4"
         self.dk_scraper = DraftKingsScraper()
         self.cache_manager = OddsCacheManager()
         self.rate_limiter = OddsAPIRateLimiter(api_key=self.api_key)
+        self.odds_source = HedgedOddsSource([
+            OddsAPIProvider(self.api_key, bookmakers=CONSENSUS_BOOKMAKERS, rate_limiter=self.rate_limiter),
+            DraftKingsProvider(self.dk_scraper),
+        ])
+        self._lock = threading.Lock()
         
-    def get_sports_odds(self, sport='basketball_nba', bookmakers='fanduel,draftkings,betonlineag'):
+    def get_sports_odds(self, sport='basketball_nba'):
         """Get odds for a specific sport with smart caching"""
         
         # Check cache first
@@ -50,108 +62,69 @@ class OddsCollector:
             else:
                 return self.get_mock_odds(sport)
         
-        # Fetch fresh data with FanDuel preference
-        url = f"{self.base_url}/sports/{sport}/odds"
-        params = {
-            'apiKey': self.api_key,
-            'regions': 'us',
-            'markets': 'h2h,spreads,totals',
-            'oddsFormat': 'american',
-            'bookmakers': bookmakers  # Prefer FanDuel, fallback to DK/BetOnline
-        }
+        # Fetch fresh data: OddsAPI (FanDuel to bet, the rest for the consensus price), hedged by DraftKings.
+        # Closing lines are FanDuel's, so a DraftKings answer only wins if OddsAPI has nothing with FanDuel
+        print(f"🔄 Fetching fresh {sport} odds (OddsAPI, DraftKings hedge)...")
+        data, provider = self.odds_source.fetch(sport, accept=has_bookmaker('fanduel'))
+        self.odds_source.save_stats()
         
-        try:
-            print(f"🔄 Fetching fresh {sport} odds from API (preferring FanDuel)...")
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Record usage in rate limiter and cache the data
-            self.rate_limiter.record_request(1)
-            self.cache_manager.increment_daily_usage()
-            self.cache_manager.cache_odds(sport, data)
-            
-            daily_usage = self.cache_manager.get_daily_usage()
-            print(f"✅ Fresh odds from OddsAPI: {len(data)} games (API calls today: {daily_usage}/500)")
-            
+        if provider is not None:
+            with self._lock:
+                if provider == OddsAPIProvider.name:
+                    # Only the primary's answer is cached: closing lines and the consensus read the cache
+                    self.cache_manager.increment_daily_usage()  # quota itself is recorded by the provider
+                    self.cache_manager.cache_odds(sport, data)
+                daily_usage = self.cache_manager.get_daily_usage()
+            print(f"✅ Fresh odds from {provider}: {len(data)} games (API calls today: {daily_usage}/500)")
             return data
-            
-        except Exception as e:
-            print(f"⚠️ OddsAPI failed ({e})")
-            # Try cache as fallback
-            if cached_odds is not None:
-                print("💾 Falling back to cached data")
-                return cached_odds
-            else:
-                print("🎭 Using mock data")
-                return self.get_mock_odds(sport)
+        
+        print(f"⚠️ Every odds provider failed for {sport}")
+        # Try cache as fallback
+        if cached_odds is not None:
+            print("💾 Falling back to cached data")
+            return cached_odds
+        else:
+            print("🎭 Using mock data")
+            return self.get_mock_odds(sport)
     
-    def get_player_props_for_event(self, event_id, bookmakers='fanduel,draftkings'):
+    def get_player_props_for_event(self, event_id, bookmakers='fanduel,draftkings', sport='basketball_nba', event=None):
         """Get player props for a specific event using the /events/{eventId}/odds endpoint
         
+        One combined call for every prop market of the sport, cached per
+        (event, market set) in the player_props table (see props_ingestion.py).
+        
         NOTE: Player props require a PAID OddsAPI tier ($50/month minimum)
         Free tier does NOT include player props markets
         """
-        url = f"{self.base_url}/events/{event_id}/odds"
-        params = {
-            'apiKey': self.api_key,
-            'regions': 'us',
-            'markets': 'player_points,player_rebounds,player_assists,player_threes',
-            'oddsFormat': 'american',
-            'bookmakers': bookmakers  # Prefer FanDuel, fallback to DraftKings
-        }
-        
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Convert to our player props format
-            return self.convert_player_props(data)
-            
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                print(f"⚠️ Player props not available for event {event_id} (requires paid tier)")
-            else:
-                print(f"⚠️ Player props failed for event {event_id}: {e}")
+        from props_ingestion import PropsIngestor, PROP_MARKETS
+        if sport not in PROP_MARKETS:
             return []
+        ingestor = PropsIngestor(api_key=self.api_key, bookmakers=bookmakers, rate_limiter=self.rate_limiter)
+        try:
+            rows = ingestor.event_props(dict(event or {}, id=event_id), sport)
         except Exception as e:
             print(f"⚠️ Player props failed for event {event_id}: {e}")
             return []
+        return self.convert_player_props(rows)
     
-    def convert_player_props(self, event_data):
-        """Convert OddsAPI player props response to our format"""
+    def convert_player_props(self, rows):
+        """Convert normalized player_props rows to our format (one entry per player line, Over price)"""
         player_props = []
         
-        if not event_data or not event_data.get('bookmakers'):
-            return player_props
-        
-        away_team = event_data.get('away_team', 'Unknown')
-        home_team = event_data.get('home_team', 'Unknown') 
-        game_matchup = f"{away_team} @ {home_team}"
-        
-        for bookmaker in event_data['bookmakers']:
-            bookmaker_key = bookmaker.get('key', 'unknown')
-            
-            for market in bookmaker.get('markets', []):
-                market_key = market.get('key', '')
-                prop_type = market_key.replace('player_', '') if market_key.startswith('player_') else market_key
-                
-                for outcome in market.get('outcomes', []):
-                    # For player props, the outcome name is the player name
-                    player_name = outcome.get('name', 'Unknown Player')
-                    prop_line = outcome.get('point', 0)
-                    prop_odds = outcome.get('price', -110)
-                    
-                    player_props.append({
-                        'game': game_matchup,
-                        'player': player_name,
-                        'prop_type': prop_type,
-                        'line': prop_line,
-                        'odds': prop_odds,
-                        'bookmaker': bookmaker_key,
-                        'event_id': event_data.get('id')
-                    })
+        for row in rows:
+            market_key = row.get('market', '')
+            prop_type = market_key.split('_', 1)[1] if market_key.startswith(('player_', 'batter_')) else market_key
+            player_props.append({
+                'game': row.get('game'),
+                'player': row.get('player', 'Unknown Player'),
+                'prop_type': prop_type,
+                'line': row.get('line') or 0,
+                'odds': row.get('over_price') if row.get('over_price') is not None else -110,
+                'under_odds': row.get('under_price'),
+                'bookmaker': row.get('bookmaker', 'unknown'),
+                'event_id': row.get('event_id'),
+                'sport': row.get('sport')
+            })
         
         return player_props
     
@@ -218,8 +191,13 @@ class OddsCollector:
         return mock_odds.get(sport, [])
     
     def parse_odds_data(self, odds_data):
-        """Parse odds data into standard format, preferring FanDuel"""
+        """Parse odds data into standard format, preferring FanDuel (plus the all-book consensus)"""
         parsed_odds = []
+        try:
+            from market_consensus import slate_consensus
+            consensus = slate_consensus(odds_data)
+        except Exception:
+            consensus = {}
         
         for game in odds_data:
             if not game.get('bookmakers'):
@@ -247,7 +225,8 @@ class OddsCollector:
                 'away_team': game['away_team'],
                 'bookmaker': bookmaker['key'],
                 'spreads': {},
-                'totals': {}
+                'totals': {},
+                'consensus': consensus.get(f"{game['away_team']} @ {game['home_team']}")
             }
             
             for market in bookmaker.get('markets', []):
@@ -274,75 +253,35 @@ class OddsCollector:
         return parsed_odds
     
     def collect_all_odds(self):
-        """Collect odds from multiple sources"""
+        """Collect odds for every sport at once (each through the hedged OddsAPI/DraftKings source)"""
         sports_map = {
-            'basketball_nba': ('nba', 'NBA'),
-            'basketball_ncaab': ('ncb', 'NCAA Basketball'), 
-            'baseball_mlb': ('mlb', 'MLB'),
-            'americanfootball_nfl': ('nfl', 'NFL')
+            'basketball_nba': 'NBA',
+            'basketball_ncaab': 'NCAA Basketball', 
+            'baseball_mlb': 'MLB',
+            'americanfootball_nfl': 'NFL'
         }
         
+        def collect(api_sport):
+            odds_data = self.get_sports_odds(api_sport)
+            try:
+                return self.parse_odds_data(odds_data or [])
+            except Exception as e:
+                print(f"⚠️ Error parsing odds data: {e}")
+                return []
+        
         all_odds = {}
+        with ThreadPoolExecutor(max_workers=len(sports_map)) as pool:
+            results = dict(zip(sports_map, pool.map(collect, sports_map)))
         
-        for api_sport, (dk_sport, sport_name) in sports_map.items():
-            print(f"📊 Collecting odds for {sport_name}...")
-            
-            # Try OddsAPI first
-            odds_data = self.get_sports_odds(api_sport)
-            parsed_odds = []
-            
-            if odds_data and not isinstance(odds_data, list) or len(odds_data) > 0:
-                try:
-                    parsed_odds = self.parse_odds_data(odds_data)
-                    if parsed_odds:
-                        print(f"✅ OddsAPI: {len(parsed_odds)} {sport_name} games")
-                except Exception as e:
-                    print(f"⚠️ Error parsing OddsAPI data: {e}")
-            
-            # If OddsAPI fails or has no data, try DraftKings scraping
-            if not parsed_odds:
-                print(f"🎯 Trying DraftKings scraping for {sport_name}...")
-                try:
-                    dk_odds = self.dk_scraper.get_dk_odds(dk_sport)
-                    if dk_odds:
-                        parsed_odds = self.parse_dk_odds(dk_odds)
-                        print(f"✅ DraftKings: {len(parsed_odds)} {sport_name} games")
-                except Exception as e:
-                    print(f"⚠️ DraftKings scraping failed: {e}")
-            
-            if parsed_odds:
-                all_odds[api_sport] = parsed_odds
+        for api_sport, sport_name in sports_map.items():
+            if results[api_sport]:
+                all_odds[api_sport] = results[api_sport]
+                print(f"✅ {sport_name}: {len(results[api_sport])} games")
             else:
                 print(f"❌ No odds found for {sport_name}")
         
         return all_odds
-    
-    def parse_dk_odds(self, dk_data):
-        """Parse DraftKings scraped data into standard format"""
-        parsed_odds = []
-        
-        for game in dk_data:
-            if game.get('home_team') and game.get('away_team'):
-                parsed_odds.append({
-                    'game_id': game['game_id'],
-                    'home_team': game['home_team'],
-                    'away_team': game['away_team'],
-                    'bookmaker': 'draftkings',
-                    'spreads': {
-                        'home_spread': game.get('spread'),
-                        'home_price': -110,  # Default DK pricing
-                        'away_spread': -game.get('spread') if game.get('spread') else None,
-                        'away_price': -110
-                    },
-                    'totals': {
-                        'over_total': game.get('total'),
-                        'over_price': -110,
-                        'under_total': game.get('total'),
-                        'under_price': -110
-                    }
-                })
-        
-        return parsed_odds
+
 
 if __name__ == "__main__":
     # Test odds collection
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+🔌 Odds Providers - pluggable odds sources with health stats and hedged requests
+
+Every provider returns the same normalized output: a list of OddsAPI-shaped
+events (id, sport_key, commence_time, home_team, away_team,
+bookmakers[].markets[].outcomes[]), so parse_odds_data, the market consensus
+and RealBettingModel read any source unchanged.
+
+- OddsAPIProvider     /sports/{sport}/odds (quota recorded with OddsAPIRateLimiter),
+                      retried with exponential backoff on timeouts, 429 and 5xx
+- DraftKingsProvider  sportsbook state blob (draftkings_scraper)
+
+Per-provider stats (recent latencies, successes, failures, consecutive
+failures) persist in PROVIDER_STATS_FILE. A provider with MAX_CONSECUTIVE_FAILURES
+in a row is unhealthy for COOLDOWN_SECONDS and is only tried after the healthy
+ones.
+
+HedgedOddsSource.fetch(sport) asks the first healthy provider; if it has not
+answered within its p95 latency (HEDGE_DEFAULT_DELAY until MIN_SAMPLES are
+recorded) - or it fails / comes back empty - the next provider is fired too,
+and the first non-empty answer wins. fetch_slate() runs every sport at once, so
+a slate takes as long as its slowest sport's fastest healthy source, not the
+sum of serialized fallbacks.
+
+Callers that need more than "any games" pass an acceptance rule: with
+accept=has_bookmaker('fanduel') a DraftKings answer never wins the hedge, the
+source keeps waiting for OddsAPI (retries included) and only falls back to the
+unaccepted answer when nothing acceptable arrives.
+
+ManualOverrides indexes manual_odds.json by lower-cased "Away @ Home" once at
+load (O(1) lookups instead of a scan per game).
+
+USAGE:
+    from odds_providers import default_odds_source, ManualOverrides
+    source = default_odds_source(api_key)
+    slate = source.fetch_slate(['basketball_nba', 'americanfootball_nfl'])   # {sport: (events, provider)}
+    events, provider = source.fetch('basketball_nba', accept=has_bookmaker('fanduel'))
+    ManualOverrides().spread('Texas Tech Red Raiders @ Arizona Wildcats')    # -9.5
+    python3 odds_providers.py --stats
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+PROVIDER_STATS_FILE = '../data/odds_provider_stats.json'
+MANUAL_ODDS_FILE = 'manual_odds.json'
+LATENCY_WINDOW = 50             # latencies kept per provider for the p95
+MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY = 3.0       # seconds before hedging while a provider has too few samples
+HEDGE_DELAY_BOUNDS = (0.5, 10.0)
+REQUEST_TIMEOUT = 15
+MAX_RETRIES = 3                 # OddsAPI attempts per fetch, backing off 1s, 2s between them
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_CONSECUTIVE_FAILURES = 3
+COOLDOWN_SECONDS = 600
+
+
+class ProviderStats:
+    """Latency / outcome history for one provider (thread-safe)"""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.latencies = deque(data.get('latencies', []), maxlen=LATENCY_WINDOW)
+        self.successes = data.get('successes', 0)
+        self.failures = data.get('failures', 0)
+        self.consecutive_failures = data.get('consecutive_failures', 0)
+        self.last_failure = data.get('last_failure')     # epoch seconds
+        self.lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self.lock:
+            if ok:
+                self.latencies.append(round(seconds, 3))
+                self.successes += 1
+                self.consecutive_failures = 0
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+                self.last_failure = time.time()
+
+    def p95(self):
+        with self.lock:
+            if len(self.latencies) < MIN_SAMPLES:
+                return None
+            return float(np.percentile(list(self.latencies), 95))
+
+    def healthy(self, now=None):
+        if self.consecutive_failures < MAX_CONSECUTIVE_FAILURES:
+            return True
+        return (now or time.time()) - (self.last_failure or 0) >= COOLDOWN_SECONDS
+
+    def to_dict(self):
+        with self.lock:
+            return {'latencies': list(self.latencies), 'successes': self.successes, 'failures': self.failures,
+                    'consecutive_failures': self.consecutive_failures, 'last_failure': self.last_failure}
+
+
+def has_bookmaker(key):
+    """Acceptance rule for fetch(): the answer carries this bookmaker for at least one event"""
+    def accept(events):
+        return any(key in str(book.get('key') or book.get('title') or '').lower()
+                   for event in events for book in event.get('bookmakers', []))
+    return accept
+
+
+class OddsProvider:
+    """Base provider: fetch(sport_key) -> [OddsAPI-shaped event]; raise or return [] on failure"""
+    name = 'provider'
+
+    def supports(self, sport_key):
+        return True
+
+    def max_seconds(self):
+        """Longest one fetch() may take (bounds how long the hedge waits on it)"""
+        return REQUEST_TIMEOUT
+
+    def fetch(self, sport_key):
+        raise NotImplementedError
+
+
+class OddsAPIProvider(OddsProvider):
+    name = 'oddsapi'
+
+    def __init__(self, api_key, bookmakers=None, markets='h2h,spreads,totals', rate_limiter=None,
+                 base_url='https://api.the-odds-api.com/v4'):
+        self.api_key = api_key
+        self.bookmakers = bookmakers
+        self.markets = markets
+        self.rate_limiter = rate_limiter
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        self.session.mount('https://', adapter)
+        self._quota_lock = threading.Lock()
+
+    def max_seconds(self):
+        return MAX_RETRIES * REQUEST_TIMEOUT + sum(2 ** attempt for attempt in range(MAX_RETRIES - 1))
+
+    def fetch(self, sport_key):
+        params = {'apiKey': self.api_key, 'regions': 'us', 'markets': self.markets, 'oddsFormat': 'american'}
+        if self.bookmakers:
+            params['bookmakers'] = self.bookmakers  # up to 10 books bill as one region
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = self.session.get(f"{self.base_url}/sports/{sport_key}/odds", params=params,
+                                            timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                break
+            except requests.exceptions.HTTPError as e:
+                # Retry rate limits and server errors only; a 401/422 won't get better
+                if attempt == MAX_RETRIES - 1 or e.response is None or e.response.status_code not in RETRY_STATUSES:
+                    raise
+                print(f"⏱️ oddsapi {sport_key}: HTTP {e.response.status_code} (attempt {attempt + 1}/{MAX_RETRIES})")
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                print(f"⏱️ oddsapi {sport_key}: {type(e).__name__} (attempt {attempt + 1}/{MAX_RETRIES})")
+            time.sleep(2 ** attempt)  # Exponential backoff: 1s, 2s
+        if self.rate_limiter is not None:
+            with self._quota_lock:
+                self.rate_limiter.record_request(int(response.headers.get('x-requests-last') or 1))
+        return response.json()
+
+
+class DraftKingsProvider(OddsProvider):
+    name = 'draftkings'
+
+    def __init__(self, scraper=None):
+        from draftkings_scraper import DraftKingsScraper, SPORT_KEYS
+        self.scraper = scraper or DraftKingsScraper()
+        self.sports = {key: dk for dk, key in SPORT_KEYS.items()}
+
+    def supports(self, sport_key):
+        return sport_key in self.sports
+
+    def fetch(self, sport_key):
+        from draftkings_scraper import extract_state, normalize_state
+        sport = self.sports[sport_key]
+        state = extract_state(self.scraper.fetch_page(sport))
+        if state is None:
+            raise ValueError('no state blob on the sportsbook page')
+        return normalize_state(state, sport)
+
+
+class HedgedOddsSource:
+    def __init__(self, providers, stats_path=PROVIDER_STATS_FILE, workers=8):
+        self.providers = list(providers)
+        self.stats_path = stats_path
+        self.workers = workers
+        saved = self._load_stats()
+        self.stats = {p.name: ProviderStats(saved.get(p.name)) for p in self.providers}
+        self._save_lock = threading.Lock()
+
+    def _load_stats(self):
+        try:
+            with open(self.stats_path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save_stats(self):
+        with self._save_lock:
+            os.makedirs(os.path.dirname(self.stats_path) or '.', exist_ok=True)
+            tmp = self.stats_path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump({name: s.to_dict() for name, s in self.stats.items()}, f, indent=2)
+            os.replace(tmp, self.stats_path)
+
+    def ranked(self, sport_key):
+        """Providers for a sport: healthy ones first, configured order within each group"""
+        candidates = [p for p in self.providers if p.supports(sport_key)]
+        return sorted(candidates, key=lambda p: not self.stats[p.name].healthy())
+
+    def hedge_delay(self, provider):
+        p95 = self.stats[provider.name].p95()
+        return HEDGE_DEFAULT_DELAY if p95 is None else min(max(p95, HEDGE_DELAY_BOUNDS[0]), HEDGE_DELAY_BOUNDS[1])
+
+    def _call(self, provider, sport_key):
+        started = time.monotonic()
+        try:
+            events = provider.fetch(sport_key) or []
+        except Exception as e:
+            self.stats[provider.name].record(time.monotonic() - started, False)
+            print(f"⚠️ {provider.name} {sport_key}: {e}")
+            return None
+        # An empty answer is a healthy response (no games), but never wins the hedge
+        self.stats[provider.name].record(time.monotonic() - started, True)
+        return events
+
+    def fetch(self, sport_key, pool=None, accept=None):
+        """
+        (events, provider name) from the first provider to answer with games that pass
+        accept(events) (default: any games). When no answer is accepted, the highest-ranked
+        provider's unaccepted games; ([], name) when providers only answered with no games,
+        ([], None) when all failed.
+        """
+        providers = self.ranked(sport_key)
+        if not providers:
+            return [], None
+        accept = accept or bool
+        own_pool = pool is None
+        pool = pool or ThreadPoolExecutor(max_workers=len(providers))
+        empty = None
+        rejected = {}   # provider name -> games that failed the acceptance rule
+        try:
+            pending = {}
+            queue = list(providers)
+            provider = queue.pop(0)
+            pending[pool.submit(self._call, provider, sport_key)] = provider
+            deadline = time.monotonic() + sum(p.max_seconds() for p in providers)
+            while pending:
+                # Wait for any answer, or until the newest request's p95 passes - then hedge
+                timeout = self.hedge_delay(provider) if queue else max(deadline - time.monotonic(), 0)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    answered = pending.pop(fut)
+                    events = fut.result()
+                    if events and accept(events):
+                        return events, answered.name
+                    if events:
+                        rejected[answered.name] = events
+                    elif events is not None:
+                        empty = empty or answered.name
+                # Nothing usable yet: slow past p95, failed, empty or rejected - bring in the next provider
+                if queue:
+                    provider = queue.pop(0)
+                    pending[pool.submit(self._call, provider, sport_key)] = provider
+                elif not done and time.monotonic() >= deadline:
+                    break
+            for p in providers:
+                if p.name in rejected:
+                    return rejected[p.name], p.name
+            return [], empty
+        finally:
+            if own_pool:
+                pool.shutdown(wait=False)
+
+    def fetch_slate(self, sport_keys, accept=None):
+        """{sport: (events, provider)} for every sport at once (see fetch for accept); stats saved once at the end"""
+        sport_keys = list(sport_keys)
+        slate = {}
+        if not sport_keys:
+            return slate
+        hedges = ThreadPoolExecutor(max_workers=self.workers * max(len(self.providers), 1))
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(sport_keys))) as sports:
+            futures = {sports.submit(self.fetch, key, hedges, accept): key for key in sport_keys}
+            for fut, key in futures.items():
+                slate[key] = fut.result()
+        hedges.shutdown(wait=False)
+        self.save_stats()
+        return slate
+
+
+class ManualOverrides:
+    """manual_odds.json overrides ('Away @ Home': spread), indexed by lower-cased game"""
+
+    def __init__(self, path=MANUAL_ODDS_FILE):
+        self.path = path
+        self.index = {}
+        try:
+            with open(path, 'r') as f:
+                overrides = json.load(f).get('overrides', {})
+        except Exception:
+            overrides = {}
+        for game, value in overrides.items():
+            try:
+                self.index[game.strip().lower()] = float(value)
+            except (TypeError, ValueError):
+                print(f"⚠️ Invalid manual odds value for {game}: {value}")
+
+    def spread(self, game_string):
+        """Manual spread for 'Away @ Home', or None"""
+        return self.index.get(str(game_string).strip().lower())
+
+    def __len__(self):
+        return len(self.index)
+
+
+def default_odds_source(api_key, bookmakers=None, rate_limiter=None, stats_path=PROVIDER_STATS_FILE):
+    """OddsAPI first, DraftKings as the hedge/backup"""
+    return HedgedOddsSource([OddsAPIProvider(api_key, bookmakers=bookmakers, rate_limiter=rate_limiter),
+                             DraftKingsProvider()], stats_path=stats_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Odds provider health and latency')
+    parser.add_argument('--stats', action='store_true', help='Show stored provider stats')
+    parser.add_argument('--sports', nargs='+', help='Fetch these OddsAPI sport keys through the hedged source')
+    args = parser.parse_args()
+
+    if args.sports:
+        from odds_collector import OddsCollector
+        source = default_odds_source(OddsCollector().api_key)
+        for sport, (events, provider) in source.fetch_slate(args.sports).items():
+            print(f"🔌 {sport}: {len(events)} events from {provider or 'no provider'}")
+    if args.sports and not args.stats:
+        return
+    source = HedgedOddsSource([])
+    for name, data in sorted(source._load_stats().items()):
+        stats = ProviderStats(data)
+        p95 = stats.p95()
+        print(f"📈 {name:10} {'healthy' if stats.healthy() else 'COOLDOWN':8} ok {stats.successes} / fail {stats.failures}"
+              f" | p95 {f'{p95:.2f}s' if p95 is not None else 'n/a'}")
+
+
+if __name__ == '__main__':
+    main()
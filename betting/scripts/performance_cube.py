@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Performance Cube - single-pass W/L/P aggregates for the learning reports
+
+One cell per (sport, bet_type, confidence_bucket, edge_bucket, risk_tier, date)
+holding wins, losses, pushes, sum(confidence), sum(edge) and the closing line
+value roll-up (bets with CLV, sum of CLV, bets that beat the close). The cube is built in
+one vectorized pass over the settled bets (NumPy digitize for the buckets,
+bincount for the sums) and updated incrementally as results land: each bet is
+remembered by bet_id, so re-feeding it is a no-op and a corrected result moves
+its contribution to the right cell.
+
+Every LearningEngine / calculate_win_rates report is a roll-up over the cells,
+which cost scales with the number of distinct cells, not bets.
+
+Usage:
+    cube = PerformanceCube.load('performance_cube.json')
+    cube.update(settled_bets)
+    cube.save('performance_cube.json')
+    cube.win_rate_table('bet_type')
+    cube.rollup(['sport', 'confidence_bucket'], bet_type='TOTAL')
+    cube.clv_table('bet_type')
+"""
+
+import bisect
+import json
+import os
+
+import numpy as np
+
+from betting_database import bet_id, clean_label, ids_current
+
+DIMENSIONS = ('sport', 'bet_type', 'confidence_bucket', 'edge_bucket', 'risk_tier', 'date')
+RESULTS = ('WIN', 'LOSS', 'PUSH')
+
+# Same buckets as BettingDB's CONFIDENCE_BUCKET_SQL / EDGE_BUCKET_SQL, best first
+CONFIDENCE_BUCKETS = ['90-100%', '80-89%', '70-79%', '60-69%', '50-59%']
+EDGE_BUCKETS = ['10+ pts', '5-9.9 pts', '3-4.9 pts', '1-2.9 pts', '0-0.9 pts']
+_CONFIDENCE_EDGES = [60, 70, 80, 90]     # np.digitize -> index into reversed CONFIDENCE_BUCKETS
+_EDGE_EDGES = [1, 3, 5, 10]
+
+CUBE_VERSION = 3
+
+
+def confidence_bucket(confidence):
+    """CONFIDENCE_BUCKETS label for one confidence value (same cut points as the cube)"""
+    return CONFIDENCE_BUCKETS[::-1][bisect.bisect_right(_CONFIDENCE_EDGES, _number(confidence))]
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _clv(value):
+    """CLV as a float, or None for bets settled without a closing line"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(value) else value
+
+
+def _label(value):
+    value = clean_label(value)
+    return value if value not in (None, '') else 'Unknown'
+
+
+def _empty_rollup():
+    return {'wins': 0, 'losses': 0, 'pushes': 0, 'sum_confidence': 0.0, 'sum_edge': 0.0,
+            'clv_bets': 0, 'sum_clv': 0.0, 'positive_clv': 0}
+
+
+def clv_entry(agg):
+    """{clv_bets, avg_clv, beat_close_pct} for one roll-up (None averages without CLV data)"""
+    n = agg['clv_bets']
+    return {
+        'clv_bets': n,
+        'avg_clv': round(agg['sum_clv'] / n, 2) if n else None,
+        'beat_close_pct': round(agg['positive_clv'] / n * 100, 1) if n else None,
+    }
+
+
+class PerformanceCube:
+    def __init__(self):
+        # cell key (tuple in DIMENSIONS order) ->
+        #   [wins, losses, pushes, sum_confidence, sum_edge, clv_bets, sum_clv, positive_clv]
+        self.cells = {}
+        # bet_id -> [cell key, result, confidence, edge, clv] of what that bet contributed
+        self.seen = {}
+        # where the settlement feed left off (see incremental_learning.SettlementFeed)
+        self.watermark = {}
+
+    # ------------------------------------------------------------------ build
+
+    @classmethod
+    def from_bets(cls, bets, date=None):
+        cube = cls()
+        cube.update(bets, date=date)
+        return cube
+
+    def update(self, bets, date=None):
+        """
+        Fold settled bets into the cube. Bets already counted with the same result,
+        confidence, edge and CLV are skipped; changed ones are retracted and re-added.
+        An id repeated within the batch counts once (first occurrence).
+        Returns the number of bets that changed the cube.
+        """
+        fresh = []
+        batch = set()
+        for bet in bets:
+            result = str(bet.get('result') or '').strip().upper()
+            if result not in RESULTS:
+                continue
+            key = bet_id(bet, date)
+            if key in batch:
+                continue
+            batch.add(key)
+            confidence, edge = _number(bet.get('confidence')), _number(bet.get('edge'))
+            clv = _clv(bet.get('clv'))
+            previous = self.seen.get(key)
+            if previous is not None:
+                if previous[1:] == [result, confidence, edge, clv]:
+                    continue
+                self._retract(previous)
+            fresh.append((key, bet, result, confidence, edge, clv))
+        if fresh:
+            self._add_batch(fresh, date)
+        return len(fresh)
+
+    def _retract(self, entry):
+        cell_key, result, confidence, edge, clv = tuple(entry[0]), entry[1], entry[2], entry[3], entry[4]
+        cell = self.cells.get(cell_key)
+        if cell is None:
+            return
+        cell[RESULTS.index(result)] -= 1
+        cell[3] -= confidence
+        cell[4] -= edge
+        if clv is not None:
+            cell[5] -= 1
+            cell[6] -= clv
+            cell[7] -= int(clv > 0)
+        if cell[0] == cell[1] == cell[2] == 0:
+            del self.cells[cell_key]
+
+    def _add_batch(self, fresh, date):
+        """One vectorized pass: bucket, factorize the cell keys, bincount the sums."""
+        results = np.array([RESULTS.index(r) for _, _, r, _, _, _ in fresh])
+        confidence = np.array([c for _, _, _, c, _, _ in fresh], dtype=float)
+        edge = np.array([e for _, _, _, _, e, _ in fresh], dtype=float)
+        clv = np.array([np.nan if v is None else v for *_, v in fresh], dtype=float)
+        has_clv = ~np.isnan(clv)
+        conf_labels = np.array(CONFIDENCE_BUCKETS[::-1])[np.digitize(confidence, _CONFIDENCE_EDGES)]
+        edge_labels = np.array(EDGE_BUCKETS[::-1])[np.digitize(edge, _EDGE_EDGES)]
+
+        keys = [
+            (_label(bet.get('sport')), _label(bet.get('bet_type')), str(conf_labels[i]),
+             str(edge_labels[i]), _label(bet.get('risk_tier')), bet.get('date') or date or 'unknown')
+            for i, (_, bet, _, _, _, _) in enumerate(fresh)
+        ]
+        index = {}
+        group = np.array([index.setdefault(k, len(index)) for k in keys])
+        n = len(index)
+        counts = [np.bincount(group[results == r], minlength=n) for r in range(len(RESULTS))]
+        sum_conf = np.bincount(group, weights=confidence, minlength=n)
+        sum_edge = np.bincount(group, weights=edge, minlength=n)
+        clv_bets = np.bincount(group[has_clv], minlength=n)
+        sum_clv = np.bincount(group[has_clv], weights=clv[has_clv], minlength=n)
+        positive_clv = np.bincount(group[has_clv & (np.nan_to_num(clv) > 0)], minlength=n)
+
+        for cell_key, g in index.items():
+            cell = self.cells.setdefault(cell_key, [0, 0, 0, 0.0, 0.0, 0, 0.0, 0])
+            cell[0] += int(counts[0][g])
+            cell[1] += int(counts[1][g])
+            cell[2] += int(counts[2][g])
+            cell[3] += float(sum_conf[g])
+            cell[4] += float(sum_edge[g])
+            cell[5] += int(clv_bets[g])
+            cell[6] += float(sum_clv[g])
+            cell[7] += int(positive_clv[g])
+        for (bet_key, _, result, c, e, v), cell_key in zip(fresh, keys):
+            self.seen[bet_key] = [list(cell_key), result, c, e, v]
+
+    # ------------------------------------------------------------ persistence
+
+    @classmethod
+    def load(cls, path):
+        cube = cls()
+        if not os.path.exists(path):
+            return cube
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return cube
+        if data.get('version') != CUBE_VERSION or not ids_current(data.get('watermark')):
+            return cube  # rebuild from scratch on layout or bet id changes
+        cube.cells = {tuple(c['key']): c['values'] for c in data.get('cells', [])}
+        cube.seen = data.get('seen', {})
+        cube.watermark = data.get('watermark', {})
+        return cube
+
+    def save(self, path):
+        data = {
+            'version': CUBE_VERSION,
+            'dimensions': list(DIMENSIONS),
+            'cells': [{'key': list(k), 'values': v} for k, v in self.cells.items()],
+            'seen': self.seen,
+            'watermark': self.watermark,
+        }
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    # ---------------------------------------------------------------- queries
+
+    def rollup(self, group_by=(), **filters):
+        """
+        Sum cells grouped by the given dimensions, optionally filtered by exact
+        dimension values. Keys are the bare value for one dimension, a tuple for
+        several, () for none. Values: wins, losses, pushes, sum_confidence, sum_edge,
+        clv_bets, sum_clv, positive_clv.
+        """
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        for dim in list(group_by) + list(filters):
+            if dim not in DIMENSIONS:
+                raise ValueError(f'Unknown dimension: {dim}')
+        gidx = [DIMENSIONS.index(d) for d in group_by]
+        fidx = [(DIMENSIONS.index(d), v) for d, v in filters.items()]
+        out = {}
+        for key, cell in self.cells.items():
+            if any(key[i] != v for i, v in fidx):
+                continue
+            group = key[gidx[0]] if len(gidx) == 1 else tuple(key[i] for i in gidx)
+            agg = out.setdefault(group, _empty_rollup())
+            agg['wins'] += cell[0]
+            agg['losses'] += cell[1]
+            agg['pushes'] += cell[2]
+            agg['sum_confidence'] += cell[3]
+            agg['sum_edge'] += cell[4]
+            agg['clv_bets'] += cell[5]
+            agg['sum_clv'] += cell[6]
+            agg['positive_clv'] += cell[7]
+        return out
+
+    def totals(self, **filters):
+        return self.rollup((), **filters).get((), _empty_rollup())
+
+    def win_rate_table(self, dimension, order=None, avg_key=None, **filters):
+        """LearningEngine report shape: {value: {wins, losses, total, win_rate%, [avg], record}}"""
+        rows = self.rollup([dimension], **filters)
+        keys = list(rows)
+        if order:
+            keys.sort(key=lambda k: order.index(k) if k in order else len(order))
+        results = {}
+        for key in keys:
+            agg = rows[key]
+            total = agg['wins'] + agg['losses']
+            if total == 0:
+                continue
+            entry = {
+                'wins': agg['wins'],
+                'losses': agg['losses'],
+                'total': total,
+                'win_rate': round(agg['wins'] / total * 100, 1),
+            }
+            if avg_key:
+                settled = total + agg['pushes']
+                entry[avg_key] = round(agg['sum_' + avg_key[len('avg_'):]] / settled, 1)
+            entry['record'] = f"{agg['wins']}-{agg['losses']}"
+            results[key] = entry
+        return results
+
+    def clv_table(self, dimension, order=None, **filters):
+        """Closing line value per dimension value: {value: {clv_bets, avg_clv, beat_close_pct}}"""
+        rows = self.rollup([dimension], **filters)
+        keys = list(rows)
+        if order:
+            keys.sort(key=lambda k: order.index(k) if k in order else len(order))
+        return {key: clv_entry(rows[key]) for key in keys if rows[key]['clv_bets']}
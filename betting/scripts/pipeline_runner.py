@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+🔀 Pipeline Runner - In-process DAG for the betting update cycle
+
+Replaces the subprocess.run(['python3', script]) chains in auto_update_cycle and
+full_internal_sync. Every stage is a Python callable run in this process, so the
+interpreter and heavy imports (requests, numpy, pandas) are paid for once.
+
+- Stages declare the files they read (inputs) and write (outputs)
+- A stage runs after every earlier-declared stage it shares a file with (reads
+  what it writes, writes what it reads, or writes the same file). Everything
+  else runs concurrently on a small thread pool
+- Content-hash skip: a stage whose inputs hash the same as on its last successful
+  run (and whose outputs still exist) is skipped. Stages fed by live data
+  (odds, scores) are marked always=True
+- Parsed JSON is shared between stages through PipelineContext.load_json, keyed
+  by (path, mtime, size) so a file rewritten by an upstream stage is re-read
+- Per-stage timing report, persisted with the hashes in cache/pipeline_<name>.json
+
+STAGES (standard_stages):
+    odds -> lines -> settle (snapshot from the fresh odds cache, before settlement computes CLV)
+    settle, odds, injuries -> predict -> rank -> publish
+    settle -> calibrate -> predict
+    settle -> stats, learning -> rank
+    props (independent; cached per event, quota budgeted)
+    boxscores (independent; finished games not yet in the player stats store)
+
+USAGE:
+    python3 pipeline_runner.py                       # full DAG
+    python3 pipeline_runner.py --stages settle stats # subset
+    python3 pipeline_runner.py --force               # ignore content hashes
+"""
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+import pytz
+
+# Configuration
+WORKSPACE = os.environ.get('WORKSPACE', os.getcwd())
+
+# Timezone
+EST = pytz.timezone('America/Detroit')
+
+# Files
+ACTIVE_BETS_FILE = f"{WORKSPACE}/active_bets.json"
+RANKED_BETS_FILE = f"{WORKSPACE}/ranked_bets.json"
+COMPLETED_BETS_GLOB = f"{WORKSPACE}/completed_bets_*.json"
+WIN_RATES_FILE = f"{WORKSPACE}/historical_win_rates.json"
+LEARNING_FILE = f"{WORKSPACE}/learning_insights.json"
+WEIGHTS_FILE = f"{WORKSPACE}/adaptive_weights.json"
+CUBE_FILE = f"{WORKSPACE}/performance_cube.json"
+CALIBRATION_FILE = f"{WORKSPACE}/calibration_model.json"
+ML_MODEL_FILE = f"{WORKSPACE}/ml_model.pkl"  # written by the background training job (run_ml_training.sh)
+STATE_DIR = f"{WORKSPACE}/cache"
+
+VOLATILE_KEYS = ('last_updated', 'timestamp')
+
+DEFAULT_WORKERS = 4
+SLOW_STAGE_SECONDS = 300  # same budget the subprocess chain allowed per script
+
+
+class Stage:
+    """One in-process pipeline step: func(ctx) -> anything (False means failure)"""
+
+    def __init__(self, name, func, inputs=(), outputs=(), after=(), always=False, description=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+        self.always = always
+        self.description = description or name
+
+
+class PipelineContext:
+    """Shared, thread-safe cache of parsed files for one pipeline run"""
+
+    def __init__(self, workspace=WORKSPACE):
+        self.workspace = workspace
+        self.data = {}  # free-form values stages hand to each other
+        self._json = {}
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def load_json(self, path, default=None):
+        """Parsed JSON for path, parsed once per file version. Treat the result as read-only."""
+        sig = self._signature(path)
+        if sig is None:
+            return default
+        with self._lock:
+            cached = self._json.get(path)
+            if cached and cached[0] == sig:
+                return cached[1]
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+        except Exception:
+            return default
+        with self._lock:
+            self._json[path] = (sig, value)
+        return value
+
+    def file_digest(self, path):
+        """sha1 of a file's content ('missing' if absent), hashed once per file version.
+        JSON objects are hashed without their VOLATILE_KEYS."""
+        sig = self._signature(path)
+        if sig is None:
+            return 'missing'
+        with self._lock:
+            cached = self._digests.get(path)
+            if cached and cached[0] == sig:
+                return cached[1]
+        data = self.load_json(path) if path.endswith('.json') else None
+        if isinstance(data, dict):
+            # Refresh stamps aren't content: publish touching last_updated must not
+            # invalidate every stage that reads the file
+            data = {k: v for k, v in data.items() if k not in VOLATILE_KEYS}
+            digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+        else:
+            h = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()
+        with self._lock:
+            self._digests[path] = (sig, digest)
+        return digest
+
+    def completed_bets(self):
+        """All bets from completed_bets_*.json, flattened (read-only, shared across stages)"""
+        files = sorted(glob.glob(COMPLETED_BETS_GLOB))
+        key = tuple((f, self._signature(f)) for f in files)
+        with self._lock:
+            cached = self.data.get('_completed_bets')
+            if cached and cached[0] == key:
+                return cached[1]
+        bets = []
+        for path in files:
+            data = self.load_json(path)
+            file_bets = data.get('bets', []) if isinstance(data, dict) else data if isinstance(data, list) else []
+            file_date = re.search(r'(\d{4}-\d{2}-\d{2})', os.path.basename(path))
+            for bet in file_bets:
+                # Copies, so the file's parsed JSON stays untouched; date comes from the filename
+                bets.append(dict(bet, date=bet.get('date') or (file_date and file_date.group(1))))
+        with self._lock:
+            self.data['_completed_bets'] = (key, bets)
+        return bets
+
+
+def _expand(pattern):
+    """Inputs may be globs; a missing plain path still counts (as 'missing')"""
+    if any(ch in pattern for ch in '*?['):
+        return sorted(glob.glob(pattern))
+    return [pattern]
+
+
+def _overlaps(paths, patterns):
+    return any(p == q or fnmatch.fnmatch(p, q) or fnmatch.fnmatch(q, p) for p in paths for q in patterns)
+
+
+class Pipeline:
+    """Dependency-ordered, concurrent runner for a list of Stages"""
+
+    def __init__(self, name, stages, workers=DEFAULT_WORKERS, log=print, state_dir=STATE_DIR):
+        self.name = name
+        self.stages = {s.name: s for s in stages}
+        self.order = [s.name for s in stages]
+        self.state_file = f"{state_dir}/pipeline_{name}.json"
+        self.workers = workers
+        self.log = log
+        self.deps = self._resolve_deps()
+
+    def _resolve_deps(self):
+        """
+        Declaration order is the tie-breaker: a stage waits for every earlier stage
+        that writes a file it reads, reads a file it writes, or writes the same file.
+        """
+        deps = {name: set() for name in self.order}
+        for i, name in enumerate(self.order):
+            stage = self.stages[name]
+            deps[name].update(d for d in stage.after if d in self.stages)
+            for other in self.order[:i]:
+                earlier = self.stages[other]
+                if (_overlaps(earlier.outputs, stage.inputs) or _overlaps(earlier.inputs, stage.outputs)
+                        or _overlaps(earlier.outputs, stage.outputs)):
+                    deps[name].add(other)
+        self._check_cycles(deps)
+        return deps
+
+    def _check_cycles(self, deps):
+        done, visiting = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in deps[name]:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.order:
+            visit(name, [])
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_state(self, state):
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            tmp = self.state_file + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp, self.state_file)
+        except Exception as e:
+            self.log(f"⚠️ Could not save pipeline state: {e}")
+
+    @staticmethod
+    def files_hash(salt, patterns, ctx):
+        h = hashlib.sha1(salt.encode())
+        for pattern in patterns:
+            for path in _expand(pattern):
+                h.update(f"{path}:{ctx.file_digest(path)}\n".encode())
+        return h.hexdigest()
+
+    def _run_stage(self, stage, ctx, previous, force):
+        """
+        Skip when both the inputs and the outputs hash the same as after the last
+        successful run - outputs rewritten by something else (or deleted) force a rerun.
+        """
+        started = time.monotonic()
+        hashed = not stage.always and bool(stage.inputs)
+        if hashed and not force and previous.get('hash') == self.files_hash(stage.name, stage.inputs, ctx) \
+                and previous.get('outputs') == self.files_hash(stage.name, stage.outputs, ctx):
+            return {'status': 'skipped', 'seconds': time.monotonic() - started}
+        self.log(f"▶️  Running: {stage.description}")
+        try:
+            result = stage.func(ctx)
+        except Exception as e:
+            return {'status': 'failed', 'seconds': time.monotonic() - started, 'error': str(e)}
+        seconds = time.monotonic() - started
+        if result is False:
+            return {'status': 'failed', 'seconds': seconds, 'error': 'stage reported failure'}
+        outcome = {'status': 'ok', 'seconds': seconds}
+        if hashed:
+            # Hash what the stage actually consumed and produced
+            outcome['hash'] = self.files_hash(stage.name, stage.inputs, ctx)
+            outcome['outputs'] = self.files_hash(stage.name, stage.outputs, ctx)
+        return outcome
+
+    def run(self, only=None, force=False, ctx=None):
+        """
+        Run the selected stages (default: all). A failed stage does not block its
+        dependents - like the old script chains, they run on whatever is on disk.
+        Returns the report: {'stages': {name: {...}}, 'wall_seconds': float}
+        """
+        ctx = ctx or PipelineContext()
+        selected = [n for n in self.order if only is None or n in only]
+        unknown = set(only or ()) - set(self.order)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+        deps = {n: self.deps[n] & set(selected) for n in selected}
+
+        state = self._load_state()
+        hashes = state.get('stages', {})
+        results = {}
+        pending = list(selected)
+        running = {}
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in [n for n in pending if deps[n] <= set(results)]:
+                    pending.remove(name)
+                    fut = pool.submit(self._run_stage, self.stages[name], ctx, hashes.get(name, {}), force)
+                    running[fut] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    outcome = fut.result()
+                    results[name] = outcome
+                    self._log_outcome(self.stages[name], outcome)
+                    if outcome['status'] == 'ok' and outcome.get('hash'):
+                        hashes[name] = {'hash': outcome.pop('hash'), 'outputs': outcome.pop('outputs'),
+                                        'finished_at': datetime.now(EST).isoformat()}
+                    elif outcome['status'] == 'failed':
+                        hashes.pop(name, None)
+
+        report = {
+            'finished_at': datetime.now(EST).isoformat(),
+            'wall_seconds': round(time.monotonic() - started, 3),
+            'stages': {n: {k: (round(v, 3) if k == 'seconds' else v)
+                           for k, v in results[n].items()} for n in selected},
+        }
+        state['stages'] = hashes
+        state['last_run'] = report
+        self._save_state(state)
+        return report
+
+    def _log_outcome(self, stage, outcome):
+        seconds = outcome['seconds']
+        if outcome['status'] == 'ok':
+            self.log(f"✅ {stage.description} - SUCCESS ({seconds:.1f}s)")
+            if seconds > SLOW_STAGE_SECONDS:
+                self.log(f"⏱️ {stage.description} took longer than {SLOW_STAGE_SECONDS}s")
+        elif outcome['status'] == 'skipped':
+            self.log(f"⏭️  {stage.description} - SKIPPED (inputs unchanged)")
+        else:
+            self.log(f"❌ {stage.description} - FAILED: {outcome.get('error')}")
+
+    def print_report(self, report):
+        """Per-stage timing table"""
+        self.log("📋 Stage timing:")
+        total = 0.0
+        for name, row in report['stages'].items():
+            total += row['seconds']
+            self.log(f"   {name:10} {row['status']:8} {row['seconds']:7.2f}s")
+        self.log(f"   {'wall':10} {'':8} {report['wall_seconds']:7.2f}s (stage sum {total:.2f}s)")
+
+    def succeeded(self, report):
+        """Names of stages that ran or were skipped as up to date"""
+        return [n for n, r in report['stages'].items() if r['status'] in ('ok', 'skipped')]
+
+
+# ---------------------------------------------------------------------------
+# Standard stages. Modules are imported inside each stage so a subset run only
+# pays for what it uses.
+# ---------------------------------------------------------------------------
+
+def snapshot_lines(ctx):
+    # Runs after 'odds' on the same collector: its fresh cache is the snapshot, no second OddsAPI call
+    from closing_line_value import capture_closing_lines, slate_sports
+    active = ctx.load_json(ACTIVE_BETS_FILE, {}) or {}
+    capture_closing_lines(slate_sports(active.get('bets', [])), collector=ctx.data.get('odds_collector'))
+
+
+def ingest_odds(ctx):
+    from odds_collector import OddsCollector
+    collector = OddsCollector()
+    ctx.data['odds_collector'] = collector
+    odds = collector.collect_all_odds()
+    ctx.data['odds'] = odds
+    return bool(odds)
+
+
+def ingest_props(ctx):
+    from oddsapi_rate_limiter import OddsAPIRateLimiter
+    from props_ingestion import PropsIngestor
+    summary = PropsIngestor(rate_limiter=OddsAPIRateLimiter()).ingest()
+    ctx.data['props'] = summary
+    return summary['fetched'] > 0 or summary['failed'] == 0
+
+
+def ingest_injuries(ctx):
+    from injury_feed import refresh_injuries
+    summary = refresh_injuries()
+    ctx.data['injuries'] = summary
+    return summary['failed'] < summary['teams'] or summary['teams'] == 0
+
+
+def ingest_boxscores(ctx):
+    from player_stats_store import PlayerStatsStore
+    ctx.data['boxscores'] = {sport: PlayerStatsStore(sport).ingest(days=2) for sport in ('nba', 'ncb')}
+    return True
+
+
+def calibrate(ctx):
+    from betting_database import open_if_populated
+    from calibration_model import refresh_model
+    refresh_model(CALIBRATION_FILE, open_if_populated(), workspace=WORKSPACE)
+
+
+def predict(ctx):
+    from initialize_daily_bets import initialize_active_bets
+    initialize_active_bets(output_path=ACTIVE_BETS_FILE, rank=False)
+
+
+def settle(ctx):
+    from game_status_checker import update_all_game_statuses
+    update_all_game_statuses()
+
+
+def stats(ctx):
+    from calculate_win_rates import calculate_historical_win_rates, save_win_rates
+    results = calculate_historical_win_rates(ctx.completed_bets())
+    save_win_rates(results, output_file=WIN_RATES_FILE)
+    ctx.data['win_rates'] = results
+
+
+def learning(ctx):
+    from learning_engine import LearningEngine
+    from update_adaptive_weights import AdaptiveWeightUpdater
+    engine = LearningEngine()
+    engine.learning_file = LEARNING_FILE
+    engine.cube_file = CUBE_FILE
+    insights = engine.run_analysis(incremental=True)
+    if insights is None:
+        return  # nothing new settled - weights stay as they are
+    updater = AdaptiveWeightUpdater()
+    updater.learning_file = LEARNING_FILE
+    updater.weights_file = WEIGHTS_FILE
+    weights = updater.calculate_weights(insights)
+    if weights:
+        updater.save_weights(weights)
+        updater.apply_confidence_calibration(insights)
+
+
+def rank(ctx):
+    from bet_ranker import calculate_bet_type_performance, rank_today_bets, save_ranked_bets
+    win_rates, performance = calculate_bet_type_performance(ctx.completed_bets())
+    active = ctx.load_json(ACTIVE_BETS_FILE, {}) or {}
+    ranked = rank_today_bets([dict(b) for b in active.get('bets', [])], win_rates)
+    save_ranked_bets(ranked, performance, win_rates, output_path=RANKED_BETS_FILE)
+
+
+def publish(ctx):
+    timestamp = datetime.now(EST).isoformat()
+    for path in (ACTIVE_BETS_FILE, RANKED_BETS_FILE):
+        data = ctx.load_json(path)
+        if not isinstance(data, dict):
+            continue
+        data = dict(data, last_updated=timestamp)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+
+def standard_stages():
+    """The full daily DAG, in declaration order"""
+    return [
+        Stage('odds', ingest_odds, always=True, description="Odds Ingest"),
+        Stage('lines', snapshot_lines, after=['odds'], always=True, description="Closing Line Snapshot"),
+        Stage('settle', settle, outputs=[ACTIVE_BETS_FILE, RANKED_BETS_FILE, COMPLETED_BETS_GLOB],
+              after=['lines'], always=True, description="Game Status Checker"),
+        Stage('props', ingest_props, always=True, description="Player Props Ingest"),
+        Stage('boxscores', ingest_boxscores, always=True, description="Player Box Score Ingest"),
+        Stage('injuries', ingest_injuries, always=True, description="Injury Report Ingest"),
+        Stage('calibrate', calibrate, inputs=[COMPLETED_BETS_GLOB], outputs=[CALIBRATION_FILE],
+              description="Confidence Calibration Refit"),
+        Stage('predict', predict, inputs=[CALIBRATION_FILE, ML_MODEL_FILE], outputs=[ACTIVE_BETS_FILE], after=['odds', 'injuries'],
+              always=True, description="Pick Generation"),
+        Stage('stats', stats, inputs=[COMPLETED_BETS_GLOB], outputs=[WIN_RATES_FILE],
+              description="Win Rate Statistics"),
+        Stage('learning', learning, inputs=[COMPLETED_BETS_GLOB],
+              outputs=[LEARNING_FILE, WEIGHTS_FILE], description="Learning Engine + Weights"),
+        Stage('rank', rank, inputs=[ACTIVE_BETS_FILE, COMPLETED_BETS_GLOB, WEIGHTS_FILE],
+              outputs=[RANKED_BETS_FILE], description="Bet Ranker"),
+        Stage('publish', publish, outputs=[ACTIVE_BETS_FILE, RANKED_BETS_FILE], always=True,
+              description="Publish Timestamps"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the betting pipeline in-process')
+    parser.add_argument('--stages', nargs='+', help='Subset of stages to run (default: all)')
+    parser.add_argument('--force', action='store_true', help='Run stages even if inputs are unchanged')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    pipeline = Pipeline('daily', standard_stages(), workers=args.workers)
+    report = pipeline.run(only=args.stages, force=args.force)
+    pipeline.print_report(report)
+    failed = [n for n, r in report['stages'].items() if r['status'] == 'failed']
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,37 +2,30 @@
 """
 LarlBot Player Props Analyzer 🎰
 Find value in player prop bets - often the softest markets
+
+Projections come from prop_projection (rolling box score form, pace and
+opponent adjustments from the player stats store), scored for the whole board
+in one batch.
 """
 
 import pandas as pd
 from datetime import datetime
 from odds_collector import OddsCollector
-import numpy as np
+from prop_projection import PropProjector
+
+PROP_EDGE_MARGIN = 0.03     # model probability must beat the price's implied probability by this
+
+def american_to_probability(american_odds):
+    """Convert American odds to implied probability"""
+    if american_odds > 0:
+        return 100 / (american_odds + 100)
+    return abs(american_odds) / (abs(american_odds) + 100)
 
 class PlayerPropsAnalyzer:
     def __init__(self):
         self.odds_collector = OddsCollector()
         
-        # Player averages (would be better from real API)
-        self.player_averages = {
-            # Today's mock players with realistic stats
-            'Max Klesmit': {'points': 16.2, 'rebounds': 3.1, 'assists': 2.4},
-            'Jaden Akins': {'points': 15.1, 'rebounds': 4.2, 'assists': 3.1}, 
-            'Tyler Wahl': {'points': 11.8, 'rebounds': 8.2, 'assists': 2.1},
-            'Gibson Jimerson': {'points': 19.1, 'rebounds': 4.1, 'assists': 2.8},
-            'Philip Alston': {'points': 8.2, 'rebounds': 2.1, 'assists': 6.2},
-            'Dwight Wilson': {'points': 21.2, 'rebounds': 5.4, 'assists': 1.8},
-            'AJ Clayton': {'points': 14.1, 'rebounds': 9.1, 'assists': 2.4},
-        }
-        
-        # Pace factors by team (faster pace = more stats)
-        self.team_pace = {
-            'Boston Celtics': 101.2,
-            'Phoenix Suns': 102.1,
-            'Sacramento Kings': 104.2,  # Fast pace
-            'Miami Heat': 97.8,  # Slow pace
-            # Would expand this
-        }
+        self.projector = PropProjector()
     
     def get_player_props_odds(self):
         """Get player prop odds - tries real API first, falls back to realistic mock data"""
@@ -67,13 +60,13 @@ class PlayerPropsAnalyzer:
                 if raw_games:
                     event_id = raw_games[0].get('id')
                     if event_id:
-                        props = self.odds_collector.get_player_props_for_event(event_id)
+                        props = self.odds_collector.get_player_props_for_event(event_id, sport=sport, event=raw_games[0])
                         if props:  # If we get any real props, use the real system
-                            # Get props for a few more games
+                            # Get props for a few more games (the first one is served from the props cache)
                             for raw_game in raw_games[:3]:
                                 event_id = raw_game.get('id')
                                 if event_id:
-                                    more_props = self.odds_collector.get_player_props_for_event(event_id)
+                                    more_props = self.odds_collector.get_player_props_for_event(event_id, sport=sport, event=raw_game)
                                     player_props.extend(more_props)
                             return player_props
             
@@ -105,73 +98,53 @@ class PlayerPropsAnalyzer:
     
     def analyze_player_prop(self, prop):
         """Analyze a single player prop for value"""
-        player = prop['player']
-        prop_type = prop['prop_type']  # points, rebounds, assists
-        market_line = prop['line']
-        
-        # Get player's average (simplified)
-        player_avg = self.get_player_average(player, prop_type)
-        if not player_avg:
-            return None
-        
-        # Pace adjustment
-        pace_factor = self.get_pace_adjustment(prop['game'])
-        adjusted_avg = player_avg * pace_factor
-        
-        # Calculate edge
-        edge = abs(adjusted_avg - market_line)
-        
-        # Determine bet recommendation
-        if adjusted_avg > market_line + 1.5:  # 1.5+ edge threshold
-            recommendation = f"OVER {market_line}"
-            confidence = min(0.8, edge / 5)  # Higher edge = higher confidence
-        elif adjusted_avg < market_line - 1.5:
-            recommendation = f"UNDER {market_line}"  
-            confidence = min(0.8, edge / 5)
-        else:
-            return None
-        
-        return {
-            'game': prop['game'],
-            'player': player,
-            'prop_type': prop_type.title(),
-            'market_line': market_line,
-            'our_projection': round(adjusted_avg, 1),
-            'recommendation': recommendation,
-            'edge': round(edge, 1),
-            'confidence': confidence,
-            'bookmaker': prop['bookmaker'],
-            'bet_type': 'player_prop'
-        }
+        return self.analyze_player_props([prop])[0]
     
-    def get_player_average(self, player, stat_type):
-        """Get player's average for this stat type"""
-        if player in self.player_averages:
-            return self.player_averages[player].get(stat_type, None)
-        
-        # Simplified fallback averages by position/tier
-        fallback_averages = {
-            'points': np.random.normal(15, 8),  # Would use real data
-            'rebounds': np.random.normal(6, 3),
-            'assists': np.random.normal(4, 2)
-        }
-        
-        return max(0, fallback_averages.get(stat_type, 10))
-    
-    def get_pace_adjustment(self, game_matchup):
-        """Adjust for game pace - faster games = more stats"""
-        # Parse teams from matchup
-        if '@' in game_matchup:
-            away, home = game_matchup.split(' @ ')
-        else:
-            return 1.0
-        
-        away_pace = self.team_pace.get(away.strip(), 100)
-        home_pace = self.team_pace.get(home.strip(), 100)
-        avg_pace = (away_pace + home_pace) / 2
-        
-        # Convert to multiplier (100 = average pace)
-        return avg_pace / 100
+    def analyze_player_props(self, props):
+        """Project every prop on the board in one batch; one analysis (or None) per prop"""
+        projections = self.projector.project(props)
+        analyses = []
+        
+        for prop, projection in zip(props, projections):
+            if projection is None:
+                analyses.append(None)
+                continue
+            
+            market_line = prop['line']
+            over_prob = projection['over_probability']
+            under_prob = projection['under_probability']
+            over_edge = over_prob - american_to_probability(prop.get('odds') or -110)
+            under_edge = under_prob - american_to_probability(prop.get('under_odds') or -110)
+            
+            # Bet the side whose probability beats its price by the margin
+            if over_edge >= under_edge and over_edge > PROP_EDGE_MARGIN:
+                recommendation = f"OVER {market_line}"
+                confidence, probability_edge = over_prob, over_edge
+            elif under_edge > PROP_EDGE_MARGIN:
+                recommendation = f"UNDER {market_line}"
+                confidence, probability_edge = under_prob, under_edge
+            else:
+                analyses.append(None)
+                continue
+            
+            analyses.append({
+                'game': prop['game'],
+                'player': prop['player'],
+                'prop_type': str(prop['prop_type']).title(),
+                'market_line': market_line,
+                'our_projection': round(projection['projection'], 1),
+                'projection_sd': projection['sd'],
+                'recommendation': recommendation,
+                'edge': round(abs(projection['projection'] - market_line), 1),
+                'probability_edge': round(probability_edge, 4),
+                'over_probability': over_prob,
+                'under_probability': under_prob,
+                'confidence': confidence,
+                'bookmaker': prop['bookmaker'],
+                'bet_type': 'player_prop'
+            })
+        
+        return analyses
     
     def find_player_prop_values(self):
         """Find all player prop value bets"""
@@ -180,8 +153,7 @@ class PlayerPropsAnalyzer:
         
         print("🎯 Analyzing player props for value...")
         
-        for prop in props:
-            analysis = self.analyze_player_prop(prop)
+        for analysis in self.analyze_player_props(props):
             if analysis and analysis['confidence'] > 0.4:
                 value_props.append(analysis)
         
@@ -205,7 +177,7 @@ class PlayerPropsAnalyzer:
             print(f"   Game: {prop['game']}")
             print(f"   BET: {prop['recommendation']}")
             print(f"   Market Line: {prop['market_line']} | Our Projection: {prop['our_projection']}")
-            print(f"   Edge: {prop['edge']} | Confidence: {prop['confidence']:.0%}")
+            print(f"   Edge: {prop['edge']} | Win Prob: {prop['confidence']:.0%} ({prop['probability_edge']:+.1%} vs price)")
             print(f"   Book: {prop['bookmaker']}")
             print()
 
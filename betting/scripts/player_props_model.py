@@ -3,9 +3,11 @@
 Player Props Model v1.0
 Fetches player prop markets from OddsAPI (FanDuel)
 Supports: Points, Rebounds, Assists, Threes, etc.
+
+Lines come from props_ingestion (one combined-market call per event, cached
+with a tip-off aware TTL, quota budgeted) via the player_props table.
 """
 
-import requests
 from datetime import datetime, timezone
 
 class PlayerPropsModel:
@@ -22,120 +24,55 @@ class PlayerPropsModel:
             {'key': 'ice_hockey_nhl', 'display': 'NHL', 'emoji': '🏒'},
         ]
         
-        # Player prop markets
-        self.markets = [
-            'player_points',
-            'player_rebounds', 
-            'player_assists',
-            'player_threes',
-            'player_pass_tds',
-            'player_pass_yds',
-            'player_rush_yds',
-            'player_receptions',
-            'player_reception_yds',
-            'player_hits',
-            'player_total_bases',
-            'player_home_runs',
-        ]
-    
-    def fetch_player_props(self, sport_key, market='player_points'):
-        """Fetch player props for a specific sport and market"""
-        try:
-            url = f"{self.base_url}/sports/{sport_key}/events"
-            params = {
-                'apiKey': self.oddsapi_key,
-                'regions': 'us',
-                'markets': market,
-                'oddsFormat': 'american',
-                'bookmakers': 'fanduel',
-                'dateFormat': 'iso'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 404:
-                return []
-            else:
-                print(f"⚠️ Props API error {response.status_code} for {sport_key}/{market}")
-                return []
-        
-        except Exception as e:
-            print(f"⚠️ Error fetching props: {e}")
-            return []
+        self.ingestor = None
     
     def generate_prop_picks(self):
-        """Generate player prop betting opportunities"""
+        """Generate player prop betting opportunities from the ingested FanDuel prop lines"""
+        from oddsapi_rate_limiter import OddsAPIRateLimiter
+        from props_ingestion import PropsIngestor
+        
         all_props = []
         
         print("🏅 Fetching player props from FanDuel...")
         
-        for sport in self.prop_sports:
-            sport_key = sport['key']
-            display_name = sport['display']
-            emoji = sport['emoji']
+        sports = {sport['key']: sport for sport in self.prop_sports}
+        self.ingestor = PropsIngestor(api_key=self.oddsapi_key, rate_limiter=OddsAPIRateLimiter(api_key=self.oddsapi_key))
+        self.ingestor.ingest(list(sports))
+        
+        for row in self.ingestor.slate_props(bookmaker='fanduel'):
+            sport = sports.get(row['sport'])
+            if not sport or row['over_price'] is None:
+                continue
+            display_name, emoji = sport['display'], sport['emoji']
+            market, player_name, line = row['market'], row['player'], row['line']
+            stat = market.replace('player_', '').replace('batter_', '')
+            over_price = row['over_price']
+            under_price = row['under_price'] or 0
+            
+            # Simple edge calculation (placeholder - can be improved)
+            edge = abs(over_price - under_price) / 20.0
+            confidence = min(85, 55 + edge * 2)
+            
+            prop_pick = {
+                'game': row['game'],
+                'sport': f"{emoji} {display_name}",
+                'bet_type': 'PLAYER PROP',
+                'prop_market': stat.replace('_', ' ').title(),
+                'player': player_name,
+                'recommendation': f"{player_name} OVER {line}",
+                'fanduel_line': f"Over {line} ({over_price}) / Under {line} ({under_price})",
+                'odds': over_price,
+                'edge': round(edge, 1),
+                'confidence': round(confidence),
+                'risk_tier': '🟡 MODERATE RISK',
+                'game_time': self.format_time(row['commence_time'] or ''),
+                'reason': f"Player prop: {player_name} {stat} line at {line}",
+                'bet_instructions': f"📍 PLACE BET ON FanDuel: {player_name} OVER {line} {stat}",
+                'bet_explanation': f"Bet that {player_name} will score OVER {line} {stat}",
+                'bookmaker_source': 'FanDuel',
+            }
             
-            # Try player points/touchdowns for this sport
-            for market in self.markets:
-                events = self.fetch_player_props(sport_key, market)
-                
-                if not events:
-                    continue
-                
-                print(f"  [{emoji} {display_name} - {market}] ✅ {len(events)} games")
-                
-                for event in events:
-                    home_team = event.get('home_team', '')
-                    away_team = event.get('away_team', '')
-                    game = f"{away_team} @ {home_team}"
-                    
-                    commence_time = event.get('commence_time', '')
-                    game_time = self.format_time(commence_time)
-                    
-                    bookmakers = event.get('bookmakers', [])
-                    for book in bookmakers:
-                        if book.get('key') != 'fanduel':
-                            continue
-                        
-                        markets = book.get('markets', [])
-                        for mkt in markets:
-                            if mkt.get('key') != market:
-                                continue
-                            
-                            outcomes = mkt.get('outcomes', [])
-                            for outcome in outcomes:
-                                player_name = outcome.get('description', 'Unknown Player')
-                                line = outcome.get('point', 0)
-                                over_price = outcome.get('price', 0)
-                                
-                                # Find corresponding under
-                                under = next((o for o in outcomes if o.get('name') == 'Under' and o.get('description') == player_name), None)
-                                under_price = under.get('price', 0) if under else 0
-                                
-                                # Simple edge calculation (placeholder - can be improved)
-                                edge = abs(over_price - under_price) / 20.0
-                                confidence = min(85, 55 + edge * 2)
-                                
-                                prop_pick = {
-                                    'game': game,
-                                    'sport': f"{emoji} {display_name}",
-                                    'bet_type': 'PLAYER PROP',
-                                    'prop_market': market.replace('player_', '').replace('_', ' ').title(),
-                                    'player': player_name,
-                                    'recommendation': f"{player_name} OVER {line}",
-                                    'fanduel_line': f"Over {line} ({over_price}) / Under {line} ({under_price})",
-                                    'edge': round(edge, 1),
-                                    'confidence': round(confidence),
-                                    'risk_tier': '🟡 MODERATE RISK',
-                                    'game_time': game_time,
-                                    'reason': f"Player prop: {player_name} {market.replace('player_', '')} line at {line}",
-                                    'bet_instructions': f"📍 PLACE BET ON FanDuel: {player_name} OVER {line} {market.replace('player_', '')}",
-                                    'bet_explanation': f"Bet that {player_name} will score OVER {line} {market.replace('player_', '')}",
-                                    'bookmaker_source': 'FanDuel',
-                                }
-                                
-                                all_props.append(prop_pick)
+            all_props.append(prop_pick)
         
         print(f"📊 Total player props available: {len(all_props)}\n")
         return all_props
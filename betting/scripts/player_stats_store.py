@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+🧾 Player Stats Store - per-game box score lines for every player, columnar
+
+Fed from ESPN box scores of completed games (scoreboard -> summary per game,
+fetched concurrently through espn_team_fetcher's rate-limited client). Each
+player's game is one row:
+
+    player, date (YYYYMMDD), team, opponent, possessions (game pace estimate),
+    minutes, points, rebounds, assists, threes, steals, blocks, turnovers
+
+Layout (PLAYER_STORE_DIR/<sport>/): one <column>.npy per column, rows sorted by
+(player, date), plus offsets.npy so player i's games are rows
+offsets[i]:offsets[i+1] (CSR style, no per-player lookups). index.json holds
+the player ids / names, team names and the ESPN game ids already ingested, so
+a box score is only ever read once. Arrays are memory-mapped on read.
+
+Possessions per team come from the box score: FGA - OREB + TO + 0.44 * FTA,
+averaged over both teams.
+
+USAGE:
+    from player_stats_store import PlayerStatsStore
+    store = PlayerStatsStore('nba')
+    store.ingest(days=2)                       # yesterday + today's finished games
+    rows = store.player_rows(store.find_player('LeBron James'))
+    python3 player_stats_store.py --sport nba --days 7
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from game_results_store import SCOREBOARD_URLS, EST, local_game_date
+
+PLAYER_STORE_DIR = '../data/player_logs'
+STORE_VERSION = 1
+
+SUMMARY_URLS = {
+    'nba': 'https://site.api.espn.com/apis/site/v2/sports/basketball/nba/summary',
+    'ncb': 'https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/summary',
+}
+STATS = ('minutes', 'points', 'rebounds', 'assists', 'threes', 'steals', 'blocks', 'turnovers')
+COLUMNS = ('player', 'date', 'team', 'opponent', 'possessions') + STATS
+_INT_COLUMNS = ('player', 'date', 'team', 'opponent')
+
+# box score label -> stat column ("made-attempted" labels keep the made count)
+BOX_LABELS = {'MIN': 'minutes', 'PTS': 'points', 'REB': 'rebounds', 'AST': 'assists', '3PT': 'threes',
+              'STL': 'steals', 'BLK': 'blocks', 'TO': 'turnovers'}
+DEFAULT_WORKERS = 8
+
+
+def normalize_name(name):
+    """'LeBron James Jr.' -> 'lebron james' (matching across ESPN / sportsbook spellings)"""
+    name = re.sub(r"[^a-z ]", '', str(name or '').lower().replace('-', ' '))
+    return ' '.join(w for w in name.split() if w not in ('jr', 'sr', 'ii', 'iii', 'iv'))
+
+
+def _number(value, made=True):
+    """Box score cell -> float ('10-18' -> 10 made / 18 attempted, '--' -> NaN)"""
+    text = str(value or '').strip()
+    if '-' in text[1:]:
+        made_count, _, attempted = text.partition('-')
+        text = made_count if made else attempted
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def parse_box_score(summary):
+    """
+    ESPN summary -> (rows, possessions) where rows are
+    {'player_id', 'name', 'team', 'opponent', **STATS} for everyone who played.
+    """
+    teams = (summary or {}).get('boxscore', {}).get('players', [])
+    if len(teams) != 2:
+        return [], np.nan
+    names = [(t.get('team') or {}).get('displayName') for t in teams]
+    rows, possessions = [], []
+    for side, team in enumerate(teams):
+        fga = oreb = to = fta = 0.0
+        for block in team.get('statistics', []):
+            labels = block.get('labels') or []
+            for athlete in block.get('athletes', []):
+                info = athlete.get('athlete') or {}
+                cells = dict(zip(labels, athlete.get('stats') or []))
+                fga += np.nan_to_num(_number(cells.get('FG'), made=False))
+                fta += np.nan_to_num(_number(cells.get('FT'), made=False))
+                oreb += np.nan_to_num(_number(cells.get('OREB')))
+                to += np.nan_to_num(_number(cells.get('TO')))
+                minutes = _number(cells.get('MIN'))
+                if athlete.get('didNotPlay') or not info.get('id') or not minutes > 0:
+                    continue
+                row = {'player_id': str(info['id']), 'name': info.get('displayName'),
+                       'team': names[side], 'opponent': names[1 - side]}
+                row.update({stat: _number(cells.get(label)) for label, stat in BOX_LABELS.items()})
+                rows.append(row)
+        possessions.append(fga - oreb + to + 0.44 * fta)
+    pace = float(np.mean(possessions)) if all(p > 0 for p in possessions) else np.nan
+    return rows, pace
+
+
+class PlayerStatsStore:
+    def __init__(self, sport='nba', path=PLAYER_STORE_DIR):
+        self.sport = sport
+        self.path = os.path.join(path, sport)
+        self.players = []       # [espn id, name] per player index
+        self.teams = []         # team name per team index
+        self.games = set()      # ESPN game ids already ingested
+        self.columns = {c: np.zeros(0, dtype=np.int64 if c in _INT_COLUMNS else float) for c in COLUMNS}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self._load()
+        self._reindex()
+
+    # ---------------------------------------------------------- persistence
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        try:
+            with open(self._file('index.json'), 'r') as f:
+                meta = json.load(f)
+        except Exception:
+            return
+        if meta.get('version') != STORE_VERSION:
+            return  # layout changed: re-ingest
+        try:
+            columns = {c: np.load(self._file(f'{c}.npy'), mmap_mode='r') for c in COLUMNS}
+            offsets = np.load(self._file('offsets.npy'))
+        except (OSError, ValueError):
+            return
+        self.players, self.teams, self.games = meta['players'], meta['teams'], set(meta['games'])
+        self.columns, self.offsets = columns, offsets
+
+    def _save(self):
+        os.makedirs(self.path, exist_ok=True)
+        for c in COLUMNS:
+            tmp = self._file(f'{c}.tmp.npy')
+            np.save(tmp, np.asarray(self.columns[c]))
+            os.replace(tmp, self._file(f'{c}.npy'))
+        np.save(self._file('offsets.tmp.npy'), self.offsets)
+        os.replace(self._file('offsets.tmp.npy'), self._file('offsets.npy'))
+        tmp = self._file('index.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'version': STORE_VERSION, 'columns': COLUMNS, 'updated_at': datetime.now().isoformat(),
+                       'players': self.players, 'teams': self.teams, 'games': sorted(self.games)}, f)
+        os.replace(tmp, self._file('index.json'))
+        self.columns = {c: np.load(self._file(f'{c}.npy'), mmap_mode='r') for c in COLUMNS}
+
+    def _reindex(self):
+        self.player_index = {pid: i for i, (pid, _) in enumerate(self.players)}
+        self.name_index = {normalize_name(name): i for i, (_, name) in enumerate(self.players)}
+        self.team_index = {name: i for i, name in enumerate(self.teams)}
+
+    # -------------------------------------------------------------- writes
+
+    def _team(self, name):
+        if name not in self.team_index:
+            self.team_index[name] = len(self.teams)
+            self.teams.append(name)
+        return self.team_index[name]
+
+    def add_games(self, box_scores):
+        """
+        box_scores: [(game_id, date 'YYYY-MM-DD', ESPN summary)]. New rows are merged
+        into the sorted arrays and written once. Returns player-game rows added.
+        """
+        new = {c: [] for c in COLUMNS}
+        for game_id, date, summary in box_scores:
+            game_id = str(game_id)
+            if game_id in self.games:
+                continue
+            rows, pace = parse_box_score(summary)
+            if not rows:
+                continue
+            self.games.add(game_id)
+            day = int(str(date).replace('-', ''))
+            for row in rows:
+                if row['player_id'] not in self.player_index:
+                    self.player_index[row['player_id']] = len(self.players)
+                    self.players.append([row['player_id'], row['name']])
+                    self.name_index[normalize_name(row['name'])] = self.player_index[row['player_id']]
+                new['player'].append(self.player_index[row['player_id']])
+                new['date'].append(day)
+                new['team'].append(self._team(row['team']))
+                new['opponent'].append(self._team(row['opponent']))
+                new['possessions'].append(pace)
+                for stat in STATS:
+                    new[stat].append(row[stat])
+        if not new['player']:
+            return 0
+        merged = {c: np.concatenate([np.asarray(self.columns[c]),
+                                     np.asarray(new[c], dtype=np.int64 if c in _INT_COLUMNS else float)])
+                  for c in COLUMNS}
+        order = np.lexsort((merged['date'], merged['player']))
+        self.columns = {c: merged[c][order] for c in COLUMNS}
+        counts = np.bincount(self.columns['player'].astype(np.int64), minlength=len(self.players))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._save()
+        return len(new['player'])
+
+    def ingest(self, days=1, client=None, workers=DEFAULT_WORKERS):
+        """Read the last `days` scoreboards and ingest every finished game not yet stored"""
+        from espn_team_fetcher import ConditionalClient
+        client = client or ConditionalClient(workers=workers, cache_dir=None)
+        params = {'groups': '50', 'limit': '500'} if self.sport == 'ncb' else {}
+        today = datetime.now(EST).date()
+        pending = []
+        for i in range(days, -1, -1):
+            day = today - timedelta(days=i)
+            data = client.get(SCOREBOARD_URLS[self.sport], dict(params, dates=day.strftime('%Y%m%d'))) or {}
+            for ev in data.get('events', []):
+                state = ((ev.get('status') or {}).get('type') or {}).get('state')
+                if state == 'post' and str(ev.get('id')) not in self.games:
+                    pending.append((str(ev['id']), local_game_date(ev.get('date')) or day.isoformat()))
+        box_scores = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(client.get, SUMMARY_URLS[self.sport], {'event': gid}): (gid, date)
+                       for gid, date in pending}
+            for fut in as_completed(futures):
+                summary = fut.result()
+                if summary:
+                    box_scores.append(futures[fut] + (summary,))
+        added = self.add_games(box_scores)
+        print(f"🧾 {self.sport.upper()} box scores: {len(box_scores)} new games, {added} player lines")
+        return added
+
+    # --------------------------------------------------------------- reads
+
+    def find_player(self, name):
+        """Player index for a sportsbook / ESPN name, or None"""
+        return self.name_index.get(normalize_name(name))
+
+    def games_played(self, player):
+        return int(self.offsets[player + 1] - self.offsets[player]) if 0 <= player < len(self.players) else 0
+
+    def player_rows(self, player):
+        """Slice of rows (oldest first) for one player index"""
+        return slice(int(self.offsets[player]), int(self.offsets[player + 1]))
+
+    def latest_team(self, player):
+        rows = self.player_rows(player)
+        return int(self.columns['team'][rows.stop - 1]) if rows.stop > rows.start else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest ESPN box scores into the player stats store')
+    parser.add_argument('--sport', choices=sorted(SUMMARY_URLS), default='nba')
+    parser.add_argument('--days', type=int, default=1, help='Scoreboards to read back from today')
+    parser.add_argument('--player', help='Show a player\'s stored games')
+    args = parser.parse_args()
+
+    store = PlayerStatsStore(args.sport)
+    if args.player:
+        idx = store.find_player(args.player)
+        if idx is None:
+            print(f"❌ {args.player} not in the {args.sport} store")
+            return
+        rows = store.player_rows(idx)
+        print(f"🧾 {store.players[idx][1]}: {store.games_played(idx)} games")
+        for r in range(rows.start, rows.stop):
+            line = ' '.join(f"{s[:3]} {store.columns[s][r]:g}" for s in STATS)
+            print(f"   {store.columns['date'][r]} vs {store.teams[int(store.columns['opponent'][r])]:25} {line}")
+        return
+    store.ingest(days=args.days)
+
+
+if __name__ == '__main__':
+    main()
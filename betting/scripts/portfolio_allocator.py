@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+💰 Portfolio Allocator - expected value and fractional-Kelly stakes for the slate
+
+Turns each bet's win probability (ml_betting_model, calibrated confidence from
+calibration_model, or the game_simulator probability - blended with the no-vig
+market consensus from market_consensus when the bet was priced) and the posted
+FanDuel price into:
+- implied probability and EV per unit staked
+- a fractional-Kelly stake, then constrained across the whole slate:
+    1. opposite sides of the same game/bet_type: only the best-EV side is kept
+    2. same-game legs are haircut for correlation: stake / (1 + Σ rho with the
+       other legs of that game), e.g. spread + moneyline on one game move together
+    3. per-bet, per-game, per-sport and total exposure caps (proportional scaling)
+
+Everything is NumPy over the slate (group sums via bincount), so it can be re-run
+on every odds refresh.
+
+USAGE:
+    from portfolio_allocator import allocate
+    plan = allocate(bets, bankroll=1000)
+    python3 portfolio_allocator.py [active_bets.json] --bankroll 1000
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from betting_database import clean_label
+
+WORKSPACE = Path("/Users/macmini/.openclaw/workspace")
+
+DEFAULT_BANKROLL = 1000.0
+DEFAULT_ODDS = -110
+KELLY_FRACTION = 0.25       # quarter Kelly
+MIN_EV = 0.0                # per unit staked
+MAX_BET = 0.03              # of bankroll
+MAX_GAME = 0.05
+MAX_SPORT = 0.15
+MAX_TOTAL = 0.30
+MARKET_WEIGHT = 0.5         # share of the no-vig consensus in a priced bet's win probability
+
+BET_TYPES = ('SPREAD', 'MONEYLINE', 'TOTAL')
+# Correlation between two legs on the same game, by bet type (rows/cols: BET_TYPES + other)
+SAME_GAME_RHO = np.array([
+    #  SPREAD MONEYLINE TOTAL other
+    [1.0, 0.7, 0.1, 0.3],   # SPREAD
+    [0.7, 1.0, 0.1, 0.3],   # MONEYLINE
+    [0.1, 0.1, 1.0, 0.3],   # TOTAL
+    [0.3, 0.3, 0.3, 1.0],   # other (props, ...)
+])
+
+
+def american_to_decimal(odds):
+    """American odds -> decimal odds (vectorized). Invalid prices fall back to -110."""
+    odds = np.asarray(odds, dtype=float)
+    odds = np.where(np.abs(odds) >= 100, odds, DEFAULT_ODDS)
+    return np.where(odds > 0, 1 + odds / 100.0, 1 + 100.0 / np.abs(odds))
+
+
+def bet_odds(bet):
+    for key in ('odds', 'price'):
+        try:
+            return float(bet[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return float(DEFAULT_ODDS)
+
+
+def posted_odds(bet):
+    """(the bet's own price as given, whether it is a usable American price)"""
+    raw = next((bet[k] for k in ('odds', 'price') if bet.get(k) is not None), None)
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return raw, False
+    return raw, bool(np.isfinite(value) and abs(value) >= 100)
+
+
+def model_probability(bet):
+    """First of: ML model, calibrated confidence, game simulation, raw confidence (0-1)"""
+    value = next((bet[k] for k in ('ml_probability', 'win_probability', 'sim_probability', 'confidence')
+                  if bet.get(k) is not None), 50)
+    try:
+        return min(0.99, max(0.01, float(value) / 100.0))
+    except (TypeError, ValueError):
+        return 0.5
+
+
+def consensus_probability(bet):
+    """No-vig market consensus win probability (0-1), or None when the bet was not priced"""
+    try:
+        return min(0.99, max(0.01, float(bet['consensus_probability']) / 100.0))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def bet_probability(bet):
+    """Model probability shrunk toward the no-vig consensus (MARKET_WEIGHT) when the bet was priced"""
+    p = model_probability(bet)
+    consensus = consensus_probability(bet)
+    if consensus is None:
+        return p
+    return MARKET_WEIGHT * consensus + (1 - MARKET_WEIGHT) * p
+
+
+def market_edge(bet):
+    """Current model probability minus the no-vig consensus, in % points (None when not priced)"""
+    consensus = consensus_probability(bet)
+    if consensus is None:
+        return None
+    return (model_probability(bet) - consensus) * 100
+
+
+def _factorize(values):
+    index = {}
+    codes = np.array([index.setdefault(v, len(index)) for v in values], dtype=np.int64)
+    return codes, len(index)
+
+
+def _cap_groups(stakes, groups, n_groups, cap):
+    """Scale every group whose stake sum exceeds cap down to the cap"""
+    if cap is None or not len(stakes):
+        return stakes
+    totals = np.bincount(groups, weights=stakes, minlength=n_groups)
+    scale = np.where(totals > cap, cap / np.maximum(totals, 1e-12), 1.0)
+    return stakes * scale[groups]
+
+
+def allocate(bets, bankroll=DEFAULT_BANKROLL, kelly_fraction=KELLY_FRACTION, min_ev=MIN_EV,
+             max_bet=MAX_BET, max_game=MAX_GAME, max_sport=MAX_SPORT, max_total=MAX_TOTAL):
+    """
+    Stake plan for a slate. Returns {'bets': [...], 'summary': {...}} where each
+    bet row carries win_probability, implied_probability, ev, kelly,
+    stake_fraction and stake, in the order the bets were given. odds is the bet's
+    own price; odds_valid is False when it was missing or not an American price
+    (EV and stake then assume DEFAULT_ODDS).
+    """
+    n = len(bets)
+    if n == 0:
+        return {'bets': [], 'summary': _summary([], np.zeros(0), np.zeros(0), bankroll)}
+
+    p = np.array([bet_probability(b) for b in bets])
+    odds = np.array([bet_odds(b) for b in bets])
+    decimal = american_to_decimal(odds)
+    b = decimal - 1.0
+    ev = p * decimal - 1.0                       # per unit staked
+    kelly = np.maximum(0.0, ev / b)              # f* = (bp - q) / b
+    stakes = np.where(ev > min_ev, kelly * kelly_fraction, 0.0)
+
+    games = [(b_.get('game') or b_.get('game_name') or '').strip() for b_ in bets]
+    types = [str(b_.get('bet_type') or 'SPREAD').upper() for b_ in bets]
+    game_codes, n_games = _factorize(games)
+    market_codes, _ = _factorize(zip(games, types))
+    type_codes = np.array([BET_TYPES.index(t) if t in BET_TYPES else len(BET_TYPES) for t in types])
+
+    # 1. One side per game/bet_type: keep the best EV (ties: first listed)
+    order = np.lexsort((np.arange(n), -ev, market_codes))
+    first = np.ones(n, dtype=bool)
+    first[1:] = market_codes[order][1:] != market_codes[order][:-1]
+    keep = np.zeros(n, dtype=bool)
+    keep[order[first]] = True
+    stakes = np.where(keep, stakes, 0.0)
+
+    # 2. Correlation haircut over the other staked legs of the same game
+    active = stakes > 0
+    per_game_type = np.zeros((n_games, SAME_GAME_RHO.shape[0]))
+    np.add.at(per_game_type, (game_codes[active], type_codes[active]), 1.0)
+    rho_sum = (SAME_GAME_RHO[type_codes] * per_game_type[game_codes]).sum(axis=1) - SAME_GAME_RHO[type_codes, type_codes]
+    stakes = np.where(active, stakes / (1.0 + np.maximum(rho_sum, 0.0)), 0.0)
+
+    # 3. Exposure caps, tightest scope first
+    stakes = np.minimum(stakes, max_bet) if max_bet is not None else stakes
+    stakes = _cap_groups(stakes, game_codes, n_games, max_game)
+    sports = [clean_label(b_.get('sport')) or 'Unknown' for b_ in bets]
+    sport_codes, n_sports = _factorize(sports)
+    stakes = _cap_groups(stakes, sport_codes, n_sports, max_sport)
+    stakes = _cap_groups(stakes, np.zeros(n, dtype=np.int64), 1, max_total)
+
+    rows = []
+    for i, bet in enumerate(bets):
+        raw_odds, odds_valid = posted_odds(bet)
+        rows.append({
+            'game': games[i],
+            'bet_type': types[i],
+            'recommendation': bet.get('recommendation'),
+            'sport': sports[i],
+            'odds': raw_odds,               # as posted; EV assumes DEFAULT_ODDS when not odds_valid
+            'odds_valid': odds_valid,
+            'win_probability': round(float(p[i]) * 100, 1),
+            'implied_probability': round(float(1.0 / decimal[i]) * 100, 1),
+            'ev': round(float(ev[i]), 4),
+            'kelly': round(float(kelly[i]), 4),
+            'stake_fraction': round(float(stakes[i]), 5),
+            'stake': round(float(stakes[i]) * bankroll, 2),
+        })
+    return {'bets': rows, 'summary': _summary(rows, stakes, ev, bankroll)}
+
+
+def _summary(rows, stakes, ev, bankroll):
+    by_sport = {}
+    for row, stake in zip(rows, stakes):
+        if stake > 0:
+            by_sport[row['sport']] = round(by_sport.get(row['sport'], 0.0) + float(stake) * bankroll, 2)
+    staked = float(stakes.sum()) * bankroll
+    return {
+        'bankroll': bankroll,
+        'bets_staked': int((stakes > 0).sum()),
+        'total_stake': round(staked, 2),
+        'exposure_pct': round(staked / bankroll * 100, 2) if bankroll else 0.0,
+        'expected_profit': round(float((stakes * ev).sum()) * bankroll, 2),
+        'by_sport': by_sport,
+    }
+
+
+def print_plan(plan):
+    print("\n" + "=" * 80)
+    print("💰 SLATE ALLOCATION (fractional Kelly)")
+    print("=" * 80)
+    staked = [r for r in plan['bets'] if r['stake'] > 0]
+    staked.sort(key=lambda r: r['stake'], reverse=True)
+    for r in staked:
+        odds = f"{float(r['odds']):+5.0f}" if r['odds_valid'] else f"{str(r['odds']):>4.4}?"
+        print(f"  ${r['stake']:8.2f} | {r['recommendation'] or r['game']:40.40} | {odds} | "
+              f"p={r['win_probability']:4.1f}% vs {r['implied_probability']:4.1f}% | EV {r['ev']*100:+5.1f}%")
+    s = plan['summary']
+    print(f"\n  Staked {s['bets_staked']} bets: ${s['total_stake']:.2f} ({s['exposure_pct']:.1f}% of ${s['bankroll']:.0f}) "
+          f"| expected profit ${s['expected_profit']:+.2f}")
+    for sport, stake in s['by_sport'].items():
+        print(f"     {sport:20} ${stake:.2f}")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EV and fractional-Kelly stakes for a slate')
+    parser.add_argument('bets_file', nargs='?', default=str(WORKSPACE / 'active_bets.json'))
+    parser.add_argument('--bankroll', type=float, default=DEFAULT_BANKROLL)
+    parser.add_argument('--kelly', type=float, default=KELLY_FRACTION, help='Kelly multiplier (0.25 = quarter Kelly)')
+    args = parser.parse_args()
+
+    with open(args.bets_file, 'r') as f:
+        data = json.load(f)
+    bets = data.get('bets', []) if isinstance(data, dict) else data
+    print_plan(allocate(bets, bankroll=args.bankroll, kelly_fraction=args.kelly))
+
+
+if __name__ == '__main__':
+    main()
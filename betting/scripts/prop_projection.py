@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+📐 Prop Projection - over/under probabilities for every prop on the board at once
+
+Projects each player's stat from the player stats store (ESPN box scores):
+
+- Rolling form: exponentially weighted mean and variance of the last WINDOW
+  games (half-life HALF_LIFE games), gathered for every prop in one fancy-index
+  over the store's CSR layout
+- Pace: expected game possessions (both teams' average pace from the store)
+  over the possessions of the player's own recent games
+- Opponent: how much of the stat the opponent allows per possession vs the
+  league, shrunk toward average with PRIOR_GAMES pseudo-games
+- Distribution: normal with the rolling variance, floored at the mean
+  (Poisson-like counting stats); P(over) / P(under) use a continuity correction
+  so whole-number lines leave the push probability out of both sides
+
+Projections (mean, sd, factors) are cached in PROJECTION_CACHE per (player,
+stat, opponent) together with the player's games-played count, so a projection
+is only recomputed once a new box score for that player lands. Probabilities
+for a different line are recomputed from the cached mean/sd (no store reads).
+
+USAGE:
+    from prop_projection import PropProjector
+    results = PropProjector().project(props)     # props: player, prop_type, line, game, sport
+    python3 prop_projection.py "LeBron James" points 24.5 --game "Boston Celtics @ Los Angeles Lakers"
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+from scipy.special import ndtr
+
+from player_stats_store import PlayerStatsStore, STATS
+
+PROJECTION_CACHE = '../data/prop_projections.json'
+PROJECTION_VERSION = 1
+WINDOW = 10
+HALF_LIFE = 5.0
+PRIOR_GAMES = 10            # pseudo-games of league average in the opponent factor
+PACE_CLIP = (0.85, 1.15)
+OPPONENT_CLIP = (0.8, 1.2)
+
+# OddsAPI sport keys / prop markets -> store sport / stat column
+SPORTS = {'basketball_nba': 'nba', 'basketball_ncaab': 'ncb', 'nba': 'nba', 'ncb': 'ncb'}
+PROP_STATS = {'points': 'points', 'rebounds': 'rebounds', 'assists': 'assists', 'threes': 'threes',
+              'steals': 'steals', 'blocks': 'blocks', 'turnovers': 'turnovers'}
+
+
+def prop_stat(prop_type):
+    """'player_points' / 'Points' / 'points' -> 'points' (None for markets the store can't project)"""
+    key = str(prop_type or '').lower().replace(' ', '_')
+    for prefix in ('player_', 'batter_'):
+        key = key[len(prefix):] if key.startswith(prefix) else key
+    return PROP_STATS.get(key)
+
+
+def over_under_probability(mean, sd, line):
+    """(P(over), P(under)) for stat ~ Normal(mean, sd) at line, vectorized, continuity corrected"""
+    mean, sd, line = (np.asarray(v, dtype=float) for v in (mean, sd, line))
+    sd = np.maximum(sd, 1e-6)
+    p_over = 1 - ndtr((np.floor(line) + 0.5 - mean) / sd)
+    p_under = ndtr((np.ceil(line) - 0.5 - mean) / sd)
+    return p_over, p_under
+
+
+class PropProjector:
+    def __init__(self, stores=None, cache_path=PROJECTION_CACHE):
+        self.stores = stores or {}          # store sport -> PlayerStatsStore
+        self.cache_path = cache_path
+        self.cache = self._load_cache()
+        self._factors = {}                  # store sport -> (team pace, {stat: opponent factor})
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == PROJECTION_VERSION:
+                return data.get('projections', {})
+        except Exception:
+            pass
+        return {}
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp = self.cache_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': PROJECTION_VERSION, 'projections': self.cache}, f)
+        os.replace(tmp, self.cache_path)
+
+    def store(self, sport):
+        if sport not in self.stores:
+            self.stores[sport] = PlayerStatsStore(sport)
+        return self.stores[sport]
+
+    # ------------------------------------------------------------- factors
+
+    def league_factors(self, sport):
+        """(pace per team index, {stat: opponent factor per team index}) from every stored game"""
+        if sport in self._factors:
+            return self._factors[sport]
+        store = self.store(sport)
+        cols = store.columns
+        n_teams = max(len(store.teams), 1)
+        team = np.asarray(cols['team'], dtype=np.int64)
+        opponent = np.asarray(cols['opponent'], dtype=np.int64)
+        possessions = np.asarray(cols['possessions'], dtype=float)
+
+        # one entry per (team, game): the first row of each team's box score
+        game_key = team * 100000000 + np.asarray(cols['date'], dtype=np.int64)
+        _, first = np.unique(game_key, return_index=True)
+        has_pace = ~np.isnan(possessions[first])
+        games = np.bincount(team[first][has_pace], minlength=n_teams)
+        pace_sum = np.bincount(team[first][has_pace], weights=possessions[first][has_pace], minlength=n_teams)
+        league_pace = pace_sum.sum() / max(games.sum(), 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pace = np.where(games > 0, pace_sum / games, league_pace)
+
+        # stat allowed by each opponent per possession, summed over the players it faced
+        opp_key = opponent * 100000000 + np.asarray(cols['date'], dtype=np.int64)
+        keys, group = np.unique(opp_key, return_inverse=True)
+        opp_of_group = keys // 100000000
+        group_pace = np.zeros(len(keys))
+        group_pace[group] = np.nan_to_num(possessions)
+        opp_games = np.bincount(opp_of_group, weights=(group_pace > 0).astype(float), minlength=n_teams)
+        factors = {}
+        for stat in STATS:
+            allowed = np.bincount(group, weights=np.nan_to_num(np.asarray(cols[stat], dtype=float)), minlength=len(keys))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                per_poss = np.where(group_pace > 0, allowed / group_pace, 0.0)
+            opp_sum = np.bincount(opp_of_group, weights=per_poss, minlength=n_teams)
+            league = opp_sum.sum() / max(opp_games.sum(), 1)
+            if league <= 0:
+                factors[stat] = np.ones(n_teams)
+                continue
+            shrunk = (opp_sum + PRIOR_GAMES * league) / (opp_games + PRIOR_GAMES)
+            factors[stat] = np.clip(shrunk / league, *OPPONENT_CLIP)
+        self._factors[sport] = (pace, factors)
+        return self._factors[sport]
+
+    # ---------------------------------------------------------- projection
+
+    def _resolve(self, prop):
+        """(sport, player index, stat, team index, opponent index) or None"""
+        sport = SPORTS.get(str(prop.get('sport') or 'basketball_nba').lower())
+        stat = prop_stat(prop.get('prop_type') or prop.get('market'))
+        if not sport or not stat:
+            return None
+        store = self.store(sport)
+        player = store.find_player(prop.get('player'))
+        if player is None or not store.games_played(player):
+            return None
+        team = store.latest_team(player)
+        away, _, home = str(prop.get('game') or '').partition(' @ ')
+        names = [n.strip() for n in (away, home)]
+        opp_name = next((n for n in names if n and n != store.teams[team]), None)
+        return sport, player, stat, team, store.team_index.get(opp_name)
+
+    def _compute(self, sport, batch):
+        """batch: [(player, stat, team, opponent)] -> (mean, sd, pace factor, opponent factor) arrays"""
+        store = self.store(sport)
+        pace, opp_factors = self.league_factors(sport)
+        players = np.array([b[0] for b in batch], dtype=np.int64)
+        start, end = store.offsets[players], store.offsets[players + 1]
+        lag = np.arange(WINDOW)
+        idx = end[:, None] - 1 - lag[None, :]                           # newest first
+        valid = idx >= start[:, None]
+        idx = np.where(valid, idx, 0)
+        weights = np.where(valid, 0.5 ** (lag / HALF_LIFE), 0.0)
+
+        values = np.empty((len(batch), WINDOW))
+        for stat in {b[1] for b in batch}:
+            rows = np.array([b[1] == stat for b in batch])
+            values[rows] = np.asarray(store.columns[stat], dtype=float)[idx[rows]]
+        played_pace = np.asarray(store.columns['possessions'], dtype=float)[idx]
+        weights = np.where(np.isnan(values), 0.0, weights)
+        w_sum = np.maximum(weights.sum(axis=1), 1e-9)
+        mean = (weights * np.nan_to_num(values)).sum(axis=1) / w_sum
+        var = (weights * (np.nan_to_num(values) - mean[:, None]) ** 2).sum(axis=1) / w_sum
+
+        pace_w = np.where(np.isnan(played_pace), 0.0, weights)
+        own_pace = (pace_w * np.nan_to_num(played_pace)).sum(axis=1) / np.maximum(pace_w.sum(axis=1), 1e-9)
+        team = np.array([b[2] for b in batch], dtype=np.int64)
+        opponent = np.array([-1 if b[3] is None else b[3] for b in batch], dtype=np.int64)
+        expected = np.where(opponent >= 0, (pace[team] + pace[np.maximum(opponent, 0)]) / 2, pace[team])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pace_factor = np.clip(np.where(own_pace > 0, expected / own_pace, 1.0), *PACE_CLIP)
+        opp_factor = np.array([opp_factors[stat][o] if o is not None else 1.0 for _, stat, _, o in batch])
+
+        scale = pace_factor * opp_factor
+        projected = mean * scale
+        sd = np.sqrt(np.maximum(var * scale ** 2, projected))
+        return projected, sd, pace_factor, opp_factor
+
+    def project(self, props):
+        """
+        One result per prop (None when the player/stat can't be projected):
+        {'projection', 'sd', 'over_probability', 'under_probability', 'games',
+         'pace_factor', 'opponent_factor'}. Only props whose player has a new box
+        score since the cached projection are recomputed.
+        """
+        resolved = [self._resolve(p) for p in props]
+        results = [None] * len(props)
+        misses = {}
+        for i, r in enumerate(resolved):
+            if r is None:
+                continue
+            sport, player, stat, team, opponent = r
+            games = self.store(sport).games_played(player)
+            key = f"{sport}|{self.store(sport).players[player][0]}|{stat}|{opponent}"
+            cached = self.cache.get(key)
+            if cached and cached['games'] == games:
+                results[i] = dict(cached)
+            else:
+                misses.setdefault(sport, []).append((i, key, games, (player, stat, team, opponent)))
+
+        for sport, batch in misses.items():
+            projected, sd, pace_factor, opp_factor = self._compute(sport, [b[3] for b in batch])
+            for j, (i, key, games, _) in enumerate(batch):
+                entry = {'projection': round(float(projected[j]), 2), 'sd': round(float(sd[j]), 2),
+                         'games': games, 'pace_factor': round(float(pace_factor[j]), 3),
+                         'opponent_factor': round(float(opp_factor[j]), 3)}
+                self.cache[key] = entry
+                results[i] = dict(entry)
+        if misses:
+            self._save_cache()
+
+        priced = [i for i, r in enumerate(results) if r is not None]
+        if priced:
+            p_over, p_under = over_under_probability([results[i]['projection'] for i in priced],
+                                                     [results[i]['sd'] for i in priced],
+                                                     [float(props[i].get('line') or 0) for i in priced])
+            for j, i in enumerate(priced):
+                results[i]['over_probability'] = round(float(p_over[j]), 4)
+                results[i]['under_probability'] = round(float(p_under[j]), 4)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Project a player prop from stored box scores')
+    parser.add_argument('player')
+    parser.add_argument('prop_type', help='points, rebounds, assists, threes, ...')
+    parser.add_argument('line', type=float)
+    parser.add_argument('--game', default='', help='"Away @ Home" for the pace / opponent adjustment')
+    parser.add_argument('--sport', default='nba', choices=['nba', 'ncb'])
+    args = parser.parse_args()
+
+    result = PropProjector().project([{'player': args.player, 'prop_type': args.prop_type, 'line': args.line,
+                                       'game': args.game, 'sport': args.sport}])[0]
+    if result is None:
+        print(f"❌ No stored games for {args.player}")
+        return
+    print(f"📐 {args.player} {args.prop_type}: {result['projection']} ± {result['sd']} "
+          f"({result['games']} games, pace x{result['pace_factor']}, opponent x{result['opponent_factor']})")
+    print(f"   OVER {args.line}: {result['over_probability']*100:.1f}% | UNDER {args.line}: {result['under_probability']*100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
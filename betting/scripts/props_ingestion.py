@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+🏅 Props Ingestion - quota-aware player prop lines from OddsAPI
+
+Player props are only priced by the per-event endpoint
+(/sports/{sport}/events/{id}/odds), which costs one quota unit per market per
+region. This stage keeps that spend bounded:
+
+1. Discover today's events once per sport (/sports/{sport}/events - free, no
+   quota), cached for EVENTS_TTL.
+2. One combined call per event with every prop market for that sport
+   (PROP_MARKETS), not one call per (sport, market).
+3. Cache by (event, market set) in BettingDB.prop_fetches. The TTL tightens as
+   tip-off approaches (props_ttl); props for games already started are never
+   refetched.
+4. Stale events are fetched concurrently (soonest tip-off first) under a quota
+   budget: each call reserves its estimated cost up front and calls that don't
+   fit are deferred to the next run. Actual spend is read from the
+   x-requests-last header and recorded once with OddsAPIRateLimiter.
+5. Results go into the normalized player_props table (one row per event, book,
+   market, player and line, with over and under prices).
+
+USAGE:
+    from props_ingestion import PropsIngestor
+    ingestor = PropsIngestor()
+    ingestor.ingest()                           # every sport in PROP_MARKETS
+    rows = ingestor.slate_props(bookmaker='fanduel')
+    python3 props_ingestion.py --sports basketball_nba --budget 50
+"""
+
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from betting_database import BettingDB, DB_PATH
+
+BASE_URL = "https://api.the-odds-api.com/v4"
+
+# Prop markets requested per sport, all in one call per event
+PROP_MARKETS = {
+    'basketball_nba': ('player_points', 'player_rebounds', 'player_assists', 'player_threes'),
+    'basketball_ncaab': ('player_points', 'player_rebounds', 'player_assists', 'player_threes'),
+    'americanfootball_nfl': ('player_pass_tds', 'player_pass_yds', 'player_rush_yds',
+                             'player_receptions', 'player_reception_yds'),
+    'baseball_mlb': ('batter_hits', 'batter_total_bases', 'batter_home_runs'),
+    'ice_hockey_nhl': ('player_points', 'player_shots_on_goal'),
+}
+PROP_BOOKMAKERS = 'fanduel,draftkings'   # up to 10 books bill as one region
+QUOTA_BUDGET = 150                       # quota units one ingest run may spend
+DEFAULT_WORKERS = 4
+EVENTS_TTL = 3600                        # seconds an event listing is reused
+LOOKAHEAD_HOURS = 24                     # "today": events starting within this window
+
+# (seconds to tip-off at least, props cache TTL in seconds), first match wins
+PROPS_TTL_TIERS = (
+    (24 * 3600, 6 * 3600),
+    (6 * 3600, 2 * 3600),
+    (3600, 30 * 60),
+    (0, 10 * 60),
+)
+
+
+def _utc(timestamp):
+    if isinstance(timestamp, datetime):
+        return timestamp if timestamp.tzinfo else timestamp.astimezone(timezone.utc)
+    return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+
+
+def props_ttl(commence_time, now):
+    """Cache TTL in seconds for an event's props, None once it has started (never refetch)"""
+    if not commence_time:
+        return PROPS_TTL_TIERS[1][1]
+    to_tip = (_utc(commence_time) - now).total_seconds()
+    if to_tip <= 0:
+        return None
+    return next(ttl for floor, ttl in PROPS_TTL_TIERS if to_tip >= floor)
+
+
+def market_cost(markets, bookmakers=PROP_BOOKMAKERS):
+    """Estimated quota cost of one event call: markets x regions (10 books per region)"""
+    books = len([b for b in bookmakers.split(',') if b])
+    return len(markets) * max(1, -(-books // 10))
+
+
+def normalize_props(event, sport, captured_at):
+    """OddsAPI event odds -> player_props rows (Over/Under outcomes paired per player and line)"""
+    home, away = event.get('home_team', ''), event.get('away_team', '')
+    rows = {}
+    for book in event.get('bookmakers', []):
+        for market in book.get('markets', []):
+            for outcome in market.get('outcomes', []):
+                player = outcome.get('description')
+                side = str(outcome.get('name', '')).lower()
+                if not player or side not in ('over', 'under', 'yes', 'no'):
+                    continue
+                key = (book.get('key'), market.get('key'), player, outcome.get('point'))
+                row = rows.setdefault(key, {
+                    'event_id': event.get('id'), 'bookmaker': key[0], 'market': key[1], 'player': player,
+                    'line': key[3], 'sport': sport, 'game': f"{away} @ {home}",
+                    'commence_time': event.get('commence_time'), 'captured_at': captured_at,
+                })
+                row['over_price' if side in ('over', 'yes') else 'under_price'] = outcome.get('price')
+    return list(rows.values())
+
+
+class PropsIngestor:
+    """Discover events, fetch stale props concurrently under a quota budget, store normalized rows"""
+
+    def __init__(self, db=None, api_key=None, bookmakers=PROP_BOOKMAKERS, budget=QUOTA_BUDGET,
+                 workers=DEFAULT_WORKERS, rate_limiter=None, timeout=15):
+        self.db = db or BettingDB(DB_PATH)
+        if api_key is None:
+            from odds_collector import ODDS_API_KEY as api_key  # the collector's key, one place to rotate it
+        self.api_key = api_key
+        self.bookmakers = bookmakers
+        self.budget = budget
+        self.workers = workers
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.events = {}            # sport -> today's events (as discovered this run)
+        self._listed = {}           # sport -> (listed_at, events) for EVENTS_TTL reuse
+        self._lock = threading.Lock()
+        self._reserved = 0
+
+    # ------------------------------------------------------------- discovery
+
+    def discover(self, sport, now=None):
+        """Today's events for a sport (id, teams, commence_time) - one listing call per EVENTS_TTL"""
+        now = now or datetime.now(timezone.utc)
+        listed = self._listed.get(sport)
+        if listed and (now - listed[0]).total_seconds() < EVENTS_TTL:
+            events = listed[1]
+        else:
+            try:
+                r = self.session.get(f"{BASE_URL}/sports/{sport}/events", timeout=self.timeout, params={
+                    'apiKey': self.api_key,
+                    'dateFormat': 'iso',
+                    'commenceTimeFrom': now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'commenceTimeTo': (now + timedelta(hours=LOOKAHEAD_HOURS)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                })
+                r.raise_for_status()
+                events = r.json() or []
+            except Exception as e:
+                print(f"  ⚠️  {sport} event listing failed: {e}")
+                events = []
+            self._listed[sport] = (now, events)
+        self.events[sport] = events
+        return events
+
+    # ---------------------------------------------------------------- fetch
+
+    def stale_events(self, sport, events, now):
+        """Events whose props for this sport's market set are missing or past their TTL, soonest first"""
+        markets = ','.join(sorted(PROP_MARKETS[sport]))
+        fetches = self.db.get_prop_fetches(e.get('id') for e in events)
+        stale = []
+        for event in events:
+            ttl = props_ttl(event.get('commence_time'), now)
+            fetch = fetches.get((event.get('id'), markets))
+            if fetch is None:
+                if ttl is not None:
+                    stale.append(event)
+                continue
+            if ttl is not None and (now - _utc(fetch['fetched_at'])).total_seconds() >= ttl:
+                stale.append(event)
+        return sorted(stale, key=lambda e: e.get('commence_time') or '')
+
+    def _reserve(self, cost, budget):
+        with self._lock:
+            if self._reserved + cost > budget:
+                return False
+            self._reserved += cost
+            return True
+
+    def fetch_event(self, event, sport, markets=None):
+        """One combined-market call for an event; stores the snapshot. Returns (rows written, quota cost)."""
+        markets = sorted(markets or PROP_MARKETS[sport])
+        r = self.session.get(f"{BASE_URL}/sports/{sport}/events/{event['id']}/odds", timeout=self.timeout, params={
+            'apiKey': self.api_key,
+            'regions': 'us',
+            'markets': ','.join(markets),
+            'oddsFormat': 'american',
+            'bookmakers': self.bookmakers,
+        })
+        cost = int(r.headers.get('x-requests-last') or market_cost(markets, self.bookmakers))
+        if r.status_code == 404:
+            data = {}  # no props posted for this event (yet) - cached like an empty snapshot
+        else:
+            r.raise_for_status()
+            data = r.json() or {}
+        captured_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        rows = normalize_props(dict(event, **{k: v for k, v in data.items() if v}), sport, captured_at)
+        self.db.save_props({
+            'event_id': event['id'], 'markets': markets, 'sport': sport,
+            'game': f"{event.get('away_team', '')} @ {event.get('home_team', '')}",
+            'commence_time': event.get('commence_time'), 'fetched_at': captured_at, 'quota_cost': cost,
+        }, rows)
+        return len(rows), cost
+
+    def event_props(self, event, sport, bookmaker=None, now=None):
+        """Props for one event, fetched only if its cached snapshot is missing or stale"""
+        now = now or datetime.now(timezone.utc)
+        if self.stale_events(sport, [event], now):
+            _, cost = self.fetch_event(event, sport)
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_request(cost)
+        return self.db.get_props([event['id']], bookmaker=bookmaker)
+
+    def ingest(self, sports=None, now=None):
+        """
+        Refresh props for every stale event of the given sports. Returns a summary:
+        events, fetched, cached (fresh snapshot or already started), deferred (over
+        budget), failed, quota_used, props.
+        """
+        now = now or datetime.now(timezone.utc)
+        sports = [s for s in (sports or PROP_MARKETS) if s in PROP_MARKETS]
+        budget = self.budget
+        if self.rate_limiter is not None:
+            budget = min(budget, self.rate_limiter.get_status()['remaining_this_month'])
+        self._reserved = 0
+
+        summary = {'events': 0, 'fetched': 0, 'cached': 0, 'deferred': 0, 'failed': 0, 'quota_used': 0, 'props': 0}
+        jobs = []
+        for sport in sports:
+            events = [e for e in self.discover(sport, now) if e.get('id')]
+            stale = self.stale_events(sport, events, now)
+            summary['events'] += len(events)
+            summary['cached'] += len(events) - len(stale)
+            jobs += [(event, sport) for event in stale]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {}
+            for event, sport in jobs:
+                if not self._reserve(market_cost(PROP_MARKETS[sport], self.bookmakers), budget):
+                    summary['deferred'] += 1
+                    continue
+                futures[pool.submit(self.fetch_event, event, sport)] = event
+            for fut in as_completed(futures):
+                try:
+                    written, cost = fut.result()
+                except Exception as e:
+                    print(f"  ⚠️  Props failed for {futures[fut].get('id')}: {e}")
+                    summary['failed'] += 1
+                    continue
+                summary['fetched'] += 1
+                summary['props'] += written
+                summary['quota_used'] += cost
+
+        if self.rate_limiter is not None and summary['quota_used']:
+            self.rate_limiter.record_request(summary['quota_used'])
+        print(f"🏅 Props: {summary['events']} events | {summary['fetched']} fetched, {summary['cached']} cached, "
+              f"{summary['deferred']} deferred | {summary['quota_used']} quota used")
+        return summary
+
+    def slate_props(self, bookmaker=None, sports=None):
+        """Stored prop rows for the events discovered this run"""
+        ids = [e.get('id') for sport, events in self.events.items()
+               if not sports or sport in sports for e in events]
+        return self.db.get_props(ids, bookmaker=bookmaker)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest player props from OddsAPI')
+    parser.add_argument('--sports', nargs='+', choices=sorted(PROP_MARKETS))
+    parser.add_argument('--budget', type=int, default=QUOTA_BUDGET, help='Quota units to spend at most')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    from oddsapi_rate_limiter import OddsAPIRateLimiter
+    ingestor = PropsIngestor(BettingDB(args.db), budget=args.budget, workers=args.workers,
+                             rate_limiter=OddsAPIRateLimiter())
+    ingestor.ingest(args.sports)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,15 @@
 Real Betting Model v4.0 - FanDuel ONLY + Crystal Clear Bet Instructions
 ONLY uses FanDuel spreads, moneyline, and totals
 Crystal clear instructions: which team, what line, what it means
+
+Odds come through odds_providers.HedgedOddsSource (OddsAPI, hedged by
+DraftKings), fetched for every sport at once; manual_odds.json overrides are an
+indexed layer on top. Only an answer with FanDuel lines wins the hedge, so a
+faster DraftKings answer never replaces OddsAPI's FanDuel picks.
 """
 
-import requests
-import json
 from datetime import datetime, timezone, timedelta
 import sys
-import time
 import logging
 
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
@@ -38,96 +40,43 @@ class RealBettingModel:
             {'key': 'soccer_epl', 'display': 'Premier League', 'emoji': '⚽'},
         ]
         self.base_url = "https://api.the-odds-api.com/v4"
+        self.odds_source = self.build_odds_source()
+        self.market_events = []  # feature store events with today's FanDuel lines
+        self.slate_events = []   # today's raw OddsAPI events (all books) for the market consensus
     
     def load_manual_odds(self):
-        """Load manual FanDuel odds overrides from file"""
-        try:
-            with open('manual_odds.json', 'r') as f:
-                data = json.load(f)
-                return data.get('overrides', {})
-        except:
-            return {}
+        """Load manual FanDuel odds overrides from file (indexed by game)"""
+        from odds_providers import ManualOverrides
+        return ManualOverrides('manual_odds.json')
     
-    def fetch_odds_with_retry(self, url, params, sport_name, max_retries=3):
-        """Fetch odds from API with exponential backoff retry logic
-        
-        Args:
-            url: API endpoint URL
-            params: Request parameters
-            sport_name: Sport display name (for logging)
-            max_retries: Maximum number of retry attempts
-            
-        Returns:
-            dict: API response JSON or empty dict on failure
-        """
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()  # Raise exception for HTTP errors
-                
-                logging.info(f"✅ {sport_name}: API fetch successful")
-                return response.json()
-                
-            except requests.exceptions.Timeout:
-                logging.warning(f"⏱️ {sport_name}: API timeout (attempt {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff: 1s, 2s, 4s
-                else:
-                    logging.error(f"❌ {sport_name}: API timeout after {max_retries} attempts")
-                    return {}
-                    
-            except requests.exceptions.HTTPError as e:
-                status_code = e.response.status_code if e.response else 'unknown'
-                logging.error(f"❌ {sport_name}: HTTP {status_code} error: {e}")
-                if attempt < max_retries - 1 and status_code in [429, 500, 502, 503, 504]:
-                    # Retry on rate limit or server errors
-                    time.sleep(2 ** attempt)
-                else:
-                    return {}
-                    
-            except requests.exceptions.RequestException as e:
-                logging.error(f"❌ {sport_name}: Network error (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                else:
-                    logging.critical(f"🚨 {sport_name}: CRITICAL - API completely unreachable after {max_retries} attempts")
-                    return {}
-                    
-            except Exception as e:
-                logging.error(f"❌ {sport_name}: Unexpected error: {type(e).__name__}: {e}")
-                return {}
-        
-        return {}
+    def build_odds_source(self):
+        """OddsAPI (all US books, for the consensus) hedged by DraftKings"""
+        from odds_providers import default_odds_source
+        try:
+            from oddsapi_rate_limiter import OddsAPIRateLimiter
+            rate_limiter = OddsAPIRateLimiter(api_key=self.oddsapi_key)
+        except Exception:
+            rate_limiter = None
+        return default_odds_source(self.oddsapi_key, rate_limiter=rate_limiter)
     
     def check_manual_odds(self, game_string):
         """Check if manual odds exist for this game"""
-        for game_name, spread_str in self.manual_odds.items():
-            if game_name.lower() == game_string.lower():
-                try:
-                    spread = float(spread_str)
-                    logging.info(f"✅ Manual odds override found for {game_string}: {spread}")
-                    return spread
-                except Exception as e:
-                    logging.warning(f"⚠️ Invalid manual odds value for {game_string}: {spread_str} ({e})")
-                    pass
-        return None
+        spread = self.manual_odds.spread(game_string)
+        if spread is not None:
+            logging.info(f"✅ Manual odds override found for {game_string}: {spread}")
+        return spread
     
-    def get_games_for_sport(self, sport_key, display_name, emoji=''):
-        """Fetch real games with FANDUEL ONLY odds from OddsAPI - TODAY ONLY
-        Includes: Spreads, Moneyline (H2H), Over/Under (Totals), Player Props"""
+    def get_games_for_sport(self, sport_key, display_name, emoji='', games=None, provider=None):
+        """Build picks from real games with FANDUEL ONLY odds - TODAY ONLY
+        Includes: Spreads, Moneyline (H2H), Over/Under (Totals), Player Props
+        
+        games: events already fetched for the slate (fetched through the hedged odds source if None)"""
         try:
-            url = f"{self.base_url}/sports/{sport_key}/odds"
-            params = {
-                'api_key': self.oddsapi_key,
-                'regions': 'us',
-                'markets': 'spreads,h2h,totals',  # Added totals for over/under
-                'oddsFormat': 'american'
-            }
-            
-            print(f"  [Fetching {emoji} {display_name}...]", end='', flush=True)
+            if games is None:
+                from odds_providers import has_bookmaker
+                games, provider = self.odds_source.fetch(sport_key, accept=has_bookmaker('fanduel'))
             
-            # Use retry logic instead of direct call
-            games = self.fetch_odds_with_retry(url, params, display_name)
+            print(f"  [{emoji} {display_name} via {provider or 'no provider'}]", end='', flush=True)
             
             if games:  # If API returned data
                 
@@ -178,9 +127,11 @@ class RealBettingModel:
                         else:
                             # Extract FANDUEL ONLY odds from OddsAPI (returns LIST of bet types)
                             bookmakers = game.get('bookmakers', [])
+                            self.slate_events.append(game)  # every book, for the consensus price
                             fanduel_bets = self.extract_fanduel_only(bookmakers, home, away)
                             
                             if fanduel_bets:
+                                self.record_market(display_name, home, away, game_date, fanduel_bets)
                                 # Generate picks for EACH bet type (spread, moneyline, totals)
                                 for fanduel_data in fanduel_bets:
                                     pick = self.build_pick_from_odds(
@@ -205,6 +156,18 @@ class RealBettingModel:
             print(f" [Error: {e}]")
             return []
     
+    def record_market(self, display_name, home, away, game_date, fanduel_bets):
+        """Queue this game's lines for the feature store (basketball leagues it has features for)"""
+        try:
+            from feature_store import make_event, market_from_fanduel
+            from game_simulator import LEAGUES
+        except ImportError:
+            return
+        league = LEAGUES.get(display_name)
+        if league:
+            self.market_events.append(make_event(league, home, away, game_date,
+                                                 market=market_from_fanduel(fanduel_bets)))
+    
     def extract_fanduel_only(self, bookmakers, home, away):
         """Extract ALL FanDuel odds (spreads, moneyline, totals) - ignore all other bookmakers
         Returns a list of different bet types available for this game"""
@@ -360,6 +323,7 @@ class RealBettingModel:
             'bet_type': 'SPREAD',
             'recommendation': recommendation,
             'fanduel_line': recommendation,
+            'odds': -110,
             'edge': round(edge, 1),
             'confidence': int(confidence),
             'risk_tier': self.get_risk_tier(int(confidence)),
@@ -395,6 +359,7 @@ class RealBettingModel:
                 explanation = f"Bet on {away} to win straight up or lose by less than {int(spread_value)} points"
             
             spread = home_spread if home_spread < 0 else away_spread
+            odds = data.get('home_odds', -110) if home_spread < 0 else data.get('away_odds', -110)
             # Use real spread predictor
             try:
                 from ncaa_spread_predictor import predict_spread
@@ -418,6 +383,7 @@ class RealBettingModel:
                 'bet_type': 'SPREAD',
                 'recommendation': recommendation,
                 'fanduel_line': f"{home} {home_spread} / {away} {away_spread}",
+                'odds': odds,
                 'edge': round(edge, 1),
                 'confidence': int(confidence),
                 'risk_tier': self.get_risk_tier(int(confidence)),
@@ -460,6 +426,7 @@ class RealBettingModel:
                 'bet_type': 'MONEYLINE',
                 'recommendation': recommendation,
                 'fanduel_line': f"{home} ({home_odds}) / {away} ({away_odds})",
+                'odds': favorite_odds,
                 'edge': edge,
                 'confidence': confidence,
                 'risk_tier': self.get_risk_tier(confidence),
@@ -510,6 +477,7 @@ class RealBettingModel:
                 'bet_type': 'TOTAL',
                 'recommendation': recommendation,
                 'fanduel_line': f"Over {total} ({over_price}) / Under {total} ({under_price})",
+                'odds': under_price if recommendation.upper().startswith('UNDER') else over_price,
                 'edge': round(edge, 1),
                 'confidence': confidence,
                 'risk_tier': self.get_risk_tier(confidence),
@@ -586,11 +554,15 @@ class RealBettingModel:
         """Generate picks from ALL sports using FANDUEL ONLY odds"""
         all_picks = []
         
-        print("🔍 Fetching FANDUEL ONLY odds from OddsAPI...")
+        print("🔍 Fetching odds for every sport at once (OddsAPI, hedged by DraftKings)...")
+        from odds_providers import has_bookmaker
+        slate = self.odds_source.fetch_slate((s['key'] for s in self.sports), accept=has_bookmaker('fanduel'))
         
         for sport in self.sports:
             try:
-                picks = self.get_games_for_sport(sport['key'], sport['display'], sport.get('emoji', ''))
+                games, provider = slate.get(sport['key'], ([], None))
+                picks = self.get_games_for_sport(sport['key'], sport['display'], sport.get('emoji', ''),
+                                                 games=games, provider=provider)
                 if picks:
                     all_picks.extend(picks)
             except Exception as e:
@@ -598,6 +570,31 @@ class RealBettingModel:
         
         print(f"\n📊 Total available picks (spreads + moneylines + totals): {len(all_picks)}")
         
+        # Price every market from one simulated slate (cached per matchup)
+        try:
+            from game_simulator import attach_sim_probabilities
+            attach_sim_probabilities(all_picks)
+        except Exception as e:
+            print(f"  ⚠️  Game simulation skipped: {e}")
+        
+        # De-vigged consensus of every book in the payload: fair lines, edge vs market, off-market FanDuel lines
+        if self.slate_events:
+            try:
+                from market_consensus import attach_consensus
+                priced = attach_consensus(all_picks, self.slate_events)
+                off = sum(1 for p in all_picks if p.get('off_market'))
+                print(f"  ⚖️  Market consensus: {priced} picks priced, {off} on off-market FanDuel lines")
+            except Exception as e:
+                print(f"  ⚠️  Market consensus skipped: {e}")
+        
+        # Today's lines into the feature store (only rows whose lines moved are rewritten)
+        if self.market_events:
+            try:
+                from feature_store import FeatureStore
+                FeatureStore().materialize(self.market_events)
+            except Exception as e:
+                print(f"  ⚠️  Feature store update skipped: {e}")
+        
         # Organize by bet type for balanced selection
         spreads = [p for p in all_picks if p.get('bet_type') == 'SPREAD']
         moneylines = [p for p in all_picks if p.get('bet_type') == 'MONEYLINE']
@@ -50,8 +50,7 @@ try:
             teams_to_check.add(parts[0].strip())  # Away team
             teams_to_check.add(parts[1].strip())  # Home team
     
-    for team in teams_to_check:
-        stats = tsc.get_ncaab_team_stats(team)
+    for team, stats in tsc.prefetch_teams(sorted(teams_to_check)).items():
         if stats:
             print(f"   ✅ {team}: Off Eff {stats.get('offensive_efficiency', 'N/A')}, Def Eff {stats.get('defensive_efficiency', 'N/A')}")
     
@@ -63,16 +62,13 @@ except Exception as e:
 # ===== STEP 3: UPDATE INJURY DATA =====
 print("\n🏥 Checking injury updates...")
 try:
-    from injury_processor import InjuryProcessor
-    ip = InjuryProcessor()
+    from injury_feed import refresh_injuries
     
-    injury_updates = 0
-    for team in teams_to_check:
-        injuries = ip.get_team_injuries(team)
-        if injuries:
-            injury_updates += 1
+    summary = refresh_injuries(teams=sorted(teams_to_check))
+    for team in summary['changed']:
+        print(f"   🔄 {team}: injury report changed")
     
-    print(f"   ✅ Checked {len(teams_to_check)} teams for injuries")
+    print(f"   ✅ Checked {summary['teams']} slate teams for injuries")
 except Exception as e:
     print(f"   ⚠️  Injury check skipped: {e}")
 
@@ -82,15 +78,10 @@ try:
     from weather_processor import WeatherProcessor
     wp = WeatherProcessor()
     
-    venues = set()
-    for bet in bets:
-        game = bet.get('game', '')
-        venues.add(game)
-    
-    for venue in venues:
-        weather = wp.get_venue_weather(venue)
-        if weather:
-            print(f"   ✅ {venue}: {weather.get('condition', 'N/A')}")
+    # Outdoor games only, one forecast request for the slate
+    forecast = wp.prefetch_slate(bets)
+    wp.save_weather_data()
+    print(f"   ✅ {forecast} outdoor venues forecast")
     
     print(f"   ✅ Weather data updated")
 except Exception as e:
@@ -14,6 +14,8 @@ Where:
 import sys
 from pathlib import Path
 
+from venue_weather import weather_sport
+
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
 
 class SmartEdgeCalculator:
@@ -32,9 +34,39 @@ class SmartEdgeCalculator:
         except:
             self.use_advanced = False
             print("⚠️ Running in basic mode (advanced modules not available)")
+
+    def prefetch(self, games):
+        """Warm team stats (and outdoor venue weather) for the whole slate in one call each
+        
+        games: 'Away @ Home' strings or pick dicts ('game', 'sport', 'game_time')
+        """
+        if not self.use_advanced:
+            return {}
+        games = [g if isinstance(g, dict) else {'game': g} for g in games]
+        teams = []
+        for game in games:
+            teams += [t.strip() for t in str(game.get('game') or '').split(' @ ') if t.strip()]
+        try:
+            self.weather_proc.prefetch_slate(g for g in games if g.get('sport'))
+        except Exception as e:
+            print(f"⚠️ Slate weather skipped: {e}")
+        return self.team_calc.prefetch_teams(teams)
     
+    def game_weather(self, away_team, home_team, venue_city, venue_state, sport, game_time=None):
+        """Venue weather by city when known, else by the home team's venue on the slate"""
+        if venue_city and venue_city != 'Unknown':
+            return self.weather_proc.get_weather('', venue_city, venue_state)
+        return self.weather_proc.get_game_weather(f"{away_team} @ {home_team}", sport, game_time=game_time)
+
+    def flush(self):
+        """Write the team strength / injury / weather caches once, at the end of a run"""
+        if self.use_advanced:
+            self.team_calc.save_cache()
+            self.injury_proc.save_injury_data()
+            self.weather_proc.save_weather_data()
+
     def calculate_spread_edge(self, away_team, home_team, spread, odds=-110, 
-                            venue_city='Unknown', venue_state='Unknown', sport='NCAA Basketball'):
+                            venue_city='Unknown', venue_state='Unknown', sport='NCAA Basketball', game_time=None):
         """Calculate edge for a spread bet
         
         Returns dict with:
@@ -77,9 +109,9 @@ class SmartEdgeCalculator:
             edge_components['injury_edge'] = 0
         
         # 3. WEATHER IMPACT (for outdoor sports mainly)
-        if self.use_advanced and sport in ['NFL', 'College Football']:
+        if self.use_advanced and weather_sport(sport) in ('nfl', 'cfb'):
             try:
-                weather = self.weather_proc.get_weather('', venue_city, venue_state)
+                weather = self.game_weather(away_team, home_team, venue_city, venue_state, sport, game_time)
                 weather_edge = weather.get('impact_on_scoring', 0)
                 edge_components['weather_edge'] = weather_edge
             except:
@@ -154,7 +186,7 @@ class SmartEdgeCalculator:
         }
     
     def calculate_total_edge(self, team1, team2, over_under, venue_city='Unknown', 
-                            venue_state='Unknown', sport='NCAA Basketball'):
+                            venue_state='Unknown', sport='NCAA Basketball', game_time=None):
         """Calculate edge for over/under bets"""
         
         edge_components = {}
@@ -184,7 +216,7 @@ class SmartEdgeCalculator:
         # 2. WEATHER IMPACT
         if self.use_advanced:
             try:
-                weather = self.weather_proc.get_weather('', venue_city, venue_state)
+                weather = self.game_weather(team1, team2, venue_city, venue_state, sport, game_time)
                 weather_adjustment = self.weather_proc.calculate_total_adjustment(sport, weather)
                 edge_components['weather_edge'] = weather_adjustment
                 total_edge += weather_adjustment
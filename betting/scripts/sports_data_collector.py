@@ -6,11 +6,13 @@ Collects live data for NCAA, NBA, MLB, NFL, UFC, and Soccer
 
 import requests
 import pandas as pd
-import sqlite3
+from betting_database import get_connection
 import json
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
-import time
+
+from game_results_store import GameResultsStore
+from espn_scoreboard import get_service, league_code
 
 class SportsDataCollector:
     def __init__(self):
@@ -19,11 +21,12 @@ class SportsDataCollector:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
         self.db_path = 'sports_betting.db'
+        self.scoreboards = get_service()
         self.init_database()
         
     def init_database(self):
         """Initialize SQLite database with tables for all sports"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Games table - universal for all sports
@@ -72,74 +75,34 @@ class SportsDataCollector:
         ''')
         
         conn.commit()
-        conn.close()
         print("✅ Database initialized")
 
     def get_espn_data(self, sport_code, league=None):
-        """Get games and scores from ESPN's public API"""
-        sport_endpoints = {
-            'ncb': 'basketball/mens-college-basketball',  # NCAA Basketball
-            'nba': 'basketball/nba',
-            'mlb': 'baseball/mlb', 
-            'nfl': 'football/nfl',
-            'soccer': 'soccer'  # We'll add specific leagues
-        }
-        
-        if sport_code not in sport_endpoints:
+        """Get games and scores from ESPN's public API (shared espn_scoreboard cache)"""
+        if league_code(sport_code) is None:
             print(f"❌ Unknown sport: {sport_code}")
             return None
-            
-        endpoint = sport_endpoints[sport_code]
-        url = f"https://site.api.espn.com/apis/site/v2/sports/{endpoint}/scoreboard"
         
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            games = []
-            for event in data.get('events', []):
-                game_data = self.parse_espn_game(event, sport_code)
-                if game_data:
-                    games.append(game_data)
-                    
-            print(f"📊 Collected {len(games)} {sport_code.upper()} games")
-            return games
-            
-        except Exception as e:
-            print(f"❌ Error fetching {sport_code} data: {e}")
-            return []
+        games = [self.parse_espn_game(event, sport_code) for event in self.scoreboards.events(sport_code)]
+        print(f"📊 Collected {len(games)} {sport_code.upper()} games")
+        return games
 
     def parse_espn_game(self, event, sport):
-        """Parse individual game from ESPN API response"""
-        try:
-            game_id = f"{sport}_{event['id']}"
-            date = event['date']
-            
-            competitions = event['competitions'][0]
-            competitors = competitions['competitors']
-            
-            # Home vs Away (ESPN sometimes flips this)
-            home_team = next((c for c in competitors if c.get('homeAway') == 'home'), competitors[0])
-            away_team = next((c for c in competitors if c.get('homeAway') == 'away'), competitors[1])
-            
-            return {
-                'id': game_id,
-                'sport': sport,
-                'date': date,
-                'home_team': home_team['team']['displayName'],
-                'away_team': away_team['team']['displayName'],
-                'home_score': home_team.get('score', 0),
-                'away_score': away_team.get('score', 0),
-                'status': competitions.get('status', {}).get('type', {}).get('description', 'scheduled'),
-                'venue': competitions.get('venue', {}).get('fullName', ''),
-                # We'll add odds scraping later
-                'spread': None,
-                'total': None
-            }
-        except Exception as e:
-            print(f"❌ Error parsing game: {e}")
-            return None
+        """ScoreboardEvent -> games table row"""
+        return {
+            'id': f"{sport}_{event.event_id}",
+            'sport': sport,
+            'date': event.date,
+            'home_team': event.home_team,
+            'away_team': event.away_team,
+            'home_score': event.home_score or 0,
+            'away_score': event.away_score or 0,
+            'status': event.detail or 'scheduled',
+            'venue': event.venue,
+            # We'll add odds scraping later
+            'spread': None,
+            'total': None
+        }
 
     def collect_all_sports_data(self):
         """Collect data for all target sports"""
@@ -153,13 +116,14 @@ class SportsDataCollector:
         ]
         
         all_games = []
+        # One concurrent pass over the scoreboards (rate limited by the shared client)
+        self.scoreboards.prefetch([(sport_code, None) for sport_code, _ in sports_to_collect])
         
         for sport_code, sport_name in sports_to_collect:
             print(f"\n📡 Collecting {sport_name} data...")
             games = self.get_espn_data(sport_code)
             if games:
                 all_games.extend(games)
-                time.sleep(1)  # Be nice to ESPN's servers
         
         # Store in database
         if all_games:
@@ -169,7 +133,7 @@ class SportsDataCollector:
 
     def store_games(self, games):
         """Store games in SQLite database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         for game in games:
@@ -185,12 +149,16 @@ class SportsDataCollector:
             ))
         
         conn.commit()
-        conn.close()
         print(f"💾 Stored {len(games)} games in database")
 
+        # Finished games feed the per-team results store (rolling form for the predictors)
+        added = GameResultsStore(self.db_path).record_games(games)
+        if added:
+            print(f"📈 Recorded {added} new team results")
+
     def get_todays_games(self, sport=None):
         """Get today's games from database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         
         query = """
             SELECT * FROM games 
@@ -202,7 +170,6 @@ class SportsDataCollector:
         query += " ORDER BY date"
         
         df = pd.read_sql_query(query, conn)
-        conn.close()
         return df
 
     def run_collection(self):
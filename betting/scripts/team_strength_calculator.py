@@ -14,10 +14,9 @@ Metrics:
 """
 
 import requests
-import json
-from datetime import datetime
 import sys
-from pathlib import Path
+
+from write_behind_cache import WriteBehindCache
 
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
 
@@ -26,30 +25,30 @@ try:
 except ImportError:
     get_team_stats = None
 
+TEAM_STATS_TTL = 86400  # season stats are refreshed at most daily
+
 class TeamStrengthCalculator:
     """Calculate team strength metrics from ESPN"""
     
-    def __init__(self):
+    def __init__(self, flush_interval=None):
         self.cache_file = 'team_strength_cache.json'
-        self.stats_cache = self.load_cache()
+        # Write-behind: misses are stored in memory and the file is written once
+        # (save_cache(), flush_interval, or interpreter exit)
+        self.cache = WriteBehindCache(self.cache_file, ttl=TEAM_STATS_TTL, value_key='stats',
+                                      flush_interval=flush_interval)
     
-    def load_cache(self):
-        """Load cached team stats"""
-        try:
-            if Path(self.cache_file).exists():
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+    @property
+    def stats_cache(self):
+        """Raw cache entries ({key: {'timestamp', 'stats'}})"""
+        return self.cache.data
     
     def save_cache(self):
-        """Save team stats to cache"""
-        try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.stats_cache, f, indent=2)
-        except:
-            pass
+        """Write pending team stats to the cache file"""
+        self.cache.flush()
+    
+    @staticmethod
+    def cache_key(team_name):
+        return f"ncaab_{team_name.lower()}"
     
     def get_ncaab_team_stats(self, team_name):
         """Get NCAA Basketball team statistics from ESPN
@@ -65,24 +64,30 @@ class TeamStrengthCalculator:
         - rank: RPI/strength ranking
         """
         
-        # Check cache first
-        cache_key = f"ncaab_{team_name.lower()}"
-        if cache_key in self.stats_cache:
-            cached = self.stats_cache[cache_key]
-            # Check if cache is fresh (within 24 hours)
-            if cached.get('timestamp'):
-                try:
-                    cached_time = datetime.fromisoformat(cached['timestamp'])
-                    if (datetime.now() - cached_time).seconds < 86400:
-                        return cached.get('stats', self.default_stats())
-                except:
-                    pass
+        # Check cache first (fresh within 24 hours)
+        cache_key = self.cache_key(team_name)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
+        stats = self.lookup_team_stats(team_name)
+        self.cache.set(cache_key, stats)
+        return stats
+    
+    def prefetch_teams(self, teams):
+        """Warm the cache for every team on a slate in one call -> {team: stats}"""
+        teams = [t for t in dict.fromkeys(teams) if t]
+        by_key = {self.cache_key(t): t for t in teams}
+        warmed = self.cache.prefetch(by_key, lambda keys: {k: self.lookup_team_stats(by_key[k]) for k in keys})
+        return {by_key[k]: stats for k, stats in warmed.items()}
+    
+    def lookup_team_stats(self, team_name):
+        """Uncached stats for one team: real season stats, else estimates, else defaults"""
         # 1. Try real season stats first (hardcoded 2025-26)
         if get_team_stats:
             season_stats = get_team_stats(team_name)
             if season_stats:
-                stats = {
+                return {
                     'offensive_efficiency': season_stats['off_eff'],
                     'defensive_efficiency': season_stats['def_eff'],
                     'pace': season_stats['pace'],
@@ -93,29 +98,14 @@ class TeamStrengthCalculator:
                     'strength_score': 100,
                     '_source': 'real'  # Real 2025-26 season data
                 }
-                # Cache and return immediately
-                self.stats_cache[cache_key] = {
-                    'timestamp': datetime.now().isoformat(),
-                    'stats': stats
-                }
-                self.save_cache()
-                return stats
         
         # 2. Fall back to estimates
         stats = self.estimate_team_stats(team_name)
         if stats:
-            stats['_source'] = 'estimated'
+            stats = dict(stats, _source='estimated')
         else:
             stats = self.default_stats()
             stats['_source'] = 'default'  # Placeholder data
-        
-        # Cache it
-        self.stats_cache[cache_key] = {
-            'timestamp': datetime.now().isoformat(),
-            'stats': stats
-        }
-        self.save_cache()
-        
         return stats
     
     def estimate_team_stats(self, team_name):
@@ -237,7 +227,7 @@ if __name__ == '__main__':
     print("  ✓ Fetch team efficiency metrics")
     print("  ✓ Calculate matchup strength differential")
     print("  ✓ Project game totals based on pace/efficiency")
-    print("  ✓ Cache team stats for fast lookups")
+    print("  ✓ Cache team stats for fast lookups (one write per run)")
     
     # Test example
     print("\nTest Example:")
@@ -2,22 +2,20 @@
 """
 Universal Score Fetcher - ESPN API wrapper for all sports
 Fetches scores and game results for NCAA, NBA, NHL, NFL
+(through the shared espn_scoreboard service - one fetch per league/date per poll)
 """
 
-import requests
-import json
-from datetime import datetime, timedelta
 import sys
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
 
 from sport_config import get_sport_config, get_active_sports
+from espn_scoreboard import get_service
 
 class UniversalScoreFetcher:
-    """Fetch scores from ESPN API for any sport"""
+    """Scores for any sport, served from the shared ESPN scoreboard cache"""
     
-    def __init__(self):
-        self.base_url = "https://site.api.espn.com/apis/site/v2/sports"
-        self.timeout = 15
+    def __init__(self, service=None):
+        self.service = service or get_service()
     
     def fetch_scores_for_sport(self, sport_code, date_str=None):
         """
@@ -35,76 +33,33 @@ class UniversalScoreFetcher:
             print(f"❌ Unknown sport: {sport_code}")
             return []
         
-        # Get endpoint
-        endpoint = config["api_endpoint"]
-        
-        # Add date if provided
-        if date_str:
-            # Convert YYYY-MM-DD to YYYYMMDD for ESPN API
-            date_formatted = date_str.replace('-', '')
-            endpoint += f"?dates={date_formatted}"
-        
-        try:
-            print(f"⏳ Fetching {config['display_name']} scores...")
-            response = requests.get(endpoint, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
-            events = data.get('events', [])
-            
-            print(f"✅ Found {len(events)} games")
-            
-            # Parse games
-            games = []
-            for event in events:
-                game = self.parse_espn_event(event, sport_code)
-                if game:
-                    games.append(game)
-            
-            return games
-        
-        except Exception as e:
-            print(f"❌ Error fetching {sport_code}: {e}")
-            return []
+        print(f"⏳ Fetching {config['display_name']} scores...")
+        events = self.service.events(sport_code, date_str)
+        print(f"✅ Found {len(events)} games")
+        return [self.parse_espn_event(event, sport_code) for event in events]
     
     def parse_espn_event(self, event, sport_code):
-        """Parse ESPN event into standardized game format"""
-        try:
-            competitors = event.get('competitions', [{}])[0].get('competitors', [])
-            if len(competitors) < 2:
-                return None
-            
-            away = competitors[1]  # First competitor is typically away
-            home = competitors[0]  # Second is home
-            
-            # Extract scores if game is finished
-            game_state = event.get('competitions', [{}])[0].get('status', {}).get('type', 'PRE')
-            
-            away_score = away.get('score')
-            home_score = home.get('score')
-            
-            game = {
-                'sport': sport_code,
-                'game': f"{away.get('team', {}).get('displayName')} @ {home.get('team', {}).get('displayName')}",
-                'away_team': away.get('team', {}).get('displayName'),
-                'home_team': home.get('team', {}).get('displayName'),
-                'away_score': away_score,
-                'home_score': home_score,
-                'game_state': game_state,
-                'date': event.get('date'),
-                'finished': game_state == 'Final' if away_score is not None else False,
-            }
-            
-            return game
-        except Exception as e:
-            print(f"⚠️ Error parsing event: {e}")
-            return None
+        """ScoreboardEvent -> standardized game format"""
+        return {
+            'sport': sport_code,
+            'game': event.matchup,
+            'away_team': event.away_team,
+            'home_team': event.home_team,
+            'away_score': event.away_score,
+            'home_score': event.home_score,
+            'game_state': event.detail,
+            'date': event.date,
+            'finished': event.completed,
+        }
     
     def fetch_all_active_sports(self, date_str=None):
         """Fetch scores for all active sports on a date"""
         all_games = {}
+        sports = get_active_sports()
+        # Every league's scoreboard in one concurrent pass; the loop below reads the cache
+        self.service.prefetch([(sport_code, date_str) for sport_code in sports])
         
-        for sport_code in get_active_sports():
+        for sport_code in sports:
             games = self.fetch_scores_for_sport(sport_code, date_str)
             if games:
                 all_games[sport_code] = games
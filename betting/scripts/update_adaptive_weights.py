@@ -2,12 +2,17 @@
 """
 Adaptive Weight Updater v1.1
 Adds Bayesian smoothing to stabilize weights for small sample sizes.
+Blends in closing line value (learning insights 'clv') once a bet type has
+enough bets with a closing line: CLV converges much faster than win rate.
+Weights and calibration files are only rewritten when their content changes.
 """
 
 import json
 from datetime import datetime
 import logging
 
+from incremental_learning import write_json_if_changed
+
 logging.basicConfig(
     level=logging.INFO,
     format='[%(asctime)s] %(message)s'
@@ -15,26 +20,38 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class AdaptiveWeightUpdater:
-    def __init__(self, alpha=2.0, beta=2.0, min_sample_size=10):
+    def __init__(self, alpha=2.0, beta=2.0, min_sample_size=10, clv_weight=0.5):
         # Bayesian prior parameters (Beta distribution)
         self.alpha = float(alpha)
         self.beta = float(beta)
         self.min_sample_size = int(min_sample_size)
+        # Share of the adjustment taken from CLV when a bet type has min_sample_size CLV bets
+        self.clv_weight = float(clv_weight)
 
         self.learning_file = 'learning_insights.json'
         self.weights_file = 'adaptive_weights.json'
         
-    def calculate_weights(self):
-        """Calculate new weights based on learning insights with Bayesian smoothing"""
-        # Load learning insights
+    def _load_insights(self, insights=None):
+        if insights is not None:
+            return insights
         try:
             with open(self.learning_file) as f:
-                insights = json.load(f)
+                return json.load(f)
         except FileNotFoundError:
+            return None
+    
+    def calculate_weights(self, insights=None):
+        """Calculate new weights based on learning insights with Bayesian smoothing
+        
+        insights: already-built insights dict (skips re-reading learning_insights.json)
+        """
+        insights = self._load_insights(insights)
+        if insights is None:
             logger.error("No learning_insights.json found")
             return None
         
         by_bet_type = insights.get('by_bet_type', {})
+        clv_by_bet_type = (insights.get('clv') or {}).get('by_bet_type', {})
         overall_wr = insights.get('overall_win_rate', 50) / 100.0
         
         logger.info(f"Overall win rate: {insights.get('overall_win_rate')}%")
@@ -45,8 +62,8 @@ class AdaptiveWeightUpdater:
         for bet_type, stats in by_bet_type.items():
             raw_wr = stats.get('win_rate', 50) / 100.0
             count = int(stats.get('total', 0))
-            # Reconstruct integer wins where possible for smoothing
-            wins = int(round(raw_wr * count))
+            # Exact wins from the insights; reconstruct from the rounded rate for older files
+            wins = int(stats['wins']) if 'wins' in stats else int(round(raw_wr * count))
 
             # Log raw values
             logger.debug(f"{bet_type} raw: wins={wins}, total={count}, raw_wr={raw_wr:.3f}")
@@ -76,6 +93,13 @@ class AdaptiveWeightUpdater:
             # Calculate adjustment relative to overall (use smoothed win rate)
             adjustment = (smoothed_wr - overall_wr) * 2.0
 
+            # CLV is in implied-probability points, the same units as the win-rate gap
+            clv = clv_by_bet_type.get(bet_type) or {}
+            if clv.get('clv_bets', 0) >= self.min_sample_size and clv.get('avg_clv') is not None:
+                clv_adjustment = clv['avg_clv'] / 100.0 * 2.0
+                adjustment = (1 - self.clv_weight) * adjustment + self.clv_weight * clv_adjustment
+                logger.info(f"  {bet_type}: CLV {clv['avg_clv']:+.2f}% over {clv['clv_bets']} bets -> adjustment {clv_adjustment:+.3f}")
+
             # Stability factor scaling (conservative ramping)
             if count < 20:
                 stability_factor = 0.0
@@ -181,7 +205,7 @@ class AdaptiveWeightUpdater:
         return validated
     
     def save_weights(self, weights):
-        """Save weights to file with validation"""
+        """Save weights to file with validation (only rewritten when the weights change)"""
         # Validate before saving
         validated_weights = self.validate_weights(weights)
         
@@ -192,19 +216,14 @@ class AdaptiveWeightUpdater:
             'instructions': 'Use these weights in bet_ranker.py when calculating LARLScore'
         }
         
-        with open(self.weights_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        logger.info(f"\n✅ Weights validated and saved to {self.weights_file}")
+        if write_json_if_changed(self.weights_file, data):
+            logger.info(f"\n✅ Weights validated and saved to {self.weights_file}")
+            return True
+        logger.info(f"\n✅ Weights unchanged: {self.weights_file}")
+        return False
     
-    def apply_confidence_calibration(self):
-        """Apply confidence calibration from learning insights"""
-        try:
-            with open(self.learning_file) as f:
-                insights = json.load(f)
-        except FileNotFoundError:
-            return None
-        
+    def calculate_calibration(self, insights):
+        """Per-bucket confidence adjustments from learning insights (no files written)"""
         by_confidence = insights.get('by_confidence', {})
         
         logger.info("=" * 60)
@@ -252,15 +271,25 @@ class AdaptiveWeightUpdater:
             logger.info(f"  Adjustment: {adjustment*100:.1f}%")
             logger.info(f"  → Recommend reducing to: {new_conf:.0f}%\n")
         
+        return calibration
+    
+    def apply_confidence_calibration(self, insights=None):
+        """Apply confidence calibration from learning insights"""
+        insights = self._load_insights(insights)
+        if insights is None:
+            return None
+        
+        calibration = self.calculate_calibration(insights)
+        
         # Save calibration
-        with open('confidence_calibration.json', 'w') as f:
-            json.dump({
+        if write_json_if_changed('confidence_calibration.json', {
                 'generated_at': datetime.now().isoformat(),
                 'calibration': calibration,
                 'instructions': 'Apply these adjustments when generating picks'
-            }, f, indent=2)
-        
-        logger.info(f"✅ Calibration saved to confidence_calibration.json\n")
+        }):
+            logger.info("✅ Calibration saved to confidence_calibration.json\n")
+        else:
+            logger.info("✅ Calibration unchanged\n")
         
         return calibration
 
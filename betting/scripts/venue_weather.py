@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+🏟️ Venue Weather - one forecast request per slate for outdoor games
+
+1. Venue table (VENUE_TABLE_FILE): team -> home venue, city/state, lat/lon and
+   indoor flag, built once per sport from ESPN team metadata (team detail
+   franchise.venue) with each outdoor city geocoded once through Open-Meteo's
+   geocoding API. Later runs only fill in teams that are missing.
+2. A slate of games ("Away @ Home" + sport + kickoff) is resolved to home
+   venues; domes and indoor sports are dropped before any weather call.
+3. Every remaining (venue, kickoff hour) not already cached is sent to
+   Open-Meteo in a single multi-location forecast request (comma-separated
+   latitude/longitude lists), and the kickoff hour's conditions are stored in
+   WeatherProcessor's cache under (venue, hour).
+
+USAGE:
+    from venue_weather import VenueTable, fetch_forecasts
+    table = VenueTable()
+    table.build(['nfl', 'mlb'])                  # once; cached in VENUE_TABLE_FILE
+    forecasts = fetch_forecasts([(lat, lon, hour), ...])
+    python3 venue_weather.py --sports nfl mlb cfb
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+VENUE_TABLE_FILE = '../data/venues.json'
+TEAMS_URLS = {
+    'nfl': 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams',
+    'cfb': 'https://site.api.espn.com/apis/site/v2/sports/football/college-football/teams',
+    'mlb': 'https://site.api.espn.com/apis/site/v2/sports/baseball/mlb/teams',
+}
+TEAMS_PARAMS = {'cfb': {'groups': '80', 'limit': '1000'}}
+GEOCODE_URL = 'https://geocoding-api.open-meteo.com/v1/search'
+FORECAST_URL = 'https://api.open-meteo.com/v1/forecast'
+HOURLY_FIELDS = ('temperature_2m', 'wind_speed_10m', 'precipitation_probability', 'relative_humidity_2m')
+DEFAULT_WORKERS = 8
+
+# pick sport label ('🏈 NFL', 'College Football') -> venue table sport; anything else plays indoors
+WEATHER_SPORTS = {'NFL': 'nfl', 'College Football': 'cfb', 'NCAAF': 'cfb', 'MLB': 'mlb'}
+
+
+def weather_sport(label):
+    """Venue table sport for a pick / OddsAPI sport label, or None for indoor sports"""
+    label = str(label or '')
+    for name, sport in WEATHER_SPORTS.items():
+        if name in label:
+            return sport
+    return {'americanfootball_nfl': 'nfl', 'americanfootball_ncaaf': 'cfb', 'baseball_mlb': 'mlb'}.get(label)
+
+
+def kickoff_hour(commence_time=None, game_time=None, now=None):
+    """
+    UTC kickoff hour 'YYYY-MM-DDTHH:00' from an ISO commence_time, else from a
+    pick's 'HH:MM PM EST' game_time (today), else the current hour.
+    """
+    now = now or datetime.now(timezone.utc)
+    when = None
+    if commence_time:
+        try:
+            when = datetime.fromisoformat(str(commence_time).replace('Z', '+00:00')).astimezone(timezone.utc)
+        except ValueError:
+            pass
+    if when is None and game_time:
+        est = timezone(timedelta(hours=-5))
+        try:
+            clock = datetime.strptime(str(game_time).replace(' EST', '').strip(), '%I:%M %p').time()
+            when = datetime.combine(now.astimezone(est).date(), clock, est).astimezone(timezone.utc)
+        except ValueError:
+            pass
+    return (when or now).strftime('%Y-%m-%dT%H:00')
+
+
+class VenueTable:
+    def __init__(self, path=VENUE_TABLE_FILE, session=None):
+        self.path = path
+        self.session = session or requests.Session()
+        self.venues = self._load()      # {sport: {team name: venue}}
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.venues, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _get(self, url, params=None):
+        try:
+            r = self.session.get(url, params=params, timeout=15)
+            r.raise_for_status()
+            return r.json()
+        except Exception as e:
+            print(f"⚠️ {url}: {e}")
+            return None
+
+    def geocode(self, city, state):
+        """(lat, lon) for a US city, matching the state when Open-Meteo returns several"""
+        data = self._get(GEOCODE_URL, {'name': city, 'count': 10, 'countryCode': 'US'}) or {}
+        results = data.get('results') or []
+        match = next((r for r in results if state and state.lower() in
+                      (str(r.get('admin1', '')).lower(), str(r.get('admin1_code', '')).lower())), None)
+        match = match or (results[0] if results else None)
+        return (match['latitude'], match['longitude']) if match else (None, None)
+
+    def team_venue(self, sport, team_id):
+        """(team name, venue) from one ESPN team detail payload"""
+        data = self._get(f"{TEAMS_URLS[sport]}/{team_id}") or {}
+        team = data.get('team') or {}
+        venue = (team.get('franchise') or {}).get('venue') or {}
+        address = venue.get('address') or {}
+        return team.get('displayName'), {
+            'venue': venue.get('fullName'),
+            'city': address.get('city'),
+            'state': address.get('state'),
+            'indoor': bool(venue.get('indoor')),
+            'lat': None,
+            'lon': None,
+        }
+
+    def build(self, sports=None, workers=DEFAULT_WORKERS, refresh=False):
+        """Fill the table for sports (only teams not already present unless refresh). Returns teams added."""
+        added = 0
+        for sport in sports or sorted(TEAMS_URLS):
+            known = {} if refresh else self.venues.get(sport, {})
+            data = self._get(TEAMS_URLS[sport], TEAMS_PARAMS.get(sport)) or {}
+            teams = [t.get('team') or t for sp in data.get('sports', []) for lg in sp.get('leagues', [])
+                     for t in lg.get('teams', [])]
+            missing = [str(t['id']) for t in teams if t.get('id') and t.get('displayName') not in known]
+            if not missing:
+                continue
+            fetched = {}
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(self.team_venue, sport, tid) for tid in missing]
+                for fut in as_completed(futures):
+                    name, venue = fut.result()
+                    if name and venue['venue']:
+                        fetched[name] = venue
+            # Geocode each outdoor city once
+            cities = {(v['city'], v['state']) for v in fetched.values() if not v['indoor'] and v['city']}
+            coords = {c: self.geocode(*c) for c in cities}
+            for venue in fetched.values():
+                venue['lat'], venue['lon'] = coords.get((venue['city'], venue['state']), (None, None))
+            self.venues[sport] = dict(known, **fetched)
+            added += len(fetched)
+        if added:
+            self._save()
+        return added
+
+    def venue(self, sport, team):
+        return self.venues.get(sport, {}).get(team)
+
+
+def fetch_forecasts(locations, session=None):
+    """
+    locations: [(lat, lon, 'YYYY-MM-DDTHH:00' UTC)] -> one weather dict per location
+    (None where the hour is outside the forecast), from a single request.
+    """
+    if not locations:
+        return []
+    session = session or requests.Session()
+    params = {
+        'latitude': ','.join(f"{lat:.4f}" for lat, _, _ in locations),
+        'longitude': ','.join(f"{lon:.4f}" for _, lon, _ in locations),
+        'hourly': ','.join(HOURLY_FIELDS),
+        'temperature_unit': 'fahrenheit',
+        'wind_speed_unit': 'mph',
+        'timezone': 'UTC',
+        'forecast_days': 7,
+    }
+    r = session.get(FORECAST_URL, params=params, timeout=20)
+    r.raise_for_status()
+    data = r.json()
+    results = data if isinstance(data, list) else [data]
+    forecasts = []
+    for (_, _, hour), result in zip(locations, results):
+        hourly = (result or {}).get('hourly') or {}
+        times = hourly.get('time') or []
+        if hour not in times:
+            forecasts.append(None)
+            continue
+        i = times.index(hour)
+        forecasts.append({
+            'is_indoor': False,
+            'temperature': hourly['temperature_2m'][i],
+            'wind_speed': hourly['wind_speed_10m'][i],
+            'precipitation': hourly['precipitation_probability'][i] or 0,
+            'humidity': hourly['relative_humidity_2m'][i],
+            'conditions': 'Forecast',
+            'impact_on_scoring': 0,     # calculate_total_adjustment scores the raw conditions
+        })
+    return forecasts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the venue table from ESPN team metadata')
+    parser.add_argument('--sports', nargs='+', choices=sorted(TEAMS_URLS))
+    parser.add_argument('--refresh', action='store_true', help='Re-read every team, not only missing ones')
+    args = parser.parse_args()
+
+    table = VenueTable()
+    added = table.build(args.sports, refresh=args.refresh)
+    for sport, venues in sorted(table.venues.items()):
+        outdoor = sum(1 for v in venues.values() if not v['indoor'])
+        print(f"🏟️ {sport.upper()}: {len(venues)} venues ({outdoor} outdoor)")
+    print(f"✅ {added} teams added")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+🚶 Walk-Forward Evaluation - does the learning system help out-of-sample?
+
+For every settled date D:
+1. Learn from bets settled BEFORE D only: PerformanceCube -> LearningEngine
+   insights -> AdaptiveWeightUpdater weights + confidence calibration +
+   optimal thresholds
+2. Rank D's bets with bet_ranker.rank_today_bets under each strategy
+3. Score the top 10 on D's results
+
+Strategies:
+    baseline    no learning: 50% type win rates, neutral weights
+    learned     prior win rates + adaptive weights (what bet_ranker does live)
+    calibrated  learned + calibrated confidence + optimal confidence/edge thresholds
+    ml          learned, with confidence replaced by the ML model's win probability
+                (ml_betting_model fit on the prior bets' feature store rows; same as
+                learned until MIN_TRAIN settled bets or without scikit-learn)
+
+Dates run in parallel on a process pool. Per-date state is cached in
+cache/walk_forward/:
+    learn_<key>.json   learned state, keyed by the prior history + learning code
+    eval_<key>.json    the date's results, keyed by learn key + that day's bets +
+                       ranking code
+so after a ranking formula change only the evaluations are redone, and a
+corrected result only invalidates the dates after it.
+
+USAGE:
+    python3 walk_forward.py
+    python3 walk_forward.py --start 2026-02-01 --workers 8
+    python3 walk_forward.py --no-cache
+"""
+
+import argparse
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from betting_database import open_if_populated, DB_PATH
+from bet_ranker import performance_from_cube, rank_today_bets, score_bet, deduplicate_conflicting_bets
+from incremental_learning import SettlementFeed
+from larlescore_backtester import payout
+from learning_engine import LearningEngine
+from ml_betting_model import FeatureBuilder, MIN_TRAIN, fit as fit_ml
+from performance_cube import PerformanceCube, confidence_bucket
+from update_adaptive_weights import AdaptiveWeightUpdater
+
+WORKSPACE = Path("/Users/macmini/.openclaw/workspace")
+CACHE_SUBDIR = 'cache/walk_forward'
+RESULTS_FILE = 'walk_forward_results.json'
+
+STRATEGIES = ('baseline', 'learned', 'calibrated', 'ml')
+TOP_N = 10
+MIN_HISTORY = 5     # LearningEngine.run_analysis needs 5 completed bets for insights
+
+
+def _digest(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _code_digest(*objects):
+    return _digest([inspect.getsource(obj) for obj in objects])
+
+
+def learn(prior_bets):
+    """Learned state from the bets settled before a date (pure - no files written)"""
+    engine = LearningEngine(use_db=False)
+    engine.cube = PerformanceCube.from_bets(prior_bets)
+    win_rates, performance = performance_from_cube(engine.cube)
+    totals = engine.cube.totals()
+    settled = totals['wins'] + totals['losses']
+
+    state = {
+        'settled': settled,
+        'win_rates': win_rates,
+        'performance': performance,
+        'weights': {},
+        'calibration': {},
+        'thresholds': None,
+    }
+    if settled < MIN_HISTORY:
+        return state
+
+    insights = engine.build_insights()
+    updater = AdaptiveWeightUpdater()
+    state['weights'] = updater.validate_weights(updater.calculate_weights(insights) or {})
+    state['calibration'] = updater.calculate_calibration(insights)
+    state['thresholds'] = insights['optimal_thresholds']
+    return state
+
+
+def _calibrated_slate(bets, state):
+    """Confidence shifted by its bucket's calibration adjustment, thresholds applied"""
+    thresholds = state['thresholds'] or {}
+    min_confidence = thresholds.get('min_confidence', 0)
+    min_edge = thresholds.get('min_edge', 0)
+    slate = []
+    for bet in bets:
+        # Thresholds were derived from raw confidence / edge buckets
+        if bet.get('confidence', 70) < min_confidence or bet.get('edge', 2.0) < min_edge:
+            continue
+        entry = state['calibration'].get(confidence_bucket(bet.get('confidence', 70)))
+        if entry:
+            bet = dict(bet, confidence=max(50, min(100, bet.get('confidence', 70) + entry['adjustment'])))
+        slate.append(bet)
+    return slate
+
+
+def ml_probabilities(X, results, start, end):
+    """
+    ML win probabilities for rows [start, end) from a model fit on rows before start
+    only (X: feature store matrix of every bet, in date order). None if unavailable.
+    """
+    decided = np.isin(results[:start], ('WIN', 'LOSS'))
+    y = (results[:start][decided] == 'WIN').astype(int)
+    if end <= start or len(y) < MIN_TRAIN or len(set(y)) < 2:
+        return None
+    try:
+        model = fit_ml(X[:start][decided], y)
+    except ImportError:
+        return None
+    return [float(p) for p in model.predict_proba(X[start:end])[:, 1]]
+
+
+def _ml_slate(bets, probabilities):
+    if probabilities is None:
+        return bets
+    return [dict(b, confidence=round(p * 100)) for b, p in zip(bets, probabilities)]
+
+
+def evaluate_day(bets, state, top_n=TOP_N, ml=None):
+    """Per-strategy top_n picks and their results for one date's settled bets"""
+    slates = {
+        'baseline': (bets, {}, {}),
+        'learned': (bets, state['win_rates'], state['weights']),
+        'calibrated': (_calibrated_slate(bets, state), state['win_rates'], state['weights']),
+        'ml': (_ml_slate(bets, ml), state['win_rates'], state['weights']),
+    }
+    out = {}
+    for name in STRATEGIES:
+        slate, win_rates, weights = slates[name]
+        with contextlib.redirect_stdout(io.StringIO()):
+            ranked = rank_today_bets([dict(b) for b in slate], win_rates, weights)[:top_n]
+        row = {'picks': 0, 'wins': 0, 'losses': 0, 'pushes': 0, 'units': 0.0}
+        for item in ranked:
+            result = item['bet'].get('result')
+            row['picks'] += 1
+            if result == 'WIN':
+                row['wins'] += 1
+                row['units'] += payout(item['bet'].get('odds', item['bet'].get('price')))
+            elif result == 'LOSS':
+                row['losses'] += 1
+                row['units'] -= 1.0
+            else:
+                row['pushes'] += 1
+        row['units'] = round(row['units'], 4)
+        out[name] = row
+    return out
+
+
+LEARN_CODE = _code_digest(PerformanceCube, LearningEngine, AdaptiveWeightUpdater, performance_from_cube, learn)
+RANK_CODE = _code_digest(score_bet, rank_today_bets, deduplicate_conflicting_bets, payout,
+                         _calibrated_slate, evaluate_day, ml_probabilities, _ml_slate, fit_ml, FeatureBuilder)
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+# Worker processes receive the history once (initializer), then only date tasks
+_worker = {}
+
+
+def _init_worker(bets, day_start, cache_dir, top_n, features):
+    logging.getLogger('update_adaptive_weights').setLevel(logging.WARNING)
+    results = np.array([str(b.get('result')) for b in bets])
+    _worker.update(bets=bets, day_start=day_start, cache_dir=cache_dir, top_n=top_n, features=features,
+                   results=results)
+
+
+def _run_date(task):
+    """Evaluate one date: cached learned state if present, else learn from the prefix"""
+    index, learn_key, eval_key = task
+    bets, day_start, cache_dir = _worker['bets'], _worker['day_start'], _worker['cache_dir']
+    start, end = day_start[index], day_start[index + 1]
+
+    learn_path = os.path.join(cache_dir, f'learn_{learn_key}.json') if cache_dir else None
+    state = _read_json(learn_path) if learn_path else None
+    learned = state is None
+    if learned:
+        state = learn(bets[:start])
+        if learn_path:
+            _write_json(learn_path, state)
+
+    ml = ml_probabilities(_worker['features'], _worker['results'], start, end)
+    result = {'settled_before': state['settled'],
+              'strategies': evaluate_day(bets[start:end], state, _worker['top_n'], ml)}
+    if cache_dir:
+        _write_json(os.path.join(cache_dir, f'eval_{eval_key}.json'), result)
+    return index, result, learned
+
+
+class WalkForward:
+    def __init__(self, bets, cache_dir=None, top_n=TOP_N, workers=None):
+        bets = [b for b in bets if b.get('date') and b.get('result') in ('WIN', 'LOSS', 'PUSH')]
+        self.bets = sorted(bets, key=lambda b: str(b['date']))  # stable: file order within a day
+        self.dates = sorted({str(b['date']) for b in self.bets})
+        self.day_start = [0] * (len(self.dates) + 1)
+        i = 0
+        for d, date in enumerate(self.dates):
+            self.day_start[d] = i
+            while i < len(self.bets) and str(self.bets[i]['date']) == date:
+                i += 1
+        self.day_start[len(self.dates)] = len(self.bets)
+        self.cache_dir = cache_dir
+        self.top_n = top_n
+        self.workers = workers or os.cpu_count() or 1
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def load(cls, workspace=WORKSPACE, **kwargs):
+        """All settled bets from BettingDB when it is populated, else the JSON files"""
+        db = open_if_populated(DB_PATH)
+        bets, _ = SettlementFeed(db, workspace).since({})
+        return cls(bets, **kwargs)
+
+    def keys(self):
+        """(learn_key, eval_key) per date. The learn key chains every earlier day's digest."""
+        out = []
+        prior = _digest(LEARN_CODE)
+        for d in range(len(self.dates)):
+            day = _digest(self.bets[self.day_start[d]:self.day_start[d + 1]])
+            out.append((prior, _digest(prior, day, RANK_CODE, self.top_n)))
+            prior = _digest(prior, day)
+        return out
+
+    def run(self, start=None, end=None, log=print):
+        """Evaluate every date in [start, end]; returns (per-date rows, stats)"""
+        keys = self.keys()
+        indexes = [d for d, date in enumerate(self.dates)
+                   if (not start or date >= start) and (not end or date <= end)]
+        results, tasks = {}, []
+        for d in indexes:
+            cached = _read_json(os.path.join(self.cache_dir, f'eval_{keys[d][1]}.json')) if self.cache_dir else None
+            if cached is not None:
+                results[d] = cached
+            else:
+                tasks.append((d, keys[d][0], keys[d][1]))
+
+        stats = {'dates': len(indexes), 'cached': len(results), 'evaluated': len(tasks), 'learned': 0}
+        log(f"📅 {len(indexes)} dates: {len(results)} cached, {len(tasks)} to evaluate")
+        # Features are read from the feature store once, here, so workers never write to it
+        features = FeatureBuilder().matrix(self.bets) if tasks else None
+        initargs = (self.bets, self.day_start, self.cache_dir, self.top_n, features)
+        if self.workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as pool:
+                done = list(pool.map(_run_date, tasks))
+        else:
+            _init_worker(*initargs)
+            done = [_run_date(t) for t in tasks]
+        for d, result, learned in done:
+            results[d] = result
+            stats['learned'] += int(learned)
+
+        rows = [dict(date=self.dates[d], **results[d]) for d in indexes]
+        return rows, stats
+
+
+def summarize(rows):
+    totals = {}
+    for name in STRATEGIES:
+        t = {'picks': 0, 'wins': 0, 'losses': 0, 'pushes': 0, 'units': 0.0}
+        for row in rows:
+            for k in t:
+                t[k] += row['strategies'][name][k]
+        decided = t['wins'] + t['losses']
+        t['units'] = round(t['units'], 2)
+        t['win_rate'] = round(t['wins'] / decided * 100, 1) if decided else 0.0
+        t['roi'] = round(t['units'] / t['picks'] * 100, 2) if t['picks'] else 0.0
+        t['record'] = f"{t['wins']}-{t['losses']}"
+        totals[name] = t
+    return totals
+
+
+def print_report(rows, totals, stats, elapsed):
+    print("\n" + "=" * 80)
+    print("🚶 WALK-FORWARD EVALUATION")
+    print("=" * 80)
+    print(f"   {stats['dates']} dates | {stats['cached']} cached | {stats['evaluated']} evaluated "
+          f"({stats['learned']} re-learned) | {elapsed:.1f}s")
+
+    print(f"\n{'Date':12} {'Prior':>6}  " + '  '.join(f"{name:>14}" for name in STRATEGIES))
+    print("-" * 80)
+    for row in rows:
+        cells = []
+        for name in STRATEGIES:
+            s = row['strategies'][name]
+            cells.append(f"{s['wins']:>3}-{s['losses']:<3}{s['units']:+7.2f}")
+        print(f"{row['date']:12} {row['settled_before']:>6}  " + '  '.join(f"{c:>14}" for c in cells))
+
+    print("\n📊 OUT-OF-SAMPLE TOTALS:")
+    for name, t in totals.items():
+        print(f"   {name:11} | {t['record']:>7} ({t['win_rate']:5.1f}%) | picks {t['picks']:4} | "
+              f"units {t['units']:+7.2f} | ROI {t['roi']:+6.2f}%")
+
+    delta = totals['learned']['units'] - totals['baseline']['units']
+    verdict = '✅ Learning helped' if delta > 0 else '⚠️  Learning did not help' if delta < 0 else '➖ No difference'
+    print(f"\n{verdict}: {delta:+.2f} units vs baseline")
+    ml_delta = totals['ml']['units'] - totals['learned']['units']
+    print(f"🧠 ML model vs heuristic confidence: {ml_delta:+.2f} units")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward evaluation of the learning system')
+    parser.add_argument('--workspace', default=str(WORKSPACE))
+    parser.add_argument('--start', help='First date to evaluate (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Last date to evaluate (YYYY-MM-DD)')
+    parser.add_argument('--top-n', type=int, default=TOP_N)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--no-cache', action='store_true', help='Recompute every date, write no cache')
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else str(Path(args.workspace) / CACHE_SUBDIR)
+    started = time.monotonic()
+    harness = WalkForward.load(args.workspace, cache_dir=cache_dir, top_n=args.top_n, workers=args.workers)
+    if not harness.dates:
+        print("❌ No settled bets found")
+        return
+
+    rows, stats = harness.run(args.start, args.end)
+    totals = summarize(rows)
+    elapsed = time.monotonic() - started
+    print_report(rows, totals, stats, elapsed)
+
+    output = {
+        'generated_at': datetime.now().isoformat(),
+        'top_n': args.top_n,
+        'stats': stats,
+        'totals': totals,
+        'dates': rows,
+    }
+    path = Path(args.workspace) / RESULTS_FILE
+    with open(path, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\n✅ Results saved to {path}")
+
+
+if __name__ == '__main__':
+    main()
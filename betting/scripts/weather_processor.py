@@ -8,42 +8,48 @@ Weather factors that affect scoring:
 - Wind (strong wind = lower scoring, esp. in football)
 - Precipitation (rain/snow = defensive focus)
 - Humidity (affects game pace and energy)
+
+Outdoor games are resolved per slate (venue_weather.py): prefetch_slate() maps
+each home team to its venue, skips indoor games, and fetches every uncached
+(venue, kickoff hour) in one Open-Meteo request; get_game_weather() is then a
+cache lookup.
 """
 
 import requests
-import json
-from datetime import datetime
-from pathlib import Path
 import sys
 
+from write_behind_cache import WriteBehindCache
+
 sys.path.insert(0, '/Users/macmini/.openclaw/workspace')
 
 class WeatherProcessor:
     """Process weather data and calculate game impact"""
     
-    def __init__(self):
+    def __init__(self, flush_interval=None):
         self.cache_file = 'weather_cache.json'
-        self.weather_data = self.load_weather_data()
+        # Cache valid for 6 hours; written once per run (save_weather_data() or exit)
+        self.cache = WriteBehindCache(self.cache_file, ttl=21600, value_key='weather',
+                                      flush_interval=flush_interval)
         # Using free weather API (Open-Meteo, no key required)
         self.weather_api = "https://api.open-meteo.com/v1/forecast"
+        self._venues = None
     
-    def load_weather_data(self):
-        """Load cached weather data"""
-        try:
-            if Path(self.cache_file).exists():
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+    @property
+    def venues(self):
+        """Team -> venue table (venue_weather.VenueTable), loaded on first use"""
+        if self._venues is None:
+            from venue_weather import VenueTable
+            self._venues = VenueTable()
+        return self._venues
+    
+    @property
+    def weather_data(self):
+        """Raw cache entries ({key: {'timestamp', 'weather'}})"""
+        return self.cache.data
     
     def save_weather_data(self):
-        """Save weather data to cache"""
-        try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.weather_data, f, indent=2)
-        except:
-            pass
+        """Write pending weather data to the cache file"""
+        self.cache.flush()
     
     def get_weather(self, venue_name, city, state):
         """Get weather for a game venue
@@ -54,12 +60,9 @@ class WeatherProcessor:
         cache_key = f"{city}_{state}".lower()
         
         # Check cache
-        if cache_key in self.weather_data:
-            cached = self.weather_data[cache_key]
-            cached_time = datetime.fromisoformat(cached['timestamp'])
-            # Cache valid if less than 6 hours old
-            if (datetime.now() - cached_time).seconds < 21600:
-                return cached['weather']
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # For indoor venues, weather doesn't matter
         indoor_venues = [
@@ -76,6 +79,66 @@ class WeatherProcessor:
         # For outdoor venues, estimate based on city
         return self.estimate_weather_for_city(city, state)
     
+    def _game_venue(self, game, sport_label):
+        """(venue table sport, home venue) for an 'Away @ Home' game; venue None when unknown"""
+        from venue_weather import weather_sport
+        sport = weather_sport(sport_label)
+        home = str(game or '').split(' @ ')[-1].strip()
+        return sport, (self.venues.venue(sport, home) if sport else None)
+    
+    @staticmethod
+    def venue_key(venue, hour):
+        return f"venue|{venue['venue']}|{hour}".lower()
+    
+    def prefetch_slate(self, games):
+        """Forecast every outdoor game on a slate with one request
+        
+        games: [{'game': 'Away @ Home', 'sport': label, 'commence_time' or 'game_time'}]
+        Indoor venues are skipped; (venue, hour) pairs already cached are not
+        refetched. Returns the number of venues forecast.
+        """
+        from venue_weather import fetch_forecasts, kickoff_hour, weather_sport
+        games = list(games)
+        sports = {weather_sport(g.get('sport')) for g in games} - {None}
+        missing_sports = [s for s in sports if not self.venues.venues.get(s)]
+        if missing_sports:
+            self.venues.build(missing_sports)
+        
+        pending = {}
+        for g in games:
+            _, venue = self._game_venue(g.get('game'), g.get('sport'))
+            if not venue or venue.get('indoor') or venue.get('lat') is None:
+                continue
+            hour = kickoff_hour(g.get('commence_time'), g.get('game_time'))
+            key = self.venue_key(venue, hour)
+            if key not in self.cache:
+                pending[key] = (venue['lat'], venue['lon'], hour)
+        if not pending:
+            return 0
+        
+        try:
+            forecasts = fetch_forecasts(list(pending.values()))
+        except Exception as e:
+            print(f"⚠️ Slate forecast failed: {e}")
+            return 0
+        for key, forecast in zip(pending, forecasts):
+            if forecast:
+                self.cache.set(key, forecast)
+        return sum(1 for f in forecasts if f)
+    
+    def get_game_weather(self, game, sport, commence_time=None, game_time=None):
+        """Weather for an 'Away @ Home' game at its home venue (cache lookup after prefetch_slate)"""
+        from venue_weather import kickoff_hour
+        sport_code, venue = self._game_venue(game, sport)
+        if sport_code is None or (venue and venue.get('indoor')):
+            return self.get_default_weather(is_indoor=True)
+        if not venue:
+            return self.get_default_weather()
+        cached = self.cache.get(self.venue_key(venue, kickoff_hour(commence_time, game_time)))
+        if cached is not None:
+            return cached
+        return self.estimate_weather_for_city(venue.get('city'), venue.get('state'))
+    
     def get_default_weather(self, is_indoor=False):
         """Get default/neutral weather"""
         return {
@@ -143,7 +206,8 @@ class WeatherProcessor:
             adjustment += 2  # Heat might slow play
         
         # Wind impact (mainly football)
-        if sport in ['NFL', 'College Football']:
+        from venue_weather import weather_sport
+        if weather_sport(sport) in ('nfl', 'cfb'):
             wind = weather_data.get('wind_speed', 0)
             if wind > 15:
                 adjustment -= 2  # Strong wind reduces scoring
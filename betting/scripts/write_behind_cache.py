@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Cache - in-memory per-key JSON cache with one flush per run
+
+The team strength, weather and injury processors each keep a small JSON file
+keyed by team/city. Reads and writes go to an in-memory dict; set() only marks
+the cache dirty, and the file is rewritten once - on flush(), at interpreter
+exit, or when flush_interval seconds have passed since the last write - via a
+temp file + os.replace so a crash never leaves half a file behind.
+
+TTL entries keep the on-disk layout the processors already use:
+
+    {key: {'timestamp': ISO time, <value_key>: value}}
+
+Freshness uses the full age (timedelta.total_seconds(), not .seconds, which
+wraps every day). Entries written in this process are aged on time.monotonic(),
+so a wall-clock jump can't make them stale or fresh early; entries loaded from
+disk are converted to a monotonic deadline once at load.
+
+Without a ttl/value_key the values are stored as-is (no expiry).
+
+Usage:
+    cache = WriteBehindCache('team_strength_cache.json', ttl=86400, value_key='stats')
+    stats = cache.get('ncaab_duke')                 # None if missing or stale
+    cache.set('ncaab_duke', {...})                  # memory only, marks dirty
+    cache.prefetch(keys, loader)                    # loader(missing_keys) -> {key: value}
+    cache.flush()                                   # also runs at exit
+"""
+
+import atexit
+import json
+import os
+import time
+from datetime import datetime
+
+
+class WriteBehindCache:
+    """Per-key JSON cache: in-memory reads/writes, dirty tracking, batched flush"""
+
+    def __init__(self, path, ttl=None, value_key=None, flush_interval=None):
+        self.path = path
+        self.ttl = ttl
+        self.value_key = value_key
+        self.flush_interval = flush_interval
+        self.dirty = False
+        self.data = self._load()
+        # key -> monotonic time the entry was written (entries from disk are back-dated by their age)
+        self._written = {}
+        now_wall, now_mono = datetime.now(), time.monotonic()
+        if self.ttl is not None:
+            for key, entry in self.data.items():
+                self._written[key] = now_mono - self._age(entry, now_wall)
+        self._last_flush = now_mono
+        atexit.register(self.flush)
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+        except Exception:
+            pass
+        return {}
+
+    @staticmethod
+    def _age(entry, now):
+        """Seconds since an on-disk entry was written (inf when it has no usable timestamp)"""
+        try:
+            return max((now - datetime.fromisoformat(entry['timestamp'])).total_seconds(), 0.0)
+        except Exception:
+            return float('inf')
+
+    # ------------------------------------------------------------------ reads
+
+    def is_fresh(self, key):
+        if key not in self.data:
+            return False
+        if self.ttl is None:
+            return True
+        return time.monotonic() - self._written.get(key, float('-inf')) < self.ttl
+
+    def get(self, key, default=None):
+        """Fresh value for key, else default"""
+        if not self.is_fresh(key):
+            return default
+        entry = self.data[key]
+        if self.value_key is None:
+            return entry
+        return entry.get(self.value_key, default)
+
+    def __contains__(self, key):
+        return self.is_fresh(key)
+
+    # ----------------------------------------------------------------- writes
+
+    def set(self, key, value):
+        """Store value in memory and mark the cache dirty (written on the next flush)"""
+        if self.value_key is None:
+            self.data[key] = value
+        else:
+            self.data[key] = {'timestamp': datetime.now().isoformat(), self.value_key: value}
+        self._written[key] = time.monotonic()
+        self.dirty = True
+        if self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def touch(self, key):
+        """Mark an in-place edit of a stored value (e.g. a list appended to) as dirty"""
+        self._written[key] = time.monotonic()
+        self.dirty = True
+
+    def delete(self, key):
+        if self.data.pop(key, None) is not None:
+            self._written.pop(key, None)
+            self.dirty = True
+
+    def prefetch(self, keys, loader):
+        """
+        Warm many keys at once: loader(missing_keys) -> {key: value} is called a
+        single time with every key that is missing or stale. Returns {key: value}
+        for all requested keys that have a value.
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [k for k in keys if not self.is_fresh(k)]
+        if missing:
+            for key, value in (loader(missing) or {}).items():
+                self.set(key, value)
+        return {k: self.get(k) for k in keys if self.is_fresh(k)}
+
+    def flush(self):
+        """Write the file if anything changed since the last flush. Returns True if written."""
+        if not self.dirty:
+            return False
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self.data, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except Exception:
+            return False
+        self.dirty = False
+        self._last_flush = time.monotonic()
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
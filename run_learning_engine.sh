@@ -1,4 +1,4 @@
 #!/bin/bash
 # Run learning engine to update insights
 cd /Users/macmini/.openclaw/workspace
-python3 learning_engine.py >> learning_engine.log 2>&1
+python3 learning_engine.py --incremental >> learning_engine.log 2>&1
@@ -0,0 +1,4 @@
+#!/bin/bash
+# Retrain the ML betting model on all settled bets (background job; pipeline loads ml_model.pkl)
+cd /Users/macmini/.openclaw/workspace
+python3 ml_betting_model.py --train >> ml_training.log 2>&1
@@ -34,6 +34,10 @@ cat > /tmp/larlbot_cron.txt << 'EOF'
 # Analyzes completed bets and updates ML insights
 0 */6 * * * cd /Users/macmini/.openclaw/workspace && /usr/bin/python3 /Users/macmini/.openclaw/workspace/learning_engine.py >> /Users/macmini/.openclaw/workspace/learning_engine.log 2>&1
 
+# 5b. ML MODEL TRAINING - 6:30 AM EST (before pick generation loads ml_model.pkl)
+# Retrains the win-probability model on all settled bets
+30 6 * * * /bin/bash /Users/macmini/.openclaw/workspace/run_ml_training.sh
+
 # 6. NIGHTLY CLEANUP - 2:00 AM EST
 # Archives old logs and cleans up cache
 0 2 * * * cd /Users/macmini/.openclaw/workspace && find . -name "*.log" -mtime +7 -delete
@@ -63,6 +67,7 @@ echo "   • Check game statuses every 15 minutes"
 echo "   • Auto-update dashboard every 15 minutes"
 echo "   • Sync to production (Railway) every 15 minutes"
 echo "   • Run learning engine every 6 hours"
+echo "   • Retrain the ML model daily at 6:30 AM"
 echo "   • Cleanup logs nightly at 2:00 AM"
 echo ""
 echo "🌐 Local Dashboard:      http://localhost:5001"
@@ -73,5 +78,6 @@ echo "   • Daily Picks:    daily_picks.log"
 echo "   • Auto Updates:   auto_update.log"
 echo "   • Git Sync:       git_sync.log"
 echo "   • Learning:       learning_engine.log"
+echo "   • ML Training:    ml_training.log"
 echo ""
 echo "======================================================================"
@@ -276,13 +276,19 @@ const RENDER = {
      */
     updateStats(stats) {
         try {
+            // Closing line value: average implied-probability points vs the close
+            const clv = (stats.avg_clv === null || stats.avg_clv === undefined)
+                ? '--'
+                : `${stats.avg_clv > 0 ? '+' : ''}${stats.avg_clv.toFixed(1)}%`;
             const updates = {
                 'stat-winrate': `${stats.win_rate}%`,
                 'stat-record': stats.record,
                 'stat-total': stats.total_bets,
                 'stat-winrate-previous': `${stats.win_rate}%`,
                 'stat-record-previous': stats.record,
-                'stat-total-previous': stats.total_bets
+                'stat-total-previous': stats.total_bets,
+                'stat-clv': clv,
+                'stat-clv-previous': clv
             };
             
             for (const [id, value] of Object.entries(updates)) {